@@ -20,6 +20,7 @@ import uuid
 
 # Import coordination system
 from agent_system.coordination.redis_coordinator import ZeroCostRedisCoordinator, AgentTask
+from ollama_client import PRIORITY_NORMAL, OllamaError, get_ollama_client
 from ollama_config import ollama_config
 
 # Configure logging
@@ -154,22 +155,21 @@ class BaseZeroCostAgent:
             model = task.context_data.get("model", "qwen2.5:3b")
 
             # Call local Ollama API
-            response = requests.post(f"{self.ollama_url}/api/generate", json={
+            result = get_ollama_client().generate(
+                model, prompt,
+                caller=f"agents.{self.agent_id}",
+                priority=PRIORITY_NORMAL,
+                timeout=30,
+                base_url=self.ollama_url,
+            )
+            return {
+                "response": result.get("response", ""),
                 "model": model,
-                "prompt": prompt,
-                "stream": False
-            }, timeout=30)
-
-            if response.status_code == 200:
-                result = response.json()
-                return {
-                    "response": result.get("response", ""),
-                    "model": model,
-                    "cost": "$0.00"
-                }
-            else:
-                return {"error": f"LLM inference failed: {response.status_code}"}
+                "cost": "$0.00"
+            }
 
+        except OllamaError as e:
+            return {"error": f"LLM inference failed: {e}"}
         except Exception as e:
             return {"error": f"LLM inference error: {str(e)}"}
 
@@ -16,10 +16,10 @@ import time
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
-import requests
 
 # Import agent system components
 from coordination.redis_coordinator import AgentTask
+from ollama_client import PRIORITY_INTERACTIVE, get_ollama_client
 from ollama_config import ollama_config
 
 # Configure logging
@@ -246,40 +246,42 @@ class ZeroCostNLPTaskParser:
         """
 
         try:
-            response = requests.post(f"{self.ollama_url}/api/generate", json={
-                "model": self.model,
-                "prompt": analysis_prompt,
-                "stream": False,
-                "options": {
+            result = get_ollama_client().generate(
+                self.model,
+                analysis_prompt,
+                options={
                     "temperature": 0.1,  # Low temperature for consistent parsing
                     "top_p": 0.9
-                }
-            }, timeout=10)
-
-            if response.status_code == 200:
-                result = response.json()
-                llm_output = result.get("response", "")
-
-                # Parse JSON from LLM response
-                try:
-                    # Extract JSON from response (handle markdown formatting)
-                    json_match = re.search(r'\{.*\}', llm_output, re.DOTALL)
-                    if json_match:
-                        parsed_data = json.loads(json_match.group())
-
-                        return TaskAnalysis(
-                            task_type=parsed_data.get("task_type", "general"),
-                            complexity=parsed_data.get("complexity", "medium"),
-                            estimated_duration_minutes=parsed_data.get("estimated_duration_minutes", 5),
-                            required_capabilities=parsed_data.get("required_capabilities", []),
-                            recommended_agent=parsed_data.get("recommended_agent", "rag_research_agent"),
-                            confidence_score=float(parsed_data.get("confidence_score", 0.7)),
-                            extracted_entities=parsed_data.get("extracted_entities", {}),
-                            mcp_tools_needed=parsed_data.get("mcp_tools_needed", []),
-                            compute_requirements=parsed_data.get("compute_requirements", {})
-                        )
-                except json.JSONDecodeError:
-                    logger.warning("Failed to parse LLM JSON response")
+                },
+                caller="agents.task_parser",
+                priority=PRIORITY_INTERACTIVE,
+                timeout=10,
+                retries=1,  # The heuristic fallback is better than waiting
+                base_url=self.ollama_url,
+            )
+
+            llm_output = result.get("response", "")
+
+            # Parse JSON from LLM response
+            try:
+                # Extract JSON from response (handle markdown formatting)
+                json_match = re.search(r'\{.*\}', llm_output, re.DOTALL)
+                if json_match:
+                    parsed_data = json.loads(json_match.group())
+
+                    return TaskAnalysis(
+                        task_type=parsed_data.get("task_type", "general"),
+                        complexity=parsed_data.get("complexity", "medium"),
+                        estimated_duration_minutes=parsed_data.get("estimated_duration_minutes", 5),
+                        required_capabilities=parsed_data.get("required_capabilities", []),
+                        recommended_agent=parsed_data.get("recommended_agent", "rag_research_agent"),
+                        confidence_score=float(parsed_data.get("confidence_score", 0.7)),
+                        extracted_entities=parsed_data.get("extracted_entities", {}),
+                        mcp_tools_needed=parsed_data.get("mcp_tools_needed", []),
+                        compute_requirements=parsed_data.get("compute_requirements", {})
+                    )
+            except json.JSONDecodeError:
+                logger.warning("Failed to parse LLM JSON response")
 
         except Exception as e:
             logger.error(f"LLM analysis failed: {e}")
@@ -16,7 +16,6 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
-import requests
 
 # Configure logging FIRST
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 # Import path utilities
 from project_paths import get_project_root, resolve_path
+from ollama_client import PRIORITY_INTERACTIVE, OllamaError, get_ollama_client
 from ollama_config import ollama_config
 
 # Import web tools for agent function calling
@@ -87,6 +87,7 @@ class OllamaAgentRuntime:
             ollama_url: URL of local Ollama server (default: localhost:11434)
         """
         self.ollama_url = ollama_url or ollama_config.base_url
+        self.client = get_ollama_client()
         self.active_agents: Dict[str, OllamaAgentConfig] = {}
         self.skills_cache: Dict[str, AgentSkill] = {}
         self.skills_dir = get_project_root() / ".claude" / "skills"
@@ -358,12 +359,10 @@ class OllamaAgentRuntime:
         Returns:
             True if Ollama is reachable, False otherwise
         """
-        try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=2)
-            return response.status_code == 200
-        except Exception as e:
-            logger.error(f"Ollama not available: {e}")
-            return False
+        available = self.client.is_available(timeout=2, base_url=self.ollama_url)
+        if not available:
+            logger.error(f"Ollama not available at {self.ollama_url}")
+        return available
 
     def list_ollama_models(self) -> List[str]:
         """
@@ -373,12 +372,9 @@ class OllamaAgentRuntime:
             List of model names
         """
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags")
-            if response.status_code == 200:
-                data = response.json()
-                return [model['name'] for model in data.get('models', [])]
-            return []
-        except Exception as e:
+            data = self.client.tags(base_url=self.ollama_url, caller='agents')
+            return [model['name'] for model in data.get('models', [])]
+        except OllamaError as e:
             logger.error(f"Failed to list Ollama models: {e}")
             return []
 
@@ -946,27 +942,20 @@ DO NOT explain what you "would need" - JUST DO IT.
             extract_count = sum(1 for tr in tool_results_history if tr.get('tool_name') == 'extract_faculty_profile')
             logger.info(f"🔄 Iteration {iteration+1}/{max_iterations} | Searches: {search_count} | Profiles: {extract_count} | Results: {len(tool_results_history)}")
 
-            # Prepare request to Ollama
-            ollama_request = {
-                'model': config.model,
-                'prompt': current_prompt,
-                'system': config.system_prompt,
-                'options': {
-                    'temperature': kwargs.get('temperature', config.temperature),
-                    'num_predict': kwargs.get('max_tokens', config.max_tokens)
-                },
-                'stream': False
-            }
-
             try:
-                response = requests.post(
-                    f"{self.ollama_url}/api/generate",
-                    json=ollama_request,
-                    timeout=120  # Increased timeout for tool calls
+                result = self.client.generate(
+                    config.model,
+                    current_prompt,
+                    system=config.system_prompt,
+                    options={
+                        'temperature': kwargs.get('temperature', config.temperature),
+                        'num_predict': kwargs.get('max_tokens', config.max_tokens)
+                    },
+                    caller='agents',
+                    priority=PRIORITY_INTERACTIVE,
+                    timeout=120,  # Increased timeout for tool calls
+                    base_url=self.ollama_url
                 )
-
-                response.raise_for_status()
-                result = response.json()
                 agent_response = result.get('response', '')
                 agent_responses.append(agent_response)
 
@@ -1221,7 +1210,7 @@ IMPORTANT:
 - If you have sufficient results, synthesize them now
 - Use clear formatting"""
 
-            except requests.exceptions.RequestException as e:
+            except OllamaError as e:
                 logger.error(f"Ollama request failed: {e}")
                 return {
                     'status': 'error',
@@ -0,0 +1,119 @@
+"""
+benchmarks/requirement_scanner.py — Requirement keyword classification: per-pattern vs single scan.
+
+Splits a real RFP text (default: the JADC2 Commercial Solutions Opening in
+data/JADC2) into sentences with RequirementExtractor._split_sentences() and
+classifies them three ways:
+
+  - per-pattern: the previous extractor logic, one compiled regex per
+                 mandatory / recommended / optional / negative / conditional
+                 pattern, searched against every sentence in turn
+  - scan:        KeywordScanner.classify(), one sentence at a time
+  - batch:       KeywordScanner.classify_many() over the whole document
+
+then times RequirementExtractor.extract_requirements() end to end with the
+per-pattern logic and with the scanner. Results are checked to be identical
+before anything is timed.
+
+Usage:
+    uv run python benchmarks/requirement_scanner.py [--text data/JADC2/FA8612-21-S-C001.txt] [--rounds 50]
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from shredding.requirement_extractor import RequirementExtractor  # noqa: E402
+
+DEFAULT_TEXT = os.path.join(ROOT, 'data', 'JADC2', 'FA8612-21-S-C001.txt')
+
+
+def _compile_all(patterns):
+    return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+
+class PerPatternScanner:
+    """The pre-scanner classification: every pattern searched separately."""
+
+    def __init__(self):
+        self.mandatory = _compile_all(RequirementExtractor.MANDATORY_KEYWORDS)
+        self.recommended = _compile_all(RequirementExtractor.RECOMMENDED_KEYWORDS)
+        self.optional = _compile_all(RequirementExtractor.OPTIONAL_KEYWORDS)
+        self.negative = _compile_all(RequirementExtractor.NEGATIVE_PATTERNS)
+        self.conditional = _compile_all(RequirementExtractor.CONDITIONAL_PATTERNS)
+
+    def classify(self, sentence):
+        for compliance_type, patterns in (('mandatory', self.mandatory), ('recommended', self.recommended),
+                                          ('optional', self.optional)):
+            found = [p.pattern.strip(r'\b') for p in patterns if p.search(sentence)]
+            if found:
+                if compliance_type == 'mandatory' and any(p.search(sentence) for p in self.conditional):
+                    found.append('conditional')
+                return (compliance_type, found)
+        return ('unknown', [])
+
+    def classify_many(self, sentences):
+        return [self.classify(sentence) for sentence in sentences]
+
+    def is_negative(self, sentence):
+        return any(p.match(sentence) for p in self.negative) or len(sentence.strip()) < 20
+
+
+def _time(fn, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--text', default=DEFAULT_TEXT, help='plain-text RFP to classify')
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with open(args.text, encoding='utf-8') as f:
+        text = f.read()
+
+    scanned = RequirementExtractor()
+    per_pattern = RequirementExtractor()
+    per_pattern.scanner = PerPatternScanner()
+    sentences = scanned._split_sentences(text)
+
+    expected = per_pattern.scanner.classify_many(sentences)
+    assert scanned.scanner.classify_many(sentences) == expected, 'scanner disagrees with per-pattern results'
+    found = sum(1 for compliance_type, _ in expected if compliance_type != 'unknown')
+
+    print(f"{os.path.basename(args.text)}: {len(text):,} chars, {len(sentences)} sentences, "
+          f"{found} with compliance keywords")
+    print("  classification")
+    baseline = None
+    for label, classify in (('per-pattern', lambda: [per_pattern.scanner.classify(s) for s in sentences]),
+                            ('scan', lambda: [scanned.scanner.classify(s) for s in sentences]),
+                            ('batch', lambda: scanned.scanner.classify_many(sentences))):
+        elapsed = _time(classify, args.rounds)
+        baseline = baseline or elapsed
+        print(f"    {label:<12} {elapsed * 1000:8.2f} ms   {len(sentences) / elapsed:>10,.0f} sentences/s"
+              f"   {baseline / elapsed:5.2f}x")
+
+    def extract(extractor):
+        return [(r.text, r.compliance_type, r.keywords) for r in extractor.extract_requirements(text, 'C')]
+
+    assert extract(scanned) == extract(per_pattern), 'extracted requirements differ'
+    print("  extract_requirements")
+    baseline = None
+    for label, extractor in (('per-pattern', per_pattern), ('batch', scanned)):
+        elapsed = _time(lambda: extractor.extract_requirements(text, 'C'), args.rounds)
+        baseline = baseline or elapsed
+        print(f"    {label:<12} {elapsed * 1000:8.2f} ms   {baseline / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
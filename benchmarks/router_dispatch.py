@@ -0,0 +1,106 @@
+"""
+benchmarks/router_dispatch.py — Router dispatch cost: compiled trie vs linear scan.
+
+Builds the real route table with build_router(), then builds a second Router
+holding the same routes as linear predicates (one compiled regex per route,
+registered in the same order — the shape of the pre-trie lambda table).
+Each router resolves one concrete path per enabled route plus a few misses,
+and the per-lookup cost is reported.
+
+Only Router.match() is timed, so no handler runs and no database is touched.
+
+Usage:
+    uv run python benchmarks/router_dispatch.py [--rounds 200]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.router import Router  # noqa: E402
+from server.routes_builder import build_router  # noqa: E402
+
+MISSES = ['/api/does-not-exist', '/api/todos/1/2/3/4', '/api/opportunities/1/unknown']
+
+
+def _concrete(pattern):
+    """Turn a pattern into a path it matches ('{id}' → 'id123', '**' → 'a/b')."""
+    segs = []
+    for seg in pattern.lstrip('/').split('/'):
+        if seg == '**':
+            segs.append('a/b')
+        elif seg == '*' or (seg.startswith('{') and seg.endswith('}')):
+            segs.append('id123')
+        else:
+            segs.append(seg)
+    return '/' + '/'.join(segs)
+
+
+def _as_predicate(pattern):
+    """Compile a pattern to a path → bool predicate equivalent to its trie entry."""
+    parts = []
+    for seg in pattern.lstrip('/').split('/'):
+        if seg == '**':
+            parts.append('.+')
+        elif seg == '*' or (seg.startswith('{') and seg.endswith('}')):
+            parts.append('[^/]+')
+        else:
+            parts.append(re.escape(seg))
+    regex = re.compile('/' + '/'.join(parts))
+    return lambda p: regex.fullmatch(p) is not None
+
+
+def build_linear(table):
+    """Rebuild the route table as predicate routes (linear scan per verb)."""
+    linear = Router()
+    for entry in table:
+        if entry['enabled'] and entry['pattern'] != '<predicate>':
+            linear.add(entry['method'], _as_predicate(entry['pattern']), entry['action'])
+    return linear
+
+
+def time_lookups(router, requests, rounds):
+    """Return mean microseconds per Router.match() call."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for method, path in requests:
+            router.match(method, path)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(requests)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    trie = build_router()
+    table = trie.describe()
+    linear = build_linear(table)
+
+    enabled = [e for e in table if e['enabled'] and e['pattern'] != '<predicate>']
+    requests = [(e['method'], _concrete(e['pattern'])) for e in enabled]
+    requests += [('GET', p) for p in MISSES]
+
+    # Both routers must agree on which pattern serves each request
+    for method, path in requests:
+        a, b = trie.match(method, path), linear.match(method, path)
+        if (a is None) != (b is None):
+            print(f"⚠️  Mismatch for {method} {path}")
+
+    trie_us = time_lookups(trie, requests, args.rounds)
+    linear_us = time_lookups(linear, requests, args.rounds)
+
+    print(f"Routes: {len(table)} registered, {len(enabled)} enabled; "
+          f"{len(requests)} lookups × {args.rounds} rounds")
+    print(f"  linear scan : {linear_us:8.2f} µs/lookup")
+    print(f"  trie        : {trie_us:8.2f} µs/lookup")
+    print(f"  speedup     : {linear_us / trie_us:8.1f}×")
+
+
+if __name__ == '__main__':
+    main()
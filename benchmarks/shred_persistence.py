@@ -0,0 +1,141 @@
+"""
+benchmarks/shred_persistence.py — Saving shredded requirements: row by row vs bulk.
+
+Builds N synthetic classified requirements and writes them, plus one task
+per requirement, into a fresh opportunities schema twice:
+
+  - row:  the previous RFPShredder path: a plain connection, one
+          cursor.execute() per requirement / task / task link and two
+          INFO log lines per requirement (formatted, written to os.devnull)
+  - bulk: shredding.requirement_store (executemany in one transaction on
+          the pooled connection, which also enforces foreign keys)
+
+and reports seconds and rows/s for each. Also times a bulk compliance
+status change of every other requirement.
+
+Both paths commit once per table, so the SQL work is similar; the gap is
+the per-row logging and Python-level statement dispatch.
+
+Usage:
+    uv run python benchmarks/shred_persistence.py [--requirements 10000]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shredding.requirement_classifier import RequirementClassification  # noqa: E402
+from shredding.requirement_extractor import Requirement  # noqa: E402
+from shredding.requirement_store import (  # noqa: E402
+    _INSERT_REQUIREMENT, _INSERT_TASK, _LINK_TASK, insert_requirements, insert_tasks,
+    requirement_rows, task_rows, update_compliance_status
+)
+
+SCHEMA = """
+    CREATE TABLE opportunities (id TEXT PRIMARY KEY, title TEXT, metadata TEXT);
+    CREATE TABLE tasks (
+        id TEXT PRIMARY KEY, opportunity_id TEXT REFERENCES opportunities(id) ON DELETE CASCADE,
+        title TEXT, description TEXT, status TEXT, priority TEXT, due_date TEXT, assignee TEXT,
+        metadata TEXT, created_at TEXT, updated_at TEXT
+    );
+    CREATE TABLE requirements (
+        id TEXT PRIMARY KEY, opportunity_id TEXT NOT NULL REFERENCES opportunities(id) ON DELETE CASCADE,
+        task_id TEXT REFERENCES tasks(id) ON DELETE SET NULL, section TEXT NOT NULL, page_number INTEGER,
+        paragraph_id TEXT, source_text TEXT NOT NULL, compliance_type TEXT NOT NULL,
+        requirement_category TEXT, priority TEXT, risk_level TEXT, compliance_status TEXT,
+        assignee_id TEXT, assignee_type TEXT, keywords TEXT, extracted_entities TEXT,
+        created_at TEXT, updated_at TEXT
+    );
+    CREATE INDEX idx_requirements_opportunity ON requirements(opportunity_id);
+    CREATE INDEX idx_requirements_compliance ON requirements(compliance_status);
+    INSERT INTO opportunities (id, title) VALUES ('opp', 'Benchmark');
+"""
+
+
+def _classified(n):
+    categories = ('technical', 'management', 'cost', 'deliverable')
+    return [
+        {
+            'requirement': Requirement(id=f'req-{i:06d}', section='CLM'[i % 3], page_number=i // 20,
+                                       paragraph_id=f'C.{i}',
+                                       text=f'The contractor shall provide capability {i} in accordance '
+                                            f'with NIST SP 800-53 and FAR 52.204-21 within 30 days.'),
+            'classification': RequirementClassification(
+                compliance_type='mandatory', category=categories[i % 4], priority='high', risk_level='yellow',
+                keywords=['capability', 'NIST', 'FAR'], implicit_requirements=[],
+                extracted_entities={'dates': [], 'standards': ['NIST', 'FAR'], 'acronyms': ['NIST', 'SP', 'FAR']}
+            )
+        }
+        for i in range(n)
+    ]
+
+
+def _fresh_db(directory, name):
+    path = os.path.join(directory, name)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return path
+
+
+def _row_logger():
+    logger = logging.getLogger('benchmarks.shred_persistence')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.StreamHandler(open(os.devnull, 'w'))
+    handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def _row_by_row(db_path, classified):
+    logger = _row_logger()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for i, row in enumerate(requirement_rows('opp', classified)):
+        logger.info(f"DEBUG: Inserting requirement {i+1}/{len(classified)}: {row[0]}")
+        cursor.execute(_INSERT_REQUIREMENT, row)
+        logger.info(f"DEBUG: Successfully inserted requirement {row[0]}")
+    conn.commit()
+    tasks, links = task_rows('opp', classified, '2026-12-08')
+    for task, link in zip(tasks, links):
+        cursor.execute(_INSERT_TASK, task)
+        cursor.execute(_LINK_TASK, link)
+    conn.commit()
+    conn.close()
+
+
+def _bulk(db_path, classified):
+    insert_requirements(db_path, 'opp', classified)
+    insert_tasks(db_path, 'opp', classified, '2026-12-08')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requirements', type=int, default=10000)
+    args = parser.parse_args()
+
+    classified = _classified(args.requirements)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.requirements} requirements (+ one task each)")
+        for label, write in (('row', _row_by_row), ('bulk', _bulk)):
+            db_path = _fresh_db(directory, f'{label}.db')
+            started = time.perf_counter()
+            write(db_path, classified)
+            elapsed = time.perf_counter() - started
+            print(f"  {label:<5} {elapsed:8.3f} s   {args.requirements / elapsed:>10,.0f} requirements/s")
+
+        ids = [cr['requirement'].id for cr in classified[::2]]
+        started = time.perf_counter()
+        updated = update_compliance_status(os.path.join(directory, 'bulk.db'), ids, 'fully_compliant')
+        print(f"  status update of {updated} requirements: {time.perf_counter() - started:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
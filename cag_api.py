@@ -152,8 +152,13 @@ class CAGManager:
             # Count tokens
             tokens = self._count_tokens(full_text)
 
+            # Re-loading a document replaces its cached copy
+            doc_id = Path(file_path).stem
+            previous = self.cached_documents.get(doc_id)
+            replaced_tokens = previous['tokens'] if previous else 0
+
             # Check if it fits in available space
-            available = self.max_context_tokens - self.total_tokens
+            available = self.max_context_tokens - self.total_tokens + replaced_tokens
             if tokens > available:
                 return {
                     'status': 'error',
@@ -163,7 +168,6 @@ class CAGManager:
                 }
 
             # Store in cache
-            doc_id = Path(file_path).stem
             self.cached_documents[doc_id] = {
                 'id': doc_id,
                 'filename': Path(file_path).name,
@@ -175,7 +179,7 @@ class CAGManager:
                 'status': 'cached'
             }
 
-            self.total_tokens += tokens
+            self.total_tokens += tokens - replaced_tokens
 
             logger.info(f"✅ Loaded {Path(file_path).name} into CAG cache ({tokens} tokens)")
 
@@ -5,11 +5,11 @@ Generates optimistic, pessimistic, pragmatic, and speculative narratives
 for each hiring case.
 """
 
-import requests
 import json
 import logging
 from typing import Dict, Optional
 
+from ollama_client import PRIORITY_BATCH, OllamaError, OllamaTimeoutError, get_ollama_client
 from ollama_config import ollama_config
 from .data_models import (
     Candidate,
@@ -296,31 +296,29 @@ Write the speculative assessment:"""
             Generated text
         """
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "num_predict": 800  # Max tokens for standard verbosity
-                    }
+            result = get_ollama_client().generate(
+                self.model,
+                prompt,
+                options={
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "num_predict": 800  # Max tokens for standard verbosity
                 },
-                timeout=120
+                caller="career_monster",
+                priority=PRIORITY_BATCH,
+                timeout=120,
+                base_url=self.ollama_url
             )
+            return result.get("response", "").strip()
 
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "").strip()
-            else:
-                logger.error(f"Ollama error: {response.status_code}")
-                return f"[Error generating narrative: HTTP {response.status_code}]"
-
-        except requests.exceptions.Timeout:
+        except OllamaTimeoutError:
             logger.error("Ollama request timed out")
             return "[Error: Request timed out. Ollama may be overloaded.]"
+        except OllamaError as e:
+            logger.error(f"Ollama error: {e}")
+            if e.status_code:
+                return f"[Error generating narrative: HTTP {e.status_code}]"
+            return f"[Error generating narrative: {str(e)}]"
         except Exception as e:
             logger.error(f"Ollama error: {e}")
             return f"[Error generating narrative: {str(e)}]"
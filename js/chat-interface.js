@@ -347,26 +347,22 @@ class ChatInterface {
             // Check knowledge mode
             const knowledgeMode = document.getElementById('knowledge-mode-selector')?.value || 'none';
 
-            let apiEndpoint = '/api/chat';
+            // Standard, RAG and CAG answers all stream from /api/chat
             const requestBody = {
                 message: message,
                 model: this.currentModel,
-                workspace: window.app.knowledgeManager?.currentKnowledgeBase || 'default'
+                workspace: window.app.knowledgeManager?.currentKnowledgeBase || 'default',
+                knowledge_mode: knowledgeMode,
+                stream: true
             };
 
-            // Route to CAG if CAG mode is selected
-            if (knowledgeMode === 'cag') {
-                apiEndpoint = '/api/cag/query';
-                requestBody.query = message;
-            }
-
-            debugLog('Sending chat request:', { endpoint: apiEndpoint, body: requestBody, mode: knowledgeMode });
+            debugLog('Sending chat request:', { body: requestBody, mode: knowledgeMode });
 
-            // Send to appropriate API
-            const response = await fetch(apiEndpoint, {
+            const response = await fetch('/api/chat', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream'
                 },
                 body: JSON.stringify(requestBody)
             });
@@ -378,8 +374,16 @@ class ChatInterface {
                 headers: Object.fromEntries(response.headers)
             });
 
-            const data = await response.json();
-            debugLog('Parsed response data:', data);
+            // Errors (bad request, Ollama unreachable) still come back as JSON
+            const contentType = response.headers.get('Content-Type') || '';
+            if (!response.ok || !contentType.includes('text/event-stream')) {
+                const data = await response.json();
+                this.removeTypingIndicator(typingId);
+                this.displayMessage('error', data.error || 'An error occurred');
+                return;
+            }
+
+            const result = await this.readChatStream(response, typingId, startTime);
 
             // Capture end time and calculate elapsed
             const endTime = Date.now();
@@ -392,37 +396,38 @@ class ChatInterface {
                 `${elapsedMinutes}m ${remainingSeconds}s` :
                 `${remainingSeconds}s`;
 
-            // Remove typing indicator
             this.removeTypingIndicator(typingId);
+            if (result.liveElement) {
+                result.liveElement.remove();
+            }
 
-            if (response.ok) {
-                // Debug RAG information
-                debugLog('RAG Debug Info:', {
-                    rag_enabled: data.rag_enabled,
-                    sources_used: data.sources_used,
-                    sources_used_type: typeof data.sources_used
-                });
+            if (result.error) {
+                if (result.text) {
+                    this.displayMessage('assistant', result.text);
+                }
+                this.displayMessage('error', result.error);
+            } else {
+                const done = result.done || {};
+                const meta = result.meta || {};
 
                 // Prepare metadata
                 const metadata = {
-                    model: data.model,
+                    model: done.model || meta.model,
                     knowledgeBase: knowledgeMode === 'none' ? 'None' :
                                    knowledgeMode === 'rag' ? 'RAG' : 'CAG',
-                    ragEnabled: data.rag_enabled,
-                    sourcesUsed: data.sources_used || 0,
+                    ragEnabled: done.rag_enabled || done.cag_enabled,
+                    sourcesUsed: done.sources_used || 0,
                     startTime: startTimeFormatted,
                     endTime: endTimeFormatted,
                     elapsed: elapsedFormatted,
-                    tokensUsed: data.tokens_used,
-                    promptTokens: data.prompt_tokens,
-                    completionTokens: data.completion_tokens
+                    firstToken: done.ttft_ms !== undefined ? `${Math.round(done.ttft_ms)} ms` : null,
+                    tokensUsed: done.tokens_used,
+                    promptTokens: done.prompt_tokens,
+                    completionTokens: done.completion_tokens
                 };
 
                 // Display AI response with complete metadata
-                this.displayMessage('assistant', data.response, metadata);
-            } else {
-                // Display error
-                this.displayMessage('error', data.error || 'An error occurred');
+                this.displayMessage('assistant', result.text, metadata);
             }
 
         } catch (error) {
@@ -452,6 +457,83 @@ class ChatInterface {
         }
     }
 
+    /**
+     * Read a Server-Sent Events chat stream from /api/chat.
+     * Tokens are appended to a live bubble as they arrive; the caller
+     * replaces it with the full message once the 'done' event lands.
+     */
+    async readChatStream(response, typingId, startTime) {
+        const result = { text: '', meta: null, done: null, error: null, liveElement: null };
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let textNode = null;
+
+        const handleEvent = (event, data) => {
+            if (event === 'meta') {
+                result.meta = data;
+            } else if (event === 'token') {
+                if (!result.liveElement) {
+                    this.removeTypingIndicator(typingId);
+                    result.liveElement = this.createStreamingMessage();
+                    textNode = result.liveElement.querySelector('p');
+                    debugLog('First token after', Date.now() - startTime, 'ms');
+                }
+                result.text += data.content;
+                textNode.textContent = result.text;
+                this.scrollToBottom();
+            } else if (event === 'done') {
+                result.done = data;
+            } else if (event === 'error') {
+                result.error = data.error || 'Stream interrupted';
+            }
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                const dataLines = [];
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+                });
+                if (dataLines.length) {
+                    handleEvent(event, JSON.parse(dataLines.join('\n')));
+                }
+            }
+        }
+
+        if (!result.done && !result.error) {
+            result.error = 'Connection closed before the response completed';
+        }
+        return result;
+    }
+
+    createStreamingMessage() {
+        const messageDiv = document.createElement('div');
+        messageDiv.className = 'message animate-fade-in';
+        messageDiv.innerHTML = `
+            <div class="flex justify-start mb-4">
+                <div class="flex space-x-3 max-w-2xl">
+                    <img src="robobrain.svg" alt="AI" class="w-8 h-8 rounded-full flex-shrink-0 mt-1 opacity-80">
+                    <div class="message-assistant px-4 py-3">
+                        <p class="text-sm whitespace-pre-wrap leading-relaxed"></p>
+                    </div>
+                </div>
+            </div>
+        `;
+        this.messagesContainer.appendChild(messageDiv);
+        return messageDiv;
+    }
+
     displayMessage(type, content, metadata = null) {
         if (!this.messagesContainer) return;
 
@@ -506,7 +588,7 @@ class ChatInterface {
                     <svg class="w-3 h-3 mr-1" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                         <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4l3 3m6-3a9 9 0 11-18 0 9 9 0 0118 0z"/>
                     </svg>
-                    ${metadata.elapsed}
+                    ${metadata.firstToken ? `${metadata.firstToken} to first token • ` : ''}${metadata.elapsed}
                 </span>`);
 
                 // Token usage (if available)
@@ -525,6 +607,7 @@ class ChatInterface {
                         <summary class="cursor-pointer opacity-60 hover:opacity-100">Detailed Timing</summary>
                         <div class="mt-1 pl-4 space-y-1 opacity-70">
                             <div>• Prompt entered: ${metadata.startTime}</div>
+                            ${metadata.firstToken ? `<div>• First token: ${metadata.firstToken}</div>` : ''}
                             <div>• Response returned: ${metadata.endTime}</div>
                             <div>• Elapsed: ${metadata.elapsed}</div>
                             ${metadata.promptTokens ? `<div>• Prompt tokens: ${metadata.promptTokens.toLocaleString()}</div>` : ''}
@@ -1293,17 +1376,8 @@ class ChatInterface {
             const optionalInputs = toolConfig.optional_inputs || [];
             const allInputs = [...requiredInputs, ...optionalInputs];
 
-            // Helper function to read file as base64
-            const readFileAsBase64 = (file) => {
-                return new Promise((resolve, reject) => {
-                    const reader = new FileReader();
-                    reader.onload = () => resolve(reader.result.split(',')[1]); // Remove data:...;base64, prefix
-                    reader.onerror = reject;
-                    reader.readAsDataURL(file);
-                });
-            };
-
-            // Collect all form values, reading files if necessary
+            // Collect all form values; files are kept as File objects and
+            // streamed to the server as multipart parts (see executeMCPTool)
             for (let idx = 0; idx < allInputs.length; idx++) {
                 const input = allInputs[idx];
                 const fieldId = `mcp-input-${idx}`;
@@ -1312,11 +1386,9 @@ class ChatInterface {
                 if (field) {
                     // Check if this field has a File object attached
                     if (field.fileObject) {
-                        // Read file content and send metadata
-                        const fileContent = await readFileAsBase64(field.fileObject);
                         formData[input.name] = {
                             filename: field.fileObject.name,
-                            content: fileContent,
+                            file: field.fileObject,
                             size: field.fileObject.size,
                             type: field.fileObject.type,
                             lastModified: field.fileObject.lastModified
@@ -1375,14 +1447,30 @@ class ChatInterface {
 
             debugLog('Sending MCP tool request:', requestBody);
 
+            // File inputs go as multipart parts named after the input (no
+            // base64 in JSON); the rest of the request rides in 'payload'
+            const fileEntries = Object.entries(inputs).filter(([k, v]) => v && v.file instanceof File);
+            let fetchOptions;
+            if (fileEntries.length > 0) {
+                const multipart = new FormData();
+                multipart.append('payload', JSON.stringify(requestBody, (key, value) =>
+                    value instanceof File ? undefined : value));
+                for (const [name, value] of fileEntries) {
+                    multipart.append(name, value.file, value.filename);
+                }
+                fetchOptions = { method: 'POST', body: multipart };
+            } else {
+                fetchOptions = {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify(requestBody)
+                };
+            }
+
             // Send to chat API (backend should handle MCP tool calls)
-            const response = await fetch('/api/chat', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(requestBody)
-            });
+            const response = await fetch('/api/chat', fetchOptions);
 
             // Always try to parse the response body, even for errors
             const data = await response.json();
@@ -3,18 +3,64 @@ Knowledge Graph Builder for Vector Data
 
 Creates proper knowledge graphs from vector embeddings and content chunks,
 extracting semantic concepts and relationships based on vector similarity.
+
+Graphs are built incrementally and cached per workspace version
+(KnowledgeGraphCache): per-chunk features (concept terms, an inverted token
+index, cluster labels) are kept between requests, so after an ingestion
+only the new chunks are fetched, tokenized and assigned to a cluster.
+Clustering is one MiniBatchKMeans fit on float32 embeddings, refit only
+when the cluster count changes or many chunks were added since the last fit.
 """
 
 import numpy as np
-from typing import Dict, List, Any, Tuple
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import KMeans
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from sklearn.cluster import MiniBatchKMeans
 import logging
 import re
-from collections import Counter
+import threading
+from collections import Counter, defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Concept candidates: capitalized phrases, snake_case terms, acronyms
+_CAPITALIZED = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+_SNAKE_CASE = re.compile(r'\b[a-z]+(?:_[a-z]+)+\b')
+_ACRONYM = re.compile(r'\b[A-Z]{2,}\b')
+# Words of lowercased text; a chunk is kept as " word word ... " so phrase
+# lookups are substring tests on word boundaries
+_TOKEN = re.compile(r'[a-z0-9_]+')
+_NAME_STOP_WORDS = {'this', 'that', 'with', 'from', 'they', 'have', 'will', 'been', 'were'}
+
+# Assign new chunks to existing centroids until this share of the workspace
+# was added since the last fit, then refit
+_REFIT_FRACTION = 0.25
+
+
+def _cluster_count(n_chunks: int) -> int:
+    """Clusters for a workspace (max 5, min 2)."""
+    return min(max(n_chunks // 3, 2), 5)
+
+
+def _token_text(text: str) -> str:
+    """Lowercase words of a text, space separated and padded."""
+    return ' ' + ' '.join(_TOKEN.findall(text.lower())) + ' '
+
+
+class _ChunkEntry:
+    """What the graph keeps of one chunk between requests."""
+
+    __slots__ = ('words', 'source', 'file_type', 'terms', 'embedding', 'label')
+
+    def __init__(self, words: str, source: str, file_type: str, terms: Counter,
+                 embedding: Optional[np.ndarray]):
+        self.words = words
+        self.source = source
+        self.file_type = file_type
+        self.terms = terms
+        self.embedding = embedding
+        self.label: Optional[int] = None
+
 
 class VectorKnowledgeGraphBuilder:
     """
@@ -24,11 +70,24 @@ class VectorKnowledgeGraphBuilder:
     - Semantic concepts from text content
     - Content clusters based on vector similarity
     - Relationships between concepts and chunks
+
+    An instance holds the chunk features of one workspace; add_chunks() and
+    remove_chunks() update them in place and build_graph() renders the graph.
     """
 
     def __init__(self):
         self.similarity_threshold = 0.7
         self.concept_min_frequency = 2
+        self.max_concepts = 20
+
+        self._chunks: Dict[str, _ChunkEntry] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._term_counts: Counter = Counter()
+        self._cluster_words: Dict[int, Counter] = defaultdict(Counter)
+        self._kmeans: Optional[MiniBatchKMeans] = None
+        self._assigned_since_fit = 0
+        # Concept name -> chunks mentioning it, for the concepts last rendered
+        self._mentions: Dict[str, Set[str]] = {}
 
     def build_knowledge_graph_from_vectors(self, chunks_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -40,97 +99,115 @@ class VectorKnowledgeGraphBuilder:
         Returns:
             Knowledge graph with entities and relationships
         """
-        chunks = chunks_data.get('chunks', [])
-
-        if not chunks:
-            return {
-                "entities": [],
-                "relationships": [],
-                "metadata": {
-                    "total_entities": 0,
-                    "total_relationships": 0,
-                    "message": "No vector chunks available for knowledge graph creation",
-                    "data_source": "Vector Embeddings"
-                }
-            }
-
         try:
-            # Extract semantic concepts from content
-            concepts = self._extract_semantic_concepts(chunks)
-
-            # Create content cluster entities based on vector similarity
-            clusters = self._create_content_clusters(chunks)
-
-            # Create document source entities
-            sources = self._create_source_entities(chunks)
-
-            # Combine all entities
-            all_entities = concepts + clusters + sources
-
-            # Create relationships
-            relationships = self._create_relationships(chunks, concepts, clusters, sources)
-
-            return {
-                "entities": all_entities,
-                "relationships": relationships,
-                "metadata": {
-                    "total_entities": len(all_entities),
-                    "total_relationships": len(relationships),
-                    "concept_count": len(concepts),
-                    "cluster_count": len(clusters),
-                    "source_count": len(sources),
-                    "chunk_count": len(chunks),
-                    "data_source": "Vector Embeddings + Semantic Analysis",
-                    "extraction_method": "vector_similarity + concept_extraction"
-                }
-            }
-
+            self.add_chunks(chunks_data.get('chunks', []))
         except Exception as e:
             logger.error(f"Knowledge graph building failed: {e}")
-            return {
-                "entities": [],
-                "relationships": [],
-                "metadata": {
-                    "total_entities": 0,
-                    "total_relationships": 0,
-                    "error": f"Knowledge graph building failed: {e}",
-                    "data_source": "Vector Embeddings"
-                }
-            }
+            return self._error_graph(e)
+        return self.build_graph()
 
-    def _extract_semantic_concepts(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Extract semantic concepts from chunk content."""
-        concepts = []
-        all_text = " ".join(chunk.get('text', '') for chunk in chunks)
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
 
-        # Extract key terms using simple NLP techniques
-        # Remove common stop words and extract meaningful terms
-        words = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', all_text)  # Capitalized phrases
-        words.extend(re.findall(r'\b[a-z]+(?:_[a-z]+)+\b', all_text))  # snake_case terms
-        words.extend(re.findall(r'\b[A-Z]{2,}\b', all_text))  # Acronyms
+    def chunk_ids(self) -> Set[str]:
+        return set(self._chunks)
 
-        # Count frequency and filter
-        word_counts = Counter(words)
+    def add_chunks(self, chunks: Iterable[Dict[str, Any]]) -> int:
+        """Tokenize, index and cluster new chunks; returns how many were added."""
+        added = []
+        for chunk in chunks:
+            chunk_id = chunk.get('id') or f"chunk_{len(self._chunks)}"
+            if chunk_id in self._chunks:
+                self._drop(chunk_id)
+            text = chunk.get('text', '')
+            embedding = chunk.get('embedding')
+            vector = None
+            if embedding is not None and len(embedding) > 0:
+                vector = np.asarray(embedding, dtype=np.float32)
+            entry = _ChunkEntry(_token_text(text), chunk.get('source', 'unknown'),
+                                chunk.get('file_type', 'unknown'), self._extract_terms(text), vector)
+            self._chunks[chunk_id] = entry
+            self._term_counts.update(entry.terms)
+            for token in set(entry.words.split()):
+                self._postings[token].add(chunk_id)
+            for name, chunk_ids in self._mentions.items():
+                if _token_text(name) in entry.words:
+                    chunk_ids.add(chunk_id)
+            added.append(chunk_id)
+        self._assign_clusters(added)
+        return len(added)
+
+    def remove_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Forget chunks that were deleted; returns how many were known."""
+        removed = 0
+        for chunk_id in chunk_ids:
+            if chunk_id in self._chunks:
+                self._drop(chunk_id)
+                removed += 1
+        if removed:
+            self._assign_clusters([])
+        return removed
+
+    def update_sources(self, metadatas: Dict[str, Dict[str, Any]]) -> None:
+        """Refresh source/file type of known chunks whose metadata was rewritten."""
+        for chunk_id, metadata in metadatas.items():
+            entry = self._chunks.get(chunk_id)
+            if entry is not None and metadata:
+                entry.source = metadata.get('source', 'unknown')
+                entry.file_type = metadata.get('file_type', 'unknown')
+
+    def _drop(self, chunk_id: str) -> None:
+        entry = self._chunks.pop(chunk_id)
+        self._term_counts.subtract(entry.terms)
+        for term in entry.terms:
+            if self._term_counts[term] <= 0:
+                del self._term_counts[term]
+        for chunk_ids in self._mentions.values():
+            chunk_ids.discard(chunk_id)
+        for token in set(entry.words.split()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.discard(chunk_id)
+                if not postings:
+                    del self._postings[token]
+        if entry.label is not None:
+            self._cluster_words[entry.label].subtract(entry.words.split())
+
+    # ------------------------------------------------------------------
+    # Concepts
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _extract_terms(text: str) -> Counter:
+        """Concept candidates in one chunk with their counts."""
+        words = _CAPITALIZED.findall(text)
+        words.extend(_SNAKE_CASE.findall(text))
+        words.extend(_ACRONYM.findall(text))
+        return Counter(words)
+
+    def _extract_semantic_concepts(self) -> List[Dict[str, Any]]:
+        """Most frequent concept terms across the workspace."""
+        concepts = []
+        total_chunks = len(self._chunks)
 
-        concept_id = 0
-        for word, count in word_counts.items():
+        for word, count in self._term_counts.items():
             if count >= self.concept_min_frequency and len(word) > 2:
                 concepts.append({
-                    "id": f"concept_{concept_id}",
+                    "id": f"concept_{len(concepts)}",
                     "name": word,
                     "type": "CONCEPT",
-                    "confidence": min(count / len(chunks), 1.0),  # Normalized frequency
+                    "confidence": min(count / total_chunks, 1.0),  # Normalized frequency
                     "frequency": count,
                     "metadata": {
                         "extraction_method": "frequency_analysis",
                         "term_type": self._classify_term(word)
                     }
                 })
-                concept_id += 1
 
         # Sort by confidence and take top concepts
         concepts.sort(key=lambda x: x['confidence'], reverse=True)
-        return concepts[:20]  # Limit to top 20 concepts
+        return concepts[:self.max_concepts]
 
     def _classify_term(self, term: str) -> str:
         """Classify extracted terms by type."""
@@ -143,88 +220,126 @@ class VectorKnowledgeGraphBuilder:
         else:
             return "general_term"
 
-    def _create_content_clusters(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Create content clusters based on vector similarity."""
-        if len(chunks) < 2:
-            return []
-
-        # Extract embeddings
-        embeddings = []
-        valid_chunks = []
-
-        for chunk in chunks:
-            embedding = chunk.get('embedding')
-            if embedding is not None and len(embedding) > 0:
-                embeddings.append(embedding)
-                valid_chunks.append(chunk)
-
-        if len(embeddings) < 2:
-            return []
+    def _chunks_mentioning(self, name: str) -> Set[str]:
+        """
+        Chunks containing a concept as whole words (case-insensitive).
 
+        Candidates come from intersecting the token postings; multi-word
+        concepts are then confirmed as a phrase in the candidate chunks only.
+        Results are kept and updated as chunks are added or removed.
+        """
+        if name in self._mentions:
+            return self._mentions[name]
+        phrase = _token_text(name)
+        tokens = phrase.split()
+        if not tokens:
+            return set()
+        postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if len(tokens) > 1:
+            candidates = {chunk_id for chunk_id in candidates if phrase in self._chunks[chunk_id].words}
+        self._mentions[name] = candidates
+        return candidates
+
+    # ------------------------------------------------------------------
+    # Clusters
+    # ------------------------------------------------------------------
+
+    def _embedded_ids(self) -> List[str]:
+        return [chunk_id for chunk_id, entry in self._chunks.items() if entry.embedding is not None]
+
+    def _assign_clusters(self, new_ids: List[str]) -> None:
+        """Label new chunks with the current centroids, refitting when needed."""
+        embedded = self._embedded_ids()
+        if len(embedded) < 2:
+            self._kmeans = None
+            self._cluster_words = defaultdict(Counter)
+            for entry in self._chunks.values():
+                entry.label = None
+            return
+        n_clusters = _cluster_count(len(embedded))
+        new_embedded = [chunk_id for chunk_id in new_ids if self._chunks[chunk_id].embedding is not None]
+        self._assigned_since_fit += len(new_embedded)
+
+        if (self._kmeans is None or self._kmeans.n_clusters != n_clusters
+                or self._assigned_since_fit > _REFIT_FRACTION * len(embedded)):
+            self._fit_clusters(embedded, n_clusters)
+        elif new_embedded:
+            vectors = np.stack([self._chunks[chunk_id].embedding for chunk_id in new_embedded])
+            for chunk_id, label in zip(new_embedded, self._kmeans.predict(vectors)):
+                self._set_label(chunk_id, int(label))
+
+    def _fit_clusters(self, embedded: List[str], n_clusters: int) -> None:
+        """Cluster every embedded chunk in a single MiniBatchKMeans pass."""
         try:
-            embeddings_array = np.array(embeddings)
-
-            # Determine optimal number of clusters (max 5, min 2)
-            n_clusters = min(max(len(embeddings) // 3, 2), 5)
-
-            # Perform clustering
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(embeddings_array)
-
-            # Create cluster entities
-            clusters = []
-            for cluster_id in range(n_clusters):
-                cluster_chunks = [chunk for i, chunk in enumerate(valid_chunks) if cluster_labels[i] == cluster_id]
-
-                if cluster_chunks:
-                    # Generate cluster name from content
-                    cluster_name = self._generate_cluster_name(cluster_chunks)
-
-                    clusters.append({
-                        "id": f"cluster_{cluster_id}",
-                        "name": cluster_name,
-                        "type": "CONTENT_CLUSTER",
-                        "confidence": len(cluster_chunks) / len(valid_chunks),
-                        "metadata": {
-                            "chunk_count": len(cluster_chunks),
-                            "cluster_method": "kmeans",
-                            "representative_sources": list(set(chunk.get('source', 'unknown') for chunk in cluster_chunks))[:3]
-                        }
-                    })
-
-            return clusters
-
+            vectors = np.stack([self._chunks[chunk_id].embedding for chunk_id in embedded])
+            kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3,
+                                     batch_size=min(len(embedded), 2048))
+            labels = kmeans.fit_predict(vectors)
         except Exception as e:
             logger.error(f"Clustering failed: {e}")
-            return []
+            return
+        self._kmeans = kmeans
+        self._assigned_since_fit = 0
+        self._cluster_words = defaultdict(Counter)
+        for entry in self._chunks.values():
+            entry.label = None
+        for chunk_id, label in zip(embedded, labels):
+            self._set_label(chunk_id, int(label))
+
+    def _set_label(self, chunk_id: str, label: int) -> None:
+        entry = self._chunks[chunk_id]
+        entry.label = label
+        self._cluster_words[label].update(entry.words.split())
+
+    def _create_content_clusters(self) -> List[Dict[str, Any]]:
+        """Create content cluster entities from the current labels."""
+        members: Dict[int, List[_ChunkEntry]] = defaultdict(list)
+        for entry in self._chunks.values():
+            if entry.label is not None:
+                members[entry.label].append(entry)
+        labelled = sum(len(entries) for entries in members.values())
+
+        clusters = []
+        for cluster_id in sorted(members):
+            cluster_chunks = members[cluster_id]
+            clusters.append({
+                "id": f"cluster_{cluster_id}",
+                "name": self._generate_cluster_name(cluster_id, len(cluster_chunks)),
+                "type": "CONTENT_CLUSTER",
+                "confidence": len(cluster_chunks) / labelled,
+                "metadata": {
+                    "chunk_count": len(cluster_chunks),
+                    "cluster_method": "minibatch_kmeans",
+                    "representative_sources": list(dict.fromkeys(entry.source for entry in cluster_chunks))[:3]
+                }
+            })
+        return clusters
 
-    def _generate_cluster_name(self, cluster_chunks: List[Dict[str, Any]]) -> str:
+    def _generate_cluster_name(self, cluster_id: int, chunk_count: int) -> str:
         """Generate a descriptive name for a cluster based on its content."""
-        # Combine text from all chunks in cluster
-        cluster_text = " ".join(chunk.get('text', '') for chunk in cluster_chunks)
-
-        # Extract key terms
-        words = re.findall(r'\b[A-Za-z]+\b', cluster_text.lower())
-        word_counts = Counter(words)
+        word_counts = +self._cluster_words[cluster_id]
 
         # Get most common meaningful words
         common_words = [word for word, count in word_counts.most_common(5)
-                       if len(word) > 3 and word not in {'this', 'that', 'with', 'from', 'they', 'have', 'will', 'been', 'were'}]
+                       if len(word) > 3 and word.isalpha() and word not in _NAME_STOP_WORDS]
 
         if common_words:
             return f"Cluster: {', '.join(common_words[:2])}"
         else:
-            return f"Content Cluster ({len(cluster_chunks)} chunks)"
+            return f"Content Cluster ({chunk_count} chunks)"
+
+    # ------------------------------------------------------------------
+    # Graph
+    # ------------------------------------------------------------------
 
-    def _create_source_entities(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _create_source_entities(self) -> List[Dict[str, Any]]:
         """Create entities representing document sources."""
         sources = {}
 
-        for chunk in chunks:
-            source = chunk.get('source', 'unknown')
+        for entry in self._chunks.values():
+            source = entry.source
             if source not in sources:
-                # Extract filename
-                import os
                 filename = os.path.basename(source) if source != 'unknown' else 'Unknown Document'
 
                 sources[source] = {
@@ -234,7 +349,7 @@ class VectorKnowledgeGraphBuilder:
                     "confidence": 1.0,
                     "metadata": {
                         "source_path": source,
-                        "file_type": chunk.get('file_type', 'unknown'),
+                        "file_type": entry.file_type,
                         "chunk_count": 0
                     }
                 }
@@ -243,86 +358,200 @@ class VectorKnowledgeGraphBuilder:
 
         return list(sources.values())
 
-    def _create_relationships(self, chunks: List[Dict[str, Any]], concepts: List[Dict[str, Any]],
-                            clusters: List[Dict[str, Any]], sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Create relationships between entities."""
-        relationships = []
+    def _create_relationships(self, concepts: List[Dict[str, Any]], clusters: List[Dict[str, Any]],
+                              sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create relationships between entities.
 
-        # Create concept-to-chunk relationships
+        One edge per entity pair; the number of chunks behind it is in
+        metadata.chunk_count.
+        """
+        relationships = []
+        total_chunks = len(self._chunks)
+        source_ids = {s['metadata']['source_path']: s['id'] for s in sources}
+        mentions = {concept['id']: self._chunks_mentioning(concept['name']) for concept in concepts}
+        shown = {concept['name'] for concept in concepts}
+        for name in [name for name in self._mentions if name not in shown]:
+            del self._mentions[name]
+
+        # Concept-to-document relationships
+        source_of = {chunk_id: entry.source for chunk_id, entry in self._chunks.items()}
         for concept in concepts:
-            concept_name = concept['name'].lower()
-            for chunk in chunks:
-                chunk_text = chunk.get('text', '').lower()
-                if concept_name in chunk_text:
-                    # Find the source for this chunk
-                    chunk_source = chunk.get('source', 'unknown')
-                    source_entity = next((s for s in sources if s['metadata']['source_path'] == chunk_source), None)
-
-                    if source_entity:
-                        relationships.append({
-                            "source": concept['id'],
-                            "target": source_entity['id'],
-                            "relationship": "MENTIONED_IN",
-                            "weight": concept['confidence'] * 0.8,
-                            "metadata": {
-                                "relationship_type": "concept_to_document",
-                                "chunk_id": chunk.get('id', 'unknown')
-                            }
-                        })
-
-        # Create cluster-to-source relationships
-        if len(chunks) >= 2:
-            try:
-                embeddings = [chunk.get('embedding') for chunk in chunks if chunk.get('embedding') is not None]
-                if len(embeddings) >= 2:
-                    embeddings_array = np.array(embeddings)
-                    n_clusters = min(len(clusters), len(embeddings))
-
-                    if n_clusters > 0:
-                        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-                        cluster_labels = kmeans.fit_predict(embeddings_array)
-
-                        for i, chunk in enumerate(chunks):
-                            if i < len(cluster_labels) and chunk.get('embedding') is not None:
-                                cluster_id = cluster_labels[i]
-                                if cluster_id < len(clusters):
-                                    chunk_source = chunk.get('source', 'unknown')
-                                    source_entity = next((s for s in sources if s['metadata']['source_path'] == chunk_source), None)
-
-                                    if source_entity:
-                                        relationships.append({
-                                            "source": clusters[cluster_id]['id'],
-                                            "target": source_entity['id'],
-                                            "relationship": "CONTAINS_CONTENT_FROM",
-                                            "weight": 0.7,
-                                            "metadata": {
-                                                "relationship_type": "cluster_to_document",
-                                                "chunk_id": chunk.get('id', 'unknown')
-                                            }
-                                        })
-            except Exception as e:
-                logger.error(f"Failed to create cluster relationships: {e}")
-
-        # Create concept-to-concept relationships based on co-occurrence
+            per_source = Counter(map(source_of.__getitem__, mentions[concept['id']]))
+            for source, count in per_source.items():
+                relationships.append({
+                    "source": concept['id'],
+                    "target": source_ids[source],
+                    "relationship": "MENTIONED_IN",
+                    "weight": concept['confidence'] * 0.8,
+                    "metadata": {
+                        "relationship_type": "concept_to_document",
+                        "chunk_count": count
+                    }
+                })
+
+        # Cluster-to-document relationships
+        if clusters:
+            per_cluster = Counter(
+                (entry.label, entry.source) for entry in self._chunks.values() if entry.label is not None
+            )
+            for (label, source), count in per_cluster.items():
+                relationships.append({
+                    "source": f"cluster_{label}",
+                    "target": source_ids[source],
+                    "relationship": "CONTAINS_CONTENT_FROM",
+                    "weight": 0.7,
+                    "metadata": {
+                        "relationship_type": "cluster_to_document",
+                        "chunk_count": count
+                    }
+                })
+
+        # Concept-to-concept relationships based on co-occurrence: one
+        # product of the concept x chunk indicator matrix counts every pair
+        position = {chunk_id: i for i, chunk_id in enumerate(self._chunks)}
+        indicator = np.zeros((len(concepts), total_chunks), dtype=np.float32)
+        for row, concept in enumerate(concepts):
+            columns = np.fromiter(map(position.__getitem__, mentions[concept['id']]), dtype=np.int64)
+            indicator[row, columns] = 1.0
+        co_occurrence = indicator @ indicator.T
+
         for i, concept1 in enumerate(concepts):
-            for concept2 in concepts[i+1:]:
-                # Check if concepts co-occur in the same chunks
-                co_occurrence_count = 0
-                for chunk in chunks:
-                    chunk_text = chunk.get('text', '').lower()
-                    if concept1['name'].lower() in chunk_text and concept2['name'].lower() in chunk_text:
-                        co_occurrence_count += 1
+            for j, concept2 in enumerate(concepts[i+1:], start=i + 1):
+                co_occurrence_count = int(co_occurrence[i, j])
 
                 if co_occurrence_count >= 1:
                     relationships.append({
                         "source": concept1['id'],
                         "target": concept2['id'],
                         "relationship": "CO_OCCURS_WITH",
-                        "weight": min(co_occurrence_count / len(chunks), 1.0),
+                        "weight": min(co_occurrence_count / total_chunks, 1.0),
                         "metadata": {
                             "relationship_type": "concept_to_concept",
                             "co_occurrence_count": co_occurrence_count
                         }
                     })
 
-        return relationships
\ No newline at end of file
+        return relationships
+
+    def build_graph(self) -> Dict[str, Any]:
+        """Render entities and relationships from the current chunk features."""
+        if not self._chunks:
+            return {
+                "entities": [],
+                "relationships": [],
+                "metadata": {
+                    "total_entities": 0,
+                    "total_relationships": 0,
+                    "message": "No vector chunks available for knowledge graph creation",
+                    "data_source": "Vector Embeddings"
+                }
+            }
+
+        try:
+            concepts = self._extract_semantic_concepts()
+            clusters = self._create_content_clusters()
+            sources = self._create_source_entities()
+            all_entities = concepts + clusters + sources
+            relationships = self._create_relationships(concepts, clusters, sources)
+
+            return {
+                "entities": all_entities,
+                "relationships": relationships,
+                "metadata": {
+                    "total_entities": len(all_entities),
+                    "total_relationships": len(relationships),
+                    "concept_count": len(concepts),
+                    "cluster_count": len(clusters),
+                    "source_count": len(sources),
+                    "chunk_count": len(self._chunks),
+                    "data_source": "Vector Embeddings + Semantic Analysis",
+                    "extraction_method": "vector_similarity + concept_extraction"
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Knowledge graph building failed: {e}")
+            return self._error_graph(e)
+
+    @staticmethod
+    def _error_graph(error: Exception) -> Dict[str, Any]:
+        return {
+            "entities": [],
+            "relationships": [],
+            "metadata": {
+                "total_entities": 0,
+                "total_relationships": 0,
+                "error": f"Knowledge graph building failed: {error}",
+                "data_source": "Vector Embeddings"
+            }
+        }
+
+
+class KnowledgeGraphCache:
+    """
+    Knowledge graphs per workspace, rebuilt only when the workspace version changes.
+
+    On a version change only the chunk ID/metadata listing is read in full;
+    chunks that are new since the last build are fetched with their
+    embeddings and folded into the workspace's builder, deleted ones are
+    dropped.
+    """
+
+    def __init__(self):
+        self._builders: Dict[str, VectorKnowledgeGraphBuilder] = {}
+        self._graphs: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, workspace: str, version: int,
+            list_chunks: Callable[[str], Dict[str, Dict[str, Any]]],
+            fetch_chunks: Callable[[str, List[str]], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Return the graph of a workspace at a data version.
+
+        Args:
+            workspace: Workspace/Knowledge Base identifier
+            version: Current workspace data version
+            list_chunks: workspace -> {chunk_id: metadata} of every stored chunk
+            fetch_chunks: (workspace, chunk_ids) -> chunk dicts with text and embedding
+
+        Returns:
+            Knowledge graph; metadata.cache is "hit" or "miss"
+        """
+        with self._lock:
+            cached = self._graphs.get(workspace)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                return self._tagged(cached[1], 'hit')
+
+            builder = self._builders.setdefault(workspace, VectorKnowledgeGraphBuilder())
+            stored = list_chunks(workspace)
+            known = builder.chunk_ids()
+            new_ids = [chunk_id for chunk_id in stored if chunk_id not in known]
+            builder.remove_chunks(known - stored.keys())
+            builder.update_sources(stored)
+            if new_ids:
+                builder.add_chunks(fetch_chunks(workspace, new_ids))
+
+            graph = builder.build_graph()
+            graph["metadata"]["chunks_recomputed"] = len(new_ids)
+            if "error" not in graph["metadata"]:
+                self._graphs[workspace] = (version, graph)
+            self.builds += 1
+            return self._tagged(graph, 'miss')
+
+    @staticmethod
+    def _tagged(graph: Dict[str, Any], cache: str) -> Dict[str, Any]:
+        return {**graph, "metadata": {**graph["metadata"], "cache": cache}}
+
+    def invalidate(self, workspace: Optional[str] = None) -> None:
+        """Drop cached graphs and features (all workspaces by default)."""
+        with self._lock:
+            if workspace is None:
+                self._builders.clear()
+                self._graphs.clear()
+            else:
+                self._builders.pop(workspace, None)
+                self._graphs.pop(workspace, None)
@@ -0,0 +1,545 @@
+"""
+Shared, pooled Ollama HTTP client.
+
+Every subsystem that talks to Ollama (chat, RAG, agents, shredding,
+color-team review, career narratives, lessons search) goes through one
+OllamaClient so that:
+
+- HTTP connections are kept alive and reused (requests.Session pool)
+  instead of opening a fresh TCP connection per call
+- a global concurrency limit keeps the local, GPU-less box from being
+  handed more generations than it can run at once
+- waiting callers are admitted by priority, so interactive chat is served
+  ahead of batch work such as RFP shredding
+- retry/backoff and per-caller latency/token metrics are handled in one place
+
+Configuration (environment variables):
+    OLLAMA_BASE_URL / OLLAMA_HOST / OLLAMA_PORT   Server location
+    OLLAMA_MAX_CONCURRENCY   Generations allowed in flight (default 2)
+    OLLAMA_POOL_SIZE         Keep-alive connections per host (default 8)
+    OLLAMA_TIMEOUT           Read timeout in seconds (default 30)
+    OLLAMA_CONNECT_TIMEOUT   Connect timeout in seconds (default 10)
+    OLLAMA_MAX_RETRIES       Attempts per call (default 3)
+    OLLAMA_RETRY_DELAY       Base backoff in seconds, doubled per retry (default 1)
+
+Usage:
+    from ollama_client import get_ollama_client, PRIORITY_BATCH
+
+    client = get_ollama_client()
+    data = client.generate('qwen2.5:3b', prompt, caller='shredding.classifier',
+                           priority=PRIORITY_BATCH, format='json', timeout=60)
+    text = data['response']
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Per-request Ollama time for /api/metrics when running inside the server
+try:
+    from server.middleware.timing import record_ollama_time
+    REQUEST_METRICS_AVAILABLE = True
+except ImportError:
+    REQUEST_METRICS_AVAILABLE = False
+
+# Lower value = admitted first when callers are waiting for a slot.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BATCH = 10
+
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_POOL_SIZE = 8
+_LATENCY_WINDOW = 200
+_MAX_BACKOFF = 30.0
+
+
+class OllamaError(Exception):
+    """An Ollama call failed after all retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, attempt: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.attempt = attempt
+
+
+class OllamaTimeoutError(OllamaError):
+    """An Ollama call timed out (connect or read) on its last attempt."""
+
+
+class _PrioritySemaphore:
+    """
+    Counting semaphore that admits waiters in priority order.
+
+    Waiters with a lower priority value go first; equal priorities are FIFO.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._cond = threading.Condition()
+        self._waiters: List = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+
+    def acquire(self, priority: int = PRIORITY_NORMAL) -> None:
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            while self._value <= 0 or self._waiters[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiters)
+            self._value -= 1
+            # Another slot may still be free for the next waiter in line
+            self._cond.notify_all()
+
+    def release(self) -> None:
+        with self._cond:
+            self._value += 1
+            self._cond.notify_all()
+
+    @property
+    def waiting(self) -> int:
+        with self._cond:
+            return len(self._waiters)
+
+
+class _CallerStats:
+    """Per-caller counters; guarded by OllamaClient._stats_lock."""
+
+    __slots__ = ('calls', 'errors', 'retries', 'latencies', 'total_latency',
+                 'total_wait', 'prompt_tokens', 'completion_tokens')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)
+        self.total_latency = 0.0
+        self.total_wait = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _default_base_url() -> str:
+    host = os.getenv('OLLAMA_HOST', 'localhost')
+    port = os.getenv('OLLAMA_PORT', '11434')
+    return os.getenv('OLLAMA_BASE_URL', f'http://{host}:{port}')
+
+
+class OllamaClient:
+    """
+    Thread-safe Ollama client with keep-alive pooling, a priority-ordered
+    concurrency limit, retries and metrics.
+
+    Generation and embedding calls take a slot from the global limit;
+    lightweight metadata calls (tags) do not.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+    ):
+        self.base_url = (base_url or _default_base_url()).rstrip('/')
+        self.max_concurrency = max_concurrency or int(os.getenv('OLLAMA_MAX_CONCURRENCY', str(DEFAULT_MAX_CONCURRENCY)))
+        self.pool_size = pool_size or int(os.getenv('OLLAMA_POOL_SIZE', str(DEFAULT_POOL_SIZE)))
+        self.timeout = timeout if timeout is not None else float(os.getenv('OLLAMA_TIMEOUT', '30.0'))
+        self.connect_timeout = connect_timeout if connect_timeout is not None else float(os.getenv('OLLAMA_CONNECT_TIMEOUT', '10.0'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('OLLAMA_MAX_RETRIES', '3'))
+        self.retry_delay = retry_delay if retry_delay is not None else float(os.getenv('OLLAMA_RETRY_DELAY', '1.0'))
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        self._slots = _PrioritySemaphore(self.max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, _CallerStats] = {}
+        self._in_flight = 0
+
+    # ------------------------------------------------------------------
+    # Core request path
+    # ------------------------------------------------------------------
+
+    def _url(self, path: str, base_url: Optional[str] = None) -> str:
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{(base_url or self.base_url).rstrip('/')}/{path.lstrip('/')}"
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(_MAX_BACKOFF, self.retry_delay * (2 ** attempt))
+        return delay * (0.75 + random.random() * 0.5)
+
+    def _acquire(self, priority: int, limited: bool) -> float:
+        """Take a concurrency slot; return seconds spent waiting."""
+        if not limited:
+            return 0.0
+        start = time.perf_counter()
+        self._slots.acquire(priority)
+        with self._stats_lock:
+            self._in_flight += 1
+        return time.perf_counter() - start
+
+    def _release(self, limited: bool) -> None:
+        if not limited:
+            return
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, caller: str, latency: float, wait: float, retries: int,
+                error: bool, data: Optional[Dict[str, Any]] = None) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(caller, _CallerStats())
+            stats.calls += 1
+            stats.retries += retries
+            stats.total_wait += wait
+            if error:
+                stats.errors += 1
+            else:
+                stats.latencies.append(latency)
+                stats.total_latency += latency
+            if data:
+                stats.prompt_tokens += data.get('prompt_eval_count', 0) or 0
+                stats.completion_tokens += data.get('eval_count', 0) or 0
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        *,
+        caller: str = 'default',
+        priority: int = PRIORITY_NORMAL,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        base_url: Optional[str] = None,
+        limited: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Make a JSON request to Ollama with retries.
+
+        Connection errors, timeouts and 5xx responses are retried with
+        jittered exponential backoff; the concurrency slot is released
+        while backing off. 4xx responses fail immediately.
+
+        Args:
+            method: HTTP verb.
+            path: API path ('/api/generate') or an absolute URL.
+            payload: JSON body.
+            caller: Metrics label for the calling subsystem.
+            priority: Admission priority (PRIORITY_INTERACTIVE/NORMAL/BATCH).
+            timeout: Read timeout override in seconds.
+            retries: Attempt count override (minimum 1).
+            base_url: Server override for callers configured with their own URL.
+            limited: Whether the call takes a concurrency slot.
+
+        Returns:
+            Parsed JSON response. NDJSON bodies (streamed replies) are folded
+            into the final object with message content concatenated.
+
+        Raises:
+            OllamaError: After the last failed attempt.
+        """
+        started = time.perf_counter()
+        try:
+            return self._request(method, path, payload, caller, priority, timeout,
+                                 retries, base_url, limited, started)
+        finally:
+            if REQUEST_METRICS_AVAILABLE:
+                record_ollama_time(time.perf_counter() - started)
+
+    def _request(self, method, path, payload, caller, priority, timeout,
+                 retries, base_url, limited, started) -> Dict[str, Any]:
+        url = self._url(path, base_url)
+        attempts = max(1, retries if retries is not None else self.max_retries)
+        read_timeout = timeout if timeout is not None else self.timeout
+        total_wait = 0.0
+        last_error: Optional[OllamaError] = None
+
+        for attempt in range(attempts):
+            total_wait += self._acquire(priority, limited)
+            try:
+                response = self._session.request(
+                    method, url, json=payload,
+                    timeout=(self.connect_timeout, read_timeout),
+                )
+                if response.status_code >= 400:
+                    last_error = OllamaError(
+                        f"HTTP {response.status_code}: {response.text[:200]}",
+                        status_code=response.status_code, attempt=attempt + 1)
+                    if response.status_code < 500:
+                        break
+                else:
+                    data = _parse_body(response.text)
+                    self._record(caller, time.perf_counter() - started - total_wait,
+                                 total_wait, attempt, False, data)
+                    return data
+            except requests.Timeout:
+                last_error = OllamaTimeoutError(f"Request timeout after {read_timeout}s", attempt=attempt + 1)
+                logger.warning(f"Ollama timeout ({caller}) on attempt {attempt + 1}/{attempts}")
+            except requests.RequestException as e:
+                last_error = OllamaError(f"Connection error: {e}", attempt=attempt + 1)
+                logger.warning(f"Ollama connection error ({caller}) on attempt {attempt + 1}/{attempts}: {e}")
+            except ValueError as e:
+                last_error = OllamaError(f"Invalid JSON response: {e}", attempt=attempt + 1)
+                break  # Don't retry JSON errors
+            finally:
+                self._release(limited)
+
+            if attempt < attempts - 1:
+                time.sleep(self._backoff(attempt))
+
+        self._record(caller, time.perf_counter() - started, total_wait,
+                     (last_error.attempt - 1) if last_error else 0, True)
+        raise last_error or OllamaError("Ollama request failed")
+
+    def stream(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        *,
+        caller: str = 'default',
+        priority: int = PRIORITY_NORMAL,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        base_url: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream NDJSON frames from a generate/chat endpoint.
+
+        The concurrency slot is held until the stream finishes or the
+        consumer closes the generator. Retries cover only connection setup.
+
+        Yields:
+            Parsed frames; the last has done=True.
+
+        Raises:
+            OllamaError: If the stream cannot start or breaks before done.
+        """
+        url = self._url(path, base_url)
+        body = dict(payload, stream=True)
+        attempts = max(1, retries if retries is not None else self.max_retries)
+        read_timeout = timeout if timeout is not None else self.timeout
+        started = time.perf_counter()
+        wait = self._acquire(priority, True)
+        final: Optional[Dict[str, Any]] = None
+        cancelled = False
+        attempt = 0
+        try:
+            response = None
+            last_error: Optional[OllamaError] = None
+            for attempt in range(attempts):
+                try:
+                    response = self._session.post(url, json=body, stream=True,
+                                                  timeout=(self.connect_timeout, read_timeout))
+                    if response.status_code >= 400:
+                        last_error = OllamaError(f"HTTP {response.status_code}: {response.text[:200]}",
+                                                 status_code=response.status_code, attempt=attempt + 1)
+                        response.close()
+                        response = None
+                        if last_error.status_code < 500:
+                            break
+                    else:
+                        break
+                except requests.Timeout:
+                    last_error = OllamaTimeoutError(f"Request timeout after {read_timeout}s", attempt=attempt + 1)
+                except requests.RequestException as e:
+                    last_error = OllamaError(f"Connection error: {e}", attempt=attempt + 1)
+                if attempt < attempts - 1:
+                    time.sleep(self._backoff(attempt))
+
+            if response is None:
+                raise last_error or OllamaError("Ollama stream failed")
+
+            with response:
+                try:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        try:
+                            frame = json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning(f"Skipping malformed stream line: {line[:80]!r}")
+                            continue
+                        if frame.get('error'):
+                            raise OllamaError(frame['error'], attempt=attempt + 1)
+                        if frame.get('done'):
+                            final = frame
+                        yield frame
+                        if final is not None:
+                            return
+                except requests.RequestException as e:
+                    raise OllamaError(f"Stream interrupted: {e}", attempt=attempt + 1) from e
+            raise OllamaError("Stream ended before the final frame", attempt=attempt + 1)
+        except GeneratorExit:
+            # Consumer stopped early (e.g. the browser disconnected)
+            cancelled = True
+            raise
+        finally:
+            self._release(True)
+            self._record(caller, time.perf_counter() - started - wait, wait, attempt,
+                         final is None and not cancelled, final)
+            if REQUEST_METRICS_AVAILABLE:
+                record_ollama_time(time.perf_counter() - started)
+
+    # ------------------------------------------------------------------
+    # Endpoint helpers
+    # ------------------------------------------------------------------
+
+    def generate(
+        self,
+        model: str,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[str] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Non-streaming /api/generate; text is in result['response']."""
+        payload: Dict[str, Any] = {'model': model, 'prompt': prompt, 'stream': False}
+        if system:
+            payload['system'] = system
+        if options:
+            payload['options'] = options
+        if format:
+            payload['format'] = format
+        return self.request('POST', '/api/generate', payload, **kwargs)
+
+    def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        *,
+        options: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Non-streaming /api/chat; text is in result['message']['content']."""
+        payload: Dict[str, Any] = {'model': model, 'messages': messages, 'stream': False}
+        if options:
+            payload['options'] = options
+        return self.request('POST', '/api/chat', payload, **kwargs)
+
+    def embed(self, model: str, text: str, **kwargs) -> List[float]:
+        """Single embedding via /api/embeddings."""
+        data = self.request('POST', '/api/embeddings', {'model': model, 'prompt': text}, **kwargs)
+        return data.get('embedding') or []
+
+    def tags(self, **kwargs) -> Dict[str, Any]:
+        """List installed models (/api/tags); does not take a concurrency slot."""
+        kwargs.setdefault('limited', False)
+        return self.request('GET', '/api/tags', **kwargs)
+
+    def is_available(self, timeout: float = 2.0, base_url: Optional[str] = None) -> bool:
+        """Whether the server answers /api/tags within timeout (single attempt)."""
+        try:
+            self.tags(timeout=timeout, retries=1, caller='health', base_url=base_url)
+            return True
+        except OllamaError:
+            return False
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Return pool and per-caller metrics.
+
+        Returns:
+            dict with max_concurrency, in_flight, waiting, pool_size and a
+            'callers' map of calls, errors, retries, latency p50/p95/mean
+            (ms, successful calls), mean queue wait (ms) and token totals.
+        """
+        with self._stats_lock:
+            callers = {}
+            for name, s in self._stats.items():
+                ok = s.calls - s.errors
+                latencies = list(s.latencies)
+                callers[name] = {
+                    'calls': s.calls,
+                    'errors': s.errors,
+                    'retries': s.retries,
+                    'latency_p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+                    'latency_p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+                    'latency_mean_ms': round(s.total_latency / ok * 1000, 1) if ok else 0.0,
+                    'wait_mean_ms': round(s.total_wait / s.calls * 1000, 1) if s.calls else 0.0,
+                    'prompt_tokens': s.prompt_tokens,
+                    'completion_tokens': s.completion_tokens,
+                }
+            in_flight = self._in_flight
+        return {
+            'base_url': self.base_url,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': in_flight,
+            'waiting': self._slots.waiting,
+            'pool_size': self.pool_size,
+            'callers': callers,
+        }
+
+
+def _parse_body(raw: str) -> Dict[str, Any]:
+    """Parse a JSON body, folding NDJSON (streamed replies) into the last frame."""
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        pass
+
+    result = None
+    accumulated = ''
+    for line in raw.strip().split('\n'):
+        if not line.strip():
+            continue
+        try:
+            parsed = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if parsed:
+            content = (parsed.get('message') or {}).get('content')
+            if content:
+                accumulated += content
+            result = parsed
+
+    if result is None:
+        raise ValueError("No valid JSON found in response")
+    if accumulated and 'message' in result:
+        result['message']['content'] = accumulated
+    return result
+
+
+_client: Optional[OllamaClient] = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+    """Return the process-wide OllamaClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
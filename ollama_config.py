@@ -15,12 +15,19 @@ import logging
 import urllib.request
 import urllib.error
 import socket
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 from urllib.parse import urljoin
 
+from ollama_client import PRIORITY_NORMAL, OllamaError, get_ollama_client
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+
+class OllamaStreamError(OllamaError):
+    """Raised when a streaming Ollama request fails before or during generation."""
+
+
 class OllamaConfig:
     """Centralized Ollama configuration and connection management."""
     
@@ -111,94 +118,102 @@ class OllamaConfig:
         
         return result
     
-    def make_request(self, endpoint: str, data: Dict[str, Any], method: str = 'POST') -> Dict[str, Any]:
-        """Make a robust HTTP request to Ollama with retries and error handling."""
-        last_error = None
-        
-        for attempt in range(self.max_retries):
-            try:
-                logger.debug(f"Ollama request attempt {attempt + 1}/{self.max_retries} to {endpoint}")
-                
-                # Prepare request
-                json_data = json.dumps(data).encode('utf-8')
-                req = urllib.request.Request(endpoint, data=json_data)
-                req.add_header('Content-Type', 'application/json')
-                req.get_method = lambda: method
-                
-                # Make request with timeout
-                with urllib.request.urlopen(req, timeout=self.timeout) as response:
-                    if response.status == 200:
-                        raw_response = response.read().decode('utf-8')
-                        
-                        # Handle multiple JSON objects or streaming responses
-                        try:
-                            # Try parsing as single JSON object first
-                            result = json.loads(raw_response)
-                        except json.JSONDecodeError:
-                            # Handle streaming responses (multiple JSON objects)
-                            lines = raw_response.strip().split('\n')
-                            result = None
-                            accumulated_content = ""
+    def make_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        method: str = 'POST',
+        caller: str = 'ollama_config',
+        priority: int = PRIORITY_NORMAL,
+    ) -> Dict[str, Any]:
+        """
+        Make a robust HTTP request to Ollama with retries and error handling.
 
-                            for line in lines:
-                                if line.strip():
-                                    try:
-                                        parsed_line = json.loads(line)
-                                        if parsed_line:
-                                            # For chat responses, accumulate content from streaming
-                                            if 'message' in parsed_line and 'content' in parsed_line['message']:
-                                                content = parsed_line['message']['content']
-                                                if content:  # Only accumulate non-empty content
-                                                    accumulated_content += content
+        Goes through the shared OllamaClient, so the connection is pooled,
+        the call counts against OLLAMA_MAX_CONCURRENCY and is admitted by
+        priority.
 
-                                            # Keep updating result with latest response
-                                            result = parsed_line
-                                    except json.JSONDecodeError:
-                                        continue
+        Args:
+            endpoint: Full endpoint URL.
+            data: JSON payload.
+            method: HTTP verb.
+            caller: Metrics label for the calling subsystem.
+            priority: Admission priority (see ollama_client).
 
-                            # If we accumulated content, update the final result
-                            if result and accumulated_content and 'message' in result:
-                                result['message']['content'] = accumulated_content
+        Returns:
+            {'success', 'data', 'attempt', 'error'}
+        """
+        limited = not endpoint.endswith('/api/tags')
+        try:
+            result = get_ollama_client().request(
+                method, endpoint, data if method != 'GET' else None,
+                caller=caller, priority=priority, timeout=self.timeout,
+                retries=self.max_retries, limited=limited,
+            )
+            return {
+                'success': True,
+                'data': result,
+                'attempt': 1,
+                'error': None
+            }
+        except OllamaError as e:
+            return {
+                'success': False,
+                'data': None,
+                'attempt': e.attempt,
+                'error': str(e)
+            }
 
-                            if result is None:
-                                raise json.JSONDecodeError("No valid JSON found in response", raw_response, 0)
-                        
-                        logger.debug(f"Ollama request successful on attempt {attempt + 1}")
-                        return {
-                            'success': True,
-                            'data': result,
-                            'attempt': attempt + 1,
-                            'error': None
-                        }
-                    else:
-                        last_error = f"HTTP {response.status}: {response.reason}"
-                        
-            except socket.timeout:
-                last_error = f"Request timeout after {self.timeout}s"
-                logger.warning(f"Ollama request timeout on attempt {attempt + 1}")
-            except urllib.error.URLError as e:
-                last_error = f"Connection error: {e.reason if hasattr(e, 'reason') else str(e)}"
-                logger.warning(f"Ollama connection error on attempt {attempt + 1}: {last_error}")
-            except json.JSONDecodeError as e:
-                last_error = f"Invalid JSON response: {e}"
-                logger.error(f"Ollama JSON decode error on attempt {attempt + 1}: {last_error}")
-                break  # Don't retry JSON errors
-            except Exception as e:
-                last_error = f"Unexpected error: {e}"
-                logger.exception(f"Ollama unexpected error on attempt {attempt + 1}")
-            
-            # Wait before retry (except on last attempt)
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_delay * (attempt + 1))  # Exponential backoff
-        
-        return {
-            'success': False,
-            'data': None,
-            'attempt': self.max_retries,
-            'error': last_error
-        }
-    
-    def generate_response(self, model: str, prompt: str, stream: bool = False) -> Dict[str, Any]:
+    def stream_request(
+        self,
+        endpoint: str,
+        data: Dict[str, Any],
+        caller: str = 'ollama_config',
+        priority: int = PRIORITY_NORMAL,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream NDJSON frames from Ollama as they are generated.
+
+        Connection failures are retried like make_request, but only until the
+        response starts; once frames are flowing a failure ends the stream.
+        OLLAMA_TIMEOUT applies per read, so it bounds the gap between tokens
+        rather than the whole generation. The concurrency slot is held for
+        the whole stream.
+
+        Args:
+            endpoint: Ollama endpoint URL (generate or chat).
+            data: Request payload; 'stream' is forced to True.
+            caller: Metrics label for the calling subsystem.
+            priority: Admission priority (see ollama_client).
+
+        Yields:
+            Parsed frames. The last one has done=True and carries
+            prompt_eval_count / eval_count.
+
+        Raises:
+            OllamaStreamError: If the request cannot be started or the
+                stream breaks before the final frame.
+        """
+        frames = get_ollama_client().stream(
+            endpoint, data, caller=caller, priority=priority,
+            timeout=self.timeout, retries=self.max_retries,
+        )
+        try:
+            yield from frames
+        except OllamaError as e:
+            raise OllamaStreamError(str(e), attempt=e.attempt) from e
+        finally:
+            frames.close()
+
+    def generate_stream(self, model: str, prompt: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Stream a completion from Ollama's generate endpoint (text in frame['response'])."""
+        return self.stream_request(self.generate_endpoint, {'model': model, 'prompt': prompt}, **kwargs)
+
+    def chat_stream(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Iterator[Dict[str, Any]]:
+        """Stream a completion from Ollama's chat endpoint (text in frame['message']['content'])."""
+        return self.stream_request(self.chat_endpoint, {'model': model, 'messages': messages}, **kwargs)
+
+    def generate_response(self, model: str, prompt: str, stream: bool = False, **kwargs) -> Dict[str, Any]:
         """Generate response using Ollama's generate endpoint."""
         data = {
             'model': model,
@@ -206,16 +221,17 @@ class OllamaConfig:
             'stream': stream
         }
         
-        return self.make_request(self.generate_endpoint, data)
+        return self.make_request(self.generate_endpoint, data, **kwargs)
     
-    def chat_response(self, model: str, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    def chat_response(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """Generate response using Ollama's chat endpoint."""
         data = {
             'model': model,
-            'messages': messages
+            'messages': messages,
+            'stream': False
         }
         
-        return self.make_request(self.chat_endpoint, data)
+        return self.make_request(self.chat_endpoint, data, **kwargs)
     
     def get_available_models(self) -> Dict[str, Any]:
         """Get list of available models from Ollama."""
@@ -12,6 +12,7 @@ Public surface (re-exported for backwards compatibility):
 """
 
 import sqlite3
+import tempfile
 import uuid
 import json
 from datetime import datetime
@@ -375,7 +376,12 @@ class OpportunitiesManager(_TasksMixin):
 
     def _add_to_knowledge_graph(self, opportunity_id: str, name: str,
                                 description: str, tags: List[str]):
-        """Add opportunity to knowledge graph for RAG reference."""
+        """
+        Add (or incrementally update) an opportunity in the knowledge graph.
+
+        Ingested under a stable doc_key, so an edit only re-embeds the chunks
+        whose text changed and an unchanged record is a no-op.
+        """
         try:
             from rag_api import handle_rag_ingest_request
 
@@ -384,17 +390,19 @@ class OpportunitiesManager(_TasksMixin):
                 f"Description: {description}\nTags: {', '.join(tags)}\n"
                 f"Type: Business Opportunity\n"
             )
-            temp_file = Path(f"/tmp/opportunity_{opportunity_id}.txt")
-            temp_file.write_text(opportunity_text)
-            handle_rag_ingest_request(str(temp_file), workspace='opportunities')
-            temp_file.unlink()
+            with tempfile.TemporaryDirectory(prefix='opportunity_') as tmp_dir:
+                temp_file = Path(tmp_dir) / f"opportunity_{opportunity_id}.txt"
+                temp_file.write_text(opportunity_text)
+                handle_rag_ingest_request(
+                    str(temp_file), workspace='opportunities',
+                    doc_key=_knowledge_graph_key(opportunity_id)
+                )
         except Exception as e:
             print(f"Note: Could not add to knowledge graph: {e}")
 
     def _update_knowledge_graph(self, opportunity_id: str, updates: Dict):
-        """Update opportunity in knowledge graph (delete + re-add)."""
+        """Update opportunity in knowledge graph (incremental re-ingest, no delete)."""
         try:
-            self._remove_from_knowledge_graph(opportunity_id)
             result = self.get_opportunity(opportunity_id)
             if result['status'] == 'success':
                 opp = result['opportunity']
@@ -407,9 +415,14 @@ class OpportunitiesManager(_TasksMixin):
     def _remove_from_knowledge_graph(self, opportunity_id: str):
         """Remove opportunity from knowledge graph."""
         try:
-            from rag_api import handle_rag_document_delete_request
-            handle_rag_document_delete_request(
-                f"opportunity_{opportunity_id}", workspace='opportunities'
+            from rag_api import handle_rag_document_remove_request
+            handle_rag_document_remove_request(
+                _knowledge_graph_key(opportunity_id), workspace='opportunities'
             )
         except Exception as e:
             print(f"Note: Could not remove from knowledge graph: {e}")
+
+
+def _knowledge_graph_key(opportunity_id: str) -> str:
+    """RAG doc_key for an opportunity record in the 'opportunities' workspace."""
+    return f"opportunity_{opportunity_id}.txt"
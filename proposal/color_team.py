@@ -401,8 +401,11 @@ Reply with ONLY one word: Outstanding, Good, Acceptable, Marginal, or Unacceptab
 def _call_ollama(model: str, prompt: str) -> str:
     """Call Ollama generate endpoint, return response text or error string."""
     try:
+        from ollama_client import PRIORITY_BATCH  # type: ignore[import]
         from ollama_config import ollama_config  # type: ignore[import]
-        result = ollama_config.generate_response(model, prompt)
+        result = ollama_config.generate_response(
+            model, prompt, caller="color_team", priority=PRIORITY_BATCH
+        )
         if result.get("success"):
             return result["data"].get("response", "").strip()
         return f"[LLM error: {result.get('error', 'unknown')}]"
@@ -470,13 +473,15 @@ def ingest_color_team_review(
         dict: Summary with 'ingested', 'skipped', 'comments', 'assessment'.
     """
     def _progress(msg: str) -> None:
-        """Report progress if running as a background job."""
+        """Report progress if running as a background job; stop if it was cancelled."""
         if job_id:
             try:
                 from server.background_jobs import job_store
-                job_store.update_progress(job_id, msg)
             except Exception:
-                pass
+                job_store = None
+            if job_store is not None:
+                job_store.check_cancelled(job_id)
+                job_store.update_progress(job_id, msg)
         logger.info("color_team ingest [%s]: %s", document_id[:8], msg)
 
     # Step 1 — Extract comments
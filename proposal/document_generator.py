@@ -21,7 +21,7 @@ from datetime import date
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import requests
+from ollama_client import PRIORITY_BATCH, OllamaError, get_ollama_client
 from ollama_config import ollama_config
 
 logger = logging.getLogger(__name__)
@@ -39,8 +39,8 @@ def _outputs_dir() -> Path:
     return Path(os.getenv("OUTPUTS_DIR", Path(__file__).parent.parent / "outputs" / "proposal"))
 
 
-def _ollama_url() -> str:
-    return f"{ollama_config.base_url.rstrip('/')}/api/generate"
+def _ollama_base_url() -> str:
+    return ollama_config.base_url.rstrip('/')
 
 
 def _ollama_model() -> str:
@@ -331,22 +331,20 @@ def generate_section_prose(
     temperature = float(os.getenv("DOC_TEMPERATURE", "0.4"))
 
     try:
-        resp = requests.post(
-            _ollama_url(),
-            json={
-                "model": _ollama_model(),
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "num_predict": max_tokens,
-                    "temperature": temperature,
-                },
+        result = get_ollama_client().generate(
+            _ollama_model(),
+            prompt,
+            options={
+                "num_predict": max_tokens,
+                "temperature": temperature,
             },
+            caller="proposal.document_generator",
+            priority=PRIORITY_BATCH,
             timeout=120,
+            base_url=_ollama_base_url(),
         )
-        resp.raise_for_status()
-        return resp.json().get("response", "").strip()
-    except requests.RequestException as exc:
+        return result.get("response", "").strip()
+    except OllamaError as exc:
         logger.warning("Ollama unavailable for section '%s': %s", section.heading, exc)
         req_ids = ", ".join(r.id for r in section.requirements)
         return (
@@ -17,7 +17,7 @@ from datetime import date
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import requests
+from ollama_client import PRIORITY_BATCH, OllamaError, get_ollama_client
 from ollama_config import ollama_config
 
 logger = logging.getLogger(__name__)
@@ -308,17 +308,16 @@ the next proposal. Focus on cross-cutting patterns, not single incidents.
 Format as a numbered list with brief rationale for each.
 """
     try:
-        resp = requests.post(
-            f"{base_url}/api/generate",
-            json={
-                "model": model, "prompt": prompt, "stream": False,
-                "options": {"num_predict": 600, "temperature": 0.3},
-            },
+        result = get_ollama_client().generate(
+            model, prompt,
+            options={"num_predict": 600, "temperature": 0.3},
+            caller="proposal.hotwash",
+            priority=PRIORITY_BATCH,
             timeout=90,
+            base_url=base_url,
         )
-        resp.raise_for_status()
-        return resp.json().get("response", "").strip()
-    except requests.RequestException as exc:
+        return result.get("response", "").strip()
+    except OllamaError as exc:
         logger.warning("Ollama unavailable for hotwash insights: %s", exc)
         if critical:
             return "Critical areas for improvement:\n" + "\n".join(
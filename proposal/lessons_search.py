@@ -30,8 +30,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import requests
-
+from ollama_client import PRIORITY_NORMAL, OllamaError, get_ollama_client
 from ollama_config import ollama_config
 from proposal.database import DEFAULT_DB_PATH, get_conn
 from proposal.hotwash import IMPACT_LEVELS, LESSON_CATEGORIES
@@ -521,14 +520,16 @@ class LessonsSearchIndex:
             List[float] embedding or None if Ollama is unavailable.
         """
         try:
-            resp = requests.post(
-                f"{self._ollama_url}/api/embeddings",
-                json={"model": self._embed_model, "prompt": text[:2000]},
+            return get_ollama_client().embed(
+                self._embed_model,
+                text[:2000],
+                caller="lessons.embed",
+                priority=PRIORITY_NORMAL,
                 timeout=10,
-            )
-            if resp.ok:
-                return resp.json().get("embedding")
-        except requests.RequestException as exc:
+                retries=1,
+                base_url=self._ollama_url,
+            ) or None
+        except OllamaError as exc:
             logger.debug("Ollama embedding unavailable: %s", exc)
         return None
 
@@ -20,6 +20,7 @@ from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from ollama_client import PRIORITY_NORMAL, OllamaError, get_ollama_client
 from ollama_config import ollama_config
 
 logger = logging.getLogger(__name__)
@@ -492,8 +493,6 @@ def summarize_notes(raw_notes: str, meeting_type: str = "") -> str:
     Returns:
         str: Summarized notes (or original if Ollama unavailable).
     """
-    import requests as _requests
-
     base_url = ollama_config.base_url.rstrip("/")
     model = os.getenv("OLLAMA_MODEL", "llama3.2:3b")
     meeting_label = MEETING_TYPES.get(meeting_type, "proposal meeting")
@@ -506,14 +505,15 @@ Notes:
 {raw_notes}
 """
     try:
-        resp = _requests.post(
-            f"{base_url}/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False,
-                  "options": {"num_predict": 500, "temperature": 0.2}},
+        result = get_ollama_client().generate(
+            model, prompt,
+            options={"num_predict": 500, "temperature": 0.2},
+            caller="proposal.meeting_notes",
+            priority=PRIORITY_NORMAL,
             timeout=60,
+            base_url=base_url,
         )
-        resp.raise_for_status()
-        return resp.json().get("response", raw_notes).strip()
-    except _requests.RequestException as exc:
+        return result.get("response", raw_notes).strip()
+    except OllamaError as exc:
         logger.warning("Ollama unavailable for note summarization: %s", exc)
         return raw_notes
@@ -0,0 +1,359 @@
+"""
+Per-workspace document catalog and chunk-level diffing for incremental ingestion.
+
+Every ingested document is identified by a stable `doc_key` (its path for
+server-side files, "uploads/<name>" for uploads, "opportunity_<id>.txt"
+for opportunity records). The catalog records, per (workspace, doc_key):
+
+  - doc_id (stable "doc_<hash>" ID exposed to the documents API)
+  - version (incremented whenever the content changes)
+  - content_hash (sha256 over the ordered chunk hashes)
+  - the chunk IDs currently stored in the vector collection, and their count
+  - size in bytes, file type, first-ingestion and last-update times
+
+Listing documents, analytics totals and deletes are indexed lookups on this
+table rather than scans over every chunk in the collection.
+
+The catalog is only trusted while it agrees with the collection: if the
+vector store lost chunks the catalog still lists (a reset or deleted Chroma
+directory), reconcile() clears the workspace, so the next ingest of each
+document writes all of its chunks again instead of reporting "unchanged".
+
+Chunk IDs are content-addressed (doc key + sha256 of the chunk text), so
+re-ingesting an edited file is a set difference: IDs that are new get
+embedded and upserted, IDs that disappeared get deleted, and everything
+else is left alone.
+
+Usage:
+    catalog = DocumentCatalog('./web_rag_data/catalog.db')
+    plan = plan_document_sync('uploads/rfp.pdf', texts, previous_ids)
+    ...
+    version = catalog.record('default', 'uploads/rfp.pdf', plan.content_hash, plan.chunk_ids)
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+_SLUG_CHARS = re.compile(r'[^A-Za-z0-9]+')
+
+# Chunk IDs looked up per collection.get(ids=...) call
+_ID_WINDOW = 5000
+
+
+def chunk_hash(text: str) -> str:
+    """sha256 hex digest of a chunk's text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def chunk_ids_for(doc_key: str, hashes: Iterable[str],
+                  seen: Optional[Dict[str, int]] = None) -> List[str]:
+    """
+    Content-addressed chunk IDs for one document.
+
+    Args:
+        doc_key: Stable document identity within the workspace
+        hashes: chunk_hash() of each chunk, in document order
+        seen: Repeat counts carried between calls when a document's chunks
+            arrive in several batches (updated in place)
+
+    Returns:
+        IDs of the form "<slug>_<key hash>_<chunk hash>", with "_<n>" appended
+        to the n-th repeat of identical text within the document
+    """
+    slug = _SLUG_CHARS.sub('_', Path(doc_key).stem).strip('_')[:48] or 'doc'
+    prefix = f"{slug}_{hashlib.sha1(doc_key.encode('utf-8')).hexdigest()[:8]}"
+    seen = {} if seen is None else seen
+    ids = []
+    for h in hashes:
+        n = seen.get(h, 0)
+        seen[h] = n + 1
+        ids.append(f"{prefix}_{h[:16]}" + (f"_{n}" if n else ''))
+    return ids
+
+
+def existing_chunk_ids(collection, ids: Sequence[str]) -> Set[str]:
+    """Which of `ids` a Chroma collection currently stores."""
+    found: Set[str] = set()
+    for start in range(0, len(ids), _ID_WINDOW):
+        window = list(ids[start:start + _ID_WINDOW])
+        found.update(collection.get(ids=window, include=[]).get('ids', []))
+    return found
+
+
+def document_id_for(doc_key: str) -> str:
+    """Stable, URL-safe document ID ("doc_<hash>") for a doc_key."""
+    return f"doc_{hashlib.sha1(doc_key.encode('utf-8')).hexdigest()[:16]}"
+
+
+@dataclass
+class SyncPlan:
+    """What an incremental ingest has to do to bring one document up to date."""
+
+    doc_key: str
+    chunk_ids: List[str]
+    chunk_hashes: List[str]
+    content_hash: str
+    to_add: List[int] = field(default_factory=list)      # positions of new/changed chunks
+    to_keep: List[int] = field(default_factory=list)     # positions already stored
+    to_delete: List[str] = field(default_factory=list)   # stored IDs no longer present
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.to_add and not self.to_delete
+
+
+def plan_document_sync(doc_key: str, texts: List[str],
+                       existing_ids: Optional[Iterable[str]] = None,
+                       force: bool = False) -> SyncPlan:
+    """
+    Diff a document's new chunks against the IDs already stored for it.
+
+    Args:
+        doc_key: Stable document identity within the workspace
+        texts: New chunk texts, in document order
+        existing_ids: Chunk IDs currently stored for this document
+        force: Treat every chunk as changed (full re-ingest)
+
+    Returns:
+        SyncPlan listing chunks to add, keep and delete
+    """
+    hashes = [chunk_hash(t) for t in texts]
+    ids = chunk_ids_for(doc_key, hashes)
+    existing = set(existing_ids or ())
+    plan = SyncPlan(
+        doc_key=doc_key,
+        chunk_ids=ids,
+        chunk_hashes=hashes,
+        content_hash=hashlib.sha256('\n'.join(hashes).encode('ascii')).hexdigest(),
+    )
+    current = set(ids)
+    for i, chunk_id in enumerate(ids):
+        if chunk_id in existing and not force:
+            plan.to_keep.append(i)
+        else:
+            plan.to_add.append(i)
+    plan.to_delete = sorted(existing - current)
+    return plan
+
+
+class DocumentCatalog:
+    """
+    SQLite record of the documents ingested into each workspace.
+
+    Listing, analytics and deletes read this table instead of scanning every
+    chunk in the collection. Workspaces populated before the catalog existed
+    are backfilled once from a single collection scan (see mark_backfilled).
+
+    Safe to share between threads; a single connection is guarded by a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                workspace TEXT NOT NULL,
+                doc_key TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL DEFAULT 0,
+                size_bytes INTEGER,
+                file_type TEXT,
+                ingested_at REAL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (workspace, doc_key)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS workspaces (
+                workspace TEXT PRIMARY KEY,
+                backfilled_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_documents_doc_id ON documents (workspace, doc_id)'
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        data['chunk_ids'] = json.loads(data['chunk_ids'])
+        return data
+
+    def get(self, workspace: str, doc_key: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry for one document, or None if it was never ingested."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM documents WHERE workspace = ? AND doc_key = ?',
+                (workspace, doc_key),
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def get_by_id(self, workspace: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry by its stable document ID, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM documents WHERE workspace = ? AND doc_id = ?',
+                (workspace, doc_id),
+            ).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, workspace: str) -> List[Dict[str, Any]]:
+        """Every document in a workspace, oldest ingestion first (chunk IDs omitted)."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT workspace, doc_key, doc_id, version, content_hash, chunk_count, '
+                'size_bytes, file_type, ingested_at, updated_at '
+                'FROM documents WHERE workspace = ? ORDER BY ingested_at, doc_key',
+                (workspace,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self, workspace: Optional[str] = None) -> Dict[str, int]:
+        """Document, chunk and byte totals for one workspace (or all of them)."""
+        query = ('SELECT COUNT(*) AS documents, COALESCE(SUM(chunk_count), 0) AS chunks, '
+                 'COALESCE(SUM(size_bytes), 0) AS size_bytes FROM documents')
+        params: tuple = ()
+        if workspace is not None:
+            query += ' WHERE workspace = ?'
+            params = (workspace,)
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return dict(row)
+
+    def record(self, workspace: str, doc_key: str, content_hash: str,
+               chunk_ids: List[str], file_type: Optional[str] = None,
+               size_bytes: Optional[int] = None, ingested_at: Optional[float] = None) -> int:
+        """
+        Store the current state of a document, bumping its version when the
+        content hash changed.
+
+        Args:
+            ingested_at: First-ingestion time for a new entry (default: now);
+                existing entries keep their original date
+
+        Returns:
+            int: The document's version after this call (1 for a new document)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT version, content_hash, ingested_at, size_bytes FROM documents '
+                'WHERE workspace = ? AND doc_key = ?',
+                (workspace, doc_key),
+            ).fetchone()
+            if row is None:
+                version = 1
+                first_seen = ingested_at or now
+            else:
+                version = row['version'] if row['content_hash'] == content_hash else row['version'] + 1
+                first_seen = row['ingested_at'] or ingested_at or now
+                if size_bytes is None:
+                    size_bytes = row['size_bytes']
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents '
+                '(workspace, doc_key, doc_id, version, content_hash, chunk_ids, chunk_count, '
+                'size_bytes, file_type, ingested_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (workspace, doc_key, document_id_for(doc_key), version, content_hash,
+                 json.dumps(chunk_ids), len(chunk_ids), size_bytes, file_type, first_seen, now),
+            )
+            self._conn.commit()
+        return version
+
+    def remove(self, workspace: str, doc_key: str) -> Optional[Dict[str, Any]]:
+        """Drop a document's entry; returns the removed entry (or None)."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM documents WHERE workspace = ? AND doc_key = ?',
+                (workspace, doc_key),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'DELETE FROM documents WHERE workspace = ? AND doc_key = ?',
+                (workspace, doc_key),
+            )
+            self._conn.commit()
+        return self._row(row)
+
+    def workspaces(self) -> List[str]:
+        """Every workspace with catalogued documents or a backfill marker."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT workspace FROM documents UNION SELECT workspace FROM workspaces'
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def chunk_ids(self, workspace: str) -> List[str]:
+        """Chunk IDs of every document in a workspace."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT chunk_ids FROM documents WHERE workspace = ?', (workspace,)
+            ).fetchall()
+        return [chunk_id for row in rows for chunk_id in json.loads(row[0])]
+
+    def clear(self, workspace: str) -> int:
+        """Forget a workspace (documents and backfill marker); returns documents removed."""
+        with self._lock:
+            removed = self._conn.execute(
+                'DELETE FROM documents WHERE workspace = ?', (workspace,)
+            ).rowcount
+            self._conn.execute('DELETE FROM workspaces WHERE workspace = ?', (workspace,))
+            self._conn.commit()
+        return removed
+
+    def reconcile(self, workspace: str, collection) -> bool:
+        """
+        Clear a workspace whose entries list chunks its collection no longer has.
+
+        Checked cheaply against collection.count() first, then by looking up
+        every catalogued chunk ID. Chunks in the collection that the catalog
+        does not list (added outside sync_document) are not a mismatch.
+
+        Returns:
+            True if the workspace was cleared
+        """
+        ids = self.chunk_ids(workspace)
+        if not ids:
+            return False
+        if collection.count() >= len(ids) and len(existing_chunk_ids(collection, ids)) == len(ids):
+            return False
+        self.clear(workspace)
+        return True
+
+    def is_backfilled(self, workspace: str) -> bool:
+        """True once a workspace's pre-catalog chunks have been indexed."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM workspaces WHERE workspace = ?', (workspace,)
+            ).fetchone()
+        return row is not None
+
+    def mark_backfilled(self, workspace: str) -> None:
+        """Record that a workspace no longer needs a collection scan."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO workspaces (workspace, backfilled_at) VALUES (?, ?)',
+                (workspace, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,438 @@
+"""
+Process-pool Docling conversion with page-batch streaming and a shared output cache.
+
+DocumentProcessor used to convert a whole PDF through Docling inside the
+HTTP thread and materialize one markdown string before chunking. Conversion
+now runs here instead:
+
+  - in a pool of worker processes (spawned, one Docling converter each), so
+    a folder of PDFs converts in parallel across cores and the server
+    process never loads the Docling models
+  - in page batches: every batch of a PDF is submitted at once and yielded
+    in page order as it finishes, so the first chunks can be embedded and
+    searched before the rest of the document is converted
+  - under a per-file timeout; a stuck conversion raises ConversionTimeout
+  - through a persistent SQLite cache keyed by sha256(file bytes) and Docling
+    version, shared by RAG ingestion, CAG and RFP shredding, so a document
+    is never converted twice
+
+Configuration (env):
+    DOC_CONVERT_WORKERS     worker processes (default: half the CPU cores)
+    DOC_CONVERT_TIMEOUT     seconds allowed per file (default 600)
+    DOC_CONVERT_PAGE_BATCH  PDF pages per conversion task (default 8)
+    DOC_CONVERT_CACHE       cache database (default web_rag_data/conversion_cache.db)
+
+Usage:
+    service = get_conversion_service()
+    for batch in service.iter_batches('rfp.pdf'):
+        print(batch.first_page, batch.last_page, len(batch.text))
+    service.prefetch(['a.pdf', 'b.pdf'])  # convert a folder in parallel
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv('DOC_CONVERT_WORKERS', '0')) or max(1, (os.cpu_count() or 2) // 2)
+DEFAULT_TIMEOUT = float(os.getenv('DOC_CONVERT_TIMEOUT', '600'))
+DEFAULT_PAGE_BATCH = int(os.getenv('DOC_CONVERT_PAGE_BATCH', '8'))
+DEFAULT_CACHE_PATH = os.getenv(
+    'DOC_CONVERT_CACHE',
+    str(Path(__file__).resolve().parent.parent / 'web_rag_data' / 'conversion_cache.db')
+)
+
+# Page range of a whole-document conversion (Word files, PDFs of unknown length)
+WHOLE_DOCUMENT: Tuple[int, int] = (0, 0)
+
+_HASH_BLOCK = 1 << 20
+
+
+class ConversionTimeout(Exception):
+    """A document did not finish converting within the per-file timeout."""
+
+
+@dataclass
+class PageBatch:
+    """Markdown for pages first_page..last_page (1-based, inclusive) of a document."""
+
+    first_page: int
+    last_page: int
+    text: str
+    cached: bool = False
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+
+_worker_converter = None
+
+
+def _convert_in_worker(file_path: str, page_range: Tuple[int, int]) -> str:
+    """Convert one page range to markdown; runs in a pool process."""
+    global _worker_converter
+    if _worker_converter is None:
+        from docling.document_converter import DocumentConverter
+        _worker_converter = DocumentConverter()
+    if page_range == WHOLE_DOCUMENT:
+        result = _worker_converter.convert(file_path)
+    else:
+        result = _worker_converter.convert(file_path, page_range=page_range)
+    return result.document.export_to_markdown()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _converter_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('docling')
+    except Exception:
+        return 'unknown'
+
+
+def file_fingerprint(file_path) -> str:
+    """sha256 of a file's bytes, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pdf_page_count(file_path) -> Optional[int]:
+    """Number of pages in a PDF, or None if it cannot be determined cheaply."""
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    try:
+        pdf = pypdfium2.PdfDocument(str(file_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.warning(f"Could not count pages of {file_path}: {e}")
+        return None
+
+
+def page_ranges(page_count: Optional[int], batch_size: int) -> List[Tuple[int, int]]:
+    """1-based inclusive page ranges covering a document, or [WHOLE_DOCUMENT]."""
+    if not page_count or batch_size <= 0:
+        return [WHOLE_DOCUMENT]
+    return [(start, min(start + batch_size - 1, page_count))
+            for start in range(1, page_count + 1, batch_size)]
+
+
+class ConversionCache:
+    """
+    Persistent (document key, page range) -> markdown cache in SQLite.
+
+    The database is opened on first use and only created by the first put(),
+    so processors that never convert anything leave no file behind. Safe to
+    share between threads; a single connection is guarded by a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self, create: bool) -> Optional[sqlite3.Connection]:
+        """The open connection; None if the database does not exist and create is False."""
+        if self._conn is None:
+            if self.db_path != ':memory:':
+                if not create and not Path(self.db_path).exists():
+                    return None
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversions (
+                    doc_key TEXT NOT NULL,
+                    first_page INTEGER NOT NULL,
+                    last_page INTEGER NOT NULL,
+                    markdown TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (doc_key, first_page, last_page)
+                ) WITHOUT ROWID
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, doc_key: str, page_range: Tuple[int, int]) -> Optional[str]:
+        with self._lock:
+            conn = self._connection(create=False)
+            if conn is None:
+                self.misses += 1
+                return None
+            row = conn.execute(
+                'SELECT markdown FROM conversions WHERE doc_key = ? AND first_page = ? AND last_page = ?',
+                (doc_key, *page_range),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, doc_key: str, page_range: Tuple[int, int], markdown: str) -> None:
+        with self._lock:
+            conn = self._connection(create=True)
+            conn.execute(
+                'INSERT OR REPLACE INTO conversions (doc_key, first_page, last_page, markdown, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (doc_key, *page_range, markdown, time.time()),
+            )
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class DocumentConversionService:
+    """
+    Docling conversion on a lazily started process pool, with page streaming.
+
+    `convert_fn(file_path, page_range) -> markdown` is what runs in the pool;
+    tests substitute a picklable stub for the Docling worker.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None,
+                 page_batch: Optional[int] = None, cache: Optional[ConversionCache] = None,
+                 convert_fn=_convert_in_worker, count_pages=pdf_page_count):
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.timeout = timeout if timeout is not None else DEFAULT_TIMEOUT
+        self.page_batch = page_batch or DEFAULT_PAGE_BATCH
+        self.cache = cache if cache is not None else ConversionCache(DEFAULT_CACHE_PATH)
+        self.convert_fn = convert_fn
+        self.count_pages = count_pages
+        self.converter_version = _converter_version()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._active_files = 0
+        # (document key, page range) -> [Future, consumers]; a batch requested
+        # again while converting joins the running task instead of resubmitting
+        self._inflight: Dict[Tuple[str, Tuple[int, int]], list] = {}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a threaded server process can deadlock the child
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def _reset_pool(self, terminate: bool) -> None:
+        """Drop the pool; with terminate, also kill workers stuck in a conversion."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+            # Tasks of the old pool can no longer be joined
+            self._inflight.clear()
+        if pool is None:
+            return
+        processes = list(getattr(pool, '_processes', {}).values()) if terminate else []
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def document_key(self, file_path) -> str:
+        return f"{file_fingerprint(file_path)}:docling-{self.converter_version}"
+
+    def _plan(self, file_path, paginate: bool) -> Tuple[str, List[Tuple[int, int]]]:
+        if paginate and Path(file_path).suffix.lower() == '.pdf':
+            ranges = page_ranges(self.count_pages(file_path), self.page_batch)
+        else:
+            ranges = [WHOLE_DOCUMENT]
+        return self.document_key(file_path), ranges
+
+    def _start(self, file_path: str, doc_key: str, page_range: Tuple[int, int]) -> Future:
+        """Submit one page range, or join its in-flight conversion."""
+        key = (doc_key, page_range)
+        with self._pool_lock:
+            entry = self._inflight.get(key)
+            if entry is not None and not entry[0].cancelled():
+                entry[1] += 1
+                return entry[0]
+        try:
+            future = self._executor().submit(self.convert_fn, file_path, page_range)
+        except BrokenProcessPool:
+            self._reset_pool(terminate=False)
+            future = self._executor().submit(self.convert_fn, file_path, page_range)
+        with self._pool_lock:
+            self._inflight[key] = [future, 1]
+        future.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future: Future) -> None:
+        with self._pool_lock:
+            entry = self._inflight.get(key)
+            if entry is not None and entry[0] is future:
+                del self._inflight[key]
+
+    def _release(self, doc_key: str, page_range: Tuple[int, int], future: Future) -> None:
+        """Drop one consumer of a conversion; cancel it if nobody is left waiting."""
+        with self._pool_lock:
+            entry = self._inflight.get((doc_key, page_range))
+            if entry is None or entry[0] is not future:
+                return
+            entry[1] -= 1
+            orphaned = entry[1] <= 0
+        if orphaned:
+            future.cancel()
+
+    def _submit(self, file_path: str, doc_key: str,
+                ranges: Sequence[Tuple[int, int]]) -> Dict[Tuple[int, int], object]:
+        """Cached markdown (str) or a pending Future for every page range."""
+        pending: Dict[Tuple[int, int], object] = {}
+        for page_range in ranges:
+            cached = self.cache.get(doc_key, page_range)
+            pending[page_range] = cached if cached is not None else self._start(file_path, doc_key, page_range)
+        return pending
+
+    def _collect(self, file_path: str, doc_key: str,
+                 pending: Dict[Tuple[int, int], object], deadline: float) -> Iterator[PageBatch]:
+        """Yield batches in page order, caching each as it completes."""
+        consumed = set()
+        try:
+            for page_range, item in pending.items():
+                if isinstance(item, Future):
+                    try:
+                        markdown = item.result(timeout=max(0.0, deadline - time.monotonic()))
+                    except FuturesTimeout:
+                        raise ConversionTimeout(
+                            f"Conversion of {Path(file_path).name} exceeded {self.timeout:.0f}s"
+                        ) from None
+                    except BrokenProcessPool:
+                        self._reset_pool(terminate=False)
+                        raise
+                    consumed.add(page_range)
+                    self._release(doc_key, page_range, item)
+                    self.cache.put(doc_key, page_range, markdown)
+                    yield PageBatch(page_range[0], page_range[1], markdown)
+                else:
+                    yield PageBatch(page_range[0], page_range[1], item, cached=True)
+        except ConversionTimeout:
+            stuck = [f for f in pending.values() if isinstance(f, Future) and not f.done()]
+            with self._pool_lock:
+                alone = self._active_files <= 1
+            # Only kill workers when no other file is converting on them
+            if alone and any(f.running() for f in stuck):
+                self._reset_pool(terminate=True)
+            raise
+        finally:
+            # Stopped early (error, timeout or consumer gave up): release the
+            # rest, cancelling batches no other caller is waiting for
+            for page_range, item in pending.items():
+                if isinstance(item, Future) and page_range not in consumed:
+                    self._release(doc_key, page_range, item)
+
+    def iter_batches(self, file_path, paginate: bool = True) -> Iterator[PageBatch]:
+        """
+        Convert a document, yielding markdown page batches in page order.
+
+        Args:
+            file_path: Document to convert
+            paginate: Split PDFs into page batches (False converts in one task)
+
+        Raises:
+            ConversionTimeout: The file took longer than the per-file timeout
+        """
+        file_path = str(file_path)
+        doc_key, ranges = self._plan(file_path, paginate)
+        deadline = time.monotonic() + self.timeout
+        with self._pool_lock:
+            self._active_files += 1
+        try:
+            pending = self._submit(file_path, doc_key, ranges)
+            yield from self._collect(file_path, doc_key, pending, deadline)
+        finally:
+            with self._pool_lock:
+                self._active_files -= 1
+
+    def convert_text(self, file_path, paginate: bool = True) -> str:
+        """Whole-document markdown (page batches joined)."""
+        return '\n\n'.join(batch.text for batch in self.iter_batches(file_path, paginate))
+
+    def prefetch(self, file_paths: Sequence, paginate: bool = True) -> Dict[str, Optional[str]]:
+        """
+        Convert many documents in parallel, filling the cache.
+
+        All page batches of all files are queued at once, so the pool stays
+        busy across file boundaries; callers converting one of the files
+        meanwhile join its queued batches. Each file gets `timeout` seconds
+        from the moment the previous one finished.
+
+        Returns:
+            file path -> None on success, or an error message
+        """
+        queued = []
+        errors: Dict[str, Optional[str]] = {}
+        with self._pool_lock:
+            self._active_files += len(file_paths)
+        try:
+            for file_path in map(str, file_paths):
+                try:
+                    doc_key, ranges = self._plan(file_path, paginate)
+                    queued.append((file_path, doc_key, self._submit(file_path, doc_key, ranges)))
+                except Exception as e:
+                    errors[file_path] = str(e)
+            for file_path, doc_key, pending in queued:
+                try:
+                    for _ in self._collect(file_path, doc_key, pending, time.monotonic() + self.timeout):
+                        pass
+                    errors[file_path] = None
+                except Exception as e:
+                    logger.warning(f"Conversion of {file_path} failed: {e}")
+                    errors[file_path] = str(e)
+        finally:
+            with self._pool_lock:
+                self._active_files -= len(file_paths)
+        return errors
+
+    def shutdown(self) -> None:
+        self._reset_pool(terminate=False)
+
+
+_service: Optional[DocumentConversionService] = None
+_service_lock = threading.Lock()
+
+
+def get_conversion_service() -> DocumentConversionService:
+    """Return the process-wide DocumentConversionService, creating it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = DocumentConversionService()
+    return _service
@@ -8,18 +8,151 @@ without paid API services.
 
 import os
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from pathlib import Path
 import json
 
 # Document processing imports
-from docling.document_converter import DocumentConverter
+import numpy as np
 import pandas as pd
 
+# Docling runs in worker processes (see document_conversion); this process
+# only chunks the markdown it returns
+from document_conversion import ConversionTimeout, DocumentConversionService, get_conversion_service
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Spreadsheets: rows per row chunk, the most row chunks one sheet may yield
+# (windows widen beyond it) and rows read per block
+SHEET_ROW_WINDOW = int(os.getenv('DOC_SHEET_ROW_WINDOW', '20'))
+SHEET_MAX_ROW_CHUNKS = int(os.getenv('DOC_SHEET_MAX_ROW_CHUNKS', '1000'))
+SHEET_READ_CHUNKSIZE = int(os.getenv('DOC_SHEET_READ_CHUNKSIZE', '50000'))
+
+# Distinct values remembered per column for unique counts and examples
+_SHEET_UNIQUE_CAP = 1000
+
+
+def _is_numeric(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _merge_dtype(seen, dtype):
+    """dtype of a column whose blocks were inferred as `seen` and `dtype`."""
+    if seen == dtype:
+        return dtype
+    if _is_numeric(seen) and _is_numeric(dtype):
+        return np.dtype('float64')
+    return np.dtype(object)
+
+
+def _count_csv_rows(file_path: Path) -> int:
+    """Data rows of a CSV (newlines minus the header; quoted newlines overcount)."""
+    lines = 0
+    last = b'\n'
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(0, lines - 1)
+
+
+def _row_texts(df: pd.DataFrame, first_row: int) -> List[str]:
+    """
+    "Row N:\ncol: value\n..." for every row, skipping nulls.
+
+    Built column by column as whole-array concatenations over numpy object
+    arrays instead of iterating rows.
+    """
+    body = np.full(len(df), '', dtype=object)
+    started = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        series = df[col]
+        present = series.notna().to_numpy()
+        if not present.any():
+            continue
+        prefix = f"{col}: "
+        values = np.array(list(map(str, series.tolist())), dtype=object)
+        labels = np.where(present & started, '\n' + prefix, np.where(present, prefix, ''))
+        body = body + labels + np.where(present, values, '')
+        started |= present
+    numbers = np.array(list(map(str, range(first_row + 1, first_row + 1 + len(df)))), dtype=object)
+    return ('Row ' + numbers + ':\n' + body).tolist()
+
+
+class SheetProfile:
+    """Column statistics of a spreadsheet, accumulated one block of rows at a time."""
+
+    def __init__(self, unique_cap: int = _SHEET_UNIQUE_CAP):
+        self.unique_cap = unique_cap
+        self.rows = 0
+        self.row_window = 1
+        self.columns: List[Any] = []
+        self.dtypes: Dict[Any, Any] = {}
+        self.counts: Dict[Any, int] = {}
+        self.mins: Dict[Any, Any] = {}
+        self.maxs: Dict[Any, Any] = {}
+        self.sums: Dict[Any, Any] = {}
+        # Distinct non-null values in order of appearance, up to unique_cap
+        self.uniques: Dict[Any, Dict[Any, None]] = {}
+        self.uniques_truncated: Dict[Any, bool] = {}
+        self.sample: Optional[pd.DataFrame] = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Fold one block of rows into the statistics."""
+        if self.sample is None:
+            self.columns = list(df.columns)
+            self.sample = df.head(3)
+            for col in self.columns:
+                self.counts[col] = 0
+                self.uniques[col] = {}
+                self.uniques_truncated[col] = False
+        self.rows += len(df)
+
+        block_counts = df.count()
+        for col in self.columns:
+            # An all-null block infers float64 whatever the column holds
+            if not self.counts[col]:
+                self.dtypes[col] = df[col].dtype
+            elif block_counts[col]:
+                self.dtypes[col] = _merge_dtype(self.dtypes[col], df[col].dtype)
+            self.counts[col] += int(block_counts[col])
+
+        numeric = [col for col in self.columns if _is_numeric(df[col].dtype) and df[col].notna().any()]
+        if numeric:
+            aggregates = df[numeric].agg(['min', 'max', 'sum'])
+            for col in numeric:
+                low, high, total = (aggregates.at[stat, col] for stat in ('min', 'max', 'sum'))
+                self.mins[col] = low if col not in self.mins else min(self.mins[col], low)
+                self.maxs[col] = high if col not in self.maxs else max(self.maxs[col], high)
+                self.sums[col] = self.sums.get(col, 0) + total
+
+        for col in self.columns:
+            if self.uniques_truncated[col]:
+                continue
+            store = self.uniques[col]
+            for value in df[col].dropna().unique():
+                if value in store:
+                    continue
+                if len(store) >= self.unique_cap:
+                    self.uniques_truncated[col] = True
+                    break
+                store[value] = None
+
+    def is_numeric(self, col) -> bool:
+        return _is_numeric(self.dtypes[col])
+
+    def is_text(self, col) -> bool:
+        dtype = self.dtypes[col]
+        return pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+
+    def unique_count(self, col) -> str:
+        count = len(self.uniques[col])
+        return f"{count}+" if self.uniques_truncated[col] else str(count)
+
 
 class DocumentProcessor:
     """
@@ -27,22 +160,65 @@ class DocumentProcessor:
     Supports .txt, .pdf, .doc, .csv, .xls with intelligent chunking.
     """
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100,
+                 conversion: Optional[DocumentConversionService] = None):
         """
         Initialize document processor.
         
         Args:
             chunk_size: Maximum characters per chunk
             chunk_overlap: Overlapping characters between chunks
+            conversion: Docling conversion service (default: the shared process pool)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.row_window = SHEET_ROW_WINDOW
+        self.max_row_chunks = SHEET_MAX_ROW_CHUNKS
+        self.read_chunksize = SHEET_READ_CHUNKSIZE
         
-        # Initialize Docling converter (free, 97.9% accuracy)
-        self.converter = DocumentConverter()
+        # Docling (free, 97.9% accuracy) runs on a shared process pool whose
+        # output cache is also used by CAG and RFP shredding
+        self.conversion = conversion or get_conversion_service()
         
         logger.info("DocumentProcessor initialized with zero-cost processing")
     
+    def iter_document_chunk_batches(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process a document incrementally (used for streaming ingestion).
+
+        PDFs yield one result per converted page batch and spreadsheets one
+        per block of rows read; every other type yields its complete
+        process_document() result once.
+
+        Yields:
+            Result dicts with 'status', 'file_type' and that batch's 'chunks'
+        """
+        path = Path(file_path)
+        if path.suffix.lower() in ('.csv', '.xls', '.xlsx') and path.exists():
+            try:
+                for chunks in self.iter_spreadsheet_chunk_batches(path):
+                    yield {"status": "success", "file_path": str(path), "file_type": "spreadsheet",
+                           "processing_method": "intelligent_chunking", "chunks": chunks}
+            except Exception as e:
+                logger.error(f"Spreadsheet processing failed: {e}")
+                yield {"status": "error", "error": f"Spreadsheet processing failed: {e}", "chunks": []}
+            return
+        if path.suffix.lower() != '.pdf' or not path.exists():
+            yield self.process_document(file_path)
+            return
+        try:
+            produced = False
+            for chunks in self.iter_pdf_chunk_batches(path):
+                produced = True
+                yield {"status": "success", "file_path": str(path), "file_type": "pdf",
+                       "processing_method": "docling", "chunks": chunks}
+            if not produced:
+                yield {"status": "error", "error": "PDF contains no extractable text content",
+                       "file_path": str(path), "file_type": "pdf", "chunks": []}
+        except Exception as e:
+            logger.error(f"Docling PDF processing failed: {e}")
+            yield {"status": "error", "error": f"PDF processing failed: {e}", "chunks": []}
+
     def process_document(self, file_path: str) -> Dict[str, Any]:
         """
         Process document based on file type (Agent-accessible via MCP).
@@ -130,33 +306,57 @@ class DocumentProcessor:
             } for i, chunk in enumerate(chunks)]
         }
     
-    def _process_pdf_file(self, file_path: Path) -> Dict[str, Any]:
-        """Process PDF files using Docling (97.9% accuracy, zero cost)."""
-        try:
-            # Convert PDF using Docling
-            result = self.converter.convert(str(file_path))
+    def iter_pdf_chunk_batches(self, file_path: Path) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream a PDF's chunks as Docling finishes each page batch.
 
-            # Extract text content using export_to_markdown()
-            content = result.document.export_to_markdown()
+        Page batches convert in parallel on the conversion pool and arrive in
+        page order; chunk boundaries are identical to chunking the whole
+        document at once.
 
-            # Check if content is empty
-            if not content or not content.strip():
-                return {
-                    "status": "error",
-                    "error": "PDF contains no extractable text content",
-                    "file_path": str(file_path),
+        Yields:
+            Lists of chunk dicts (text + metadata), in document order
+        """
+        chunk_index = 0
+        pages = {"last": 0}
+
+        def page_texts():
+            for batch in self.conversion.iter_batches(file_path):
+                pages["last"] = batch.last_page
+                yield batch.text + "\n\n"
+
+        pending = []
+        for chunk in self._iter_chunks(page_texts(), flush_each_piece=True):
+            if chunk is None:
+                if pending:
+                    yield pending
+                    pending = []
+                continue
+            pending.append({
+                "text": chunk,
+                "metadata": {
+                    "source": str(file_path),
+                    "chunk_index": chunk_index,
                     "file_type": "pdf",
-                    "chunks": []
+                    "processor": "docling",
+                    "converted_through_page": pages["last"]
                 }
+            })
+            chunk_index += 1
+        if pending:
+            yield pending
 
-            # Create chunks
-            chunks = self._chunk_text(content)
+    def _process_pdf_file(self, file_path: Path) -> Dict[str, Any]:
+        """Process PDF files using Docling (97.9% accuracy, zero cost)."""
+        try:
+            # Convert PDF page batches on the Docling process pool
+            chunks = [chunk for batch in self.iter_pdf_chunk_batches(file_path) for chunk in batch]
 
-            # Check if chunking produced any results
+            # Check if content is empty
             if not chunks:
                 return {
                     "status": "error",
-                    "error": "PDF processing produced no usable chunks",
+                    "error": "PDF contains no extractable text content",
                     "file_path": str(file_path),
                     "file_type": "pdf",
                     "chunks": []
@@ -168,17 +368,16 @@ class DocumentProcessor:
                 "file_type": "pdf",
                 "total_chunks": len(chunks),
                 "processing_method": "docling",
-                "chunks": [{
-                    "text": chunk,
-                    "metadata": {
-                        "source": str(file_path),
-                        "chunk_index": i,
-                        "file_type": "pdf",
-                        "processor": "docling"
-                    }
-                } for i, chunk in enumerate(chunks)]
+                "chunks": chunks
             }
 
+        except ConversionTimeout as e:
+            logger.error(f"Docling PDF processing timed out: {e}")
+            return {
+                "status": "error",
+                "error": f"PDF processing timed out: {e}",
+                "chunks": []
+            }
         except Exception as e:
             logger.error(f"Docling PDF processing failed: {e}")
             return {
@@ -190,11 +389,8 @@ class DocumentProcessor:
     def _process_word_file(self, file_path: Path) -> Dict[str, Any]:
         """Process Word documents using Docling."""
         try:
-            # Convert Word document using Docling
-            result = self.converter.convert(str(file_path))
-
-            # Extract text content using export_to_markdown()
-            content = result.document.export_to_markdown()
+            # Convert Word document using Docling (process pool, cached)
+            content = self.conversion.convert_text(file_path, paginate=False)
 
             # Create chunks
             chunks = self._chunk_text(content)
@@ -228,49 +424,15 @@ class DocumentProcessor:
         """
         Process spreadsheet files with intelligent semantic understanding.
         Addresses the complex spreadsheet vectorization challenge.
+
+        Produces a table summary chunk, one chunk per column and row-window
+        chunks (see iter_spreadsheet_chunk_batches).
         """
         try:
-            file_ext = file_path.suffix.lower()
-            
-            # Read spreadsheet
-            if file_ext == '.csv':
-                df = pd.read_csv(file_path)
-            else:  # .xls, .xlsx
-                df = pd.read_excel(file_path)
-            
-            chunks = []
-            
-            # Strategy 1: Table summary chunk
-            summary_text = self._create_table_summary(df, file_path)
-            chunks.append({
-                "text": summary_text,
-                "metadata": {
-                    "source": str(file_path),
-                    "chunk_index": 0,
-                    "chunk_type": "table_summary",
-                    "file_type": "spreadsheet",
-                    "table_shape": f"{df.shape[0]}x{df.shape[1]}"
-                }
-            })
-            
-            # Strategy 2: Column-based semantic chunks
-            for col_idx, col in enumerate(df.columns):
-                col_text = self._create_column_chunk(df, col)
-                chunks.append({
-                    "text": col_text,
-                    "metadata": {
-                        "source": str(file_path),
-                        "chunk_index": col_idx + 1,
-                        "chunk_type": "column_summary",
-                        "column_name": col,
-                        "file_type": "spreadsheet"
-                    }
-                })
-            
-            # Strategy 3: Row-based chunks (for smaller datasets)
-            if len(df) <= 100:  # Only for manageable datasets
-                row_chunks = self._create_row_chunks(df, file_path)
-                chunks.extend(row_chunks)
+            profile = SheetProfile()
+            batches = list(self.iter_spreadsheet_chunk_batches(file_path, profile))
+            # Summary and column chunks come last from the stream; keep them first here
+            chunks = batches[-1] + [chunk for batch in batches[:-1] for chunk in batch]
             
             return {
                 "status": "success",
@@ -279,9 +441,10 @@ class DocumentProcessor:
                 "total_chunks": len(chunks),
                 "processing_method": "intelligent_chunking",
                 "table_info": {
-                    "rows": len(df),
-                    "columns": len(df.columns),
-                    "column_names": list(df.columns)
+                    "rows": profile.rows,
+                    "columns": len(profile.columns),
+                    "column_names": list(profile.columns),
+                    "rows_per_chunk": profile.row_window
                 },
                 "chunks": chunks
             }
@@ -293,90 +456,227 @@ class DocumentProcessor:
                 "error": f"Spreadsheet processing failed: {e}",
                 "chunks": []
             }
+
+    def iter_spreadsheet_chunk_batches(self, file_path: Path,
+                                       profile: Optional['SheetProfile'] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream a spreadsheet's chunks, one batch per block of rows read.
+
+        CSVs are read `read_chunksize` rows at a time, so memory stays bounded
+        however large the file is; Excel files are read whole and sliced.
+        Rows are grouped into windows of `row_window` rows per chunk, widened
+        so a sheet never yields more than `max_row_chunks` row chunks. Column
+        statistics are accumulated block by block, so the table summary and
+        column chunks are yielded last.
+
+        Args:
+            file_path: .csv, .xls or .xlsx file
+            profile: Receives the accumulated column statistics
+
+        Yields:
+            Lists of chunk dicts (text + metadata)
+        """
+        file_path = Path(file_path)
+        profile = profile if profile is not None else SheetProfile()
+        is_csv = file_path.suffix.lower() == '.csv'
+
+        if is_csv:
+            window = self._row_window(_count_csv_rows(file_path))
+            # Blocks hold whole windows, so no window straddles two blocks
+            read_size = max(window, self.read_chunksize // window * window)
+            blocks = pd.read_csv(file_path, chunksize=read_size)
+        else:  # .xls, .xlsx
+            df = pd.read_excel(file_path)
+            window = self._row_window(len(df))
+            read_size = max(window, self.read_chunksize // window * window)
+            blocks = (df.iloc[start:start + read_size] for start in range(0, len(df), read_size))
+        profile.row_window = window
+
+        chunk_index = None
+        for block in blocks:
+            first_row = profile.rows
+            profile.update(block)
+            if chunk_index is None:
+                # Row chunks follow the summary and column chunks
+                chunk_index = len(profile.columns) + 1
+            row_chunks = self._create_row_chunks(block, file_path, first_row, window, chunk_index)
+            chunk_index += len(row_chunks)
+            if row_chunks:
+                yield row_chunks
+
+        if not profile.columns:
+            # Header-only CSV: no blocks were read
+            profile.update(pd.read_csv(file_path, nrows=0) if is_csv else pd.read_excel(file_path, nrows=0))
+
+        chunks = [{
+            "text": self._create_table_summary(profile, file_path),
+            "metadata": {
+                "source": str(file_path),
+                "chunk_index": 0,
+                "chunk_type": "table_summary",
+                "file_type": "spreadsheet",
+                "table_shape": f"{profile.rows}x{len(profile.columns)}"
+            }
+        }]
+        for col_idx, col in enumerate(profile.columns):
+            chunks.append({
+                "text": self._create_column_chunk(profile, col),
+                "metadata": {
+                    "source": str(file_path),
+                    "chunk_index": col_idx + 1,
+                    "chunk_type": "column_summary",
+                    "column_name": col,
+                    "file_type": "spreadsheet"
+                }
+            })
+        yield chunks
+
+    def _row_window(self, total_rows: int) -> int:
+        """Rows per row chunk, widened to keep at most max_row_chunks chunks."""
+        window = max(1, self.row_window)
+        if self.max_row_chunks > 0 and total_rows > window * self.max_row_chunks:
+            window = -(-total_rows // self.max_row_chunks)
+        return window
     
-    def _create_table_summary(self, df: pd.DataFrame, file_path: Path) -> str:
+    def _create_table_summary(self, profile: 'SheetProfile', file_path: Path) -> str:
         """Create a comprehensive table summary for semantic search."""
         summary_parts = [
             f"Spreadsheet: {file_path.name}",
-            f"Dimensions: {len(df)} rows × {len(df.columns)} columns",
+            f"Dimensions: {profile.rows} rows × {len(profile.columns)} columns",
             "",
             "Column Overview:",
         ]
         
-        for col in df.columns:
-            col_info = f"- {col}: {df[col].dtype}"
-            if df[col].dtype in ['int64', 'float64']:
-                col_info += f" (range: {df[col].min()}-{df[col].max()})"
-            elif df[col].dtype == 'object':
-                unique_count = df[col].nunique()
+        for col in profile.columns:
+            col_info = f"- {col}: {profile.dtypes[col]}"
+            if profile.is_numeric(col):
+                if profile.counts[col]:
+                    col_info += f" (range: {profile.mins[col]}-{profile.maxs[col]})"
+            elif profile.is_text(col):
+                unique_count = profile.unique_count(col)
                 col_info += f" ({unique_count} unique values)"
-                if unique_count <= 10:
-                    col_info += f" - Examples: {', '.join(map(str, df[col].dropna().unique()[:5]))}"
+                if not profile.uniques_truncated[col] and len(profile.uniques[col]) <= 10:
+                    col_info += f" - Examples: {', '.join(map(str, list(profile.uniques[col])[:5]))}"
             
             summary_parts.append(col_info)
         
         # Add sample data
-        if len(df) > 0:
+        if profile.rows > 0:
             summary_parts.extend([
                 "",
                 "Sample Data (first 3 rows):",
-                df.head(3).to_string(index=False)
+                profile.sample.to_string(index=False)
             ])
         
-        return "\\n".join(summary_parts)
+        return "\n".join(summary_parts)
     
-    def _create_column_chunk(self, df: pd.DataFrame, column: str) -> str:
+    def _create_column_chunk(self, profile: 'SheetProfile', column: str) -> str:
         """Create a semantic chunk for a specific column."""
-        col_data = df[column].dropna()
-        
         chunk_parts = [
             f"Column Analysis: {column}",
-            f"Data Type: {df[column].dtype}",
-            f"Total Values: {len(col_data)} (excluding nulls)"
+            f"Data Type: {profile.dtypes[column]}",
+            f"Total Values: {profile.counts[column]} (excluding nulls)"
         ]
         
-        if df[column].dtype in ['int64', 'float64']:
-            chunk_parts.extend([
-                f"Range: {col_data.min()} to {col_data.max()}",
-                f"Mean: {col_data.mean():.2f}",
-                f"Statistics: Min={col_data.min()}, Max={col_data.max()}, Mean={col_data.mean():.2f}"
-            ])
+        if profile.is_numeric(column):
+            if profile.counts[column]:
+                mean = profile.sums[column] / profile.counts[column]
+                chunk_parts.extend([
+                    f"Range: {profile.mins[column]} to {profile.maxs[column]}",
+                    f"Mean: {mean:.2f}",
+                    f"Statistics: Min={profile.mins[column]}, Max={profile.maxs[column]}, Mean={mean:.2f}"
+                ])
         else:
-            unique_values = col_data.unique()
             chunk_parts.extend([
-                f"Unique Values: {len(unique_values)}",
-                f"Sample Values: {', '.join(map(str, unique_values[:10]))}"
+                f"Unique Values: {profile.unique_count(column)}",
+                f"Sample Values: {', '.join(map(str, list(profile.uniques[column])[:10]))}"
             ])
         
-        return "\\n".join(chunk_parts)
+        return "\n".join(chunk_parts)
     
-    def _create_row_chunks(self, df: pd.DataFrame, file_path: Path) -> List[Dict[str, Any]]:
-        """Create row-based chunks for detailed data access."""
+    def _create_row_chunks(self, df: pd.DataFrame, file_path: Path, first_row: int,
+                           window: int, first_index: int) -> List[Dict[str, Any]]:
+        """
+        Create row-window chunks for detailed data access.
+
+        Row texts are built column by column with vectorized string
+        operations; only the final join per window is done in Python.
+        """
+        row_texts = _row_texts(df, first_row)
         chunks = []
         
-        for idx, row in df.iterrows():
-            row_text = f"Row {idx + 1} from {file_path.name}:\\n"
-            row_data = []
-            
-            for col, value in row.items():
-                if pd.notna(value):
-                    row_data.append(f"{col}: {value}")
-            
-            row_text += "\\n".join(row_data)
-            
+        for start in range(0, len(row_texts), window):
+            rows = row_texts[start:start + window]
+            row_start = first_row + start + 1
+            row_end = row_start + len(rows) - 1
             chunks.append({
-                "text": row_text,
+                "text": f"Rows {row_start}-{row_end} from {file_path.name}:\n\n" + "\n\n".join(rows),
                 "metadata": {
                     "source": str(file_path),
-                    "chunk_index": len(chunks) + len(df.columns) + 2,  # After summary and column chunks
-                    "chunk_type": "data_row",
-                    "row_index": idx,
+                    "chunk_index": first_index + len(chunks),
+                    "chunk_type": "data_rows",
+                    "row_start": row_start,
+                    "row_end": row_end,
                     "file_type": "spreadsheet"
                 }
             })
         
         return chunks
     
+    def _chunk_end(self, text: str, start: int) -> int:
+        """End of the chunk starting at `start`, preferring a sentence boundary."""
+        end = start + self.chunk_size
+        
+        # Try to break at sentence boundaries
+        if end < len(text):
+            # Look for sentence endings
+            sentence_ends = [text.rfind('.', start, end),
+                           text.rfind('!', start, end),
+                           text.rfind('?', start, end)]
+            valid_sentence_ends = [pos for pos in sentence_ends if pos > start + self.chunk_size // 2]
+
+            # Only use sentence boundary if we found one
+            if valid_sentence_ends:
+                sentence_end = max(valid_sentence_ends)
+                if sentence_end > 0:
+                    end = sentence_end + 1
+        return end
+
+    def _iter_chunks(self, pieces: Iterable[str], flush_each_piece: bool = False) -> Iterator[Optional[str]]:
+        """
+        Chunk text that arrives in pieces, with the same boundaries as _chunk_text.
+
+        A chunk is emitted as soon as the text after its window has arrived;
+        only the unfinished tail is carried into the next piece.
+
+        Args:
+            pieces: Consecutive pieces of one document
+            flush_each_piece: Yield None after each piece's chunks (a batch marker)
+        """
+        buffer = ''
+        for piece in pieces:
+            buffer += piece
+            start = 0
+            while start + self.chunk_size < len(buffer):
+                end = self._chunk_end(buffer, start)
+                chunk = buffer[start:end].strip()
+                if chunk:
+                    yield chunk
+                start = end - self.chunk_overlap
+            buffer = buffer[start:]
+            if flush_each_piece:
+                yield None
+        
+        start = 0
+        while start < len(buffer):
+            end = self._chunk_end(buffer, start)
+            chunk = buffer[start:end].strip()
+            if chunk:
+                yield chunk
+            
+            # Move start position with overlap
+            start = end - self.chunk_overlap
+
     def _chunk_text(self, text: str) -> List[str]:
         """
         Split text into chunks with overlap for better context preservation.
@@ -390,34 +690,7 @@ class DocumentProcessor:
         if len(text) <= self.chunk_size:
             return [text]
         
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + self.chunk_size
-            
-            # Try to break at sentence boundaries
-            if end < len(text):
-                # Look for sentence endings
-                sentence_ends = [text.rfind('.', start, end),
-                               text.rfind('!', start, end),
-                               text.rfind('?', start, end)]
-                valid_sentence_ends = [pos for pos in sentence_ends if pos > start + self.chunk_size // 2]
-
-                # Only use sentence boundary if we found one
-                if valid_sentence_ends:
-                    sentence_end = max(valid_sentence_ends)
-                    if sentence_end > 0:
-                        end = sentence_end + 1
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            # Move start position with overlap
-            start = end - self.chunk_overlap
-            
-        return chunks
+        return list(self._iter_chunks([text]))
 
 
 def test_document_processor():
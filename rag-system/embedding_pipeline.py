@@ -0,0 +1,379 @@
+"""
+Batched, parallel embedding pipeline with a persistent content-hash cache.
+
+MojoChromaRAG.add_documents used to embed every chunk of a document in one
+synchronous encode() call and re-embedded identical text on every upload.
+The pipeline instead:
+
+  - looks every chunk up in an embedding cache keyed by
+    (model, sha256(chunk text)); unchanged chunks are never re-embedded
+  - embeds the misses in fixed-size batches on a small worker pool
+    (identical chunks within one upload are embedded once)
+  - hands finished windows to the vector-store writer in input order, with
+    at most `max_in_flight` batches embedded ahead of the writer, so a slow
+    ChromaDB write throttles the encoder (a run keeps all of its vectors
+    until it returns; memory grows with the size of the upload)
+  - caps the cache at `max_cache_entries`, dropping the oldest entries
+    after a run that added vectors
+  - reports throughput (chunks/s) and cache hit rate for every run
+
+Configuration (env):
+    RAG_EMBED_BATCH_SIZE     chunks per encode() call (default 64)
+    RAG_EMBED_WORKERS        parallel encode() calls (default 2)
+    RAG_EMBED_MAX_IN_FLIGHT  batches embedded ahead of the writer (default 2 x workers)
+    RAG_EMBED_CACHE_MAX      cached vectors kept (default 200000; 0 = unlimited)
+
+Usage:
+    cache = EmbeddingCache('./web_rag_data/embedding_cache.db')
+    pipeline = EmbeddingPipeline(model.encode, 'all-MiniLM-L6-v2', cache)
+    report = pipeline.run(texts, write_fn=lambda start, vectors: collection.upsert(...))
+    print(report.to_dict())  # chunks_per_second, cache_hit_rate, ...
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = int(os.getenv('RAG_EMBED_BATCH_SIZE', '64'))
+DEFAULT_WORKERS = int(os.getenv('RAG_EMBED_WORKERS', '2'))
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv('RAG_EMBED_MAX_IN_FLIGHT', '0')) or None
+DEFAULT_CACHE_MAX = int(os.getenv('RAG_EMBED_CACHE_MAX', '200000'))
+
+# SQLite caps bound parameters per statement; stay well below it
+_LOOKUP_CHUNK = 500
+
+
+def content_hash(text: str) -> str:
+    """sha256 hex digest of a chunk's text (the cache key within a model)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent (model, sha256) -> float32 vector cache in SQLite.
+
+    Safe to share between threads; a single connection is guarded by a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Args:
+            model: Embedding model name
+            hashes: Content hashes to look up
+
+        Returns:
+            Dict of hash -> float32 vector for the hashes that were cached
+        """
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                part = unique[start:start + _LOOKUP_CHUNK]
+                marks = ','.join('?' * len(part))
+                rows = self._conn.execute(
+                    f'SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({marks})',
+                    [model, *part],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Dict[str, np.ndarray]) -> None:
+        """Store vectors (as float32) for the given hashes."""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            vec = np.asarray(vector, dtype=np.float32)
+            rows.append((model, key, int(vec.shape[0]), vec.tobytes(), now))
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (model, hash, dim, vector, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+            self._conn.commit()
+
+    def prune(self, max_entries: int) -> int:
+        """
+        Drop the oldest entries beyond max_entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            total = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+            excess = total - max_entries
+            if excess <= 0:
+                return 0
+            self._conn.execute(
+                'DELETE FROM embeddings WHERE (model, hash) IN ('
+                'SELECT model, hash FROM embeddings ORDER BY created_at LIMIT ?)',
+                (excess,),
+            )
+            self._conn.commit()
+            return excess
+
+    def clear(self, model: Optional[str] = None) -> None:
+        """Remove all entries (or only one model's)."""
+        with self._lock:
+            if model is None:
+                self._conn.execute('DELETE FROM embeddings')
+            else:
+                self._conn.execute('DELETE FROM embeddings WHERE model = ?', (model,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, object]:
+        """Entry count plus lookup hit/miss counters since start-up."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'path': self.db_path,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class IngestReport:
+    """Throughput report for one pipeline run."""
+
+    chunks: int = 0
+    cache_hits: int = 0
+    embedded: int = 0
+    duplicates: int = 0
+    batches: int = 0
+    embed_seconds: float = 0.0
+    write_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.chunks if self.chunks else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        for key in ('embed_seconds', 'write_seconds', 'elapsed_seconds'):
+            data[key] = round(data[key], 4)
+        data['chunks_per_second'] = round(self.chunks_per_second, 1)
+        data['cache_hit_rate'] = round(self.cache_hit_rate, 4)
+        return data
+
+
+class EmbeddingPipeline:
+    """
+    Embed chunks in parallel batches through an EmbeddingCache and feed the
+    results to a writer in order, embedding at most max_in_flight batches
+    ahead of it.
+    """
+
+    def __init__(self, encode: Callable[[List[str]], Sequence], model_name: str,
+                 cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 workers: int = DEFAULT_WORKERS,
+                 max_in_flight: Optional[int] = DEFAULT_MAX_IN_FLIGHT,
+                 max_cache_entries: int = DEFAULT_CACHE_MAX):
+        """
+        Args:
+            encode: Function mapping a list of texts to an (n, dim) array of vectors
+            model_name: Cache namespace; vectors from different models never mix
+            cache: Persistent cache (None disables caching)
+            batch_size: Chunks per encode() call and per write
+            workers: Parallel encode() calls
+            max_in_flight: Batches embedded ahead of the writer (default 2 x workers)
+            max_cache_entries: Cache size kept after each run (0 = unlimited)
+        """
+        self.encode = encode
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.max_in_flight = max(1, max_in_flight or 2 * self.workers)
+        self.max_cache_entries = max(0, max_cache_entries)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='rag-embed')
+        self._lock = threading.Lock()
+        self.totals = IngestReport()
+        self.last_report: Optional[IngestReport] = None
+
+    def _encode_batch(self, texts: List[str]) -> Tuple[np.ndarray, float]:
+        started = time.perf_counter()
+        vectors = np.asarray(self.encode(texts), dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(texts):
+            raise ValueError(f'encode() returned shape {vectors.shape} for {len(texts)} texts')
+        return vectors, time.perf_counter() - started
+
+    def run(self, texts: Sequence[str],
+            write_fn: Optional[Callable[[int, np.ndarray], None]] = None) -> IngestReport:
+        """
+        Embed `texts` and deliver the vectors to `write_fn` window by window.
+
+        Args:
+            texts: Chunk texts, in the order they should be written
+            write_fn: Called as write_fn(start, vectors) for consecutive windows
+                of up to batch_size chunks, in order; vectors is a float32
+                (n, dim) array for texts[start:start + n]. Embedding stays at
+                most max_in_flight batches ahead of it.
+
+        Returns:
+            IngestReport for this run (also kept as last_report)
+        """
+        started = time.perf_counter()
+        report = IngestReport(chunks=len(texts))
+        hashes = [content_hash(t) for t in texts]
+        cached = self.cache.get_many(self.model_name, hashes) if self.cache else {}
+        report.cache_hits = sum(1 for h in hashes if h in cached)
+
+        # Group the misses into batches of unique texts, in first-seen order
+        batches: List[List[str]] = []
+        batch_keys: List[List[str]] = []
+        batch_of: Dict[str, int] = {}
+        current: List[str] = []
+        current_keys: List[str] = []
+        for text, key in zip(texts, hashes):
+            if key in cached or key in batch_of:
+                continue
+            batch_of[key] = len(batches)
+            current.append(text)
+            current_keys.append(key)
+            if len(current) == self.batch_size:
+                batches.append(current)
+                batch_keys.append(current_keys)
+                current, current_keys = [], []
+        if current:
+            batches.append(current)
+            batch_keys.append(current_keys)
+        report.batches = len(batches)
+        report.embedded = sum(len(b) for b in batches)
+        report.duplicates = len(texts) - report.cache_hits - report.embedded
+
+        vectors: Dict[str, np.ndarray] = dict(cached)
+        futures: Dict[int, Future] = {}
+        next_batch = 0
+
+        def submit_until(limit: int) -> None:
+            nonlocal next_batch
+            while next_batch < len(batches) and next_batch <= limit:
+                futures[next_batch] = self._executor.submit(self._encode_batch, batches[next_batch])
+                next_batch += 1
+
+        def collect(index: int) -> None:
+            future = futures.pop(index, None)
+            if future is None:
+                return
+            result, seconds = future.result()
+            report.embed_seconds += seconds
+            fresh = dict(zip(batch_keys[index], result))
+            vectors.update(fresh)
+            if self.cache:
+                self.cache.put_many(self.model_name, fresh)
+
+        try:
+            done = -1  # highest batch index collected
+            for start in range(0, len(texts), self.batch_size):
+                window = hashes[start:start + self.batch_size]
+                needed = max((batch_of[h] for h in window if h not in vectors), default=-1)
+                # Keep the pool busy up to the look-ahead bound, then wait
+                # only for the batches this window depends on
+                submit_until(max(needed, done) + self.max_in_flight)
+                while done < needed:
+                    done += 1
+                    collect(done)
+                if write_fn is not None:
+                    write_started = time.perf_counter()
+                    write_fn(start, np.stack([vectors[h] for h in window]))
+                    report.write_seconds += time.perf_counter() - write_started
+            while done < len(batches) - 1:
+                done += 1
+                collect(done)
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+        if self.cache and self.max_cache_entries and report.embedded:
+            pruned = self.cache.prune(self.max_cache_entries)
+            if pruned:
+                logger.info(f"Pruned {pruned} oldest embeddings from the cache")
+
+        report.elapsed_seconds = time.perf_counter() - started
+        self._accumulate(report)
+        logger.info(
+            f"Embedded {report.chunks} chunks in {report.elapsed_seconds:.2f}s "
+            f"({report.chunks_per_second:.1f} chunks/s, {report.cache_hit_rate:.0%} cache hits, "
+            f"{report.embedded} encoded in {report.batches} batches)"
+        )
+        return report
+
+    def _accumulate(self, report: IngestReport) -> None:
+        with self._lock:
+            self.last_report = report
+            for key in ('chunks', 'cache_hits', 'embedded', 'duplicates', 'batches',
+                        'embed_seconds', 'write_seconds', 'elapsed_seconds'):
+                setattr(self.totals, key, getattr(self.totals, key) + getattr(report, key))
+
+    def get_stats(self) -> Dict[str, object]:
+        """Configuration, totals since start-up, the last run and cache stats."""
+        with self._lock:
+            stats = {
+                'model': self.model_name,
+                'batch_size': self.batch_size,
+                'workers': self.workers,
+                'max_in_flight': self.max_in_flight,
+                'max_cache_entries': self.max_cache_entries,
+                'totals': self.totals.to_dict(),
+                'last_run': self.last_report.to_dict() if self.last_report else None,
+            }
+        stats['cache'] = self.cache.stats() if self.cache else None
+        return stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
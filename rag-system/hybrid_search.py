@@ -0,0 +1,297 @@
+"""
+Lexical (BM25) chunk index and reciprocal-rank fusion for hybrid RAG retrieval.
+
+Dense retrieval alone misses exact tokens that matter in RFPs (CLIN numbers,
+FAR clause IDs like 52.212-4, acronyms) unless n_results is inflated. Each
+workspace collection therefore gets a SQLite FTS5 index over the same chunk
+IDs, maintained on every upsert/delete. A query runs both retrievers and
+fuses their rankings with weighted reciprocal-rank fusion:
+
+    score(chunk) = sum over retrievers r of  weight_r / (k + rank_r(chunk))
+
+Chunks found by both retrievers rise to the top, so fewer of them are needed
+in the LLM prompt.
+
+The index is a copy of the collection's text, so it is only trusted while it
+holds exactly the collection's chunk IDs; reconcile() clears a workspace
+that drifted (e.g. a reset Chroma directory) and it is rebuilt from the
+collection before its next search.
+
+Configuration (env):
+    RAG_RETRIEVAL_MODE     'hybrid' (default) or 'vector' (dense only)
+    RAG_RRF_K              RRF rank constant (default 60)
+    RAG_WEIGHT_VECTOR      fusion weight of the dense retriever (default 1.0)
+    RAG_WEIGHT_LEXICAL     fusion weight of the BM25 retriever (default 1.0)
+    RAG_HYBRID_CANDIDATES  candidates per retriever, as a multiple of n_results (default 4)
+
+Usage:
+    index = LexicalIndex('./web_rag_data/lexical_index.db')
+    index.upsert('default', ids, texts)
+    hits = index.search('default', 'FAR 52.212-4 CLIN 0001', limit=20)
+    fused = reciprocal_rank_fusion({'vector': dense_ids, 'lexical': [h[0] for h in hits]})
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from document_catalog import existing_chunk_ids
+
+DEFAULT_MODE = os.getenv('RAG_RETRIEVAL_MODE', 'hybrid').lower()
+DEFAULT_RRF_K = int(os.getenv('RAG_RRF_K', '60'))
+DEFAULT_WEIGHTS = {
+    'vector': float(os.getenv('RAG_WEIGHT_VECTOR', '1.0')),
+    'lexical': float(os.getenv('RAG_WEIGHT_LEXICAL', '1.0')),
+}
+CANDIDATE_MULTIPLIER = int(os.getenv('RAG_HYBRID_CANDIDATES', '4'))
+
+# Clause numbers, CLINs and acronyms survive as one term: "52.212-4", "0001AA"
+_QUERY_TERMS = re.compile(r"[\w][\w.\-/]*[\w]|\w")
+_MAX_QUERY_TERMS = 32
+
+# SQLite caps bound parameters per statement; stay well below it
+_WRITE_CHUNK = 500
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every term is quoted, so punctuation inside a term ("52.212-4") becomes a
+    phrase of adjacent tokens instead of FTS5 syntax; terms are OR-ed and
+    BM25 ranks chunks matching more (and rarer) terms higher.
+
+    Returns:
+        MATCH expression, or None if the query has no searchable terms
+    """
+    terms = []
+    seen = set()
+    for term in _QUERY_TERMS.findall(query):
+        key = term.lower()
+        if key in seen or (len(term) < 2 and not term.isdigit()):
+            continue
+        seen.add(key)
+        terms.append('"' + term.replace('"', '""') + '"')
+        if len(terms) >= _MAX_QUERY_TERMS:
+            break
+    return ' OR '.join(terms) if terms else None
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, Sequence[str]],
+                           weights: Optional[Dict[str, float]] = None,
+                           k: int = DEFAULT_RRF_K) -> List[Tuple[str, float, Dict[str, int]]]:
+    """
+    Fuse several best-first rankings of the same IDs.
+
+    Args:
+        rankings: retriever name -> IDs, best first
+        weights: retriever name -> weight (missing retrievers weigh 1.0)
+        k: Rank constant; larger values flatten the contribution of top ranks
+
+    Returns:
+        (id, fused score, {retriever: 1-based rank}) sorted by score, best first;
+        ties keep the order in which IDs were first seen
+    """
+    weights = weights or {}
+    scores: Dict[str, float] = {}
+    ranks: Dict[str, Dict[str, int]] = {}
+    for name, ids in rankings.items():
+        weight = weights.get(name, 1.0)
+        for position, item in enumerate(ids, start=1):
+            if name in ranks.get(item, {}):
+                continue
+            scores[item] = scores.get(item, 0.0) + weight / (k + position)
+            ranks.setdefault(item, {})[name] = position
+    order = {item: i for i, item in enumerate(scores)}
+    fused = sorted(scores.items(), key=lambda pair: (-pair[1], order[pair[0]]))
+    return [(item, score, ranks[item]) for item, score in fused]
+
+
+@dataclass
+class RetrievalTrace:
+    """How one hybrid query was answered; returned to callers as `retrieval`."""
+
+    mode: str
+    k: int
+    weights: Dict[str, float]
+    candidates: Dict[str, int] = field(default_factory=dict)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'fusion': {'method': 'rrf', 'k': self.k, 'weights': dict(self.weights)},
+            'candidates': dict(self.candidates),
+            'timings_ms': {name: round(ms, 2) for name, ms in self.timings_ms.items()},
+        }
+
+
+class LexicalIndex:
+    """
+    SQLite FTS5 index of chunk text per workspace, keyed by Chroma chunk ID.
+
+    The FTS table holds only text; `chunk_map` maps its rowids to
+    (workspace, chunk_id) so upserts and deletes are indexed lookups.
+    Safe to share between threads; a single connection is guarded by a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_map (
+                rowid INTEGER PRIMARY KEY,
+                workspace TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                UNIQUE (workspace, chunk_id)
+            )
+        """)
+        self._conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                text,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS workspaces (
+                workspace TEXT PRIMARY KEY,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def _delete_locked(self, workspace: str, ids: Sequence[str]) -> None:
+        for start in range(0, len(ids), _WRITE_CHUNK):
+            window = list(ids[start:start + _WRITE_CHUNK])
+            placeholders = ','.join('?' * len(window))
+            rowids = [row[0] for row in self._conn.execute(
+                f'SELECT rowid FROM chunk_map WHERE workspace = ? AND chunk_id IN ({placeholders})',
+                [workspace, *window],
+            )]
+            if not rowids:
+                continue
+            marks = ','.join('?' * len(rowids))
+            self._conn.execute(f'DELETE FROM chunks WHERE rowid IN ({marks})', rowids)
+            self._conn.execute(f'DELETE FROM chunk_map WHERE rowid IN ({marks})', rowids)
+
+    def upsert(self, workspace: str, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """Index (or re-index) chunks under their Chroma IDs."""
+        if not ids:
+            return
+        with self._lock:
+            self._delete_locked(workspace, ids)
+            for chunk_id, text in zip(ids, texts):
+                rowid = self._conn.execute(
+                    'INSERT INTO chunk_map (workspace, chunk_id) VALUES (?, ?)',
+                    (workspace, chunk_id),
+                ).lastrowid
+                self._conn.execute('INSERT INTO chunks (rowid, text) VALUES (?, ?)', (rowid, text or ''))
+            self._conn.commit()
+
+    def delete(self, workspace: str, ids: Sequence[str]) -> None:
+        """Drop chunks from the index."""
+        if not ids:
+            return
+        with self._lock:
+            self._delete_locked(workspace, ids)
+            self._conn.commit()
+
+    def search(self, workspace: str, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        BM25 search within one workspace.
+
+        Returns:
+            (chunk_id, bm25 score) best first; FTS5 scores are negative, lower is better
+        """
+        match = build_match_query(query)
+        if match is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT m.chunk_id, bm25(chunks) AS score FROM chunks '
+                'JOIN chunk_map m ON m.rowid = chunks.rowid '
+                'WHERE chunks MATCH ? AND m.workspace = ? ORDER BY score LIMIT ?',
+                (match, workspace, limit),
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def count(self, workspace: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM chunk_map WHERE workspace = ?', (workspace,)
+            ).fetchone()[0]
+
+    def workspaces(self) -> List[str]:
+        """Every workspace with indexed chunks or an indexed marker."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT workspace FROM chunk_map UNION SELECT workspace FROM workspaces'
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def chunk_ids(self, workspace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT chunk_id FROM chunk_map WHERE workspace = ?', (workspace,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self, workspace: str) -> None:
+        """Drop a workspace's chunks and its indexed marker (rebuilt on next search)."""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM chunks WHERE rowid IN (SELECT rowid FROM chunk_map WHERE workspace = ?)',
+                (workspace,),
+            )
+            self._conn.execute('DELETE FROM chunk_map WHERE workspace = ?', (workspace,))
+            self._conn.execute('DELETE FROM workspaces WHERE workspace = ?', (workspace,))
+            self._conn.commit()
+
+    def reconcile(self, workspace: str, collection) -> bool:
+        """
+        Clear a workspace whose index no longer matches its collection.
+
+        Every write to the collection also goes to the index, so an indexed
+        workspace must hold the same number of chunks under IDs the
+        collection still has.
+
+        Returns:
+            True if the workspace was cleared
+        """
+        if not self.is_indexed(workspace):
+            return False
+        ids = self.chunk_ids(workspace)
+        if collection.count() == len(ids) and len(existing_chunk_ids(collection, ids)) == len(ids):
+            return False
+        self.clear(workspace)
+        return True
+
+    def is_indexed(self, workspace: str) -> bool:
+        """True once a workspace's pre-existing chunks have been indexed."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM workspaces WHERE workspace = ?', (workspace,)
+            ).fetchone()
+        return row is not None
+
+    def mark_indexed(self, workspace: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO workspaces (workspace, indexed_at) VALUES (?, ?)',
+                (workspace, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -8,8 +8,8 @@ enabling AI agents to orchestrate document ingestion, search, and synthesis.
 import asyncio
 import json
 import logging
+import os
 from typing import Dict, List, Any, Optional
-from pathlib import Path
 
 # MCP imports
 from mcp.server import Server
@@ -75,17 +75,14 @@ class RAGMCPServer:
                         "file_path": file_path
                     })
                 
-                # Add processed chunks to vector database
-                documents = []
-                for chunk in processing_result["chunks"]:
-                    documents.append({
-                        "text": chunk["text"],
-                        "metadata": chunk["metadata"],
-                        "id": f"{Path(file_path).stem}_chunk_{chunk['metadata']['chunk_index']}"
-                    })
-                
-                # Store in ChromaDB (local, zero cost)
-                storage_result = self.rag_system.add_documents(documents)
+                # Incrementally store chunks in ChromaDB (local, zero cost) and
+                # record the document in the workspace catalog
+                storage_result = self.rag_system.sync_document(
+                    file_path,
+                    processing_result["chunks"],
+                    file_type=processing_result.get("file_type"),
+                    size_bytes=os.path.getsize(file_path) if os.path.exists(file_path) else None
+                )
                 
                 return json.dumps({
                     "status": "success",
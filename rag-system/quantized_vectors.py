@@ -0,0 +1,321 @@
+"""
+Compact (float16 / int8) storage for chunk embeddings with exact rescoring.
+
+Chroma keeps every chunk embedding as float32 plus its HNSW graph, and
+embeddings used to travel through the RAG system as Python lists of floats
+(32 bytes per dimension). A workspace created in a compact storage mode
+instead keeps its vectors in a QuantizedVectorStore:
+
+  - float16: vectors stored as half precision (2 bytes per dimension)
+  - int8: vectors scaled by max(|x|) / 127 per vector and rounded
+    (1 byte per dimension plus one float32 scale)
+
+Chroma still holds the workspace's documents and metadata (with a 1-dim
+placeholder embedding), and dense search runs here instead: the float32
+query is scored against the codes a block at a time, the top
+k x RAG_RESCORE_CANDIDATES candidates are kept, and those are rescored
+against their exact float32 vectors (from the embedding cache) before the
+top k are returned. Distances are squared L2, like Chroma's default space,
+so similarity scores are comparable across storage modes.
+
+Rescoring needs those exact vectors, so a compact workspace relies on the
+embedding cache (embedding_cache.db) keeping a float32 copy of each of its
+vectors; pruned ones fall back to the dequantized codes. Compact storage
+therefore shrinks what dense search scans, not the total on disk: the codes
+replace Chroma's float32 vectors and HNSW graph, but the cached float32
+copies stay. stats() reports the codes as 'bytes' and, given how many
+exact copies are kept, those as 'rescore_bytes'.
+
+The storage mode is fixed when a workspace's collection is created and is
+recorded in the collection metadata ('embedding_storage'); existing
+workspaces stay float32.
+
+The .npz file and the collection must hold the same chunk IDs. On startup
+the RAG system drops vectors whose chunk is no longer in the collection
+(retain()), so dense search never returns IDs without a document behind
+them.
+
+Configuration (env):
+    RAG_EMBEDDING_STORAGE   'float32' (default), 'float16' or 'int8' for new workspaces
+    RAG_RESCORE_CANDIDATES  coarse candidates per requested result (default 4)
+
+Usage:
+    store = QuantizedVectorStore('./web_rag_data/vectors/documents.npz', 'int8')
+    store.upsert(ids, vectors)        # float32 (n, dim) array
+    store.flush()
+    ids, distances = store.search(query_vector, 20)
+    ranked = rescore(query_vector, ids, distances, exact_vectors)
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORAGE_MODES = ('float32', 'float16', 'int8')
+DEFAULT_STORAGE = os.getenv('RAG_EMBEDDING_STORAGE', 'float32').lower()
+RESCORE_CANDIDATES = max(1, int(os.getenv('RAG_RESCORE_CANDIDATES', '4')))
+
+# Rows converted to float32 at once while scoring (bounds scratch memory)
+_SCORE_BLOCK = 16384
+
+
+def storage_mode(mode: Optional[str]) -> str:
+    """Validated storage mode ('float32' when unset)."""
+    mode = (mode or 'float32').lower()
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown embedding storage mode '{mode}' (expected one of {', '.join(STORAGE_MODES)})")
+    return mode
+
+
+def quantize(vectors: np.ndarray, mode: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode float vectors for storage.
+
+    Returns (codes, scales): codes are float16 or int8 rows, scales the
+    per-row multipliers that restore them (all ones for float16).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    if mode == 'float16':
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    if mode == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Cannot quantize to '{mode}'")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Float32 vectors back from quantize() output."""
+    return codes.astype(np.float32) * scales[:, None]
+
+
+def squared_l2(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Squared L2 distance from one query to each row of a float32 matrix."""
+    diff = vectors - query
+    return np.einsum('ij,ij->i', diff, diff)
+
+
+def rescore(query: np.ndarray, ids: Sequence[str], distances: Sequence[float],
+            exact: Dict[str, np.ndarray]) -> List[Tuple[str, float]]:
+    """
+    Re-rank coarse candidates by their exact distance to the query.
+
+    Candidates without an exact vector keep their coarse distance. Returns
+    (id, distance) pairs, nearest first.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    scored = list(zip(ids, (float(d) for d in distances)))
+    exact_ids = [chunk_id for chunk_id in ids if chunk_id in exact]
+    if exact_ids:
+        exact_distances = squared_l2(query, np.stack([exact[chunk_id] for chunk_id in exact_ids]))
+        refined = dict(zip(exact_ids, exact_distances.tolist()))
+        scored = [(chunk_id, refined.get(chunk_id, distance)) for chunk_id, distance in scored]
+    scored.sort(key=lambda item: item[1])
+    return scored
+
+
+class QuantizedVectorStore:
+    """
+    One workspace's embeddings as a quantized matrix, persisted to a .npz file.
+
+    Rows live in a contiguous array grown by doubling; deleting a row moves
+    the last row into its slot. Writes mark the store dirty and flush()
+    persists it (atomically, via a temporary file).
+    """
+
+    def __init__(self, path, mode: str):
+        self.path = Path(path)
+        self.mode = storage_mode(mode)
+        if self.mode == 'float32':
+            raise ValueError("float32 workspaces keep their vectors in Chroma")
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._codes: Optional[np.ndarray] = None
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._dirty = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with np.load(self.path, allow_pickle=False) as data:
+            stored_mode = str(data['mode'])
+            if stored_mode != self.mode:
+                raise ValueError(f"{self.path} holds {stored_mode} vectors, not {self.mode}")
+            self._codes = data['codes']
+            self._scales = data['scales']
+            packed = data['ids'].tobytes().decode('utf-8')
+            self._ids = packed.split('\n') if packed else []
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        logger.info(f"Loaded {len(self._ids)} {self.mode} vectors from {self.path}")
+
+    def flush(self) -> None:
+        """Write the store to disk if it changed since the last flush."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            size = len(self._ids)
+            codes = self._codes[:size] if self._codes is not None else np.zeros((0, 0), dtype=self._dtype)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'wb') as f:
+                # IDs as one newline-joined UTF-8 buffer (a fixed-width str
+                # array would cost 4 bytes per character of the longest ID)
+                packed = np.frombuffer('\n'.join(self._ids).encode('utf-8'), dtype=np.uint8)
+                np.savez(f, mode=np.array(self.mode), ids=packed, codes=codes, scales=self._scales[:size])
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @property
+    def _dtype(self):
+        return np.float16 if self.mode == 'float16' else np.int8
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        if self._codes is None or not self._ids and self._codes.shape[1] != dim:
+            capacity = max(rows, 1024)
+            self._codes = np.zeros((capacity, dim), dtype=self._dtype)
+            self._scales = np.zeros(capacity, dtype=np.float32)
+            return
+        if self._codes.shape[1] != dim:
+            raise ValueError(f"Vectors have {dim} dimensions, store has {self._codes.shape[1]}")
+        capacity = self._codes.shape[0]
+        if rows <= capacity:
+            return
+        capacity = max(rows, capacity * 2)
+        codes = np.zeros((capacity, dim), dtype=self._dtype)
+        codes[:len(self._ids)] = self._codes[:len(self._ids)]
+        scales = np.zeros(capacity, dtype=np.float32)
+        scales[:len(self._ids)] = self._scales[:len(self._ids)]
+        self._codes, self._scales = codes, scales
+
+    def upsert(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Add or replace the vectors of the given chunk IDs."""
+        if len(ids) == 0:
+            return
+        codes, scales = quantize(vectors, self.mode)
+        with self._lock:
+            new = [chunk_id for chunk_id in dict.fromkeys(ids) if chunk_id not in self._rows]
+            self._reserve(len(self._ids) + len(new), codes.shape[1])
+            for chunk_id in new:
+                self._rows[chunk_id] = len(self._ids)
+                self._ids.append(chunk_id)
+            rows = np.fromiter((self._rows[chunk_id] for chunk_id in ids), dtype=np.int64, count=len(ids))
+            self._codes[rows] = codes
+            self._scales[rows] = scales
+            self._dirty = True
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Remove chunk IDs; returns how many were stored."""
+        removed = 0
+        with self._lock:
+            for chunk_id in ids:
+                row = self._rows.pop(chunk_id, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                if row != last:
+                    moved = self._ids[last]
+                    self._ids[row] = moved
+                    self._rows[moved] = row
+                    self._codes[row] = self._codes[last]
+                    self._scales[row] = self._scales[last]
+                self._ids.pop()
+                removed += 1
+            if removed:
+                self._dirty = True
+        return removed
+
+    def retain(self, ids: Iterable[str]) -> int:
+        """Keep only the given chunk IDs; returns how many vectors were dropped."""
+        keep = set(ids)
+        with self._lock:
+            stale = [chunk_id for chunk_id in self._ids if chunk_id not in keep]
+        return self.delete(stale)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def ids(self) -> List[str]:
+        """Stored chunk IDs (in row order)."""
+        with self._lock:
+            return self._ids[:]
+
+    def get(self, ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Dequantized float32 vectors of the stored chunk IDs among `ids`."""
+        with self._lock:
+            found = [chunk_id for chunk_id in ids if chunk_id in self._rows]
+            if not found:
+                return {}
+            rows = np.fromiter((self._rows[chunk_id] for chunk_id in found), dtype=np.int64, count=len(found))
+            vectors = dequantize(self._codes[rows], self._scales[rows])
+        return dict(zip(found, vectors))
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[List[str], np.ndarray]:
+        """
+        Coarse nearest neighbours: the k rows with the smallest squared L2
+        distance to the float32 query. Returns (ids, distances), nearest first.
+        """
+        query = np.asarray(query, dtype=np.float32).ravel()
+        with self._lock:
+            size = len(self._ids)
+            if size == 0 or k <= 0:
+                return [], np.zeros(0, dtype=np.float32)
+            distances = np.empty(size, dtype=np.float32)
+            query_norm = float(query @ query)
+            for start in range(0, size, _SCORE_BLOCK):
+                end = min(start + _SCORE_BLOCK, size)
+                block = self._codes[start:end].astype(np.float32)
+                scales = self._scales[start:end]
+                # |v - q|^2 with v = scale * code, without materializing v - q
+                norms = np.einsum('ij,ij->i', block, block) * scales * scales
+                distances[start:end] = norms - 2.0 * scales * (block @ query) + query_norm
+            ids = self._ids[:]
+        k = min(k, size)
+        top = np.argpartition(distances, k - 1)[:k] if k < size else np.arange(size)
+        top = top[np.argsort(distances[top], kind='stable')]
+        return [ids[row] for row in top], distances[top]
+
+    def stats(self, rescore_vectors: int = 0) -> Dict[str, object]:
+        """
+        Row count, dimensions and bytes.
+
+        Args:
+            rescore_vectors: Exact float32 vectors kept elsewhere for rescoring
+                (the embedding cache), counted in rescore_bytes and total_bytes
+        """
+        with self._lock:
+            size = len(self._ids)
+            dim = self._codes.shape[1] if self._codes is not None else 0
+            code_bytes = int(size * dim * np.dtype(self._dtype).itemsize + size * 4)
+            rescore_bytes = int(rescore_vectors * dim * 4)
+            return {
+                'mode': self.mode,
+                'vectors': size,
+                'dimensions': dim,
+                'bytes': code_bytes,
+                'rescore_bytes': rescore_bytes,
+                'total_bytes': code_bytes + rescore_bytes,
+                'float32_bytes': int(size * dim * 4)
+            }
@@ -0,0 +1,116 @@
+"""
+In-memory caches for RAG query traffic.
+
+The UI and agents repeat the same questions (multi-turn chats re-send a
+prompt, dashboards poll /api/rag/search), and every repeat used to re-encode
+the query and re-query Chroma. Two LRU caches short-circuit that:
+
+  - query embeddings keyed by (model, normalized query)
+  - search results keyed by (workspace, sha256(query), n_results, mode,
+    workspace version)
+
+Workspace versions are bumped on every write or delete in a workspace, so a
+cached result can never outlive the data it was computed from: entries for
+an older version simply stop being looked up and age out of the LRU.
+
+Configuration (env):
+    RAG_QUERY_EMBED_CACHE_SIZE  cached query embeddings (default 1024, 0 disables)
+    RAG_RESULT_CACHE_SIZE       cached search results (default 512, 0 disables)
+
+Usage:
+    versions = WorkspaceVersions()
+    results = LRUCache(512)
+    key = result_key(workspace, query, n_results, mode, versions.get(workspace))
+    cached = results.get(key)
+    ...
+    versions.bump(workspace)  # after any add/delete
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+DEFAULT_EMBED_CACHE_SIZE = int(os.getenv('RAG_QUERY_EMBED_CACHE_SIZE', '1024'))
+DEFAULT_RESULT_CACHE_SIZE = int(os.getenv('RAG_RESULT_CACHE_SIZE', '512'))
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different spellings share cache entries."""
+    return ' '.join(query.split())
+
+
+def result_key(workspace: str, query: str, n_results: int, mode: str, version: int) -> Tuple:
+    """Result-cache key for one search against one version of a workspace."""
+    digest = hashlib.sha256(normalize_query(query).encode('utf-8')).hexdigest()
+    return (workspace, digest, n_results, mode, version)
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with hit/miss counters."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, max_entries)
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+            }
+
+
+class WorkspaceVersions:
+    """Monotonic per-workspace data versions; bump on every add or delete."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, workspace: str) -> int:
+        with self._lock:
+            return self._versions.get(workspace, 0)
+
+    def bump(self, workspace: str) -> int:
+        with self._lock:
+            version = self._versions.get(workspace, 0) + 1
+            self._versions[workspace] = version
+            return version
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
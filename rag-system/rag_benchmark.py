@@ -0,0 +1,431 @@
+"""
+Offline RAG benchmark: ingest throughput, query latency and recall@k.
+
+Runs the retrieval path of MojoChromaRAG without Chroma, Ollama or a
+downloaded model, so a change to chunking (DocumentProcessor._chunk_text,
+chunk size/overlap), the embedder or retrieval settings can be measured
+on any machine and compared between commits:
+
+  - corpus: a seeded synthetic RFP-style corpus, or a JSON file with
+    documents and labeled question/answer pairs
+  - ingest: DocumentProcessor chunking -> EmbeddingPipeline -> dense
+    vectors (float32 matrix, or a QuantizedVectorStore) + LexicalIndex
+  - query: dense search (exact, or quantized with rescoring) and BM25,
+    fused by reciprocal rank exactly like search_similar
+  - metrics: chunks/s, p50/p95 query latency, peak RSS and vector bytes
+    (quantized codes plus the exact float32 vectors kept for rescoring),
+    recall@k and MRR
+
+A chunk is relevant to a question when it contains the question's answer
+string, so labels stay valid whatever the chunk size. The default embedder
+is a deterministic feature-hashing stub (no model download); pass --model
+to benchmark a sentence-transformers model instead.
+
+Corpus file format:
+    {"documents": [{"id": "rfp-1", "text": "..."}],
+     "questions": [{"question": "...", "answer": "CLIN 0042"}]}
+
+Usage:
+    uv run python rag_benchmark.py --output bench.json
+    uv run python rag_benchmark.py --chunk-size 800 --chunk-overlap 80 --mode vector
+    uv run python rag_benchmark.py --corpus corpus.json --storage int8 --output int8.json
+    uv run python rag_benchmark.py --compare baseline.json bench.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from document_processor import DocumentProcessor
+from embedding_pipeline import EmbeddingCache, EmbeddingPipeline
+from hybrid_search import CANDIDATE_MULTIPLIER, DEFAULT_RRF_K, DEFAULT_WEIGHTS, LexicalIndex, reciprocal_rank_fusion
+from quantized_vectors import RESCORE_CANDIDATES, QuantizedVectorStore, rescore, squared_l2, storage_mode
+
+WORKSPACE = 'benchmark'
+K_VALUES = (1, 5, 10)
+
+_TOKENS = re.compile(r'\w+')
+
+
+# ---------------------------------------------------------------------------
+# Stub embedder
+# ---------------------------------------------------------------------------
+
+class StubEmbedder:
+    """
+    Deterministic bag-of-words embedder (feature hashing, no model download).
+
+    Each lowercased token and adjacent-token pair is hashed to a signed
+    bucket; counts are log-scaled and the vector L2-normalized, so texts
+    sharing words are close. Speed is not representative of a real model,
+    but the same text always gets the same vector on every machine.
+    """
+
+    name = 'stub-hashing'
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self._buckets: Dict[str, tuple] = {}
+
+    def _bucket(self, feature: str) -> tuple:
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            bucket = (value % self.dim, 1.0 if value >> 63 else -1.0)
+            self._buckets[feature] = bucket
+        return bucket
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKENS.findall(text.lower())
+            features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                index, sign = self._bucket(feature)
+                vectors[row, index] += sign
+        np.copysign(np.log1p(np.abs(vectors)), vectors, out=vectors)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def load_embedder(model: Optional[str]):
+    """(name, encode function) for --model; the stub when no model is given."""
+    if not model:
+        stub = StubEmbedder()
+        return stub.name, stub.encode
+    from sentence_transformers import SentenceTransformer
+    transformer = SentenceTransformer(model)
+    return model, lambda texts: transformer.encode(list(texts), batch_size=len(texts), convert_to_numpy=True)
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+_VERBS = ['maintain', 'migrate', 'secure', 'monitor', 'modernize', 'document', 'integrate', 'test',
+          'operate', 'decommission', 'audit', 'train staff on', 'configure', 'back up', 'patch',
+          'design', 'deploy', 'support', 'inventory', 'certify']
+_SYSTEMS = ['payroll database', 'email gateway', 'case management portal', 'GIS server', 'help desk',
+            'identity provider', 'data warehouse', 'records archive', 'network core', 'mobile app',
+            'grants system', 'budget dashboard', 'video conferencing', 'badge readers', 'web portal',
+            'document scanners', 'fleet tracker', 'call center', 'HR system', 'procurement system',
+            'backup appliances', 'firewall cluster', 'SharePoint farm', 'ERP platform', 'print servers']
+_AGENCIES = ['the Navy', 'the Army', 'DHS', 'the VA', 'NASA', 'the FAA', 'the EPA', 'USDA', 'HHS',
+             'the Census Bureau', 'NOAA', 'the IRS', 'GSA', 'the Coast Guard', 'DOE']
+_FILLER = ['The Government will furnish workspace and badges.', 'Deliverables are due monthly.',
+           'Key personnel must hold an active clearance.', 'Travel is reimbursed at cost.',
+           'The period of performance is one base year and four option years.',
+           'All reports shall be submitted electronically.', 'Section 508 compliance is required.',
+           'The contractor shall attend weekly status meetings.', 'Invoices are submitted via IPP.',
+           'Quality control follows the approved QCP.', 'Transition-in shall complete within 60 days.',
+           'Work is performed on site and remotely.']
+
+
+def synthetic_corpus(documents: int = 40, facts_per_document: int = 12, seed: int = 0) -> Dict[str, Any]:
+    """
+    Seeded RFP-style corpus with one labeled question per fact.
+
+    Every fact names a task, a system, an agency and a unique CLIN; its
+    question asks for the CLIN using the other three, so answering needs
+    the right passage rather than any passage with similar words. Filler
+    sentences shared across documents pad each fact.
+    """
+    rng = random.Random(seed)
+    combos = [(v, s, a) for v in _VERBS for s in _SYSTEMS for a in _AGENCIES]
+    rng.shuffle(combos)
+    total = documents * facts_per_document
+    if total > len(combos):
+        raise ValueError(f'At most {len(combos)} facts can be generated')
+    clins = rng.sample(range(1000, 10000), total)
+
+    docs, questions = [], []
+    for d in range(documents):
+        sentences = []
+        for f in range(facts_per_document):
+            fact = d * facts_per_document + f
+            verb, system, agency = combos[fact]
+            clin = f'CLIN {clins[fact]}'
+            sentences.append(f'Under {clin} the contractor shall {verb} the {system} for {agency}.')
+            sentences.extend(rng.sample(_FILLER, 3))
+            questions.append({'question': f'Which CLIN covers work to {verb} the {system} for {agency}?',
+                              'answer': clin})
+        docs.append({'id': f'rfp-{d:04d}', 'text': ' '.join(sentences)})
+    return {'documents': docs, 'questions': questions, 'source': f'synthetic(seed={seed})'}
+
+
+def load_corpus(path) -> Dict[str, Any]:
+    """Corpus from a JSON file with 'documents' and 'questions'."""
+    with open(path, encoding='utf-8') as f:
+        corpus = json.load(f)
+    for key in ('documents', 'questions'):
+        if not isinstance(corpus.get(key), list):
+            raise ValueError(f"{path}: '{key}' must be a list")
+    corpus.setdefault('source', str(path))
+    return corpus
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 3) if len(values) else 0.0
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(corpus: Dict[str, Any], chunk_size: int = 1000, chunk_overlap: int = 100,
+                  model: Optional[str] = None, encode: Optional[Callable] = None,
+                  mode: str = 'hybrid', storage: str = 'float32', n_results: int = max(K_VALUES),
+                  candidates: int = CANDIDATE_MULTIPLIER, rescore_candidates: int = RESCORE_CANDIDATES,
+                  work_dir=None) -> Dict[str, Any]:
+    """
+    Ingest `corpus`, answer its questions and return the results dict.
+
+    Args:
+        corpus: {'documents': [{'id', 'text'}], 'questions': [{'question', 'answer'}]}
+        chunk_size, chunk_overlap: DocumentProcessor chunking settings
+        model: sentence-transformers model name (default: the stub embedder)
+        encode: Explicit encode function (overrides `model`)
+        mode: 'hybrid' (BM25 + vector, RRF) or 'vector'
+        storage: 'float32', 'float16' or 'int8' dense vectors
+        n_results: Results kept per query (recall is reported up to this k)
+        candidates: Per-retriever candidates = n_results x this, in hybrid mode
+        rescore_candidates: Quantized coarse candidates per dense candidate
+        work_dir: Directory for the embedding cache and indexes (default: a temp dir)
+    """
+    mode = mode.lower()
+    if mode not in ('hybrid', 'vector'):
+        raise ValueError(f"Unknown retrieval mode '{mode}'")
+    storage = storage_mode(storage)
+    if encode is not None:
+        model_name = model or getattr(encode, '__name__', 'custom')
+    else:
+        model_name, encode = load_embedder(model)
+
+    temp = None
+    if work_dir is None:
+        temp = tempfile.TemporaryDirectory(prefix='rag-bench-')
+        work_dir = temp.name
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    # Chunking never touches the Docling conversion service
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap, conversion=object())
+    cache = EmbeddingCache(work_dir / 'embedding_cache.db')
+    pipeline = EmbeddingPipeline(encode, model_name, cache)
+    lexical = LexicalIndex(work_dir / 'lexical_index.db')
+    store = QuantizedVectorStore(work_dir / 'vectors.npz', storage) if storage != 'float32' else None
+    try:
+        # -- Ingest ---------------------------------------------------------
+        started = time.perf_counter()
+        ids: List[str] = []
+        texts: List[str] = []
+        for doc in corpus['documents']:
+            for index, chunk in enumerate(processor._chunk_text(doc['text'])):
+                ids.append(f"{doc['id']}::{index}")
+                texts.append(chunk)
+        chunk_seconds = time.perf_counter() - started
+
+        # Exact vectors are kept for rescoring, as the embedding cache does
+        exact = np.zeros((len(texts), 0), dtype=np.float32)
+
+        def write_window(start: int, vectors: np.ndarray) -> None:
+            nonlocal exact
+            if exact.shape[1] != vectors.shape[1]:
+                exact = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            exact[start:start + len(vectors)] = vectors
+            if store is not None:
+                store.upsert(ids[start:start + len(vectors)], vectors)
+            lexical.upsert(WORKSPACE, ids[start:start + len(vectors)], texts[start:start + len(vectors)])
+
+        report = pipeline.run(texts, write_fn=write_window)
+        ingest_seconds = time.perf_counter() - started
+        row_of = {chunk_id: row for row, chunk_id in enumerate(ids)}
+
+        # -- Query ----------------------------------------------------------
+        per_retriever = max(n_results * candidates, n_results) if mode == 'hybrid' else n_results
+        per_retriever = min(per_retriever, len(ids))
+        latencies: List[float] = []
+        hits = {k: 0 for k in K_VALUES if k <= n_results}
+        reciprocal_ranks = 0.0
+        for item in corpus['questions']:
+            answer = item['answer']
+            relevant = {chunk_id for chunk_id, text in zip(ids, texts) if answer in text}
+
+            started = time.perf_counter()
+            query = np.asarray(encode([item['question']]), dtype=np.float32)[0]
+            if store is not None:
+                coarse_ids, coarse = store.search(query, per_retriever * rescore_candidates)
+                ranked = rescore(query, coarse_ids, coarse,
+                                 {chunk_id: exact[row_of[chunk_id]] for chunk_id in coarse_ids})
+                dense = [chunk_id for chunk_id, _ in ranked[:per_retriever]]
+            elif len(ids):
+                distances = squared_l2(query, exact)
+                top = np.argpartition(distances, per_retriever - 1)[:per_retriever]
+                dense = [ids[row] for row in top[np.argsort(distances[top], kind='stable')]]
+            else:
+                dense = []
+            if mode == 'hybrid':
+                lexical_ids = [chunk_id for chunk_id, _ in lexical.search(WORKSPACE, item['question'], per_retriever)]
+                fused = reciprocal_rank_fusion({'vector': dense, 'lexical': lexical_ids},
+                                               DEFAULT_WEIGHTS, DEFAULT_RRF_K)
+                results = [chunk_id for chunk_id, _, _ in fused[:n_results]]
+            else:
+                results = dense[:n_results]
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            first = next((rank for rank, chunk_id in enumerate(results, start=1) if chunk_id in relevant), None)
+            if first is not None:
+                reciprocal_ranks += 1.0 / first
+                for k in hits:
+                    if first <= k:
+                        hits[k] += 1
+
+        questions = len(corpus['questions'])
+        # Compact storage still keeps the exact vectors for rescoring
+        vector_bytes = (store.stats(rescore_vectors=len(ids))['total_bytes'] if store is not None
+                        else int(exact.nbytes))
+        return {
+            'benchmark': 'rag',
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'config': {
+                'model': model_name, 'chunk_size': chunk_size, 'chunk_overlap': chunk_overlap,
+                'mode': mode, 'storage': storage, 'n_results': n_results,
+                'candidates': candidates, 'rescore_candidates': rescore_candidates,
+                'embed_batch_size': pipeline.batch_size, 'embed_workers': pipeline.workers
+            },
+            'corpus': {
+                'source': corpus.get('source'),
+                'documents': len(corpus['documents']),
+                'characters': sum(len(doc['text']) for doc in corpus['documents']),
+                'questions': questions
+            },
+            'ingest': {
+                'chunks': len(texts),
+                'seconds': round(ingest_seconds, 3),
+                'chunk_seconds': round(chunk_seconds, 3),
+                'chunks_per_second': round(len(texts) / ingest_seconds, 1) if ingest_seconds else 0.0,
+                'embedding': report.to_dict()
+            },
+            'query': {
+                'count': questions,
+                'p50_ms': _percentile(latencies, 50),
+                'p95_ms': _percentile(latencies, 95),
+                'mean_ms': round(float(np.mean(latencies)), 3) if latencies else 0.0
+            },
+            'recall': {f'@{k}': round(count / questions, 4) if questions else 0.0 for k, count in hits.items()},
+            'mrr': round(reciprocal_ranks / questions, 4) if questions else 0.0,
+            'memory': {'peak_rss_mb': _peak_rss_mb(), 'vector_bytes': vector_bytes}
+        }
+    finally:
+        pipeline.shutdown()
+        cache.close()
+        lexical.close()
+        if temp is not None:
+            temp.cleanup()
+
+
+# ---------------------------------------------------------------------------
+# Regression comparison
+# ---------------------------------------------------------------------------
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            recall_tolerance: float = 0.01, latency_tolerance: float = 0.25) -> Dict[str, Any]:
+    """
+    Metric deltas between two result files, and which of them regressed.
+
+    Recall and MRR regress when they drop by more than `recall_tolerance`
+    (absolute); latency and throughput when they get worse by more than
+    `latency_tolerance` (relative).
+    """
+    metrics = {f'recall{k}': (baseline['recall'].get(k), current['recall'].get(k), 'higher')
+               for k in current['recall']}
+    metrics['mrr'] = (baseline.get('mrr'), current.get('mrr'), 'higher')
+    metrics['chunks_per_second'] = (baseline['ingest']['chunks_per_second'],
+                                    current['ingest']['chunks_per_second'], 'higher_relative')
+    for name in ('p50_ms', 'p95_ms'):
+        metrics[name] = (baseline['query'][name], current['query'][name], 'lower_relative')
+
+    deltas, regressions = {}, []
+    for name, (before, after, better) in metrics.items():
+        if before is None or after is None:
+            continue
+        deltas[name] = {'baseline': before, 'current': after, 'delta': round(after - before, 4)}
+        if better == 'higher':
+            regressed = after < before - recall_tolerance
+        elif better == 'higher_relative':
+            regressed = after < before * (1 - latency_tolerance)
+        else:
+            regressed = after > before * (1 + latency_tolerance)
+        if regressed:
+            regressions.append(name)
+    return {'deltas': deltas, 'regressions': regressions,
+            'configs_match': baseline.get('config') == current.get('config')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--corpus', help='JSON corpus file (default: synthetic corpus)')
+    parser.add_argument('--documents', type=int, default=40, help='synthetic corpus documents')
+    parser.add_argument('--facts', type=int, default=12, help='synthetic facts (questions) per document')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--chunk-overlap', type=int, default=100)
+    parser.add_argument('--model', help='sentence-transformers model (default: deterministic stub)')
+    parser.add_argument('--mode', choices=['hybrid', 'vector'], default='hybrid')
+    parser.add_argument('--storage', choices=['float32', 'float16', 'int8'], default='float32')
+    parser.add_argument('--n-results', type=int, default=max(K_VALUES))
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='compare two result files; exit 1 on regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        comparison = compare(baseline, current)
+        print(json.dumps(comparison, indent=2))
+        sys.exit(1 if comparison['regressions'] else 0)
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.documents, args.facts, args.seed)
+    results = run_benchmark(corpus, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap,
+                            model=args.model, mode=args.mode, storage=args.storage, n_results=args.n_results)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
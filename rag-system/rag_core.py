@@ -7,13 +7,18 @@ the OPTIMAL_RAG_IMPLEMENTATION_PLAN.md architecture.
 
 import os
 import json
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional
 from pathlib import Path
 from datetime import datetime
 
 import chromadb
 from chromadb.config import Settings
+import numpy as np
 import ollama
 import redis
 from sentence_transformers import SentenceTransformer
@@ -22,12 +27,43 @@ from sentence_transformers import SentenceTransformer
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
+from ollama_client import PRIORITY_INTERACTIVE
 from ollama_config import ollama_config
 
+from document_catalog import DocumentCatalog, chunk_hash, chunk_ids_for, existing_chunk_ids, plan_document_sync
+from embedding_pipeline import EmbeddingCache, EmbeddingPipeline, content_hash
+from hybrid_search import (
+    CANDIDATE_MULTIPLIER, DEFAULT_MODE, DEFAULT_RRF_K, DEFAULT_WEIGHTS,
+    LexicalIndex, RetrievalTrace, reciprocal_rank_fusion
+)
+from query_cache import (
+    DEFAULT_EMBED_CACHE_SIZE, DEFAULT_RESULT_CACHE_SIZE,
+    LRUCache, WorkspaceVersions, normalize_query, result_key
+)
+from quantized_vectors import (
+    DEFAULT_STORAGE, RESCORE_CANDIDATES, QuantizedVectorStore, rescore, storage_mode
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Chunks fetched per collection.get(ids=...) call
+_GET_WINDOW = 5000
+
+
+def _combine_ingest_reports(reports: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Sum the embedding reports of several add_documents calls into one."""
+    if not reports:
+        return None
+    combined = {key: sum(report[key] for report in reports)
+                for key in ('chunks', 'cache_hits', 'embedded', 'duplicates', 'batches',
+                            'embed_seconds', 'write_seconds', 'elapsed_seconds')}
+    elapsed = combined['elapsed_seconds']
+    combined['chunks_per_second'] = round(combined['chunks'] / elapsed, 1) if elapsed else 0.0
+    combined['cache_hit_rate'] = round(combined['cache_hits'] / combined['chunks'], 4) if combined['chunks'] else 0.0
+    return combined
+
 
 class MojoChromaRAG:
     """
@@ -45,19 +81,54 @@ class MojoChromaRAG:
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(exist_ok=True)
         
-        # Initialize ChromaDB with DuckDB backend for better performance
-        self.client = chromadb.Client(Settings(
-            persist_directory=str(self.persist_directory),
-            anonymized_telemetry=False,  # Privacy-first
-            allow_reset=True
-        ))
+        # Persistent ChromaDB: the catalog, lexical index and quantized vectors
+        # saved next to it describe these collections and must survive restarts too
+        self.client = chromadb.PersistentClient(
+            path=str(self.persist_directory),
+            settings=Settings(
+                anonymized_telemetry=False,  # Privacy-first
+                allow_reset=True
+            )
+        )
         
+        # Workspaces created in a compact storage mode (RAG_EMBEDDING_STORAGE)
+        # keep float16/int8 vectors here instead of float32 in Chroma
+        self.embedding_storage = storage_mode(DEFAULT_STORAGE)
+        self._vector_stores: Dict[str, QuantizedVectorStore] = {}
+        self._vector_stores_lock = threading.Lock()
+
         # Initialize collections
         self.collection = self._get_or_create_collection("documents")
         
         # Initialize embedding model (local, no API costs)
         logger.info("Loading local embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model_name = 'all-MiniLM-L6-v2'
+        self.embedding_model = SentenceTransformer(self.embedding_model_name)
+
+        # Ingestion embeds through a batched worker pool backed by a
+        # persistent (model, sha256(chunk)) cache, so re-uploading a file
+        # only embeds the chunks that changed
+        self.embedding_cache = EmbeddingCache(self.persist_directory / "embedding_cache.db")
+        self.embedding_pipeline = EmbeddingPipeline(
+            self._encode_batch, self.embedding_model_name, self.embedding_cache
+        )
+
+        # Document versions and chunk IDs per workspace (incremental re-ingestion)
+        self.catalog = DocumentCatalog(self.persist_directory / "catalog.db")
+
+        # BM25 index over the same chunk IDs; queried alongside Chroma and
+        # fused by reciprocal rank (see hybrid_search)
+        self.lexical_index = LexicalIndex(self.persist_directory / "lexical_index.db")
+        self._retrieval_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='rag-retrieval')
+
+        # Drop saved state that describes chunks the collections no longer hold
+        self._reconcile_stores()
+
+        # Repeated queries skip embedding and retrieval; cached results are
+        # keyed on a workspace version bumped by every add or delete
+        self.workspace_versions = WorkspaceVersions()
+        self.query_embedding_cache = LRUCache(DEFAULT_EMBED_CACHE_SIZE)
+        self.result_cache = LRUCache(DEFAULT_RESULT_CACHE_SIZE)
         
         # Initialize Ollama client (local LLM, zero API costs)
         # Keep backward compatibility with existing ollama.Client() for internal methods
@@ -148,11 +219,44 @@ class MojoChromaRAG:
                 name=collection_name,
                 metadata={
                     "description": f"Agent-native RAG document collection for workspace: {workspace}",
-                    "workspace": workspace
+                    "workspace": workspace,
+                    "embedding_storage": self.embedding_storage
                 }
             )
+
+    def _vector_path(self, collection_name: str) -> Path:
+        return self.persist_directory / "vectors" / f"{collection_name}.npz"
+
+    def _vector_store(self, collection) -> Optional[QuantizedVectorStore]:
+        """Quantized vector store of a compact workspace (None for float32 workspaces)."""
+        mode = (collection.metadata or {}).get('embedding_storage', 'float32')
+        if mode == 'float32':
+            return None
+        with self._vector_stores_lock:
+            store = self._vector_stores.get(collection.name)
+            if store is None:
+                store = QuantizedVectorStore(self._vector_path(collection.name), mode)
+                self._vector_stores[collection.name] = store
+            return store
+
+    def get_vector_storage_stats(self, workspace: str = 'default') -> Dict[str, Any]:
+        """
+        Storage mode and vector bytes of a workspace.
+
+        For a compact workspace, rescore_bytes counts the float32 copies the
+        embedding cache keeps for rescoring (one per vector, as ingestion
+        caches every vector; fewer once the cache has been pruned).
+        """
+        collection = self._get_or_create_collection("documents", workspace)
+        store = self._vector_store(collection)
+        if store is not None:
+            return store.stats(rescore_vectors=len(store))
+        count = collection.count()
+        dimensions = self.embedding_model.get_sentence_embedding_dimension()
+        return {'mode': 'float32', 'vectors': count, 'dimensions': dimensions,
+                'bytes': count * dimensions * 4, 'float32_bytes': count * dimensions * 4}
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for texts using local model.
         
@@ -160,10 +264,31 @@ class MojoChromaRAG:
             texts: List of text strings to embed
             
         Returns:
-            List of embedding vectors
+            float32 array of embedding vectors, one row per text
         """
-        embeddings = self.embedding_model.encode(texts)
-        return embeddings.tolist()
+        return self.embedding_model.encode(texts, convert_to_numpy=True).astype(np.float32, copy=False)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embedding of a search query, served from the query-embedding LRU when seen before."""
+        key = (self.embedding_model_name, normalize_query(query))
+        embedding = self.query_embedding_cache.get(key)
+        if embedding is None:
+            embedding = self.embed_texts([key[1]])[0]
+            embedding.setflags(write=False)  # shared by every hit
+            self.query_embedding_cache.put(key, embedding)
+        return embedding
+
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the query-embedding and search-result caches."""
+        return {
+            "query_embeddings": self.query_embedding_cache.get_stats(),
+            "results": self.result_cache.get_stats(),
+            "workspace_versions": self.workspace_versions.snapshot()
+        }
+
+    def _encode_batch(self, texts: List[str]):
+        """Encode one pipeline batch as a float32 array (called from the embed workers)."""
+        return self.embedding_model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
     
     def add_documents(self, documents: List[Dict[str, Any]], workspace: str = 'default') -> Dict[str, Any]:
         """
@@ -186,19 +311,34 @@ class MojoChromaRAG:
             metadatas.append(doc.get('metadata', {}))
             ids.append(doc_id)
         
-        # Generate embeddings locally (zero cost)
-        embeddings = self.embed_texts(texts)
-        
         # Get workspace-specific collection
         collection = self._get_or_create_collection("documents", workspace)
-        
-        # Add to ChromaDB
-        collection.add(
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids
-        )
+        store = self._vector_store(collection)
+
+        # Embed locally (zero cost) in parallel batches; unchanged chunks come
+        # from the cache. Each window is written as soon as it is ready and
+        # embedding never runs more than a few batches ahead of ChromaDB.
+        # Compact workspaces quantize the vectors into their own store and
+        # give Chroma a 1-dim placeholder.
+        def write_window(start: int, vectors: np.ndarray) -> None:
+            end = start + len(vectors)
+            if store is not None:
+                store.upsert(ids[start:end], vectors)
+                vectors = np.zeros((len(vectors), 1), dtype=np.float32)
+            collection.upsert(
+                embeddings=vectors,
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end]
+            )
+            self.lexical_index.upsert(workspace, ids[start:end], texts[start:end])
+            self.workspace_versions.bump(workspace)
+
+        try:
+            report = self.embedding_pipeline.run(texts, write_fn=write_window)
+        finally:
+            if store is not None:
+                store.flush()
         
         # Emit event for agent orchestration
         if self.redis_client:
@@ -211,67 +351,546 @@ class MojoChromaRAG:
             "status": "success",
             "documents_added": len(documents),
             "total_documents": collection.count(),
-            "workspace": workspace
+            "workspace": workspace,
+            "ingest_report": report.to_dict()
         }
     
-    def search_similar(self, query: str, n_results: int = 5, workspace: str = 'default') -> Dict[str, Any]:
+    def _delete_chunks(self, collection, workspace: str, ids: List[str]) -> None:
+        """Delete chunks from the vector collection and the lexical index."""
+        collection.delete(ids=ids)
+        store = self._vector_store(collection)
+        if store is not None:
+            store.delete(ids)
+            store.flush()
+        self.lexical_index.delete(workspace, ids)
+        self.workspace_versions.bump(workspace)
+
+    def _reconcile_stores(self) -> None:
+        """
+        Bring the quantized vectors, document catalog and lexical index back
+        in line with the Chroma collections.
+
+        Quantized vectors go first: vectors of chunks the collection lost are
+        dropped, and chunks left without a vector (unreachable by dense
+        search) are deleted from the collection. A workspace whose catalog
+        then lists chunks its collection lacks (e.g. the Chroma directory was
+        reset) is cleared; it is backfilled again from what the collection
+        still holds, and re-ingesting a document writes all of its chunks.
+        A lexical index that drifted is cleared and rebuilt from the
+        collection before its next search.
+        """
+        workspaces = set(self.catalog.workspaces()) | set(self.lexical_index.workspaces())
+        for path in (self.persist_directory / "vectors").glob("*.npz"):
+            if path.stem == "documents":
+                workspaces.add('default')
+            elif path.stem.endswith("_documents"):
+                workspaces.add(path.stem[:-len("_documents")])
+        for workspace in sorted(workspaces):
+            collection = self._get_or_create_collection("documents", workspace)
+            self._reconcile_vectors(workspace, collection)
+            if self.catalog.reconcile(workspace, collection):
+                logger.warning(f"Document catalog for '{workspace}' did not match its collection; cleared")
+            if self.lexical_index.reconcile(workspace, collection):
+                logger.warning(f"Lexical index for '{workspace}' did not match its collection; rebuilding")
+
+    def _reconcile_vectors(self, workspace: str, collection) -> None:
+        """Make a workspace's quantized vectors and its collection hold the same chunk IDs."""
+        store = self._vector_store(collection)
+        if store is None:
+            # float32 workspace (or a collection recreated as one): any .npz is stale
+            path = self._vector_path(collection.name)
+            if path.exists():
+                path.unlink()
+                logger.warning(f"Removed quantized vectors of '{workspace}': its collection stores float32")
+            return
+
+        stored = set(collection.get(include=[]).get('ids', []))
+        dropped = store.retain(stored)
+        store.flush()
+        if dropped:
+            logger.warning(f"Dropped {dropped} quantized vectors of '{workspace}' missing from its collection")
+        unreachable = sorted(stored.difference(store.ids()))
+        for start in range(0, len(unreachable), _GET_WINDOW):
+            collection.delete(ids=unreachable[start:start + _GET_WINDOW])
+        if unreachable:
+            logger.warning(f"Deleted {len(unreachable)} chunks of '{workspace}' that had no quantized vector")
+
+    def _stored_chunk_ids(self, collection, doc_key: str, workspace: str) -> List[str]:
+        """Chunk IDs currently stored for a document (catalog first, then the collection)."""
+        entry = self.catalog.get(workspace, doc_key)
+        if entry is not None:
+            return entry['chunk_ids']
+        # Not catalogued yet: chunks from before incremental ingestion carry
+        # the document's path as 'source' and positional IDs
+        ids = set(collection.get(where={"doc_key": doc_key}, include=[]).get('ids', []))
+        ids.update(collection.get(where={"source": doc_key}, include=[]).get('ids', []))
+        return sorted(ids)
+
+    def _backfill_catalog(self, workspace: str, collection=None) -> None:
+        """
+        Catalog documents stored before the catalog existed (one scan per workspace).
+
+        Chunks are grouped by their 'source' metadata in a single pass; once a
+        workspace is marked backfilled, the catalog alone is authoritative.
+        """
+        if self.catalog.is_backfilled(workspace):
+            return
+        collection = collection or self._get_or_create_collection("documents", workspace)
+        results = collection.get(include=['documents', 'metadatas'])
+
+        grouped: Dict[str, List[tuple]] = {}
+        for chunk_id, text, metadata in zip(results.get('ids', []), results.get('documents', []),
+                                            results.get('metadatas', [])):
+            if metadata and metadata.get('source'):
+                grouped.setdefault(metadata['source'], []).append(
+                    (metadata.get('chunk_index', 0), chunk_id, text or '', metadata)
+                )
+
+        for source, rows in grouped.items():
+            if self.catalog.get(workspace, source) is not None:
+                continue
+            rows.sort(key=lambda row: (row[0], row[1]))
+            hashes = [row[3].get('chunk_hash') or chunk_hash(row[2]) for row in rows]
+            try:
+                size_bytes = os.path.getsize(source) if os.path.exists(source) else None
+            except OSError:
+                size_bytes = None
+            self.catalog.record(
+                workspace, source,
+                hashlib.sha256('\n'.join(hashes).encode('ascii')).hexdigest(),
+                [row[1] for row in rows],
+                rows[0][3].get('file_type'),
+                size_bytes
+            )
+        self.catalog.mark_backfilled(workspace)
+        if grouped:
+            logger.info(f"Backfilled document catalog for '{workspace}': {len(grouped)} documents")
+
+    def _sync_catalog(self, workspace: str, collection=None):
         """
-        Perform semantic similarity search (Agent-accessible via MCP).
+        Make a workspace's catalog agree with its collection before it is read.
+
+        A catalog listing more chunks than the collection holds (the
+        collection was reset after startup) is reconciled first; either way
+        the workspace is then backfilled from the collection if needed.
+        Returns the workspace's collection.
+        """
+        collection = collection or self._get_or_create_collection("documents", workspace)
+        if self.catalog.stats(workspace)['chunks'] > collection.count():
+            if self.catalog.reconcile(workspace, collection):
+                logger.warning(f"Document catalog for '{workspace}' did not match its collection; cleared")
+        self._backfill_catalog(workspace, collection)
+        return collection
+
+    def get_catalog_stats(self, workspace: Optional[str] = None) -> Dict[str, int]:
+        """Document, chunk and byte totals from the catalog (no collection scan)."""
+        for name in ([workspace] if workspace is not None else self.catalog.workspaces()):
+            self._sync_catalog(name)
+        return self.catalog.stats(workspace)
+
+    @staticmethod
+    def _chunk_metadata(doc_key: str, chunk: Dict[str, Any], content_hash: str) -> Dict[str, Any]:
+        """Stored metadata of one chunk of a synced document."""
+        metadata = dict(chunk.get('metadata', {}))
+        metadata['source'] = doc_key
+        metadata['doc_key'] = doc_key
+        metadata['chunk_hash'] = content_hash
+        return metadata
+
+    def sync_document(self, doc_key: str, chunks: List[Dict[str, Any]], workspace: str = 'default',
+                      file_type: Optional[str] = None, force: bool = False,
+                      size_bytes: Optional[int] = None,
+                      preloaded_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Incrementally (re-)ingest one document (Agent-accessible via MCP).
+
+        Chunks are diffed against what is stored for `doc_key`: only new or
+        changed chunks are embedded and upserted, chunks that disappeared are
+        deleted, and unchanged chunks whose position moved get a metadata-only
+        update. The document version is recorded in the workspace catalog.
+
+        Args:
+            doc_key: Stable document identity within the workspace
+            chunks: Chunk dicts with 'text' and 'metadata', in document order
+            workspace: Workspace/Knowledge Base identifier
+            file_type: Document type recorded in the catalog
+            force: Re-embed and rewrite every chunk
+            size_bytes: Source file size recorded in the catalog
+            preloaded_ids: Chunk IDs already written for this version (by
+                stream_document); treated as stored, never re-embedded
+
+        Returns:
+            Status dictionary with version and per-chunk change counts
+        """
+        collection = self._sync_catalog(workspace)
+        texts = [chunk['text'] for chunk in chunks]
+        preloaded = set(preloaded_ids or ())
+        existing = set(self._stored_chunk_ids(collection, doc_key, workspace)) | preloaded
+        plan = plan_document_sync(doc_key, texts, existing, force)
+
+        entry = self.catalog.get(workspace, doc_key)
+        if entry is not None and entry['content_hash'] == plan.content_hash and plan.unchanged:
+            return {
+                "status": "unchanged",
+                "doc_key": doc_key,
+                "version": entry['version'],
+                "chunks_total": len(texts),
+                "chunks_added": 0,
+                "chunks_removed": 0,
+                "chunks_unchanged": len(texts),
+                "total_documents": collection.count(),
+                "workspace": workspace
+            }
+
+        metadatas = [self._chunk_metadata(doc_key, chunk, plan.chunk_hashes[i])
+                     for i, chunk in enumerate(chunks)]
+
+        storage_result = {"ingest_report": None}
+        if plan.to_add:
+            storage_result = self.add_documents(
+                [{"text": texts[i], "metadata": metadatas[i], "id": plan.chunk_ids[i]} for i in plan.to_add],
+                workspace
+            )
+
+        # Unchanged text at a new position: refresh metadata without re-embedding
+        # (preloaded chunks were just written with their final metadata)
+        kept = [i for i in plan.to_keep if plan.chunk_ids[i] not in preloaded]
+        if kept:
+            kept_ids = [plan.chunk_ids[i] for i in kept]
+            stored = collection.get(ids=kept_ids, include=['metadatas'])
+            stored_meta = dict(zip(stored.get('ids', []), stored.get('metadatas', [])))
+            moved = [i for i in kept if stored_meta.get(plan.chunk_ids[i]) != metadatas[i]]
+            if moved:
+                collection.update(ids=[plan.chunk_ids[i] for i in moved],
+                                  metadatas=[metadatas[i] for i in moved])
+                self.workspace_versions.bump(workspace)
+
+        if plan.to_delete:
+            self._delete_chunks(collection, workspace, plan.to_delete)
+
+        version = self.catalog.record(workspace, doc_key, plan.content_hash, plan.chunk_ids,
+                                      file_type, size_bytes)
+        logger.info(
+            f"Synced '{doc_key}' v{version} in '{workspace}': +{len(plan.to_add)} "
+            f"-{len(plan.to_delete)} ={len(plan.to_keep)} chunks"
+        )
+
+        if self.redis_client:
+            self._emit_event("document_synced", {
+                "doc_key": doc_key,
+                "version": version,
+                "workspace": workspace
+            })
+
+        return {
+            "status": "success",
+            "doc_key": doc_key,
+            "version": version,
+            "chunks_total": len(texts),
+            "chunks_added": len(plan.to_add),
+            "chunks_removed": len(plan.to_delete),
+            "chunks_unchanged": len(plan.to_keep),
+            "total_documents": collection.count(),
+            "workspace": workspace,
+            "ingest_report": storage_result.get("ingest_report")
+        }
+
+    def stream_document(self, doc_key: str, chunk_batches: Iterable[List[Dict[str, Any]]],
+                        workspace: str = 'default', file_type: Optional[str] = None,
+                        force: bool = False, size_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Incrementally ingest a document whose chunks arrive in batches.
+
+        New or changed chunks of each batch are embedded and written as soon
+        as the batch arrives, so the start of a long PDF is searchable while
+        later pages are still converting. Once the last batch is in, the
+        document is reconciled with sync_document (stale chunks deleted,
+        metadata refreshed, version recorded) without re-embedding.
+
+        Args:
+            doc_key: Stable document identity within the workspace
+            chunk_batches: Lists of chunk dicts, in document order
+            workspace: Workspace/Knowledge Base identifier
+            file_type: Document type recorded in the catalog
+            force: Re-embed and rewrite every chunk
+            size_bytes: Source file size recorded in the catalog
+
+        Returns:
+            sync_document status dictionary, counting streamed chunks as added
+        """
+        collection = self._sync_catalog(workspace)
+        stored = set(self._stored_chunk_ids(collection, doc_key, workspace))
+
+        chunks: List[Dict[str, Any]] = []
+        written: List[str] = []
+        reports = []
+        seen: Dict[str, int] = {}
+        batches = 0
+        try:
+            for batch in chunk_batches:
+                batches += 1
+                chunks.extend(batch)
+                hashes = [chunk_hash(chunk['text']) for chunk in batch]
+                ids = chunk_ids_for(doc_key, hashes, seen)
+                fresh = [i for i, chunk_id in enumerate(ids) if force or chunk_id not in stored]
+                if not fresh:
+                    continue
+                result = self.add_documents([
+                    {"text": batch[i]['text'], "metadata": self._chunk_metadata(doc_key, batch[i], hashes[i]),
+                     "id": ids[i]}
+                    for i in fresh
+                ], workspace)
+                written.extend(ids[i] for i in fresh)
+                reports.append(result["ingest_report"])
+        except Exception:
+            # Conversion failed part-way: drop the chunks this run added so the
+            # stored version stays consistent with the catalog
+            orphans = [chunk_id for chunk_id in written if chunk_id not in stored]
+            if orphans:
+                self._delete_chunks(collection, workspace, orphans)
+            raise
+
+        result = self.sync_document(doc_key, chunks, workspace, file_type,
+                                    size_bytes=size_bytes, preloaded_ids=written)
+        if written:
+            result["status"] = "success"
+            result["chunks_added"] += len(written)
+            result["chunks_unchanged"] -= len(written)
+            result["ingest_report"] = _combine_ingest_reports(reports)
+        result["batches_streamed"] = batches
+        return result
+
+    def remove_document_by_key(self, doc_key: str, workspace: str = 'default') -> Dict[str, Any]:
+        """
+        Delete every chunk of a document identified by its doc_key.
+
+        Args:
+            doc_key: Stable document identity used at ingestion
+            workspace: Workspace/Knowledge Base identifier
+
+        Returns:
+            Dictionary with deletion status and chunk count
+        """
+        collection = self._sync_catalog(workspace)
+        ids = self._stored_chunk_ids(collection, doc_key, workspace)
+        deleted = len(existing_chunk_ids(collection, ids))
+        if ids:
+            self._delete_chunks(collection, workspace, ids)
+        self.catalog.remove(workspace, doc_key)
+        return {
+            "success": True,
+            "doc_key": doc_key,
+            "chunks_deleted": deleted,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _ensure_lexical_index(self, workspace: str, collection) -> None:
+        """Index chunks stored before the lexical index existed (one scan per workspace)."""
+        if self.lexical_index.is_indexed(workspace):
+            return
+        results = collection.get(include=['documents'])
+        ids = results.get('ids', [])
+        if ids:
+            self.lexical_index.upsert(workspace, ids, results.get('documents', []))
+            logger.info(f"Built lexical index for '{workspace}': {len(ids)} chunks")
+        self.lexical_index.mark_indexed(workspace)
+
+    def _lexical_search(self, workspace: str, collection, query: str, limit: int):
+        """BM25 candidates for hybrid search; returns (chunk IDs, elapsed ms)."""
+        started = time.perf_counter()
+        self._ensure_lexical_index(workspace, collection)
+        ids = [chunk_id for chunk_id, _ in self.lexical_index.search(workspace, query, limit)]
+        return ids, (time.perf_counter() - started) * 1000
+
+    def search_similar(self, query: str, n_results: int = 5, workspace: str = 'default',
+                       mode: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Perform hybrid (BM25 + semantic) search (Agent-accessible via MCP).
+
+        Both retrievers are queried in parallel for n_results x
+        RAG_HYBRID_CANDIDATES candidates, and their rankings are fused with
+        reciprocal-rank fusion, so exact terms (clause numbers, CLINs,
+        acronyms) are found without inflating n_results.
         
         Args:
             query: Search query text
             n_results: Number of results to return
             workspace: Workspace/Knowledge Base identifier
+            mode: 'hybrid' or 'vector' (default: RAG_RETRIEVAL_MODE)
             
+        Repeats of a query against an unchanged workspace are answered from
+        the result cache without embedding or querying Chroma.
+
         Returns:
-            Search results formatted for agent consumption
+            Search results formatted for agent consumption, with fusion
+            weights, per-stage timings and cache outcome under 'retrieval'
         """
-        # Generate query embedding locally
-        query_embedding = self.embed_texts([query])[0]
-        
+        started = time.perf_counter()
+        mode = (mode or DEFAULT_MODE).lower()
+        hybrid = mode == 'hybrid'
+
+        # Version is read before searching, so a write racing this query
+        # leaves the cached entry under an already-superseded key
+        cache_key = result_key(workspace, query, n_results, 'hybrid' if hybrid else 'vector',
+                               self.workspace_versions.get(workspace))
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            retrieval = dict(cached["retrieval"], cache="hit",
+                             timings_ms={"total": round((time.perf_counter() - started) * 1000, 2)})
+            return {**cached, "query": query, "results": list(cached["results"]), "retrieval": retrieval}
+        trace = RetrievalTrace(mode='hybrid' if hybrid else 'vector', k=DEFAULT_RRF_K,
+                               weights=DEFAULT_WEIGHTS if hybrid else {'vector': 1.0})
+        candidates = max(n_results * CANDIDATE_MULTIPLIER, n_results) if hybrid else n_results
+
         # Get workspace-specific collection
         collection = self._get_or_create_collection("documents", workspace)
+        if candidates > n_results:
+            # Never over-fetch past the collection size (Chroma rejects it)
+            candidates = max(min(candidates, collection.count()), n_results)
+
+        # Lexical search runs on the retrieval pool while this thread embeds
+        lexical_future = None
+        if hybrid:
+            lexical_future = self._retrieval_pool.submit(
+                self._lexical_search, workspace, collection, query, candidates
+            )
+
+        # Generate query embedding locally
+        stage = time.perf_counter()
+        query_embedding = self._embed_query(query)
+        trace.timings_ms['embed'] = (time.perf_counter() - stage) * 1000
         
-        # Search ChromaDB (optimized for sub-10ms latency)
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            include=['documents', 'metadatas', 'distances']
-        )
-        
+        # Search ChromaDB (optimized for sub-10ms latency), or the quantized
+        # store of a compact workspace
+        stage = time.perf_counter()
+        store = self._vector_store(collection)
+        if store is not None:
+            dense = self._compact_dense_search(collection, store, query_embedding, candidates, trace)
+        else:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=candidates,
+                include=['documents', 'metadatas', 'distances']
+            )
+            dense = {}
+            for i, chunk_id in enumerate(results['ids'][0]):
+                dense[chunk_id] = {
+                    "document": results['documents'][0][i],
+                    "metadata": results['metadatas'][0][i],
+                    "similarity_score": 1.0 - results['distances'][0][i]  # Convert distance to similarity
+                }
+        trace.timings_ms['vector'] = (time.perf_counter() - stage) * 1000
+        trace.candidates['vector'] = len(dense)
+
         # Format results for agent consumption
         formatted_results = []
-        for i in range(len(results['documents'][0])):
-            formatted_results.append({
-                "document": results['documents'][0][i],
-                "metadata": results['metadatas'][0][i],
-                "similarity_score": 1.0 - results['distances'][0][i],  # Convert distance to similarity
-                "rank": i + 1
-            })
+        if lexical_future is None:
+            for i, (chunk_id, hit) in enumerate(dense.items()):
+                formatted_results.append({**hit, "id": chunk_id, "rank": i + 1})
+        else:
+            try:
+                lexical_ids, trace.timings_ms['lexical'] = lexical_future.result()
+            except Exception as e:
+                logger.warning(f"Lexical search failed, using vector results only: {e}")
+                lexical_ids = []
+            trace.candidates['lexical'] = len(lexical_ids)
+
+            stage = time.perf_counter()
+            fused = reciprocal_rank_fusion(
+                {'vector': list(dense), 'lexical': lexical_ids}, DEFAULT_WEIGHTS, DEFAULT_RRF_K
+            )[:n_results]
+
+            # Chunks only the lexical retriever found still need their text
+            missing = [chunk_id for chunk_id, _, _ in fused if chunk_id not in dense]
+            lexical_hits = {}
+            if missing:
+                fetched = collection.get(ids=missing, include=['documents', 'metadatas'])
+                for chunk_id, doc_text, metadata in zip(fetched.get('ids', []), fetched.get('documents', []),
+                                                        fetched.get('metadatas', [])):
+                    lexical_hits[chunk_id] = {"document": doc_text, "metadata": metadata,
+                                              "similarity_score": 0.0}
+
+            for chunk_id, score, ranks in fused:
+                hit = dense.get(chunk_id) or lexical_hits.get(chunk_id)
+                if hit is None:
+                    continue  # deleted between index lookup and fetch
+                formatted_results.append({
+                    **hit,
+                    "id": chunk_id,
+                    "fusion_score": round(score, 6),
+                    "ranks": ranks,
+                    "rank": len(formatted_results) + 1
+                })
+            trace.timings_ms['fusion'] = (time.perf_counter() - stage) * 1000
+
+        formatted_results = formatted_results[:n_results]
+        trace.timings_ms['total'] = (time.perf_counter() - started) * 1000
         
         # Debug: Log search results
-        logger.info(f"🔍 Search Debug - Query: '{query}' found {len(formatted_results)} results")
+        logger.info(f"🔍 Search Debug - Query: '{query}' found {len(formatted_results)} results ({trace.mode})")
         if formatted_results:
             logger.info(f"🔍 Search Debug - First result metadata: {formatted_results[0].get('metadata', {})}")
         else:
             logger.warning(f"🔍 Search Debug - No results found for query: '{query}'")
             
-        return {
+        response = {
             "query": query,
             "results": formatted_results,
-            "total_found": len(formatted_results)
+            "total_found": len(formatted_results),
+            "retrieval": {**trace.to_dict(), "cache": "miss"}
         }
+        self.result_cache.put(cache_key, response)
+        return response
     
-    def generate_response(self, query: str, context_docs: List[str]) -> Dict[str, Any]:
+    def _compact_dense_search(self, collection, store: QuantizedVectorStore, query_embedding: np.ndarray,
+                              candidates: int, trace: RetrievalTrace) -> Dict[str, Dict[str, Any]]:
         """
-        Generate response using local Ollama model with retrieved context.
-        
+        Dense candidates of a compact workspace, nearest first.
+
+        The quantized store ranks RAG_RESCORE_CANDIDATES times as many
+        candidates as needed; those are rescored against their exact float32
+        vectors from the embedding cache (dequantized codes where the cache
+        no longer has them) before the top `candidates` are kept.
+        """
+        coarse_ids, coarse_distances = store.search(query_embedding, candidates * RESCORE_CANDIDATES)
+        if not coarse_ids:
+            return {}
+        stage = time.perf_counter()
+        fetched = collection.get(ids=coarse_ids, include=['documents', 'metadatas'])
+        stored = {chunk_id: (doc_text, metadata) for chunk_id, doc_text, metadata in
+                  zip(fetched.get('ids', []), fetched.get('documents', []), fetched.get('metadatas', []))}
+
+        hashes = {chunk_id: content_hash(doc_text or '') for chunk_id, (doc_text, _) in stored.items()}
+        cached = self.embedding_cache.get_many(self.embedding_model_name, list(set(hashes.values())))
+        exact = {chunk_id: cached[digest] for chunk_id, digest in hashes.items() if digest in cached}
+
+        # IDs missing from Chroma were deleted between the two lookups
+        present = [(chunk_id, distance) for chunk_id, distance in zip(coarse_ids, coarse_distances)
+                   if chunk_id in stored]
+        ranked = rescore(query_embedding, [chunk_id for chunk_id, _ in present],
+                         [distance for _, distance in present], exact)[:candidates]
+        trace.candidates['rescored'] = len(present)
+        trace.timings_ms['rescore'] = (time.perf_counter() - stage) * 1000
+
+        return {
+            chunk_id: {
+                "document": stored[chunk_id][0],
+                "metadata": stored[chunk_id][1],
+                "similarity_score": 1.0 - distance  # Same squared-L2 scale as Chroma
+            }
+            for chunk_id, distance in ranked
+        }
+
+    def build_rag_messages(self, query: str, context_docs: List[str]) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a context-grounded answer.
+
         Args:
             query: User query
             context_docs: Retrieved document texts for context
-            
+
         Returns:
-            Generated response with metadata
+            Ollama chat messages list
         """
         # Build context-aware prompt without numbered document references
         context = "\\n\\n".join(context_docs)
@@ -285,11 +904,27 @@ Question: {query}
 
 Answer based solely on the provided context:"""
 
+        return [{"role": "user", "content": prompt}]
+
+    def generate_response(self, query: str, context_docs: List[str]) -> Dict[str, Any]:
+        """
+        Generate response using local Ollama model with retrieved context.
+        
+        Args:
+            query: User query
+            context_docs: Retrieved document texts for context
+            
+        Returns:
+            Generated response with metadata
+        """
+        messages = self.build_rag_messages(query, context_docs)
+
         try:
             # Use robust Ollama configuration for chat response
             logger.debug(f"Generating response using robust Ollama config with model: {self.default_model}")
-            messages = [{"role": "user", "content": prompt}]
-            result = self.robust_ollama_config.chat_response(self.default_model, messages)
+            result = self.robust_ollama_config.chat_response(
+                self.default_model, messages, caller='rag', priority=PRIORITY_INTERACTIVE
+            )
             
             if result['success']:
                 response_content = result['data']['message']['content']
@@ -357,12 +992,40 @@ Answer based solely on the provided context:"""
             "sources": search_results["results"],
             "model_used": generation_result.get("model_used", self.default_model),
             "retrieval_count": len(context_docs),
+            "retrieval": search_results["retrieval"],
             "status": generation_result["status"],
             "prompt_tokens": generation_result.get("prompt_tokens", 0),
             "completion_tokens": generation_result.get("completion_tokens", 0),
             "total_tokens": generation_result.get("total_tokens", 0)
         }
     
+    def prepare_rag_query(self, query: str, n_results: int = 5, workspace: str = 'default') -> Dict[str, Any]:
+        """
+        Retrieval half of query_rag: search and build the generation prompt.
+
+        Used by streaming chat, which sends the messages to Ollama itself
+        and forwards tokens as they arrive.
+
+        Args:
+            query: User question
+            n_results: Number of documents to retrieve for context
+            workspace: Workspace/Knowledge Base identifier
+
+        Returns:
+            Sources, chat messages and the model to generate with
+        """
+        search_results = self.search_similar(query, n_results, workspace)
+        context_docs = [result["document"] for result in search_results["results"]]
+
+        return {
+            "query": query,
+            "sources": search_results["results"],
+            "messages": self.build_rag_messages(query, context_docs),
+            "model_used": self.default_model,
+            "retrieval_count": len(context_docs),
+            "retrieval": search_results["retrieval"]
+        }
+
     def _emit_event(self, event_type: str, payload: Dict[str, Any]):
         """Emit event to Redis Streams for agent orchestration."""
         if not self.redis_client:
@@ -380,34 +1043,64 @@ Answer based solely on the provided context:"""
         except Exception as e:
             logger.warning(f"Failed to emit event: {e}")
     
-    def get_vector_chunks_for_knowledge_graph(self, workspace: str = 'default') -> Dict[str, Any]:
-        """Get all vector chunks with embeddings and content for knowledge graph creation."""
+    def get_chunk_index(self, workspace: str = 'default') -> Dict[str, Dict[str, Any]]:
+        """Chunk ID -> metadata for every chunk in a workspace (no text or embeddings)."""
+        collection = self._get_or_create_collection("documents", workspace)
+        results = collection.get(include=['metadatas'])
+        return dict(zip(results.get('ids', []), results.get('metadatas', [])))
+
+    def get_vector_chunks_for_knowledge_graph(self, workspace: str = 'default',
+                                              ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get vector chunks with embeddings and content for knowledge graph creation.
+
+        Embeddings are NumPy arrays (dequantized float32 rows for compact
+        workspaces); convert them only at a JSON boundary.
+
+        Args:
+            workspace: Workspace/Knowledge Base identifier
+            ids: Only these chunks (default: all chunks)
+        """
         try:
             # Get workspace-specific collection
             collection = self._get_or_create_collection("documents", workspace)
 
-            # Get all chunks with embeddings and metadata
-            results = collection.get(include=['documents', 'metadatas', 'embeddings'])
+            # Get chunks with embeddings and metadata (by ID, a window at a time);
+            # compact workspaces read their vectors from the quantized store
+            store = self._vector_store(collection)
+            include = ['documents', 'metadatas'] if store is not None else ['documents', 'metadatas', 'embeddings']
+            if ids is None:
+                windows = [collection.get(include=include)]
+            else:
+                windows = (collection.get(ids=ids[start:start + _GET_WINDOW], include=include)
+                           for start in range(0, len(ids), _GET_WINDOW))
 
             chunks = []
-            documents = results.get('documents', [])
-            metadatas = results.get('metadatas', [])
-            embeddings = results.get('embeddings', [])
-            ids = results.get('ids', [])
-
-            for i, (doc_text, metadata, embedding, chunk_id) in enumerate(zip(documents, metadatas, embeddings, ids)):
-                if doc_text and metadata:
-                    chunk_info = {
-                        'id': chunk_id,
-                        'text': doc_text,
-                        'metadata': metadata,
-                        'embedding': embedding,
-                        'source': metadata.get('source', 'unknown'),
-                        'file_type': metadata.get('file_type', 'unknown'),
-                        'chunk_index': metadata.get('chunk_index', i),
-                        'chunk_type': metadata.get('chunk_type', 'content')
-                    }
-                    chunks.append(chunk_info)
+            for results in windows:
+                documents = results.get('documents')
+                metadatas = results.get('metadatas')
+                chunk_ids = results.get('ids', [])
+                if store is not None:
+                    vectors = store.get(chunk_ids)
+                    embeddings = [vectors.get(chunk_id) for chunk_id in chunk_ids]
+                else:
+                    embeddings = results.get('embeddings')
+                if documents is None or metadatas is None or embeddings is None:
+                    continue
+
+                for doc_text, metadata, embedding, chunk_id in zip(documents, metadatas, embeddings, chunk_ids):
+                    if doc_text and metadata:
+                        chunk_info = {
+                            'id': chunk_id,
+                            'text': doc_text,
+                            'metadata': metadata,
+                            'embedding': embedding,
+                            'source': metadata.get('source', 'unknown'),
+                            'file_type': metadata.get('file_type', 'unknown'),
+                            'chunk_index': metadata.get('chunk_index', len(chunks)),
+                            'chunk_type': metadata.get('chunk_type', 'content')
+                        }
+                        chunks.append(chunk_info)
 
             return {
                 'chunks': chunks,
@@ -420,64 +1113,38 @@ Answer based solely on the provided context:"""
             return {'chunks': [], 'total_chunks': 0, 'workspace': workspace}
 
     def get_documents_metadata(self, workspace: str = 'default') -> List[Dict[str, Any]]:
-        """Get metadata for all ingested documents in a specific workspace."""
+        """Get metadata for all ingested documents in a specific workspace (from the catalog)."""
         try:
-            # Get workspace-specific collection
-            collection = self._get_or_create_collection("documents", workspace)
-            # Get all documents from ChromaDB
-            results = collection.get()
-            
+            self._sync_catalog(workspace)
+
             documents = []
-            processed_sources = set()
-            
-            for i, metadata in enumerate(results.get('metadatas', [])):
-                if metadata and 'source' in metadata:
-                    source_path = metadata['source']
-                    
-                    # Skip if we've already processed this source file
-                    if source_path in processed_sources:
-                        continue
-                    processed_sources.add(source_path)
-                    
-                    # Extract filename from path
-                    import os
-                    filename = os.path.basename(source_path)
-                    
-                    # Count chunks for this document
-                    chunk_count = sum(1 for m in results.get('metadatas', []) 
-                                    if m and m.get('source') == source_path)
-                    
-                    # Determine file type
-                    file_ext = os.path.splitext(filename)[1].lower()
-                    file_type = {
-                        '.csv': 'CSV',
-                        '.txt': 'Text',
-                        '.pdf': 'PDF',
-                        '.docx': 'Word Document',
-                        '.md': 'Markdown'
-                    }.get(file_ext, 'Unknown')
-                    
-                    # Try to get file size (this is approximate)
-                    try:
-                        file_size = os.path.getsize(source_path) if os.path.exists(source_path) else None
-                    except:
-                        file_size = None
-                    
-                    doc_info = {
-                        'id': f"doc_{len(documents)}",
-                        'name': filename,
-                        'type': file_type,
-                        'size': file_size,
-                        'chunks': chunk_count,
-                        'uploadDate': metadata.get('ingestion_date', datetime.now().isoformat()),
-                        'status': 'processed',
-                        'source_path': source_path
-                    }
-                    
-                    documents.append(doc_info)
-            
+            for entry in self.catalog.list(workspace):
+                filename = os.path.basename(entry['doc_key'])
+
+                # Determine file type
+                file_ext = os.path.splitext(filename)[1].lower()
+                file_type = {
+                    '.csv': 'CSV',
+                    '.txt': 'Text',
+                    '.pdf': 'PDF',
+                    '.docx': 'Word Document',
+                    '.md': 'Markdown'
+                }.get(file_ext, 'Unknown')
+
+                documents.append({
+                    'id': entry['doc_id'],
+                    'name': filename,
+                    'type': file_type,
+                    'size': entry['size_bytes'],
+                    'chunks': entry['chunk_count'],
+                    'version': entry['version'],
+                    'uploadDate': datetime.fromtimestamp(entry['ingested_at']).isoformat(),
+                    'status': 'processed',
+                    'source_path': entry['doc_key']
+                })
+
             return documents
-            
+
         except Exception as e:
             logger.error(f"Error getting documents metadata: {e}")
             return []
@@ -487,7 +1154,7 @@ Answer based solely on the provided context:"""
         Delete a document from the vector database.
         
         Args:
-            document_id: The unique identifier for the document to delete (e.g., "doc_0", "doc_1")
+            document_id: Stable catalog ID of the document to delete (e.g., "doc_3f2a...")
             workspace: Workspace/Knowledge Base identifier
             
         Returns:
@@ -495,60 +1162,30 @@ Answer based solely on the provided context:"""
         """
         try:
             logger.info(f"Attempting to delete document: {document_id} from workspace: {workspace}")
-            
-            # First, get the list of documents to find the source path for this document ID
-            documents = self.get_documents_metadata(workspace)
-            
-            # Find the document that matches this ID
-            target_document = None
-            for doc in documents:
-                if doc['id'] == document_id:
-                    target_document = doc
-                    break
-            
-            if not target_document:
+
+            collection = self._sync_catalog(workspace)
+
+            entry = self.catalog.get_by_id(workspace, document_id)
+            if entry is None:
                 return {
                     "success": False,
                     "error": f"Document with ID '{document_id}' not found",
                     "document_id": document_id
                 }
-            
-            # Get the source path for this document
-            source_path = target_document['source_path']
+
+            source_path = entry['doc_key']
+            matching_ids = entry['chunk_ids']
             logger.info(f"Found document {document_id} with source path: {source_path}")
-            
-            # Get workspace-specific collection
-            collection = self._get_or_create_collection("documents", workspace)
-            
-            # Now find all chunk IDs that belong to this source path
-            all_data = collection.get()
-            all_ids = all_data.get('ids', [])
-            all_metadatas = all_data.get('metadatas', [])
-            
-            matching_ids = []
-            
-            for i, chunk_id in enumerate(all_ids):
-                metadata = all_metadatas[i] if i < len(all_metadatas) else {}
-                
-                # Match based on source path in metadata
-                if metadata and metadata.get('source') == source_path:
-                    matching_ids.append(chunk_id)
-            
-            logger.info(f"Found {len(matching_ids)} matching chunk IDs for document '{document_id}' (source: {source_path}): {matching_ids}")
-            
-            if not matching_ids:
-                return {
-                    "success": False,
-                    "error": f"No chunks found for document '{document_id}' with source path '{source_path}'",
-                    "document_id": document_id
-                }
-            
-            # Delete all matching chunks from workspace-specific collection
-            collection.delete(ids=matching_ids)
+
+            # Count only chunks the collection still had, so a stale entry
+            # is reported as such (it is removed from the catalog either way)
+            deleted_count = len(existing_chunk_ids(collection, matching_ids))
+            if matching_ids:
+                self._delete_chunks(collection, workspace, matching_ids)
+            self.catalog.remove(workspace, source_path)
             
             # Log the deletion event
-            deleted_count = len(matching_ids)
-            logger.info(f"Deleted document '{document_id}' ({deleted_count} chunks): {matching_ids}")
+            logger.info(f"Deleted document '{document_id}' ({deleted_count} chunks)")
             
             # Emit event if Redis is available
             if self.redis_client:
@@ -598,6 +1235,7 @@ Answer based solely on the provided context:"""
                 "type": "Redis Streams",
                 "status": "available" if self.redis_client else "unavailable"
             },
+            "catalog": self.catalog.stats(),
             "cost": "$0/month",
             "architecture": "local-first"
         }
@@ -7,6 +7,7 @@ adding document processing and semantic search capabilities.
 
 import json
 import logging
+import threading
 from typing import Dict, Any
 from pathlib import Path
 import sys
@@ -27,6 +28,15 @@ except ImportError as e:
     logger.error(f"RAG system not available: {e}")
     RAG_AVAILABLE = False
 
+# Context chunks put into chat prompts. Hybrid retrieval ranks exact-term
+# matches highly, so fewer chunks are needed than with dense search alone.
+CHAT_CONTEXT_CHUNKS = int(os.getenv('RAG_CHAT_CONTEXT_CHUNKS', '3'))
+
+# File types accepted by DocumentProcessor; the Docling ones are converted
+# on the process pool ahead of ingestion when a whole folder is ingested
+INGESTIBLE_EXTENSIONS = {'.txt', '.pdf', '.doc', '.docx', '.csv', '.xls', '.xlsx'}
+DOCLING_EXTENSIONS = {'.pdf', '.doc', '.docx'}
+
 
 class RAGService:
     """
@@ -39,6 +49,8 @@ class RAGService:
     def __init__(self):
         """Initialize RAG service if available."""
         self.available = RAG_AVAILABLE
+        # Built on first use (needs scikit-learn)
+        self.knowledge_graph_cache = None
         
         if self.available:
             try:
@@ -73,13 +85,26 @@ class RAGService:
                 "features": []
             }
     
-    def ingest_document(self, file_path: str, workspace: str = 'default') -> Dict[str, Any]:
+    def ingest_document(self, file_path: str, workspace: str = 'default',
+                        doc_key: str = None, incremental: bool = True) -> Dict[str, Any]:
         """
         Process and ingest a document into the RAG system.
+
+        Chunks are streamed into the collection as they are produced: a PDF
+        converts in page batches on the conversion pool, and each batch is
+        embedded and searchable before the rest of the file has converted.
+
+        Ingestion is incremental: chunks are diffed against the stored
+        version of the same document (by doc_key), so only new or changed
+        chunks are embedded, chunks that disappeared are deleted, and the
+        document version is recorded in the workspace catalog.
         
         Args:
             file_path: Path to document file
             workspace: Workspace/Knowledge Base identifier
+            doc_key: Stable document identity (defaults to file_path); uploads
+                pass "uploads/<filename>" since their temp path changes
+            incremental: False re-embeds and rewrites every chunk
             
         Returns:
             Processing result dictionary
@@ -91,30 +116,57 @@ class RAGService:
             }
         
         try:
-            # Process document
-            processing_result = self.document_processor.process_document(file_path)
-            
-            if processing_result["status"] != "success":
-                return processing_result
+            # PDFs arrive one converted page batch at a time; each batch is
+            # embedded and searchable before the rest of the file converts
+            batches = self.document_processor.iter_document_chunk_batches(file_path)
+            first = next(batches)
+            if first["status"] != "success":
+                return first
+            chunks_processed = [0]
+
+            def chunk_batches():
+                result = first
+                while result is not None:
+                    if result["status"] != "success":
+                        raise RuntimeError(result.get("error", "Document processing failed"))
+                    chunks_processed[0] += len(result["chunks"])
+                    yield result["chunks"]
+                    result = next(batches, None)
+
+            doc_key = doc_key or str(file_path)
+            sync_result = self.rag_system.stream_document(
+                doc_key,
+                chunk_batches(),
+                workspace,
+                file_type=first.get("file_type"),
+                force=not incremental,
+                size_bytes=os.path.getsize(file_path) if os.path.exists(file_path) else None
+            )
+            processing_result = {"file_type": first.get("file_type"), "total_chunks": chunks_processed[0]}
             
-            # Add to vector database
-            documents = []
-            for chunk in processing_result["chunks"]:
-                documents.append({
-                    "text": chunk["text"],
-                    "metadata": chunk["metadata"],
-                    "id": f"{Path(file_path).stem}_chunk_{chunk['metadata']['chunk_index']}"
-                })
-            
-            storage_result = self.rag_system.add_documents(documents, workspace)
+            if sync_result["status"] == "unchanged":
+                message = f"Document unchanged (version {sync_result['version']}); nothing re-embedded"
+            else:
+                message = (
+                    f"Successfully processed {processing_result['total_chunks']} chunks "
+                    f"({sync_result['chunks_added']} embedded, {sync_result['chunks_removed']} removed)"
+                )
             
             return {
                 "status": "success",
-                "message": f"Successfully processed {processing_result['total_chunks']} chunks",
+                "message": message,
                 "file_path": file_path,
+                "doc_key": doc_key,
+                "version": sync_result["version"],
+                "unchanged": sync_result["status"] == "unchanged",
                 "file_type": processing_result["file_type"],
                 "chunks_processed": processing_result["total_chunks"],
-                "total_documents": storage_result["total_documents"]
+                "chunks_added": sync_result["chunks_added"],
+                "chunks_removed": sync_result["chunks_removed"],
+                "chunks_unchanged": sync_result["chunks_unchanged"],
+                "batches_streamed": sync_result.get("batches_streamed"),
+                "total_documents": sync_result.get("total_documents"),
+                "ingest_report": sync_result.get("ingest_report")
             }
             
         except Exception as e:
@@ -123,10 +175,80 @@ class RAGService:
                 "status": "error",
                 "message": f"Document ingestion failed: {e}"
             }
+
+    def ingest_directory(self, directory: str, workspace: str = 'default',
+                         incremental: bool = True) -> Dict[str, Any]:
+        """
+        Ingest every supported document in a folder (recursively).
+
+        All PDF and Word files are queued on the conversion pool up front, so
+        they convert in parallel while earlier files are being embedded;
+        each file is then ingested in name order, joining its running
+        conversion or reading it from the conversion cache.
+
+        Args:
+            directory: Folder to ingest
+            workspace: Workspace/Knowledge Base identifier
+            incremental: False re-embeds and rewrites every chunk
+
+        Returns:
+            Per-file ingestion results and totals
+        """
+        if not self.available:
+            return {"status": "error", "message": "RAG system not available"}
+
+        root = Path(directory)
+        if not root.is_dir():
+            return {"status": "error", "message": f"Directory not found: {directory}"}
+
+        files = sorted(
+            path for path in root.rglob('*')
+            if path.is_file() and path.suffix.lower() in INGESTIBLE_EXTENSIONS
+        )
+        to_convert = [path for path in files if path.suffix.lower() in DOCLING_EXTENSIONS]
+        if to_convert:
+            threading.Thread(
+                target=self.document_processor.conversion.prefetch,
+                args=(to_convert,),
+                daemon=True,
+                name='rag-prefetch'
+            ).start()
+
+        results = [self.ingest_document(str(path), workspace, incremental=incremental) for path in files]
+        succeeded = [r for r in results if r.get("status") == "success"]
+        return {
+            "status": "success" if len(succeeded) == len(results) else "partial",
+            "message": f"Ingested {len(succeeded)} of {len(results)} documents from {directory}",
+            "directory": str(directory),
+            "documents_processed": len(results),
+            "documents_failed": len(results) - len(succeeded),
+            "chunks_added": sum(r.get("chunks_added", 0) for r in succeeded),
+            "results": results
+        }
+
+    def remove_document_by_key(self, doc_key: str, workspace: str = 'default') -> Dict[str, Any]:
+        """
+        Remove a document by the doc_key it was ingested under.
+
+        Args:
+            doc_key: Stable document identity used at ingestion
+            workspace: Workspace/Knowledge Base identifier
+
+        Returns:
+            Deletion result dictionary
+        """
+        if not self.available:
+            return {"status": "error", "message": "RAG system not available"}
+        try:
+            result = self.rag_system.remove_document_by_key(doc_key, workspace)
+            return {"status": "success", **result}
+        except Exception as e:
+            logger.error(f"Document removal failed: {e}")
+            return {"status": "error", "message": f"Document removal failed: {e}"}
     
     def search_documents(self, query: str, max_results: int = 5, workspace: str = 'default') -> Dict[str, Any]:
         """
-        Search documents using semantic similarity.
+        Search documents using hybrid BM25 + semantic retrieval.
         
         Args:
             query: Search query
@@ -149,7 +271,8 @@ class RAGService:
                 "status": "success",
                 "query": query,
                 "results": results["results"],
-                "total_found": results["total_found"]
+                "total_found": results["total_found"],
+                "retrieval": results.get("retrieval")
             }
         except Exception as e:
             logger.error(f"Document search failed: {e}")
@@ -185,7 +308,8 @@ class RAGService:
                 "query": query,
                 "answer": result["answer"],
                 "sources": result["sources"][:3],  # Limit sources for web display
-                "model_used": result["model_used"]
+                "model_used": result["model_used"],
+                "retrieval": result.get("retrieval")
             }
         except Exception as e:
             logger.error(f"RAG query failed: {e}")
@@ -195,6 +319,41 @@ class RAGService:
                 "answer": f"Sorry, I encountered an error: {e}"
             }
     
+    def prepare_rag_query(self, query: str, max_context: int = 5, workspace: str = 'default') -> Dict[str, Any]:
+        """
+        Retrieve context and build the prompt without generating an answer.
+
+        Args:
+            query: User question
+            max_context: Maximum context documents
+            workspace: Workspace/Knowledge Base identifier
+
+        Returns:
+            Dictionary with sources, chat messages and model_used
+        """
+        if not self.available:
+            return {
+                "status": "error",
+                "message": "RAG system not available"
+            }
+
+        try:
+            result = self.rag_system.prepare_rag_query(query, max_context, workspace)
+            return {
+                "status": "success",
+                "query": query,
+                "sources": result["sources"][:3],  # Limit sources for web display
+                "messages": result["messages"],
+                "model_used": result["model_used"],
+                "retrieval": result.get("retrieval")
+            }
+        except Exception as e:
+            logger.error(f"RAG query preparation failed: {e}")
+            return {
+                "status": "error",
+                "message": f"RAG query preparation failed: {e}"
+            }
+
     def get_documents(self, workspace: str = 'default') -> Dict[str, Any]:
         """
         Get metadata for all ingested documents in a specific workspace.
@@ -244,17 +403,18 @@ class RAGService:
             }
         
         try:
-            status = self.rag_system.get_system_status()
-            documents = self.rag_system.get_documents_metadata()
-            
-            # Calculate total chunks
-            total_chunks = sum(doc.get('chunks', 0) for doc in documents)
+            # Totals come from the document catalog, not a scan of every chunk
+            catalog_stats = self.rag_system.get_catalog_stats('default')
             
             return {
                 "status": "success",
-                "document_count": len(documents),  # Use actual document count, not chunk count
-                "chunk_count": total_chunks,
-                "query_count": getattr(self.rag_system, 'query_count', 0)  # Placeholder for now
+                "document_count": catalog_stats["documents"],  # Use actual document count, not chunk count
+                "chunk_count": catalog_stats["chunks"],
+                "size_bytes": catalog_stats["size_bytes"],
+                "query_count": getattr(self.rag_system, 'query_count', 0),  # Placeholder for now
+                "embedding": self.rag_system.embedding_pipeline.get_stats(),
+                "vector_storage": self.rag_system.get_vector_storage_stats('default'),
+                "query_cache": self.rag_system.get_query_cache_stats()
             }
         except Exception as e:
             logger.error(f"Failed to get analytics: {e}")
@@ -286,6 +446,10 @@ class RAGService:
 
         try:
             result = self.rag_system.get_vector_chunks_for_knowledge_graph(workspace)
+            # Embeddings stay arrays internally; lists only for the JSON response
+            for chunk in result.get('chunks', []):
+                if hasattr(chunk.get('embedding'), 'tolist'):
+                    chunk['embedding'] = chunk['embedding'].tolist()
             return {
                 "status": "success",
                 **result
@@ -300,6 +464,41 @@ class RAGService:
                 "total_chunks": 0
             }
 
+    def get_knowledge_graph(self, workspace: str = 'default') -> Dict[str, Any]:
+        """
+        Knowledge graph of a workspace, cached per workspace version.
+
+        Repeat requests return the cached graph without reading Chroma;
+        after an ingestion only the new chunks are fetched and analyzed.
+
+        Args:
+            workspace: Workspace/Knowledge Base identifier
+
+        Returns:
+            Graph dictionary (entities, relationships, metadata) with "status"
+        """
+        if not self.available:
+            return {"status": "error", "message": "RAG system not available",
+                    "entities": [], "relationships": []}
+
+        try:
+            if self.knowledge_graph_cache is None:
+                from knowledge_graph_builder import KnowledgeGraphCache
+                self.knowledge_graph_cache = KnowledgeGraphCache()
+
+            graph = self.knowledge_graph_cache.get(
+                workspace,
+                self.rag_system.workspace_versions.get(workspace),
+                self.rag_system.get_chunk_index,
+                lambda ws, ids: self.rag_system.get_vector_chunks_for_knowledge_graph(ws, ids)['chunks']
+            )
+            return {"status": "success", **graph}
+
+        except Exception as e:
+            logger.error(f"Knowledge graph retrieval failed: {e}")
+            return {"status": "error", "message": f"Knowledge graph retrieval failed: {e}",
+                    "entities": [], "relationships": []}
+
     def delete_document(self, document_id: str, workspace: str = 'default') -> Dict[str, Any]:
         """
         Delete a document from the RAG system.
@@ -364,9 +563,24 @@ def handle_rag_query_request(query: str, max_context: int = 5, workspace: str =
     return rag_service.query_rag(query, max_context, workspace)
 
 
-def handle_rag_ingest_request(file_path: str, workspace: str = 'default'):
-    """Handle RAG document ingestion request."""
-    return rag_service.ingest_document(file_path, workspace)
+def handle_rag_prepare_request(query: str, max_context: int = 5, workspace: str = 'default'):
+    """Handle RAG retrieval for a streamed answer."""
+    return rag_service.prepare_rag_query(query, max_context, workspace)
+
+
+def handle_rag_ingest_request(file_path: str, workspace: str = 'default', doc_key: str = None):
+    """Handle RAG document ingestion request (incremental by doc_key)."""
+    return rag_service.ingest_document(file_path, workspace, doc_key=doc_key)
+
+
+def handle_rag_ingest_directory_request(directory: str, workspace: str = 'default'):
+    """Handle ingestion of every supported document in a folder."""
+    return rag_service.ingest_directory(directory, workspace)
+
+
+def handle_rag_document_remove_request(doc_key: str, workspace: str = 'default'):
+    """Handle removal of a document by the doc_key it was ingested under."""
+    return rag_service.remove_document_by_key(doc_key, workspace)
 
 
 def handle_rag_documents_request(workspace: str = 'default'):
@@ -384,6 +598,11 @@ def handle_rag_document_delete_request(document_id: str, workspace: str = 'defau
     return rag_service.delete_document(document_id, workspace)
 
 
+def handle_rag_knowledge_graph_request(workspace: str = 'default'):
+    """Handle knowledge graph request (cached per workspace version)."""
+    return rag_service.get_knowledge_graph(workspace)
+
+
 def handle_rag_vector_chunks_request(workspace: str = 'default'):
     """Handle RAG vector chunks request for knowledge graph."""
     return rag_service.get_vector_chunks_for_knowledge_graph(workspace)
@@ -3,61 +3,119 @@
 HTTP server startup for the Robobrain UI web application on port 9090.
 
 Responsibilities:
-  - Initialize any system-level singletons that must be ready at startup
-  - Build the application router
-  - Start the HTTPServer
+  - Build the application router (heavy route modules are registered
+    lazily; see server/lazy_imports.py)
+  - Start the HTTP server (bounded worker pool by default; see
+    server/http_server.py for SERVER_MODE / SERVER_MAX_WORKERS /
+    SERVER_QUEUE_DEPTH)
+  - Once listening, warm up in a background thread: agent system
+    managers, deferred route modules (RAG, agents, shredding, ...) and
+    the static asset cache
+
+Usage:
+    python server.py                    # serve on PORT (default 9090)
+    python server.py --profile-startup  # report import/init time per module and exit
 """
 
 import atexit
 import os
 import sys
-from http.server import HTTPServer
+import threading
+from contextlib import nullcontext
+
+# ---------------------------------------------------------------------------
+# --profile-startup: install the import timer before anything else loads
+# ---------------------------------------------------------------------------
+_PROFILE_STARTUP = '--profile-startup' in sys.argv
+if _PROFILE_STARTUP:
+    from server.startup_profiler import start_profiling
+    _profiler = start_profiling()
+else:
+    _profiler = None
 
-# Import debug logger
-from debug_logger import debug_log, error_log
 
-# Import Ollama configuration (ensures config is loaded before routes)
-from ollama_config import ollama_config  # noqa: F401
+def _phase(name):
+    """Time a startup phase when profiling; no-op otherwise."""
+    return _profiler.phase(name) if _profiler else nullcontext()
 
-# Import server decorators (side-effects only at startup)
-from server_decorators import require_system  # noqa: F401
 
 # ---------------------------------------------------------------------------
 # Add project root to sys.path so agent_system and other local packages resolve
 # ---------------------------------------------------------------------------
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# ---------------------------------------------------------------------------
-# Initialize agent system managers (start background processes if needed)
-# ---------------------------------------------------------------------------
-try:
-    from agent_system.mcp.server_manager import initialize_default_servers
-    from agent_system.agents.agent_config import MojoOptimizedAgentManager
-    from agent_system.security.local_security import ZeroCostLocalSecurity
-
-    mcp_manager = initialize_default_servers()
-    agent_manager = MojoOptimizedAgentManager()
-    security_manager = ZeroCostLocalSecurity()
-    print("✅ Agent managers initialized")
-except ImportError as e:
-    mcp_manager = None
-    agent_manager = None
-    security_manager = None
-    print(f"⚠️  Agent system not available: {e}")
+with _phase('core imports'):
+    # Import debug logger
+    from debug_logger import debug_log, error_log  # noqa: F401
+
+    # Import Ollama configuration (ensures config is loaded before routes)
+    from ollama_config import ollama_config  # noqa: F401
+
+    # Import server decorators (side-effects only at startup)
+    from server_decorators import require_system  # noqa: F401
 
 # ---------------------------------------------------------------------------
 # Build router and inject into request handler
 # ---------------------------------------------------------------------------
-from server.routes_builder import build_router
-import server.request_handler as _handler_mod
+with _phase('build router'):
+    from server.routes_builder import build_router
+    from server.middleware.timing import TimingMiddleware
+    import server.request_handler as _handler_mod
+
+    # Per-route timing for /api/metrics wraps every API dispatch
+    _handler_mod._router = TimingMiddleware(build_router())
+
+with _phase('server imports'):
+    from server.request_handler import CustomHTTPRequestHandler
+    from server.http_server import create_server
+    from server.lazy_imports import pending_modules, warm_lazy_handlers
+    from static_cache import warm_static_cache
 
-_handler_mod._router = build_router()
+    # Ensure pooled DB connections are released cleanly on server shutdown
+    from server.db_pool import close_all
+    atexit.register(close_all)
 
-from server.request_handler import CustomHTTPRequestHandler
 
-# Ensure pooled DB connections are released cleanly on server shutdown
-from server.db_pool import close_all
-atexit.register(close_all)
+# ---------------------------------------------------------------------------
+# Agent system managers — started by the warm-up thread, not at import
+# ---------------------------------------------------------------------------
+mcp_manager = None
+agent_manager = None
+security_manager = None
+
+
+def init_agent_managers():
+    """Initialize agent system managers (MCP servers, agents, security policy)."""
+    global mcp_manager, agent_manager, security_manager
+    try:
+        from agent_system.mcp.server_manager import initialize_default_servers
+        from agent_system.agents.agent_config import MojoOptimizedAgentManager
+        from agent_system.security.local_security import ZeroCostLocalSecurity
+
+        mcp_manager = initialize_default_servers()
+        agent_manager = MojoOptimizedAgentManager()
+        security_manager = ZeroCostLocalSecurity()
+        print("✅ Agent managers initialized")
+    except ImportError as e:
+        print(f"⚠️  Agent system not available: {e}")
+
+
+def warm_up(root):
+    """
+    Initialize heavy subsystems after the server is listening.
+
+    Args:
+        root: Directory served as static files.
+    """
+    with _phase('warm-up: agent managers'):
+        init_agent_managers()
+    for module in pending_modules():
+        with _phase(f'warm-up: {module}'):
+            warm_lazy_handlers([module])
+    # Precompress index.html, styles.css and js/
+    with _phase('warm-up: static cache'):
+        warm_static_cache(root)
+    debug_log("Background warm-up complete", "🔥")
 
 
 # ---------------------------------------------------------------------------
@@ -70,10 +128,30 @@ _PORT = int(os.getenv('PORT', '9090'))
 def main():
     """Start the HTTP server on the configured port (default 9090, override with PORT env var)."""
     server_address = ('', _PORT)
-    httpd = HTTPServer(server_address, CustomHTTPRequestHandler)
+    with _phase('bind server'):
+        httpd = create_server(server_address, CustomHTTPRequestHandler)
+
+    if _profiler:
+        listen_s = _profiler.mark('listening')
+        print(f'⏱️  Time to listen: {listen_s * 1000:.0f} ms')
+        warm_up(os.getcwd())
+        _profiler.mark('warm-up complete')
+        _profiler.report()
+        httpd.server_close()
+        return
+
     print(f'🚀 Server running on http://localhost:{_PORT}')
     print(f'📂 Serving files from: {os.getcwd()}')
-    httpd.serve_forever()
+    threading.Thread(target=warm_up, args=(os.getcwd(),), daemon=True, name='startup-warmup').start()
+    if hasattr(httpd, 'get_stats'):
+        stats = httpd.get_stats()
+        print(f"🧵 Worker pool: {stats['max_workers']} workers, queue depth {stats['queue_depth']}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
 
 
 if __name__ == '__main__':
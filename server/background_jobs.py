@@ -1,52 +1,281 @@
 """
-server/background_jobs.py — Lightweight in-process background job queue.
+server/background_jobs.py — Bounded, persistent in-process job executor.
 
-Runs jobs in daemon threads so the HTTP request handler returns immediately.
-Designed for the 5-user local deployment: no Redis, no Celery, just threads.
+Jobs run on a fixed pool of worker threads so the HTTP request handler
+returns immediately. Designed for the 5-user local deployment: no Redis,
+no Celery, just threads and SQLite.
+
+- Named queues, each with its own fixed set of workers:
+    llm  LLM-bound work (color-team ingest, shredding); kept small so
+         jobs don't pile onto the shared Ollama concurrency limit
+    io   File/network work (default)
+    cpu  Parsing and number crunching
+- Within a queue, lower priority values run first; equal priorities FIFO.
+- Pending jobs can be cancelled outright; running jobs are flagged and
+  stop at their next cancellation check (see is_cancelled()).
+- Job state is written through to SQLite, so status stays pollable after
+  a restart. Jobs that were pending/running when the process died are
+  reported as errors ("Interrupted by server restart"); the callables
+  themselves are not persisted. Finished jobs are deleted after a TTL.
+
+Configuration (environment variables):
+    JOBS_DB_PATH       SQLite file (default <project root>/jobs.db)
+    JOB_WORKERS_LLM    Workers on the llm queue (default 1)
+    JOB_WORKERS_IO     Workers on the io queue (default 4)
+    JOB_WORKERS_CPU    Workers on the cpu queue (default half the CPUs)
+    JOB_TTL_SECONDS    Age after which finished jobs are purged (default 86400)
 
 Usage:
-    from server.background_jobs import job_store
+    from server.background_jobs import job_store, QUEUE_LLM
 
     job_id = job_store.submit(my_fn, arg1, arg2, kwarg=value)
-    # → returns immediately
+    # → returns immediately (io queue, normal priority)
+
+    job_id = job_store.enqueue(my_fn, (arg1,), queue=QUEUE_LLM,
+                               pass_job_id=True, name='shred')
 
     status = job_store.get(job_id)
-    # → {'status': 'pending'|'running'|'done'|'error',
-    #    'result': ..., 'error': None, 'progress': '...'}
+    # → {'status': 'pending'|'running'|'done'|'error'|'cancelled',
+    #    'result': ..., 'error': None, 'progress': '...', ...}
 """
 
 from __future__ import annotations
 
+import heapq
+import itertools
+import json
 import logging
+import os
 import threading
+import time
 import uuid
-from typing import Any, Callable, Dict, Optional
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from project_paths import get_project_root
+from server.db_pool import get_db
 
 logger = logging.getLogger(__name__)
 
 # Job lifecycle states
-_PENDING = "pending"
-_RUNNING = "running"
-_DONE    = "done"
-_ERROR   = "error"
+_PENDING   = "pending"
+_RUNNING   = "running"
+_DONE      = "done"
+_ERROR     = "error"
+_CANCELLED = "cancelled"
+
+_FINISHED = (_DONE, _ERROR, _CANCELLED)
+
+# Queue names
+QUEUE_LLM = "llm"
+QUEUE_IO  = "io"
+QUEUE_CPU = "cpu"
+
+# Lower value = runs first within a queue
+PRIORITY_HIGH   = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW    = 10
+
+_DEFAULT_WORKERS = {
+    QUEUE_LLM: 1,
+    QUEUE_IO: 4,
+    QUEUE_CPU: max(1, (os.cpu_count() or 2) // 2),
+}
+_DEFAULT_TTL = 24 * 3600
+_CLEANUP_INTERVAL = 300
+_TIMING_WINDOW = 200
+
+# Fields returned by get(); everything else in the in-memory entry is internal
+_PUBLIC_FIELDS = ("job_id", "name", "queue", "priority", "status", "result", "error",
+                  "progress", "created_at", "started_at", "finished_at")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS background_jobs (
+    job_id      TEXT PRIMARY KEY,
+    name        TEXT,
+    queue       TEXT NOT NULL,
+    priority    INTEGER NOT NULL,
+    status      TEXT NOT NULL,
+    progress    TEXT,
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_background_jobs_finished
+    ON background_jobs(status, finished_at);
+"""
+
+
+class JobCancelledError(Exception):
+    """Raised by a job (via check_cancelled) to stop after a cancel request."""
+
+
+class _Queue:
+    """Pending-job heap and counters for one named queue; guarded by _JobStore._lock."""
+
+    def __init__(self, name: str, workers: int, lock: threading.Lock) -> None:
+        self.name = name
+        self.workers = workers
+        self.cond = threading.Condition(lock)
+        self.heap: List = []  # (priority, seq, job_id)
+        self.threads: List[threading.Thread] = []
+        self.depth = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.waits = deque(maxlen=_TIMING_WINDOW)
+        self.runs = deque(maxlen=_TIMING_WINDOW)
+
+
+def _percentile_ms(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] * 1000, 1)
+
+
+def _encode_result(result: Any) -> Optional[str]:
+    try:
+        return json.dumps(result, default=str)
+    except (TypeError, ValueError):
+        return None
 
 
 class _JobStore:
     """
-    Thread-safe in-memory store for background job state.
+    Thread-safe job executor with a write-through SQLite job table.
 
     Attributes:
-        _lock: Protects _jobs dict from concurrent modification.
-        _jobs: Maps job_id str → job state dict.
+        _lock: Protects _jobs, _tasks and every queue's heap and counters.
+        _jobs: Maps job_id → job state dict for jobs seen by this process.
+        _tasks: Maps pending job_id → (fn, args, kwargs) until a worker takes it.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        workers: Optional[Dict[str, int]] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.db_path = str(db_path or os.getenv("JOBS_DB_PATH", get_project_root() / "jobs.db"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("JOB_TTL_SECONDS", str(_DEFAULT_TTL)))
         self._lock = threading.Lock()
         self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, tuple] = {}
+        self._seq = itertools.count()
+        self._stopping = False
+        self._last_cleanup = 0.0
+        self._db_ready = False
+
+        workers = workers or {}
+        self._queues: Dict[str, _Queue] = {}
+        for name, default in _DEFAULT_WORKERS.items():
+            count = workers.get(name) or int(os.getenv(f"JOB_WORKERS_{name.upper()}", str(default)))
+            self._queues[name] = _Queue(name, max(1, count), self._lock)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _ensure_db(self) -> None:
+        """Create the job table and settle jobs left over from a previous run."""
+        if self._db_ready:
+            return
+        with self._lock:
+            if self._db_ready:
+                return
+            try:
+                with get_db(self.db_path) as conn:
+                    conn.executescript(_SCHEMA)
+                    interrupted = conn.execute(
+                        "UPDATE background_jobs SET status = ?, error = ?, progress = ?, finished_at = ? "
+                        "WHERE status IN (?, ?)",
+                        (_ERROR, "Interrupted by server restart", "Interrupted", time.time(),
+                         _PENDING, _RUNNING),
+                    ).rowcount
+                    conn.commit()
+                if interrupted:
+                    logger.warning("Marked %d unfinished job(s) from a previous run as interrupted", interrupted)
+            except Exception as exc:
+                logger.error("Job persistence unavailable (%s): %s", self.db_path, exc)
+            self._db_ready = True
+        self.cleanup()
+
+    def _persist(self, job: Dict[str, Any]) -> None:
+        try:
+            with get_db(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO background_jobs "
+                    "(job_id, name, queue, priority, status, progress, result, error, "
+                    " created_at, started_at, finished_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job["job_id"], job["name"], job["queue"], job["priority"], job["status"],
+                     job["progress"], _encode_result(job["result"]), job["error"],
+                     job["created_at"], job["started_at"], job["finished_at"]),
+                )
+                conn.commit()
+        except Exception as exc:
+            logger.error("Failed to persist job %s: %s", job["job_id"][:8], exc)
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_db()
+        try:
+            with get_db(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT * FROM background_jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+        except Exception as exc:
+            logger.error("Failed to load job %s: %s", job_id[:8], exc)
+            return None
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["result"] = json.loads(entry["result"]) if entry["result"] else None
+        return entry
+
+    def cleanup(self, max_age: Optional[float] = None) -> int:
+        """
+        Delete finished jobs older than the TTL from memory and SQLite.
+
+        Args:
+            max_age: Age in seconds; defaults to the store TTL.
+
+        Returns:
+            int: Number of persisted jobs removed.
+        """
+        cutoff = time.time() - (self.ttl_seconds if max_age is None else max_age)
+        with self._lock:
+            self._last_cleanup = time.time()
+            expired = [jid for jid, job in self._jobs.items()
+                       if job["status"] in _FINISHED and (job["finished_at"] or 0) < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+        try:
+            with get_db(self.db_path) as conn:
+                removed = conn.execute(
+                    "DELETE FROM background_jobs WHERE status IN (?, ?, ?) AND finished_at < ?",
+                    (*_FINISHED, cutoff),
+                ).rowcount
+                conn.commit()
+        except Exception as exc:
+            logger.error("Job cleanup failed: %s", exc)
+            return 0
+        if removed:
+            logger.debug("Purged %d finished job(s)", removed)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
 
     def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> str:
         """
-        Submit a callable to run in a background daemon thread.
+        Submit a callable to the io queue at normal priority.
 
         Args:
             fn: The function to call.
@@ -56,7 +285,7 @@ class _JobStore:
         Returns:
             str: Unique job ID for polling.
         """
-        return self._enqueue(fn, args, kwargs)
+        return self.enqueue(fn, args, kwargs)
 
     def submit_with_id(self, fn: Callable, *args: Any, **kwargs: Any) -> str:
         """
@@ -72,69 +301,173 @@ class _JobStore:
         Returns:
             str: Unique job ID for polling.
         """
+        return self.enqueue(fn, args, kwargs, pass_job_id=True)
+
+    def enqueue(
+        self,
+        fn: Callable,
+        args: tuple = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        *,
+        queue: str = QUEUE_IO,
+        priority: int = PRIORITY_NORMAL,
+        pass_job_id: bool = False,
+        name: Optional[str] = None,
+    ) -> str:
+        """
+        Queue fn(*args, **kwargs) on a named queue.
+
+        Args:
+            fn: The function to call.
+            args: Positional arguments.
+            kwargs: Keyword arguments.
+            queue: QUEUE_LLM, QUEUE_IO or QUEUE_CPU.
+            priority: Lower runs first within the queue.
+            pass_job_id: Prepend the job_id to args (for progress reporting).
+            name: Label shown in status and metrics; defaults to fn.__name__.
+
+        Returns:
+            str: Unique job ID for polling.
+
+        Raises:
+            ValueError: If queue is not a known queue name.
+        """
+        if queue not in self._queues:
+            raise ValueError(f"Unknown job queue: {queue!r}")
+        self._ensure_db()
+        if time.time() - self._last_cleanup > _CLEANUP_INTERVAL:
+            self.cleanup()
+
         job_id = str(uuid.uuid4())
-        self._register(job_id)
-        t = threading.Thread(
-            target=self._run,
-            args=(job_id, fn, (job_id,) + args, kwargs),
-            daemon=True,
-            name=f"bg-job-{job_id[:8]}",
-        )
-        t.start()
-        logger.debug("Submitted (with_id) job %s → %s", job_id[:8], fn.__name__)
-        return job_id
+        if pass_job_id:
+            args = (job_id,) + tuple(args)
+        job = {
+            "job_id": job_id,
+            "name": name or getattr(fn, "__name__", "job"),
+            "queue": queue,
+            "priority": priority,
+            "status": _PENDING,
+            "result": None,
+            "error": None,
+            "progress": "Queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "cancel_requested": False,
+        }
+        self._persist(job)
 
-    def _register(self, job_id: str) -> None:
+        q = self._queues[queue]
         with self._lock:
-            self._jobs[job_id] = {
-                "status": _PENDING,
-                "result": None,
-                "error": None,
-                "progress": "Queued",
-            }
-
-    def _enqueue(self, fn: Callable, args: tuple, kwargs: dict) -> str:
-        job_id = str(uuid.uuid4())
-        self._register(job_id)
-        t = threading.Thread(
-            target=self._run,
-            args=(job_id, fn, args, kwargs),
-            daemon=True,
-            name=f"bg-job-{job_id[:8]}",
-        )
-        t.start()
-        logger.debug("Submitted background job %s → %s", job_id[:8], fn.__name__)
+            if self._stopping:
+                raise RuntimeError("Job executor is shut down")
+            self._jobs[job_id] = job
+            self._tasks[job_id] = (fn, tuple(args), kwargs or {})
+            heapq.heappush(q.heap, (priority, next(self._seq), job_id))
+            q.depth += 1
+            q.submitted += 1
+            self._start_workers(q)
+            q.cond.notify()
+        logger.debug("Queued job %s → %s on %s", job_id[:8], job["name"], queue)
         return job_id
 
-    def _run(self, job_id: str, fn: Callable, args: tuple, kwargs: dict) -> None:
-        """Execute fn in the current (background) thread and record outcome."""
-        self._update(job_id, status=_RUNNING, progress="Running")
+    def _start_workers(self, q: _Queue) -> None:
+        """Start q's workers on first use (caller holds _lock)."""
+        if q.threads:
+            return
+        for i in range(q.workers):
+            t = threading.Thread(target=self._worker, args=(q,), daemon=True,
+                                 name=f"bg-{q.name}-{i}")
+            q.threads.append(t)
+            t.start()
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _next(self, q: _Queue) -> Optional[tuple]:
+        """Block until a job is available on q; None once shut down and drained."""
+        with self._lock:
+            while True:
+                while q.heap:
+                    _, _, job_id = heapq.heappop(q.heap)
+                    task = self._tasks.pop(job_id, None)
+                    if task is None:
+                        continue  # cancelled while queued
+                    job = self._jobs[job_id]
+                    now = time.time()
+                    job.update(status=_RUNNING, progress="Running", started_at=now)
+                    q.depth -= 1
+                    q.running += 1
+                    q.waits.append(now - job["created_at"])
+                    return job, task
+                if self._stopping:
+                    return None
+                q.cond.wait()
+
+    def _worker(self, q: _Queue) -> None:
+        while True:
+            item = self._next(q)
+            if item is None:
+                return
+            job, (fn, args, kwargs) = item
+            self._run(q, job, fn, args, kwargs)
+
+    def _run(self, q: _Queue, job: Dict[str, Any], fn: Callable, args: tuple, kwargs: dict) -> None:
+        """Execute fn in the current worker thread and record the outcome."""
+        job_id = job["job_id"]
+        self._persist(job)
+        started = time.perf_counter()
+        fields: Dict[str, Any]
         try:
             result = fn(*args, **kwargs)
-            self._update(job_id, status=_DONE, result=result, progress="Complete")
-            logger.debug("Job %s finished successfully", job_id[:8])
+            if job["cancel_requested"]:
+                fields = {"status": _CANCELLED, "progress": "Cancelled"}
+            else:
+                fields = {"status": _DONE, "result": result, "progress": "Complete"}
+            logger.debug("Job %s finished (%s)", job_id[:8], fields["status"])
+        except JobCancelledError:
+            fields = {"status": _CANCELLED, "progress": "Cancelled"}
         except Exception as exc:
             logger.exception("Job %s failed: %s", job_id[:8], exc)
-            self._update(job_id, status=_ERROR, error=str(exc), progress="Failed")
+            fields = {"status": _ERROR, "error": str(exc), "progress": "Failed"}
 
-    def _update(self, job_id: str, **fields: Any) -> None:
         with self._lock:
-            if job_id in self._jobs:
-                self._jobs[job_id].update(fields)
+            job.update(fields, finished_at=time.time())
+            q.running -= 1
+            q.runs.append(time.perf_counter() - started)
+            if job["status"] == _DONE:
+                q.completed += 1
+            elif job["status"] == _CANCELLED:
+                q.cancelled += 1
+            else:
+                q.failed += 1
+            snapshot = dict(job)
+        self._persist(snapshot)
+
+    # ------------------------------------------------------------------
+    # Status, progress and cancellation
+    # ------------------------------------------------------------------
 
     def get(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
         Return the current state of a job, or None if not found.
 
+        Jobs from a previous run are read back from SQLite.
+
         Args:
             job_id: Job UUID returned by submit().
 
         Returns:
-            dict with keys: status, result, error, progress.
+            dict with keys: status, result, error, progress, plus job_id,
+            name, queue, priority and created/started/finished timestamps.
         """
         with self._lock:
             entry = self._jobs.get(job_id)
-            return dict(entry) if entry else None
+            if entry is not None:
+                return {k: entry[k] for k in _PUBLIC_FIELDS}
+        entry = self._load(job_id)
+        return {k: entry[k] for k in _PUBLIC_FIELDS} if entry else None
 
     def update_progress(self, job_id: str, message: str) -> None:
         """
@@ -144,7 +477,112 @@ class _JobStore:
             job_id: Job UUID.
             message: Human-readable progress description.
         """
-        self._update(job_id, progress=message)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["progress"] = message
+        try:
+            with get_db(self.db_path) as conn:
+                conn.execute("UPDATE background_jobs SET progress = ? WHERE job_id = ?",
+                             (message, job_id))
+                conn.commit()
+        except Exception as exc:
+            logger.debug("Failed to persist progress for job %s: %s", job_id[:8], exc)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job.
+
+        A pending job is removed from its queue immediately. A running job
+        is flagged; it stops at its next check_cancelled() call, and
+        its result is discarded if it finishes anyway.
+
+        Args:
+            job_id: Job UUID.
+
+        Returns:
+            bool: False if the job is unknown or already finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in _FINISHED:
+                return False
+            if job["status"] == _PENDING:
+                self._tasks.pop(job_id, None)
+                q = self._queues[job["queue"]]
+                q.depth -= 1
+                q.cancelled += 1
+                job.update(status=_CANCELLED, progress="Cancelled", finished_at=time.time())
+            else:
+                job.update(cancel_requested=True, progress="Cancelling")
+            snapshot = dict(job)
+        self._persist(snapshot)
+        logger.info("Cancel requested for job %s (%s)", job_id[:8], snapshot["status"])
+        return True
+
+    def is_cancelled(self, job_id: str) -> bool:
+        """Whether cancel() has been called for a job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return bool(job and (job["cancel_requested"] or job["status"] == _CANCELLED))
+
+    def check_cancelled(self, job_id: str) -> None:
+        """
+        Raise JobCancelledError if the job has been cancelled.
+
+        Long-running jobs call this between steps to stop promptly.
+        """
+        if self.is_cancelled(job_id):
+            raise JobCancelledError(job_id)
+
+    # ------------------------------------------------------------------
+    # Introspection and lifecycle
+    # ------------------------------------------------------------------
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Return per-queue depth, throughput and timing metrics.
+
+        Returns:
+            dict: {'queues': {name: {workers, depth, running, submitted,
+            completed, failed, cancelled, wait_mean_ms, wait_p95_ms,
+            run_mean_ms}}, 'tracked_jobs': int}
+        """
+        with self._lock:
+            queues = {}
+            for name, q in self._queues.items():
+                waits, runs = list(q.waits), list(q.runs)
+                queues[name] = {
+                    "workers": q.workers,
+                    "depth": q.depth,
+                    "running": q.running,
+                    "submitted": q.submitted,
+                    "completed": q.completed,
+                    "failed": q.failed,
+                    "cancelled": q.cancelled,
+                    "wait_mean_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                    "wait_p95_ms": _percentile_ms(waits, 95),
+                    "run_mean_ms": round(sum(runs) / len(runs) * 1000, 1) if runs else 0.0,
+                }
+            return {"queues": queues, "tracked_jobs": len(self._jobs)}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting jobs; workers exit once their queues are drained.
+
+        Args:
+            wait: Join the worker threads before returning.
+        """
+        with self._lock:
+            self._stopping = True
+            threads = []
+            for q in self._queues.values():
+                q.cond.notify_all()
+                threads.extend(q.threads)
+        if wait:
+            for t in threads:
+                t.join()
 
 
 # Module-level singleton — import and use this everywhere
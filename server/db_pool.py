@@ -22,9 +22,12 @@ Usage:
 
 import sqlite3
 import threading
+import time
 from contextlib import contextmanager
 from typing import Generator
 
+from server.middleware.timing import record_db_time
+
 # Thread-local storage: maps db_path → sqlite3.Connection
 _local = threading.local()
 
@@ -94,11 +97,15 @@ def get_db(db_path: str) -> Generator[sqlite3.Connection, None, None]:
             conn.commit()
     """
     conn = get_connection(db_path)
+    started = time.perf_counter()
     try:
         yield conn
     except Exception:
         conn.rollback()
         raise
+    finally:
+        # Attributed to the current request in /api/metrics
+        record_db_time(time.perf_counter() - started)
 
 
 def close_all() -> None:
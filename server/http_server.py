@@ -0,0 +1,204 @@
+"""
+server/http_server.py — Concurrent HTTP serving front end.
+
+The stdlib HTTPServer handles one request at a time, so a single 30–120 s
+Ollama call on /api/chat blocks static assets and health checks for every
+other user.  BoundedThreadPoolHTTPServer keeps the same request handler
+(CustomHTTPRequestHandler → Router.dispatch) but hands each accepted
+connection to a fixed pool of worker threads:
+
+  - max_workers caps how many requests run at once
+  - queue_depth caps how many accepted connections may wait for a worker;
+    beyond that the connection is answered with 503 + Retry-After instead
+    of piling up unbounded
+  - each worker is a long-lived thread, so server/db_pool.py keeps exactly
+    one SQLite connection per worker per database, and close_all() runs on
+    worker exit to release them
+
+Configuration (environment variables):
+    SERVER_MODE          'threaded' (default) or 'single' (legacy HTTPServer)
+    SERVER_MAX_WORKERS   Worker thread count (default 16)
+    SERVER_QUEUE_DEPTH   Pending-connection limit (default 64)
+
+Usage:
+    from server.http_server import create_server
+
+    httpd = create_server(('', 9090), CustomHTTPRequestHandler)
+    httpd.serve_forever()
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from http.server import HTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from server.db_pool import close_all
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_QUEUE_DEPTH = 64
+
+_REJECT_RESPONSE = (
+    b"HTTP/1.0 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"Content-Length: 35\r\n"
+    b"\r\n"
+    b'{"error": "Server busy, try again"}'
+)
+
+# Sentinel placed on the queue once per worker to stop it.
+_STOP = None
+
+
+class BoundedThreadPoolHTTPServer(HTTPServer):
+    """
+    HTTPServer that dispatches connections to a bounded worker pool.
+
+    The accept loop (serve_forever) stays on the calling thread and only
+    enqueues sockets, so it never blocks on a slow handler.
+
+    Attributes:
+        max_workers: Number of worker threads.
+        queue_depth: Maximum connections waiting for a free worker.
+    """
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        handler_class,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        bind_and_activate: bool = True,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be >= 1")
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._queue: "queue.Queue[Optional[Tuple[Any, Any, float]]]" = queue.Queue(maxsize=queue_depth)
+        self._stats_lock = threading.Lock()
+        self._active = 0
+        self._handled = 0
+        self._rejected = 0
+        self._max_wait = 0.0
+        self._workers = []
+        super().__init__(server_address, handler_class, bind_and_activate)
+        for i in range(max_workers):
+            t = threading.Thread(target=self._worker_loop, daemon=True, name=f"http-worker-{i}")
+            t.start()
+            self._workers.append(t)
+
+    # ------------------------------------------------------------------
+    # socketserver hooks
+    # ------------------------------------------------------------------
+
+    def process_request(self, request, client_address) -> None:
+        """Queue the connection for a worker, or reject it when the queue is full."""
+        try:
+            self._queue.put_nowait((request, client_address, time.monotonic()))
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            logger.warning("Request queue full (%d); rejecting %s", self.queue_depth, client_address)
+            try:
+                request.sendall(_REJECT_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        """Close the listening socket, then drain and stop the worker pool."""
+        super().server_close()
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for t in self._workers:
+            t.join(timeout=5)
+        self._workers = []
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self) -> None:
+        """Serve queued connections until the stop sentinel arrives."""
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                request, client_address, enqueued_at = item
+                waited = time.monotonic() - enqueued_at
+                with self._stats_lock:
+                    self._active += 1
+                    if waited > self._max_wait:
+                        self._max_wait = waited
+                try:
+                    self.finish_request(request, client_address)
+                except Exception:
+                    self.handle_error(request, client_address)
+                finally:
+                    self.shutdown_request(request)
+                    with self._stats_lock:
+                        self._active -= 1
+                        self._handled += 1
+        finally:
+            # Release this worker's thread-local SQLite connections
+            close_all()
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return worker-pool counters.
+
+        Returns:
+            dict with max_workers, queue_depth, queued, active, handled,
+            rejected and max_queue_wait_ms.
+        """
+        with self._stats_lock:
+            return {
+                'mode': 'threaded',
+                'max_workers': self.max_workers,
+                'queue_depth': self.queue_depth,
+                'queued': self._queue.qsize(),
+                'active': self._active,
+                'handled': self._handled,
+                'rejected': self._rejected,
+                'max_queue_wait_ms': round(self._max_wait * 1000, 2),
+            }
+
+
+def create_server(server_address: Tuple[str, int], handler_class) -> HTTPServer:
+    """
+    Build the HTTP server selected by SERVER_MODE.
+
+    Args:
+        server_address: (host, port) tuple.
+        handler_class: BaseHTTPRequestHandler subclass.
+
+    Returns:
+        BoundedThreadPoolHTTPServer in 'threaded' mode (default), or a plain
+        single-threaded HTTPServer when SERVER_MODE=single.
+    """
+    mode = os.getenv('SERVER_MODE', 'threaded').lower()
+    if mode == 'single':
+        return HTTPServer(server_address, handler_class)
+    if mode != 'threaded':
+        raise ValueError(f"Unknown SERVER_MODE: {mode!r} (expected 'threaded' or 'single')")
+    return BoundedThreadPoolHTTPServer(
+        server_address,
+        handler_class,
+        max_workers=int(os.getenv('SERVER_MAX_WORKERS', str(DEFAULT_MAX_WORKERS))),
+        queue_depth=int(os.getenv('SERVER_QUEUE_DEPTH', str(DEFAULT_QUEUE_DEPTH))),
+    )
@@ -0,0 +1,143 @@
+"""
+server/lazy_imports.py — Deferred route modules and background warm-up.
+
+Route modules for the heavy subsystems (RAG, CAG, agents, shredding,
+search, visualizations) pull in ChromaDB, sentence-transformers, Docling,
+scikit-learn and friends at import time. Registering them through
+lazy_handler() keeps those imports off the startup path: the module is
+imported on the first request that needs it, or earlier by
+warm_lazy_handlers() running in a background thread once the server is
+listening.
+
+Feature gates use module_available(), which locates modules without
+executing them.
+
+Usage:
+    from server.lazy_imports import lazy_handler, module_available
+
+    RAG_AVAILABLE = module_available('rag_api')
+    handle_rag_query_route = lazy_handler('server.routes.rag', 'handle_rag_query_api')
+    r.add('POST', '/api/rag/query', handle_rag_query_route, enabled=RAG_AVAILABLE)
+
+    # after the socket is bound
+    threading.Thread(target=warm_lazy_handlers, daemon=True).start()
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# module path → [handler, ...]; guarded by _lock
+_registry: Dict[str, List['_LazyHandler']] = {}
+_lock = threading.RLock()
+
+
+class _LazyHandler:
+    """
+    Route action that imports its module on first call.
+
+    Carries the target's __module__/__name__ so Router.describe() lists
+    the same action name as an eagerly imported handler.
+    """
+
+    def __init__(self, module: str, name: str):
+        self.__module__ = module
+        self.__name__ = name
+        self._target: Optional[Callable] = None
+        self._error: Optional[Exception] = None
+
+    def resolve(self) -> Optional[Callable]:
+        """Import the module and return the handler (None if it failed to import)."""
+        if self._target is None and self._error is None:
+            with _lock:
+                if self._target is None and self._error is None:
+                    try:
+                        module = importlib.import_module(self.__module__)
+                        self._target = getattr(module, self.__name__)
+                    except (ImportError, AttributeError) as e:
+                        self._error = e
+                        logger.error("Lazy route %s.%s unavailable: %s", self.__module__, self.__name__, e)
+        return self._target
+
+    def __call__(self, handler, *args):
+        target = self.resolve()
+        if target is None:
+            handler.send_json_response({
+                'status': 'error',
+                'message': f'{self.__module__} not available: {self._error}',
+            }, 503)
+            return None
+        return target(handler, *args)
+
+
+def lazy_handler(module: str, name: str) -> _LazyHandler:
+    """
+    Return a route action for module.name that is imported on first use.
+
+    Args:
+        module: Dotted module path (e.g. 'server.routes.rag').
+        name: Handler function name within the module.
+
+    Returns:
+        Callable(handler, *captured) suitable for Router.add().
+    """
+    handler = _LazyHandler(module, name)
+    with _lock:
+        _registry.setdefault(module, []).append(handler)
+    return handler
+
+
+def module_available(*modules: str) -> bool:
+    """
+    Whether every named module can be found, without importing it.
+
+    Args:
+        *modules: Dotted module names.
+
+    Returns:
+        bool: True if all modules are locatable on sys.path.
+    """
+    for name in modules:
+        try:
+            if importlib.util.find_spec(name) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+    return True
+
+
+def pending_modules() -> List[str]:
+    """Modules registered through lazy_handler() that have not been imported yet."""
+    with _lock:
+        return [m for m, handlers in _registry.items()
+                if any(h._target is None and h._error is None for h in handlers)]
+
+
+def warm_lazy_handlers(modules: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Import deferred route modules ahead of their first request.
+
+    Intended for a daemon thread started after the server is listening.
+    Failures are logged and reported by the handler on first use.
+
+    Args:
+        modules: Subset to warm; defaults to every pending module.
+
+    Returns:
+        dict: module → seconds spent importing it.
+    """
+    timings = {}
+    for module in modules or pending_modules():
+        start = time.perf_counter()
+        with _lock:
+            handlers = list(_registry.get(module, []))
+        for handler in handlers:
+            handler.resolve()
+        timings[module] = time.perf_counter() - start
+        logger.debug("Warmed %s in %.2fs", module, timings[module])
+    return timings
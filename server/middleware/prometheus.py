@@ -0,0 +1,105 @@
+"""
+server/middleware/prometheus.py — Prometheus text exposition (format 0.0.4).
+
+A small writer for the handful of metric families /api/metrics serves;
+no client library needed.
+
+Usage:
+    from server.middleware.prometheus import PrometheusWriter
+
+    out = PrometheusWriter()
+    out.family('robobrain_jobs_depth', 'gauge', 'Pending jobs per queue')
+    out.sample('robobrain_jobs_depth', 3, queue='llm')
+    text = out.render()
+"""
+
+from typing import List
+
+from server.middleware.timing import LATENCY_BUCKETS, RequestMetrics
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class PrometheusWriter:
+    """Accumulates HELP/TYPE headers and samples; render() returns the text body."""
+
+    def __init__(self):
+        self._lines: List[str] = []
+        self._declared = set()
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        """Declare a metric family once (counter, gauge, histogram, summary)."""
+        if name in self._declared:
+            return
+        self._declared.add(name)
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, **labels) -> None:
+        """Append one sample line."""
+        if labels:
+            body = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            self._lines.append(f"{name}{{{body}}} {_number(value)}")
+        else:
+            self._lines.append(f"{name} {_number(value)}")
+
+    def render(self) -> str:
+        return '\n'.join(self._lines) + '\n'
+
+
+def write_request_metrics(out: PrometheusWriter, metrics: RequestMetrics) -> None:
+    """Write the per-route request families from a RequestMetrics registry."""
+    rows = metrics.snapshot()
+    requests = [r for r in rows if r['count']]
+
+    out.family('robobrain_http_requests_total', 'counter', 'API requests by route and status code')
+    for r in requests:
+        for status, n in sorted(r['statuses'].items()):
+            out.sample('robobrain_http_requests_total', n, method=r['method'], route=r['route'], status=status)
+
+    out.family('robobrain_http_response_bytes_total', 'counter', 'Response bytes written by API routes')
+    for r in requests:
+        out.sample('robobrain_http_response_bytes_total', r['bytes_out'], method=r['method'], route=r['route'])
+
+    out.family('robobrain_http_request_duration_seconds', 'histogram', 'API request latency')
+    for r in requests:
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float('inf'),), r['buckets']):
+            cumulative += n
+            out.sample('robobrain_http_request_duration_seconds_bucket', cumulative,
+                       method=r['method'], route=r['route'], le=_number(bound))
+        out.sample('robobrain_http_request_duration_seconds_sum', r['latency_sum'],
+                   method=r['method'], route=r['route'])
+        out.sample('robobrain_http_request_duration_seconds_count', r['count'],
+                   method=r['method'], route=r['route'])
+
+    out.family('robobrain_http_request_latency_quantile_seconds', 'gauge',
+               'Latency quantiles estimated from the histogram buckets')
+    for r in requests:
+        for q in ('p50', 'p95', 'p99'):
+            out.sample('robobrain_http_request_latency_quantile_seconds', r[q],
+                       method=r['method'], route=r['route'], quantile=f"0.{q[1:]}")
+
+    for kind, help_text in (('db', 'Time inside server.db_pool.get_db blocks'),
+                            ('ollama', 'Time inside Ollama client calls')):
+        used = [r for r in rows if r[f'{kind}_calls']]
+        out.family(f'robobrain_{kind}_seconds_total', 'counter', f'{help_text}, by API route')
+        for r in used:
+            out.sample(f'robobrain_{kind}_seconds_total', r[f'{kind}_seconds'], method=r['method'], route=r['route'])
+        out.family(f'robobrain_{kind}_calls_total', 'counter', f'{help_text} (count), by API route')
+        for r in used:
+            out.sample(f'robobrain_{kind}_calls_total', r[f'{kind}_calls'], method=r['method'], route=r['route'])
@@ -0,0 +1,262 @@
+"""
+server/middleware/timing.py — Request timing middleware and Prometheus metrics.
+
+TimingMiddleware wraps Router.dispatch and records, per (method, route
+pattern):
+
+  - request count by status code
+  - response bytes written
+  - a latency histogram (fixed buckets; p50/p95/p99 estimated at scrape time)
+  - time spent inside DB calls (server.db_pool.get_db) and Ollama calls
+    (ollama_client), accumulated through a thread-local request scope
+
+Work outside any request (background jobs, warm-up) is recorded under the
+route label "<background>".
+
+The hot path is two perf_counter() calls, a bisect into the bucket list
+and one short critical section; percentiles and text rendering happen only
+when /api/metrics is scraped.
+
+Usage:
+    from server.middleware.timing import TimingMiddleware
+
+    _handler_mod._router = TimingMiddleware(build_router())
+
+    # inside a DB or Ollama helper
+    from server.middleware.timing import record_db_time
+    record_db_time(elapsed_seconds)
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds; the implicit last bucket is +Inf
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+UNMATCHED_ROUTE = '<unmatched>'
+BACKGROUND_ROUTE = '<background>'
+
+_local = threading.local()
+
+
+class _RouteStats:
+    """Counters for one (method, route); guarded by RequestMetrics._lock."""
+
+    __slots__ = ('statuses', 'bytes_out', 'buckets', 'latency_sum',
+                 'db_seconds', 'db_calls', 'ollama_seconds', 'ollama_calls')
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.bytes_out = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.db_seconds = 0.0
+        self.db_calls = 0
+        self.ollama_seconds = 0.0
+        self.ollama_calls = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.buckets)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile by linear interpolation within its bucket."""
+        total = self.count
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else lower * 2 or 1.0
+                return lower + (upper - lower) * ((rank - seen) / n)
+            seen += n
+        return LATENCY_BUCKETS[-1]
+
+
+class _Scope:
+    """Per-request accumulator for DB and Ollama time."""
+
+    __slots__ = ('db_seconds', 'db_calls', 'ollama_seconds', 'ollama_calls')
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.db_calls = 0
+        self.ollama_seconds = 0.0
+        self.ollama_calls = 0
+
+
+class _CountingWriter:
+    """File-like proxy over handler.wfile that counts bytes written."""
+
+    __slots__ = ('_raw', 'written')
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+        return self._raw.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class RequestMetrics:
+    """Thread-safe registry of per-route request statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self.started_at = time.time()
+
+    def _stats(self, method: str, route: str) -> _RouteStats:
+        key = (method, route)
+        stats = self._routes.get(key)
+        if stats is None:
+            stats = self._routes.setdefault(key, _RouteStats())
+        return stats
+
+    def observe(self, method: str, route: str, status: int, elapsed: float,
+                bytes_out: int = 0, scope: Optional[_Scope] = None) -> None:
+        """Record one finished request."""
+        bucket = bisect_left(LATENCY_BUCKETS, elapsed)
+        with self._lock:
+            stats = self._stats(method, route)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.buckets[bucket] += 1
+            stats.latency_sum += elapsed
+            stats.bytes_out += bytes_out
+            if scope is not None:
+                stats.db_seconds += scope.db_seconds
+                stats.db_calls += scope.db_calls
+                stats.ollama_seconds += scope.ollama_seconds
+                stats.ollama_calls += scope.ollama_calls
+
+    def observe_background(self, kind: str, elapsed: float) -> None:
+        """Record DB/Ollama time spent outside any request."""
+        with self._lock:
+            stats = self._stats('-', BACKGROUND_ROUTE)
+            if kind == 'db':
+                stats.db_seconds += elapsed
+                stats.db_calls += 1
+            else:
+                stats.ollama_seconds += elapsed
+                stats.ollama_calls += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Return per-route statistics as plain dicts.
+
+        Returns:
+            List of dicts with method, route, count, statuses, bytes_out,
+            latency_sum, p50/p95/p99 (seconds), buckets and DB/Ollama totals.
+        """
+        with self._lock:
+            rows = []
+            for (method, route), s in sorted(self._routes.items(), key=lambda kv: (kv[0][1], kv[0][0])):
+                rows.append({
+                    'method': method,
+                    'route': route,
+                    'count': s.count,
+                    'statuses': dict(s.statuses),
+                    'bytes_out': s.bytes_out,
+                    'latency_sum': s.latency_sum,
+                    'p50': s.quantile(0.50),
+                    'p95': s.quantile(0.95),
+                    'p99': s.quantile(0.99),
+                    'buckets': list(s.buckets),
+                    'db_seconds': s.db_seconds,
+                    'db_calls': s.db_calls,
+                    'ollama_seconds': s.ollama_seconds,
+                    'ollama_calls': s.ollama_calls,
+                })
+            return rows
+
+
+# Process-wide registry used by the middleware and /api/metrics
+request_metrics = RequestMetrics()
+
+
+def _record(kind: str, elapsed: float) -> None:
+    scope = getattr(_local, 'scope', None)
+    if scope is None:
+        request_metrics.observe_background(kind, elapsed)
+    elif kind == 'db':
+        scope.db_seconds += elapsed
+        scope.db_calls += 1
+    else:
+        scope.ollama_seconds += elapsed
+        scope.ollama_calls += 1
+
+
+def record_db_time(elapsed: float) -> None:
+    """Attribute seconds spent in a DB call to the current request (or background)."""
+    _record('db', elapsed)
+
+
+def record_ollama_time(elapsed: float) -> None:
+    """Attribute seconds spent in an Ollama call to the current request (or background)."""
+    _record('ollama', elapsed)
+
+
+class TimingMiddleware:
+    """
+    Router wrapper that times every dispatched request.
+
+    Exposes the wrapped router's API (add, match, describe, ...) so it can
+    replace the router on the request handler unchanged.
+    """
+
+    def __init__(self, router, metrics: Optional[RequestMetrics] = None):
+        self.router = router
+        self.metrics = metrics or request_metrics
+
+    def dispatch(self, method: str, path: str, handler) -> bool:
+        """
+        Match, invoke and record one request.
+
+        Returns:
+            True if a route matched, False otherwise (recorded as 404 under
+            the "<unmatched>" route).
+        """
+        started = time.perf_counter()
+        found = self.router.match(method, path)
+        if found is None:
+            self.metrics.observe(method, UNMATCHED_ROUTE, 404, time.perf_counter() - started)
+            return False
+
+        route, params = found
+        label = route.match if isinstance(route.match, str) else '<predicate>'
+        scope = _Scope()
+        previous = getattr(_local, 'scope', None)
+        _local.scope = scope
+        handler.response_status = None
+        writer = _CountingWriter(handler.wfile)
+        handler.wfile = writer
+        try:
+            self.router.invoke(route, params, handler)
+        except Exception:
+            if handler.response_status is None:
+                handler.response_status = 500
+            raise
+        finally:
+            handler.wfile = writer._raw
+            _local.scope = previous
+            self.metrics.observe(method, label, handler.response_status or 200,
+                                 time.perf_counter() - started, writer.written, scope)
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self.router, name)
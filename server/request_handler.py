@@ -6,7 +6,6 @@ The `_router` module-level variable must be set by server.py before
 the HTTPServer is started.
 """
 
-import gzip
 import os
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
@@ -19,7 +18,7 @@ _GZIP_TYPES = (
 )
 
 from debug_logger import debug_log, error_log
-from static_cache import get_static_cache
+from static_cache import choose_encoding, get_static_cache
 from server.utils.json_response import send_json_response as send_json_response_util
 from server.utils.request_helpers import (
     get_content_type as get_content_type_util,
@@ -59,13 +58,28 @@ class CustomHTTPRequestHandler(BaseHTTPRequestHandler):
 
             debug_log(f"Request: {self.path} -> {file_path}")
 
-            if not os.path.exists(full_path) or not os.path.isfile(full_path):
+            if not os.path.isfile(full_path):
                 self.send_error(404, f"File not found: {self.path}")
                 return
 
             content_type = self.get_content_type(file_path)
 
+            # Determine cache policy: immutable assets (images, fonts, woff) get 1h;
+            # mutable source files (JS, CSS, HTML) require revalidation every request.
+            _MUTABLE_TYPES = ('text/javascript', 'application/javascript', 'text/css', 'text/html')
+            cache_control = (
+                'no-cache, must-revalidate'
+                if any(content_type.startswith(t) for t in _MUTABLE_TYPES)
+                else 'public, max-age=3600'
+            )
+
             static_cache = get_static_cache()
+
+            # Large uploads/outputs (PDF, PPTX) bypass the cache entirely
+            if static_cache.is_large(os.path.getsize(full_path)):
+                self._send_large_file(full_path, content_type, cache_control)
+                return
+
             content, etag = static_cache.get(full_path)
 
             if content is None:
@@ -76,29 +90,29 @@ class CustomHTTPRequestHandler(BaseHTTPRequestHandler):
             else:
                 debug_log(f"Cache HIT: {file_path}", "⚡")
 
-            # Determine cache policy: immutable assets (images, fonts, woff) get 1h;
-            # mutable source files (JS, CSS, HTML) require revalidation every request.
-            _MUTABLE_TYPES = ('text/javascript', 'application/javascript', 'text/css', 'text/html')
-            cache_control = (
-                'no-cache, must-revalidate'
-                if any(content_type.startswith(t) for t in _MUTABLE_TYPES)
-                else 'public, max-age=3600'
-            )
+            # Serve a precompressed variant from the cache when the client
+            # accepts one; each encoding carries its own ETag.
+            compressible = any(content_type.startswith(t) for t in _GZIP_TYPES)
+            encoding = None
+            if compressible:
+                encoding = choose_encoding(self.headers.get('Accept-Encoding'))
+                if encoding:
+                    encoded, encoded_etag = static_cache.get_encoded(full_path, encoding)
+                    if encoded is None:
+                        encoding = None
+                    else:
+                        content, etag = encoded, encoded_etag
 
             # Quick Win 2: If-None-Match → 304 Not Modified
-            if self.headers.get('If-None-Match') == etag:
+            if self._etag_matches(etag):
                 self.send_response(304)
                 self.send_header('ETag', etag)
                 self.send_header('Cache-Control', cache_control)
+                if compressible:
+                    self.send_header('Vary', 'Accept-Encoding')
                 self.end_headers()
                 return
 
-            # Quick Win 4: Gzip compression for text assets
-            accepts_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
-            use_gzip = accepts_gzip and any(content_type.startswith(t) for t in _GZIP_TYPES)
-            if use_gzip:
-                content = gzip.compress(content, compresslevel=6)
-
             self.send_response(200)
             self.send_header('Content-Type', content_type)
             self.send_header('Content-Length', str(len(content)))
@@ -107,8 +121,9 @@ class CustomHTTPRequestHandler(BaseHTTPRequestHandler):
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            if use_gzip:
-                self.send_header('Content-Encoding', 'gzip')
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if compressible:
                 self.send_header('Vary', 'Accept-Encoding')
             self.end_headers()
             self.wfile.write(content)
@@ -119,6 +134,45 @@ class CustomHTTPRequestHandler(BaseHTTPRequestHandler):
             print(f"❌ Error serving {self.path}: {e}")
             self.send_error(500, f"Internal server error: {e}")
 
+    def _etag_matches(self, etag):
+        """Whether If-None-Match lists this ETag."""
+        if_none_match = self.headers.get('If-None-Match')
+        return bool(if_none_match) and etag in (t.strip() for t in if_none_match.split(','))
+
+    def _send_large_file(self, full_path, content_type, cache_control):
+        """
+        Stream a file too large for StaticCache straight from disk.
+
+        Uses socket.sendfile (zero-copy os.sendfile where supported) so the
+        file is never read into the Python heap. The ETag is derived from
+        mtime and size instead of hashing the content.
+        """
+        with open(full_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            etag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+            if self._etag_matches(etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', cache_control)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(st.st_size))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+            # Count before sending so stats are current once the client has the body
+            get_static_cache().record_passthrough(st.st_size)
+            self.connection.sendfile(f, 0, st.st_size)
+
+        debug_log(f"Streamed {full_path} ({st.st_size} bytes) via sendfile", "📤")
+
     def do_POST(self):
         """Handle POST requests — API dispatch via router."""
         try:
@@ -184,6 +238,11 @@ class CustomHTTPRequestHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
+    def send_response(self, code, message=None):
+        """Record the status code (for request metrics), then send the status line."""
+        self.response_status = code
+        super().send_response(code, message)
+
     def send_json_response(self, data, status_code=200):
         """Send a JSON response."""
         send_json_response_util(self, data, status_code)
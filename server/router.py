@@ -1,22 +1,38 @@
 """
-server/router.py — Lightweight URL router for CustomHTTPRequestHandler.
+server/router.py — Compiled URL router for CustomHTTPRequestHandler.
 
-Routes are stored per HTTP method so dispatch only scans same-method routes
-(O(k) where k is the count for that verb, not O(n) total).
+Routes are declared as path patterns and compiled into a per-method segment
+trie, so dispatch walks one node per path segment instead of calling a
+predicate for every registered route.
 
-`match_fn(path)` returns True when the route applies.
-`action` is either a no-argument method name on the handler instance
-or a callable(handler) that handles the request directly.
+Pattern syntax (one token per '/'-separated segment):
+    literal        matches that exact segment             /api/todos
+    {name}         matches one non-empty segment and      /api/tasks/{task_id}
+                   passes it to the action positionally
+    *              matches one non-empty segment,         /api/opportunities/*/ptw
+                   not passed (handler parses self.path)
+    **             final token only: matches one or more  /api/mcp/servers/**
+                   remaining segments, not passed
 
-All handler methods must be *argument-free* — they extract any path
-parameters from `self.path` internally.
+Precedence is by specificity, not registration order: at each segment a
+literal beats a single-segment wildcard, which beats `**`.  Registering the
+same pattern twice for a verb keeps the first action.
+
+`action` is either a zero-argument method name on the handler instance or a
+callable(handler, *captured) that handles the request directly.  Captured
+`{name}` values are also exposed as `handler.path_params` (dict) for every
+route.
+
+For backward compatibility `match` may still be a predicate callable(path)
+→ bool; such routes are scanned linearly after the trie misses.
 
 Usage:
     from server.router import Router
 
     _router = Router()
-    _router.add('GET',  lambda p: p == '/api/health',  'handle_health_api')
-    _router.add('DELETE', lambda p: p.startswith('/api/items/'), 'handle_item_delete_api')
+    _router.add('GET',    '/api/health',            'handle_health_api')
+    _router.add('DELETE', '/api/items/{item_id}',   handle_item_delete)   # handle_item_delete(handler, item_id)
+    _router.add('GET',    '/api/rag/documents',     handle_docs, enabled=RAG_AVAILABLE)
 
     # In do_GET / do_POST / do_DELETE:
     if _router.dispatch('GET', self.path, self):
@@ -24,40 +40,133 @@ Usage:
     self.send_error(404, f"Not found: {self.path}")
 """
 
-from typing import Callable, Dict, List, NamedTuple, Union
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
 
 class _Route(NamedTuple):
     method: str
-    match: Callable[[str], bool]
-    action: Union[str, Callable]  # method name OR callable(handler)
+    match: Union[str, Callable[[str], bool]]
+    action: Union[str, Callable]  # method name OR callable(handler, *captured)
+    # For pattern routes: positions (within wildcard matches) that are named captures
+    captures: Tuple[Tuple[int, str], ...] = ()
+
+
+class _Node:
+    """One trie level; children keyed by literal segment."""
+
+    __slots__ = ('static', 'wild', 'rest', 'route')
+
+    def __init__(self) -> None:
+        self.static: Dict[str, '_Node'] = {}
+        self.wild: Optional['_Node'] = None      # {name} or *
+        self.rest: Optional[_Route] = None       # **
+        self.route: Optional[_Route] = None      # terminal
+
+
+def _split(path: str) -> List[str]:
+    """Split a bare path into segments ('/api/x/' → ['api', 'x', ''])."""
+    return path[1:].split('/') if path.startswith('/') else path.split('/')
 
 
 class Router:
-    """Route registry with per-method O(k) dispatch."""
+    """Route registry with per-method trie dispatch."""
 
     def __init__(self) -> None:
-        # Keyed by uppercase HTTP verb → ordered list of routes for that verb.
+        # Keyed by uppercase HTTP verb → trie root for that verb.
+        self._tries: Dict[str, _Node] = {}
+        # Keyed by uppercase HTTP verb → legacy predicate routes, in order.
         self._routes: Dict[str, List[_Route]] = {}
-
-    def add(self, method: str, match: Callable[[str], bool], action: Union[str, Callable]) -> None:
+        # Registration-order record of every route for introspection.
+        self._table: List[Dict[str, Any]] = []
+
+    def add(
+        self,
+        method: str,
+        match: Union[str, Callable[[str], bool]],
+        action: Union[str, Callable],
+        enabled: bool = True,
+    ) -> None:
         """
         Register a route.
 
         Args:
             method: HTTP verb ('GET', 'POST', 'DELETE', 'PUT').
-            match: Callable that returns True when the path matches.
+            match: Path pattern (see module docstring), or a legacy
+                   predicate callable(path) → bool.
             action: Zero-argument method name on the handler instance,
-                    OR a callable(handler) that handles the request directly.
+                    OR a callable(handler, *captured) that handles the request.
+            enabled: Feature gate; disabled routes are listed by describe()
+                     but never dispatched.
+        """
+        verb = method.upper()
+        self._table.append({
+            'method': verb,
+            'pattern': match if isinstance(match, str) else '<predicate>',
+            'action': _action_name(action),
+            'params': _param_names(match) if isinstance(match, str) else [],
+            'enabled': enabled,
+        })
+        if not enabled:
+            return
+
+        if not isinstance(match, str):
+            self._routes.setdefault(verb, []).append(_Route(verb, match, action))
+            return
+
+        node = self._tries.setdefault(verb, _Node())
+        segments = _split(match)
+        captures = []
+        wild_index = 0
+        for i, seg in enumerate(segments):
+            if seg == '**':
+                if i != len(segments) - 1:
+                    raise ValueError(f"'**' must be the last segment: {match}")
+                if node.rest is None:
+                    node.rest = _Route(verb, match, action, tuple(captures))
+                return
+            if seg == '*' or (seg.startswith('{') and seg.endswith('}')):
+                if seg != '*':
+                    captures.append((wild_index, seg[1:-1]))
+                wild_index += 1
+                if node.wild is None:
+                    node.wild = _Node()
+                node = node.wild
+            else:
+                node = node.static.setdefault(seg, _Node())
+        if node.route is None:
+            node.route = _Route(verb, match, action, tuple(captures))
+
+    def match(self, method: str, path: str) -> Optional[Tuple[_Route, Dict[str, str]]]:
+        """
+        Resolve a path to its route without invoking it.
+
+        Args:
+            method: HTTP verb.
+            path: Request path (may include query string).
+
+        Returns:
+            (route, path_params) or None when nothing matches.
         """
         verb = method.upper()
-        if verb not in self._routes:
-            self._routes[verb] = []
-        self._routes[verb].append(_Route(verb, match, action))
+        # Strip query string for matching
+        bare = path.split('?', 1)[0]
+
+        root = self._tries.get(verb)
+        if root is not None:
+            wild_values: List[str] = []
+            route = _walk(root, _split(bare), 0, wild_values)
+            if route is not None:
+                params = {name: wild_values[idx] for idx, name in route.captures}
+                return route, params
+
+        for route in self._routes.get(verb, ()):
+            if route.match(bare):
+                return route, {}
+        return None
 
     def dispatch(self, method: str, path: str, handler) -> bool:
         """
-        Find and invoke the first matching route for this HTTP method.
+        Find and invoke the matching route for this HTTP method.
 
         Args:
             method: HTTP verb of the incoming request.
@@ -67,17 +176,66 @@ class Router:
         Returns:
             True if a route matched and was invoked, False otherwise.
         """
-        verb = method.upper()
-        routes = self._routes.get(verb)
-        if not routes:
+        found = self.match(method, path)
+        if found is None:
             return False
-        # Strip query string for matching
-        bare = path.split('?')[0]
-        for route in routes:
-            if route.match(bare):
-                if callable(route.action) and not isinstance(route.action, str):
-                    route.action(handler)
-                else:
-                    getattr(handler, route.action)()
-                return True
-        return False
+        self.invoke(found[0], found[1], handler)
+        return True
+
+    def invoke(self, route: _Route, params: Dict[str, str], handler) -> None:
+        """
+        Run a matched route's action (the second half of dispatch()).
+
+        Args:
+            route: Route returned by match().
+            params: Captured `{name}` values returned by match().
+            handler: Handler instance.
+        """
+        handler.path_params = params
+        if callable(route.action) and not isinstance(route.action, str):
+            route.action(handler, *params.values())
+        else:
+            getattr(handler, route.action)()
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """
+        Return the route table in registration order.
+
+        Returns:
+            List of dicts with method, pattern, action, params and enabled.
+        """
+        return [dict(entry) for entry in self._table]
+
+
+def _walk(node: _Node, segs: List[str], i: int, wild_values: List[str]) -> Optional[_Route]:
+    """Depth-first trie match: literal, then single wildcard, then '**'."""
+    if i == len(segs):
+        return node.route
+
+    seg = segs[i]
+    child = node.static.get(seg)
+    if child is not None:
+        route = _walk(child, segs, i + 1, wild_values)
+        if route is not None:
+            return route
+
+    if node.wild is not None and seg:
+        wild_values.append(seg)
+        route = _walk(node.wild, segs, i + 1, wild_values)
+        if route is not None:
+            return route
+        wild_values.pop()
+
+    return node.rest
+
+
+def _param_names(pattern: str) -> List[str]:
+    return [s[1:-1] for s in _split(pattern) if s.startswith('{') and s.endswith('}')]
+
+
+def _action_name(action: Union[str, Callable]) -> str:
+    if isinstance(action, str):
+        return action
+    name = getattr(action, '__name__', repr(action))
+    module = getattr(action, '__module__', None)
+    return f"{module}.{name}" if module else name
@@ -1,14 +1,10 @@
 """CAG (Cache-Augmented Generation) route handlers."""
 
-import json
-import uuid
-import urllib.request
-from pathlib import Path
-
 from debug_logger import debug_log
-from ollama_config import ollama_config
+from ollama_client import PRIORITY_INTERACTIVE, get_ollama_client
 from server_decorators import require_system
 from server.utils.error_handler import error_handler
+from server.utils.multipart import UploadError, parse_multipart
 
 try:
     from cag_api import get_cag_manager, calculate_optimal_cag_capacity
@@ -18,6 +14,11 @@ except ImportError:
     CAG_AVAILABLE = False
     cag_manager = None
 
+# A CAG prompt carries the whole preloaded context, so a CPU generation can
+# run for minutes; a single attempt, since repeating it on a read timeout
+# only multiplies the load
+CAG_GENERATE_TIMEOUT = 600
+
 
 @error_handler
 def handle_cag_status_api(handler):
@@ -46,47 +47,31 @@ def handle_cag_load_api(handler):
         handler.send_json_response({'error': 'CAG system not available'}, 503)
         return
 
-    content_length = int(handler.headers.get('Content-Length', 0))
-    if content_length == 0:
-        handler.send_json_response({'error': 'No data received'}, 400)
-        return
-
     content_type = handler.headers.get('Content-Type', '')
 
     if content_type.startswith('multipart/form-data'):
-        import cgi
-        import io
-
-        post_data = handler.rfile.read(content_length)
-
-        environ = {
-            'REQUEST_METHOD': 'POST',
-            'CONTENT_TYPE': content_type,
-            'CONTENT_LENGTH': str(content_length),
-        }
-
-        fields = cgi.FieldStorage(
-            fp=io.BytesIO(post_data),
-            environ=environ,
-            keep_blank_values=True
-        )
-
-        if 'file' not in fields:
-            handler.send_json_response({'error': 'No file uploaded'}, 400)
+        # Stream the upload to a temp file; load_document gets the path
+        try:
+            form = parse_multipart(handler)
+        except UploadError as e:
+            debug_log(f"Rejected CAG upload: {e}", "⚠️")
+            handler.send_json_response({'error': str(e)}, e.status)
             return
 
-        file_item = fields['file']
-        filename = file_item.filename
-        file_data = file_item.file.read()
-
-        temp_path = Path(f'/tmp/cag_{uuid.uuid4()}_{filename}')
-        temp_path.write_bytes(file_data)
+        with form:
+            file_item = form.files.get('file')
+            if file_item is None:
+                handler.send_json_response({'error': 'No file uploaded'}, 400)
+                return
 
-        result = cag_manager.load_document(str(temp_path))
-        temp_path.unlink()
+            debug_log(f"CAG upload: {file_item.filename} ({file_item.size:,} bytes)", "📤")
+            result = cag_manager.load_document(file_item.path)
         handler.send_json_response(result)
 
     else:
+        if int(handler.headers.get('Content-Length', 0) or 0) == 0:
+            handler.send_json_response({'error': 'No data received'}, 400)
+            return
         request_data = handler.get_request_body()
         if request_data is None:
             handler.send_json_response({'error': 'Invalid JSON'}, 400)
@@ -144,21 +129,9 @@ def handle_cag_query_api(handler):
 
     full_context = cag_manager.get_context_for_query(query)
 
-    ollama_url = f"{ollama_config.base_url}/api/generate"
-    payload = {
-        'model': model,
-        'prompt': full_context,
-        'stream': False
-    }
-
-    req = urllib.request.Request(
-        ollama_url,
-        data=json.dumps(payload).encode('utf-8'),
-        headers={'Content-Type': 'application/json'}
-    )
-
-    with urllib.request.urlopen(req) as response:
-        result = json.loads(response.read().decode('utf-8'))
+    result = get_ollama_client().generate(model, full_context, caller='cag',
+                                          priority=PRIORITY_INTERACTIVE,
+                                          timeout=CAG_GENERATE_TIMEOUT, retries=1)
 
     handler.send_json_response({
         'status': 'success',
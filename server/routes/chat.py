@@ -4,17 +4,21 @@ import json
 import os
 import sys
 import asyncio
-import base64
-import tempfile
+import threading
+import time
+from collections import deque
 from pathlib import Path
 
 from debug_logger import debug_log, error_log
-from ollama_config import ollama_config
+from ollama_client import PRIORITY_INTERACTIVE
+from ollama_config import OllamaStreamError, ollama_config
 from server.utils.error_handler import error_handler
+from server.utils.multipart import UploadError, parse_multipart, remove_spooled, spool_base64
+from server.utils.sse import SSEStream
 
 # Import RAG functionality if available
 try:
-    from rag_api import handle_rag_query_request
+    from rag_api import CHAT_CONTEXT_CHUNKS, handle_rag_prepare_request, handle_rag_query_request
     RAG_AVAILABLE = True
 except ImportError:
     RAG_AVAILABLE = False
@@ -34,6 +38,9 @@ except ImportError:
     AGENTS_AVAILABLE = False
     debug_log("Ollama Agent Runtime not available", "⚠️")
 
+# Chat is interactive: admitted ahead of batch work on the shared Ollama client
+_CHAT_CALL = {'caller': 'chat', 'priority': PRIORITY_INTERACTIVE}
+
 
 @error_handler
 def handle_chat_api(handler):
@@ -43,6 +50,11 @@ def handle_chat_api(handler):
     Args:
         handler: The HTTP request handler instance
     """
+    # MCP tool calls with file inputs arrive as multipart (files streamed to disk)
+    if handler.headers.get('Content-Type', '').startswith('multipart/form-data'):
+        _handle_chat_upload(handler)
+        return
+
     # Read request body
     request_data = handler.get_request_body()
     if request_data is None:
@@ -79,19 +91,18 @@ def handle_chat_api(handler):
     use_rag = knowledge_mode == 'rag' and RAG_AVAILABLE
     use_cag = knowledge_mode == 'cag' and CAG_AVAILABLE
 
+    # Streaming mode: forward tokens as Server-Sent Events
+    if _wants_stream(handler, request_data):
+        stream_chat_response(handler, message, model, workspace, use_rag=use_rag, use_cag=use_cag)
+        return
+
     if use_rag:
         # Use RAG-enhanced response
         response_text, model_used, sources, token_info = get_rag_enhanced_response(message, model, workspace)
         debug_log(f"RAG-enhanced response: {response_text[:50]}...", "🧠")
 
         # Count unique source files instead of chunks
-        unique_sources = set()
-        if sources:
-            for source in sources:
-                if 'metadata' in source and 'source' in source['metadata']:
-                    file_path = source['metadata']['source']
-                    document_name = os.path.basename(file_path)
-                    unique_sources.add(document_name)
+        unique_sources = _source_names(sources)
 
         # Send RAG response back to client
         handler.send_json_response({
@@ -107,7 +118,7 @@ def handle_chat_api(handler):
     elif use_cag:
         # Use CAG-enhanced response (with preloaded context)
         debug_log(f"Making CAG request with model: {model}", "💾")
-        result = ollama_config.generate_response(model, message)
+        result = ollama_config.generate_response(model, message, **_CHAT_CALL)
 
         if result['success']:
             response_text = result['data'].get('response', 'Sorry, I could not generate a response.')
@@ -139,7 +150,7 @@ def handle_chat_api(handler):
     else:
         # Use robust Ollama configuration for standard response (no knowledge base)
         debug_log(f"Making standard Ollama request with model: {model}", "📤")
-        result = ollama_config.generate_response(model, message)
+        result = ollama_config.generate_response(model, message, **_CHAT_CALL)
 
         if result['success']:
             response_text = result['data'].get('response', 'Sorry, I could not generate a response.')
@@ -169,6 +180,223 @@ def handle_chat_api(handler):
             }, 503)
 
 
+def _handle_chat_upload(handler):
+    """
+    Handle an MCP tool call sent as multipart/form-data.
+
+    The JSON request goes in the 'payload' field; each file part is named
+    after the tool input it fills and is spooled to a temp file instead of
+    travelling base64-encoded inside the JSON body.
+
+    Args:
+        handler: The HTTP request handler instance
+    """
+    try:
+        form = parse_multipart(handler)
+    except UploadError as e:
+        debug_log(f"Rejected chat upload: {e}", "⚠️")
+        handler.send_json_response({'error': str(e)}, e.status)
+        return
+
+    with form:
+        try:
+            request_data = json.loads(form.fields.get('payload') or '{}')
+        except ValueError:
+            handler.send_json_response({'error': 'Invalid JSON payload'}, 400)
+            return
+
+        mcp_tool_call = request_data.get('mcp_tool_call')
+        if not mcp_tool_call:
+            handler.send_json_response({'error': 'File uploads are only supported for MCP tool calls'}, 400)
+            return
+
+        model = request_data.get('model', 'qwen2.5:3b')
+        debug_log(f"MCP Tool call: {mcp_tool_call.get('tool_name', 'unknown')} "
+                  f"({len(form.files)} uploaded file(s))", "🔧")
+        handle_mcp_tool_call(handler, mcp_tool_call, model, uploads=form.files)
+
+
+def _wants_stream(handler, request_data):
+    """Whether the client asked for an event stream instead of one JSON body."""
+    if request_data.get('stream'):
+        return True
+    accept = handler.headers.get('Accept', '') if getattr(handler, 'headers', None) else ''
+    return 'text/event-stream' in accept
+
+
+def _source_names(sources):
+    """Unique document file names referenced by RAG sources."""
+    names = set()
+    for source in sources or []:
+        if 'metadata' in source and 'source' in source['metadata']:
+            names.add(os.path.basename(source['metadata']['source']))
+    return names
+
+
+def _frame_text(frame):
+    """Token text from a generate ('response') or chat ('message') frame."""
+    if 'response' in frame:
+        return frame['response']
+    return frame.get('message', {}).get('content', '')
+
+
+def stream_chat_response(handler, message, model, workspace='default', use_rag=False, use_cag=False):
+    """
+    Stream a chat answer to the client as Server-Sent Events.
+
+    Events:
+        meta   {model, rag_enabled, cag_enabled, sources_used}
+        token  {content}
+        done   {tokens_used, prompt_tokens, completion_tokens, ttft_ms, elapsed_ms, ...}
+        error  {error}   (stream broke after it had started)
+
+    The event stream is only opened once Ollama produces its first frame,
+    so a connection failure still returns the same 503 JSON body as the
+    non-streaming path.
+
+    Args:
+        handler: The HTTP request handler instance
+        message (str): User message
+        model (str): Model to use
+        workspace (str): Workspace for RAG retrieval
+        use_rag (bool): Ground the answer in retrieved RAG context
+        use_cag (bool): Prefix the prompt with the preloaded CAG context
+    """
+    started = time.perf_counter()
+    meta = {'model': model, 'rag_enabled': False, 'cag_enabled': False, 'sources_used': 0}
+    suffix = ''
+
+    frames = None
+    if use_rag:
+        prepared = handle_rag_prepare_request(message, max_context=CHAT_CONTEXT_CHUNKS, workspace=workspace)
+        if prepared['status'] == 'success':
+            names = _source_names(prepared['sources'])
+            meta.update(model=prepared['model_used'], rag_enabled=True, sources_used=len(names))
+            if names:
+                suffix = f"\n\n📚 Sources consulted: {', '.join(sorted(names))}"
+            elif prepared['sources']:
+                suffix = f"\n\n📚 Sources consulted: {len(prepared['sources'])} document(s)"
+            frames = ollama_config.chat_stream(prepared['model_used'], prepared['messages'], **_CHAT_CALL)
+        else:
+            print(f"⚠️ RAG failed, falling back to standard response: {prepared.get('message', 'Unknown error')}")
+    elif use_cag:
+        meta['cag_enabled'] = True
+        frames = ollama_config.generate_stream(model, get_cag_manager().get_context_for_query(message), **_CHAT_CALL)
+
+    if frames is None:
+        frames = ollama_config.generate_stream(model, message, **_CHAT_CALL)
+
+    try:
+        first = next(frames)
+    except (OllamaStreamError, StopIteration) as e:
+        error_log(f"Ollama stream failed: {e}")
+        handler.send_json_response({
+            'error': f"Ollama request failed: {e}",
+            'connection_attempt': getattr(e, 'attempt', 1)
+        }, 503)
+        return
+
+    stream = SSEStream(handler)
+    stream.open()
+    stream.send('meta', meta)
+
+    ttft = None
+    final = first
+    completion_chars = 0
+    frame = first
+    try:
+        while True:
+            text = _frame_text(frame)
+            if text:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                completion_chars += len(text)
+                if not stream.send('token', {'content': text}):
+                    debug_log("Client disconnected mid-stream; stopping generation", "🔌")
+                    frames.close()
+                    return
+            if frame.get('done'):
+                final = frame
+                break
+            frame = next(frames)
+    except (OllamaStreamError, StopIteration) as e:
+        error_log(f"Ollama stream interrupted: {e}")
+        stream.send('error', {'error': f"Ollama stream interrupted: {e}"})
+        return
+
+    if suffix:
+        stream.send('token', {'content': suffix})
+
+    elapsed = time.perf_counter() - started
+    prompt_tokens = final.get('prompt_eval_count', 0)
+    completion_tokens = final.get('eval_count', 0)
+    ttft = ttft if ttft is not None else elapsed
+    _record_latency(ttft, elapsed, completion_tokens)
+
+    stream.send('done', {
+        **meta,
+        'timestamp': final.get('created_at', ''),
+        'tokens_used': prompt_tokens + completion_tokens,
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'ttft_ms': round(ttft * 1000, 1),
+        'elapsed_ms': round(elapsed * 1000, 1)
+    })
+    debug_log(f"Streamed {completion_tokens} tokens (TTFT {ttft * 1000:.0f} ms, total {elapsed:.1f} s)", "⚡")
+
+
+# ---------------------------------------------------------------------------
+# Streaming latency — time-to-first-token is the headline chat metric
+# ---------------------------------------------------------------------------
+
+_LATENCY_WINDOW = 500
+_latency_lock = threading.Lock()
+_latency_samples = deque(maxlen=_LATENCY_WINDOW)  # (ttft_s, elapsed_s, completion_tokens)
+
+
+def _record_latency(ttft, elapsed, completion_tokens):
+    with _latency_lock:
+        _latency_samples.append((ttft, elapsed, completion_tokens))
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def get_chat_latency_stats():
+    """
+    Summarize recent streamed chat latencies.
+
+    Returns:
+        dict: count plus p50/p95 time-to-first-token and total time (ms)
+        and mean generation rate (tokens/s) over the last 500 streams.
+    """
+    with _latency_lock:
+        samples = list(_latency_samples)
+
+    ttfts = sorted(s[0] for s in samples)
+    totals = sorted(s[1] for s in samples)
+    rates = [s[2] / (s[1] - s[0]) for s in samples if s[1] > s[0]]
+    return {
+        'count': len(samples),
+        'window': _LATENCY_WINDOW,
+        'ttft_p50_ms': round(_percentile(ttfts, 50) * 1000, 1),
+        'ttft_p95_ms': round(_percentile(ttfts, 95) * 1000, 1),
+        'total_p50_ms': round(_percentile(totals, 50) * 1000, 1),
+        'total_p95_ms': round(_percentile(totals, 95) * 1000, 1),
+        'tokens_per_second': round(sum(rates) / len(rates), 1) if rates else 0.0
+    }
+
+
+@error_handler
+def handle_chat_metrics_api(handler):
+    """Handle GET /api/chat/metrics - streamed chat latency summary."""
+    handler.send_json_response(get_chat_latency_stats())
+
+
 def handle_agent_invocation(handler, agent_id, message, model):
     """
     Handle agent invocation requests with tool calling support.
@@ -236,7 +464,7 @@ def handle_agent_invocation(handler, agent_id, message, model):
         }, 500)
 
 
-def handle_mcp_tool_call(handler, mcp_tool_call, model):
+def handle_mcp_tool_call(handler, mcp_tool_call, model, uploads=None):
     """
     Handle MCP tool execution requests.
 
@@ -244,6 +472,8 @@ def handle_mcp_tool_call(handler, mcp_tool_call, model):
         handler: The HTTP request handler instance
         mcp_tool_call (dict): MCP tool call parameters
         model (str): Model to use for LLM operations
+        uploads (dict): Spooled multipart files keyed by input name (optional;
+            removed by the caller)
     """
     temp_files = []  # Track temporary files for cleanup
 
@@ -257,45 +487,36 @@ def handle_mcp_tool_call(handler, mcp_tool_call, model):
         tool_name = mcp_tool_call.get('tool_name', '')
         inputs = mcp_tool_call.get('inputs', {})
 
-        # Process file uploads: convert base64 content to temp files
+        # Process file uploads: multipart parts are already on disk; legacy
+        # base64 content is decoded to temp files in chunks
         processed_inputs = {}
 
         for key, value in inputs.items():
-            if isinstance(value, dict) and 'filename' in value and 'content' in value:
-                # This is a file upload - save to temp file
+            if uploads and key in uploads:
+                processed_inputs[key] = uploads[key].path
+                debug_log(f"Using uploaded file {uploads[key].filename} at {uploads[key].path}", "📁")
+            elif isinstance(value, dict) and 'filename' in value and 'content' in value:
+                # This is a base64 file upload - save to temp file
                 try:
-                    file_content = base64.b64decode(value['content'])
-                    suffix = Path(value['filename']).suffix
-
-                    # Create temp file with original extension
-                    temp_file = tempfile.NamedTemporaryFile(
-                        mode='wb',
-                        suffix=suffix,
-                        delete=False
-                    )
-                    temp_file.write(file_content)
-                    temp_file.close()
-
-                    temp_files.append(temp_file.name)
-                    processed_inputs[key] = temp_file.name
-
-                    debug_log(f"Saved uploaded file {value['filename']} to {temp_file.name}", "📁")
-                except Exception as e:
+                    spooled = spool_base64(value['content'], value['filename'])
+                    temp_files.append(spooled.path)
+                    processed_inputs[key] = spooled.path
+
+                    debug_log(f"Saved uploaded file {value['filename']} to {spooled.path}", "📁")
+                except UploadError as e:
                     error_log(f"Failed to process uploaded file: {e}")
-                    # Cleanup any temp files created so far
-                    for temp_path in temp_files:
-                        try:
-                            os.unlink(temp_path)
-                        except:
-                            pass
                     handler.send_json_response({
                         'error': f'Failed to process uploaded file: {str(e)}'
-                    }, 400)
+                    }, e.status)
                     return
             else:
                 # Regular string value
                 processed_inputs[key] = value
 
+        # File parts with no matching JSON input still reach the tool
+        for key, upload in (uploads or {}).items():
+            processed_inputs.setdefault(key, upload.path)
+
         # Use processed inputs (with temp file paths) instead of raw inputs
         inputs = processed_inputs
 
@@ -321,12 +542,8 @@ def handle_mcp_tool_call(handler, mcp_tool_call, model):
     finally:
         # Clean up temporary files
         for temp_path in temp_files:
-            try:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
-                    debug_log(f"Cleaned up temp file: {temp_path}", "🗑️")
-            except Exception as cleanup_error:
-                error_log(f"Failed to clean up temp file {temp_path}: {cleanup_error}")
+            remove_spooled(temp_path)
+            debug_log(f"Cleaned up temp file: {temp_path}", "🗑️")
 
 
 def _handle_whitepaper_review(handler, inputs, model):
@@ -446,7 +663,7 @@ def get_rag_enhanced_response(message, model, workspace='default'):
     """
     try:
         # Use the RAG query endpoint
-        rag_result = handle_rag_query_request(message, max_context=5, workspace=workspace)
+        rag_result = handle_rag_query_request(message, max_context=CHAT_CONTEXT_CHUNKS, workspace=workspace)
 
         if rag_result['status'] == 'success':
             response_text = rag_result['answer']
@@ -507,7 +724,7 @@ def get_standard_ollama_response_with_tokens(message, model):
         tuple: (response_text, token_info)
     """
     debug_log(f"Making fallback Ollama request with model: {model}", "📤")
-    result = ollama_config.generate_response(model, message)
+    result = ollama_config.generate_response(model, message, **_CHAT_CALL)
 
     if result['success']:
         response_text = result['data'].get('response', 'Sorry, I could not generate a response.')
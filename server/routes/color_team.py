@@ -24,7 +24,7 @@ import logging
 from typing import Any, Dict
 
 from server.utils.error_handler import error_handler
-from server.background_jobs import job_store
+from server.background_jobs import QUEUE_LLM, job_store
 
 logger = logging.getLogger(__name__)
 
@@ -118,7 +118,7 @@ def _read_multipart(handler) -> Dict[str, Any]:
 
 
 # ---------------------------------------------------------------------------
-# Background wrapper — called by job_store.submit_with_id
+# Background wrapper — run by job_store on the llm queue
 # ---------------------------------------------------------------------------
 
 def _run_ingest_with_job_id(
@@ -227,12 +227,15 @@ def handle_color_team_upload(handler) -> None:
     if review_stage not in ("pink", "red", "gold", "final"):
         review_stage = "red"
 
-    # Submit to background thread — returns immediately with a job_id.
-    # submit_with_id passes the job_id as the first arg to the wrapper so
+    # Queue on the llm worker pool — returns immediately with a job_id.
+    # pass_job_id prepends the job_id to the wrapper's args so
     # ingest_color_team_review can report per-comment progress.
-    job_id = job_store.submit_with_id(
+    job_id = job_store.enqueue(
         _run_ingest_with_job_id,
-        doc_id, opportunity_id, docx_bytes, review_stage, author_prefix, model,
+        (doc_id, opportunity_id, docx_bytes, review_stage, author_prefix, model),
+        queue=QUEUE_LLM,
+        pass_job_id=True,
+        name="color_team_ingest",
     )
 
     handler.send_json_response({
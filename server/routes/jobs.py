@@ -0,0 +1,49 @@
+"""Background job route handlers (status, cancellation, queue metrics)."""
+
+from server.background_jobs import job_store
+from server.utils.error_handler import error_handler
+
+
+@error_handler
+def handle_job_status_api(handler, job_id):
+    """
+    Handle GET /api/jobs/{job_id} - poll any background job.
+
+    Args:
+        handler: The HTTP request handler instance
+        job_id: Job UUID
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        handler.send_json_response({'error': 'Job not found'}, 404)
+        return
+    handler.send_json_response(job)
+
+
+@error_handler
+def handle_job_cancel_api(handler, job_id):
+    """
+    Handle POST /api/jobs/{job_id}/cancel - cancel a pending or running job.
+
+    Args:
+        handler: The HTTP request handler instance
+        job_id: Job UUID
+    """
+    if job_store.get(job_id) is None:
+        handler.send_json_response({'error': 'Job not found'}, 404)
+        return
+    if not job_store.cancel(job_id):
+        handler.send_json_response({'error': 'Job already finished', 'job': job_store.get(job_id)}, 409)
+        return
+    handler.send_json_response({'status': 'success', 'job': job_store.get(job_id)})
+
+
+@error_handler
+def handle_job_metrics_api(handler):
+    """
+    Handle GET /api/jobs/metrics - per-queue depth, throughput and wait times.
+
+    Args:
+        handler: The HTTP request handler instance
+    """
+    handler.send_json_response(job_store.get_metrics())
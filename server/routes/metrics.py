@@ -0,0 +1,130 @@
+"""Prometheus metrics endpoint (GET /api/metrics)."""
+
+import sys
+
+from ollama_client import get_ollama_client
+from server.background_jobs import job_store
+from server.middleware.prometheus import CONTENT_TYPE, PrometheusWriter, write_request_metrics
+from server.middleware.timing import request_metrics
+from server.utils.error_handler import error_handler
+
+
+def _write_server_pool(out, handler):
+    get_stats = getattr(handler.server, 'get_stats', None)
+    if get_stats is None:
+        return
+    stats = get_stats()
+    for key, kind, help_text in (
+        ('max_workers', 'gauge', 'HTTP worker threads'),
+        ('active', 'gauge', 'HTTP workers currently handling a request'),
+        ('queued', 'gauge', 'Accepted connections waiting for a worker'),
+        ('handled', 'counter', 'Connections handled by the worker pool'),
+        ('rejected', 'counter', 'Connections rejected with 503 (queue full)'),
+    ):
+        name = f'robobrain_http_pool_{key}' + ('_total' if kind == 'counter' else '')
+        out.family(name, kind, help_text)
+        out.sample(name, stats[key])
+
+
+def _write_ollama(out):
+    metrics = get_ollama_client().get_metrics()
+    for key, help_text in (('max_concurrency', 'Generations allowed in flight'),
+                           ('in_flight', 'Generations currently in flight'),
+                           ('waiting', 'Callers queued for an Ollama slot')):
+        out.family(f'robobrain_ollama_{key}', 'gauge', help_text)
+        out.sample(f'robobrain_ollama_{key}', metrics[key])
+
+    callers = metrics['callers']
+    for key, help_text in (('calls', 'Ollama calls by caller'),
+                           ('errors', 'Failed Ollama calls by caller'),
+                           ('retries', 'Ollama retries by caller')):
+        out.family(f'robobrain_ollama_client_{key}_total', 'counter', help_text)
+        for caller, stats in sorted(callers.items()):
+            out.sample(f'robobrain_ollama_client_{key}_total', stats[key], caller=caller)
+
+    out.family('robobrain_ollama_tokens_total', 'counter', 'Tokens processed by Ollama, by caller')
+    for caller, stats in sorted(callers.items()):
+        out.sample('robobrain_ollama_tokens_total', stats['prompt_tokens'], caller=caller, kind='prompt')
+        out.sample('robobrain_ollama_tokens_total', stats['completion_tokens'], caller=caller, kind='completion')
+
+    out.family('robobrain_ollama_latency_quantile_seconds', 'gauge', 'Recent Ollama call latency by caller')
+    for caller, stats in sorted(callers.items()):
+        for q, key in (('0.50', 'latency_p50_ms'), ('0.95', 'latency_p95_ms')):
+            out.sample('robobrain_ollama_latency_quantile_seconds', stats[key] / 1000,
+                       caller=caller, quantile=q)
+
+
+def _write_chat(out):
+    # Only once chat has been loaded; scraping must not import the chat stack
+    chat = sys.modules.get('server.routes.chat')
+    if chat is None:
+        return
+    stats = chat.get_chat_latency_stats()
+    out.family('robobrain_chat_stream_latency_quantile_seconds', 'gauge',
+               'Streamed chat time-to-first-token and total time (recent window)')
+    for phase in ('ttft', 'total'):
+        for q in ('50', '95'):
+            out.sample('robobrain_chat_stream_latency_quantile_seconds',
+                       stats[f'{phase}_p{q}_ms'] / 1000, phase=phase, quantile=f'0.{q}')
+    out.family('robobrain_chat_tokens_per_second', 'gauge', 'Mean streamed generation rate (recent window)')
+    out.sample('robobrain_chat_tokens_per_second', stats['tokens_per_second'])
+
+
+def _write_jobs(out):
+    queues = job_store.get_metrics()['queues']
+    for key, kind, help_text in (
+        ('depth', 'gauge', 'Pending background jobs'),
+        ('running', 'gauge', 'Running background jobs'),
+        ('submitted', 'counter', 'Background jobs submitted'),
+        ('completed', 'counter', 'Background jobs completed'),
+        ('failed', 'counter', 'Background jobs failed'),
+        ('cancelled', 'counter', 'Background jobs cancelled'),
+    ):
+        name = f'robobrain_jobs_{key}' + ('_total' if kind == 'counter' else '')
+        out.family(name, kind, f'{help_text}, by queue')
+        for queue, stats in queues.items():
+            out.sample(name, stats[key], queue=queue)
+    out.family('robobrain_jobs_wait_mean_seconds', 'gauge', 'Mean queue wait of recent background jobs, by queue')
+    for queue, stats in queues.items():
+        out.sample('robobrain_jobs_wait_mean_seconds', stats['wait_mean_ms'] / 1000, queue=queue)
+
+
+def render_metrics(handler=None) -> str:
+    """
+    Render every metric family as Prometheus text.
+
+    Args:
+        handler: Request handler (for the HTTP worker-pool stats); optional.
+
+    Returns:
+        str: Exposition-format body.
+    """
+    out = PrometheusWriter()
+    write_request_metrics(out, request_metrics)
+    if handler is not None:
+        _write_server_pool(out, handler)
+    _write_ollama(out)
+    _write_chat(out)
+    _write_jobs(out)
+    return out.render()
+
+
+@error_handler
+def handle_metrics_api(handler):
+    """
+    Handle GET /api/metrics - Prometheus text exposition.
+
+    Includes per-route request counts, status codes, bytes out, latency
+    histograms with p50/p95/p99, DB and Ollama time per route, plus the
+    HTTP worker pool, Ollama client, streamed chat and job queue stats.
+
+    Args:
+        handler: The HTTP request handler instance
+    """
+    body = render_metrics(handler).encode('utf-8')
+    handler.send_response(200)
+    handler.send_header('Content-Type', CONTENT_TYPE)
+    handler.send_header('Content-Length', str(len(body)))
+    handler.send_header('Cache-Control', 'no-cache')
+    handler.end_headers()
+    handler.wfile.write(body)
@@ -1,6 +1,7 @@
 """Models route handlers for Ollama model management."""
 
 from debug_logger import debug_log
+from ollama_client import get_ollama_client
 from ollama_config import ollama_config
 from server.utils.error_handler import error_handler
 
@@ -32,3 +33,14 @@ def handle_models_api(handler):
             'count': 0,
             'connection_attempt': result['attempt']
         }, 503)
+
+
+@error_handler
+def handle_ollama_metrics_api(handler):
+    """
+    Handle GET /api/ollama/metrics: shared client concurrency and per-caller stats.
+
+    Args:
+        handler: The HTTP request handler instance
+    """
+    handler.send_json_response(get_ollama_client().get_metrics())
@@ -1,9 +1,9 @@
 """RAG route handlers for document ingestion and querying."""
 
 import os
-from pathlib import Path
 from debug_logger import debug_log, error_log
 from server.utils.error_handler import error_handler
+from server.utils.multipart import UploadError, parse_multipart
 
 try:
     from rag_api import (
@@ -11,6 +11,7 @@ try:
         handle_rag_search_request,
         handle_rag_query_request,
         handle_rag_ingest_request,
+        handle_rag_ingest_directory_request,
         handle_rag_documents_request,
         handle_rag_analytics_request,
         handle_rag_document_delete_request
@@ -70,7 +71,7 @@ def handle_rag_query_api(handler):
 
 @error_handler
 def handle_rag_ingest_api(handler):
-    """Handle RAG document ingestion API requests (supports both FormData files and JSON file paths)."""
+    """Handle RAG document ingestion API requests (FormData files, or JSON file paths and folders)."""
     content_type = handler.headers.get('Content-Type', '')
 
     if content_type.startswith('multipart/form-data'):
@@ -81,10 +82,18 @@ def handle_rag_ingest_api(handler):
             handler.send_json_response({'error': 'Invalid JSON'}, 400)
             return
 
+        directory = request_data.get('directory', '').strip()
+        if directory:
+            workspace = request_data.get('workspace') or 'default'
+            ingest_result = handle_rag_ingest_directory_request(directory, workspace)
+            debug_log(f"RAG folder ingest: '{directory}' -> {ingest_result.get('message', 'unknown')}", "📁")
+            handler.send_json_response(ingest_result)
+            return
+
         file_path = request_data.get('file_path', '').strip()
 
         if not file_path:
-            handler.send_json_response({'error': 'File path is required'}, 400)
+            handler.send_json_response({'error': 'File path or directory is required'}, 400)
             return
 
         ingest_result = handle_rag_ingest_request(file_path)
@@ -93,51 +102,40 @@ def handle_rag_ingest_api(handler):
 
 
 def _handle_file_upload(handler):
-    """Handle multipart form data file upload."""
-    import cgi
+    """
+    Handle multipart form data file upload.
 
+    The body is streamed to a temp file (see server/utils/multipart.py) and
+    the spooled path is handed to the RAG service; the upload is never held
+    in memory.
+    """
     try:
-        content_type = handler.headers.get('Content-Type', '')
-
-        environ = {
-            'REQUEST_METHOD': 'POST',
-            'CONTENT_TYPE': content_type,
-            'CONTENT_LENGTH': handler.headers.get('Content-Length', '0')
-        }
-
-        form = cgi.FieldStorage(
-            fp=handler.rfile,
-            headers=handler.headers,
-            environ=environ
-        )
+        form = parse_multipart(handler)
+    except UploadError as e:
+        debug_log(f"Rejected RAG upload: {e}", "⚠️")
+        handler.send_json_response({'error': str(e)}, e.status)
+        return
 
-        if 'file' not in form:
+    with form:
+        file_item = form.files.get('file')
+        if file_item is None:
             handler.send_json_response({'error': 'No file uploaded'}, 400)
             return
-
-        file_item = form['file']
         if not file_item.filename:
             handler.send_json_response({'error': 'No file selected'}, 400)
             return
 
-        knowledge_base = 'default'
-        if 'knowledge_base' in form:
-            knowledge_base = form['knowledge_base'].value
+        knowledge_base = form.fields.get('knowledge_base') or 'default'
+        file_path = file_item.path
 
         debug_log(f"File upload for workspace: {knowledge_base}", "📤")
-
-        uploads_dir = Path('uploads')
-        uploads_dir.mkdir(exist_ok=True)
-
-        file_path = uploads_dir / file_item.filename
-        with open(file_path, 'wb') as f:
-            f.write(file_item.file.read())
-
-        debug_log(f"File uploaded: {file_item.filename} -> {file_path}", "📤")
+        debug_log(f"File uploaded: {file_item.filename} -> {file_path} ({file_item.size:,} bytes)", "📤")
 
         try:
             debug_log(f"Starting RAG ingestion for: {file_path} (workspace: {knowledge_base})", "🔄")
-            ingest_result = handle_rag_ingest_request(str(file_path), knowledge_base)
+            # Keyed by filename so re-uploading an edited file only re-embeds changed chunks
+            doc_key = f"uploads/{os.path.basename(file_path)}"
+            ingest_result = handle_rag_ingest_request(file_path, knowledge_base, doc_key=doc_key)
             debug_log(f"RAG ingest: '{file_path}' -> {ingest_result.get('status', 'unknown')}", "📄")
 
             if ingest_result.get('status') == 'error':
@@ -150,17 +148,8 @@ def _handle_file_upload(handler):
                 'message': f'RAG ingestion failed: {str(ingest_error)}'
             }
 
-        try:
-            os.remove(file_path)
-            debug_log(f"Cleaned up temporary file: {file_path}", "🧹")
-        except OSError as cleanup_error:
-            error_log(f"Could not clean up file {file_path}: {cleanup_error}")
-
-        handler.send_json_response(ingest_result)
-
-    except Exception as e:
-        error_log(f"File upload error: {e}", exception=e)
-        handler.send_json_response({'error': f'File upload failed: {str(e)}'}, 500)
+    debug_log(f"Cleaned up temporary file: {file_path}", "🧹")
+    handler.send_json_response(ingest_result)
 
 
 @error_handler
@@ -0,0 +1,28 @@
+"""Route-table introspection handler (GET /api/routes)."""
+
+from server.utils.error_handler import error_handler
+
+
+@error_handler
+def handle_routes_api(handler):
+    """
+    List every registered route with its pattern, action and feature gate.
+
+    Query params:
+        method: Optional HTTP verb filter (e.g. ?method=GET)
+
+    Args:
+        handler: The HTTP request handler instance
+    """
+    import server.request_handler as _handler_mod
+
+    routes = _handler_mod._router.describe()
+    method = handler.get_query_params().get('method')
+    if method:
+        routes = [r for r in routes if r['method'] == method.upper()]
+
+    handler.send_json_response({
+        'routes': routes,
+        'count': len(routes),
+        'enabled': sum(1 for r in routes if r['enabled']),
+    })
@@ -10,6 +10,8 @@ from pathlib import Path
 from typing import Dict, Any
 
 from shredding.rfp_shredder import RFPShredder
+from shredding.requirement_store import COMPLIANCE_STATUSES, update_compliance_status
+from server.background_jobs import QUEUE_LLM, job_store
 from server.db_pool import get_db
 from server.utils.json_response import send_json_response
 from server.utils.error_handler import error_handler
@@ -24,6 +26,11 @@ shredder = RFPShredder(
 )
 
 
+def _run_shred_with_job_id(job_id: str, shred_kwargs: Dict[str, Any]) -> Dict:
+    """Background wrapper: forwards the job_id so classification progress is recorded."""
+    return shredder.shred_rfp(**shred_kwargs, job_id=job_id)
+
+
 @error_handler
 def handle_shredding_shred_api(handler, path: str, query_params: Dict):
     """
@@ -42,9 +49,15 @@ def handle_shredding_shred_api(handler, path: str, query_params: Dict):
         "set_aside": str (optional),
         "create_tasks": bool (default: true),
         "auto_assign": bool (default: false),
-        "output_dir": str (optional)
+        "output_dir": str (optional),
+        "background": bool (default: false)
     }
 
+    With "background": true the RFP is shredded on the llm job queue and the
+    response is {"status": "accepted", "job_id": str}; poll
+    GET /api/jobs/{job_id} for progress ("Classifying requirements: 120/600")
+    and the result below.
+
     Response:
     {
         "status": "success" | "error",
@@ -55,8 +68,14 @@ def handle_shredding_shred_api(handler, path: str, query_params: Dict):
         "optional_count": int,
         "tasks_created": int,
         "matrix_file": str,
-        "sections": {...}
+        "sections": {...},
+        "classification": {...},
+        "pipeline": {"status": str, "seconds": float, "resumed_stages": [str],
+                     "stages": [{"stage": str, "seconds": float, "items": int, "resumed": bool}]}
     }
+
+    A failed run returns "pipeline" with "failed_stage"; sending the same
+    request again resumes after the last completed stage.
     """
     if handler.command != 'POST':
         send_json_response(handler, {'error': 'Method not allowed'}, 405)
@@ -87,7 +106,7 @@ def handle_shredding_shred_api(handler, path: str, query_params: Dict):
     # Start shredding
     logger.info(f"Starting RFP shredding: {data['rfp_number']}")
 
-    result = shredder.shred_rfp(
+    shred_kwargs = dict(
         file_path=data['file_path'],
         rfp_number=data['rfp_number'],
         opportunity_name=data['opportunity_name'],
@@ -100,6 +119,19 @@ def handle_shredding_shred_api(handler, path: str, query_params: Dict):
         output_dir=data.get('output_dir')
     )
 
+    if data.get('background'):
+        job_id = job_store.enqueue(
+            _run_shred_with_job_id,
+            (shred_kwargs,),
+            queue=QUEUE_LLM,
+            pass_job_id=True,
+            name="shred_rfp",
+        )
+        send_json_response(handler, {'status': 'accepted', 'job_id': job_id}, 202)
+        return
+
+    result = shredder.shred_rfp(**shred_kwargs)
+
     if result['status'] == 'success':
         send_json_response(handler, result, 200)
     else:
@@ -136,6 +168,12 @@ def handle_shredding_status_api(handler, path: str, query_params: Dict):
             "completed": int,
             "in_progress": int,
             "pending": int
+        },
+        "pipeline": {
+            "status": "running" | "success" | "error",
+            "seconds": float,
+            "stages": [{"stage": str, "seconds": float, "items": int, "resumed": bool}],
+            ...
         }
     }
     """
@@ -399,6 +437,59 @@ def handle_shredding_requirement_update_api(handler, path: str, query_params: Di
     }, 200)
 
 
+@error_handler
+def handle_shredding_requirements_bulk_update_api(handler, path: str, query_params: Dict):
+    """
+    PUT /api/shredding/requirements/bulk
+
+    Set the compliance status of several requirements at once (multi-select
+    in the requirements grid). All rows change in one transaction.
+
+    Request body:
+    {
+        "requirement_ids": [str],
+        "compliance_status": str,
+        "opportunity_id": str (optional, limits the update to one opportunity)
+    }
+
+    Response:
+    {
+        "status": "success",
+        "updated": int
+    }
+    """
+    if handler.command != 'PUT':
+        send_json_response(handler, {'error': 'Method not allowed'}, 405)
+        return
+
+    data = handler.get_request_body()
+    if data is None:
+        send_json_response(handler, {'error': 'Invalid JSON'}, 400)
+        return
+
+    requirement_ids = data.get('requirement_ids')
+    if not isinstance(requirement_ids, list) or not requirement_ids \
+            or not all(isinstance(req_id, str) for req_id in requirement_ids):
+        send_json_response(handler, {'error': 'requirement_ids must be a non-empty list of IDs'}, 400)
+        return
+
+    compliance_status = data.get('compliance_status')
+    if compliance_status not in COMPLIANCE_STATUSES:
+        send_json_response(handler, {
+            'error': f'compliance_status must be one of: {", ".join(COMPLIANCE_STATUSES)}'
+        }, 400)
+        return
+
+    updated = update_compliance_status(
+        shredder.db_path, requirement_ids, compliance_status, opportunity_id=data.get('opportunity_id')
+    )
+
+    send_json_response(handler, {
+        'status': 'success',
+        'updated': updated
+    }, 200)
+
+
 @error_handler
 def handle_shredding_matrix_api(handler, path: str, query_params: Dict):
     """
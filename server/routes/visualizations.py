@@ -3,12 +3,13 @@
 from datetime import datetime
 from debug_logger import debug_log
 from server_decorators import require_system
+from server.lazy_imports import module_available
 from server.utils.error_handler import error_handler
 
 try:
-    from rag_api import handle_rag_analytics_request, handle_rag_search_request, handle_rag_vector_chunks_request
-    from knowledge_graph_builder import VectorKnowledgeGraphBuilder
-    KNOWLEDGE_GRAPH_AVAILABLE = True
+    from rag_api import handle_rag_analytics_request, handle_rag_search_request, handle_rag_knowledge_graph_request
+    # The graph itself is built inside rag_api; only check its dependencies here
+    KNOWLEDGE_GRAPH_AVAILABLE = module_available('knowledge_graph_builder', 'sklearn')
 except ImportError:
     KNOWLEDGE_GRAPH_AVAILABLE = False
 
@@ -24,9 +25,10 @@ def handle_knowledge_graph_api(handler):
         }, 503)
         return
 
-    chunks_result = handle_rag_vector_chunks_request()
+    # Built once per workspace version; repeat views are served from cache
+    graph_data = handle_rag_knowledge_graph_request()
 
-    if chunks_result.get('status') != 'success':
+    if graph_data.pop('status', None) != 'success' or not graph_data.get('entities'):
         handler.send_json_response({
             "entities": [],
             "relationships": [],
@@ -39,15 +41,14 @@ def handle_knowledge_graph_api(handler):
         })
         return
 
-    graph_builder = VectorKnowledgeGraphBuilder()
-    graph_data = graph_builder.build_knowledge_graph_from_vectors(chunks_result)
     graph_data["metadata"]["generated_at"] = datetime.now().isoformat()
 
     entity_count = len(graph_data.get("entities", []))
     relationship_count = len(graph_data.get("relationships", []))
-    chunk_count = chunks_result.get('total_chunks', 0)
+    chunk_count = graph_data["metadata"].get('chunk_count', 0)
+    cache = graph_data["metadata"].get('cache')
 
-    debug_log(f"Vector-based knowledge graph: {entity_count} entities, {relationship_count} relationships from {chunk_count} vector chunks", "📊")
+    debug_log(f"Vector-based knowledge graph ({cache}): {entity_count} entities, {relationship_count} relationships from {chunk_count} vector chunks", "📊")
     handler.send_json_response(graph_data)
 
 
@@ -2,8 +2,15 @@
 server/routes_builder.py — Application route registry.
 
 Builds and returns a Router with all API routes mapped to callable
-handler functions. Feature-gated routes are only registered when the
-corresponding module imports successfully.
+handler functions. Routes are declared as path patterns (see
+server/router.py); `{name}` segments are passed to the handler as
+positional arguments. Feature-gated routes whose handlers always import
+are registered with `enabled=<FLAG>` (listed by /api/routes but not
+dispatched when off); route groups whose handler modules may fail to
+import are registered inside `if <FLAG>:` blocks. Route modules for the
+heavy subsystems are registered through lazy_handler() (see
+server/lazy_imports.py) and imported on first use, and their flags are
+probed without importing them.
 
 Usage:
     from server.routes_builder import build_router
@@ -11,26 +18,12 @@ Usage:
 """
 
 
+from server.lazy_imports import lazy_handler, module_available
 from server.router import Router
+from server.routes.routes_meta import handle_routes_api as handle_routes_route
+from server.routes.metrics import handle_metrics_api as handle_metrics_route
 from server.routes.models import handle_models_api as handle_models_route
-from server.routes.chat import handle_chat_api as handle_chat_route
-from server.routes.rag import (
-    handle_rag_status_api as handle_rag_status_route,
-    handle_rag_search_api as handle_rag_search_route,
-    handle_rag_query_api as handle_rag_query_route,
-    handle_rag_ingest_api as handle_rag_ingest_route,
-    handle_rag_documents_api as handle_rag_documents_route,
-    handle_rag_analytics_api as handle_rag_analytics_route,
-    handle_rag_upload_api as handle_rag_upload_route,
-    handle_rag_document_delete_api as handle_rag_document_delete_route,
-)
-from server.routes.cag import (
-    handle_cag_status_api as handle_cag_status_route,
-    handle_cag_load_api as handle_cag_load_route,
-    handle_cag_clear_api as handle_cag_clear_route,
-    handle_cag_document_delete_api as handle_cag_document_delete_route,
-    handle_cag_query_api as handle_cag_query_route,
-)
+from server.routes.models import handle_ollama_metrics_api as handle_ollama_metrics_route
 from server.routes.prompts import (
     handle_prompts_list_api as handle_prompts_list_route,
     handle_prompts_create_api as handle_prompts_create_route,
@@ -40,25 +33,6 @@ from server.routes.prompts import (
     handle_prompts_use_api as handle_prompts_use_route,
     handle_prompts_search_api as handle_prompts_search_route,
 )
-from server.routes.search import (
-    handle_search_api as handle_search_route,
-    handle_search_folders_api as handle_search_folders_route,
-    handle_search_create_folder_api as handle_search_create_folder_route,
-    handle_search_tags_api as handle_search_tags_route,
-    handle_search_add_object_api as handle_search_add_object_route,
-)
-from server.routes.agents import (
-    handle_agents_api as handle_agents_route,
-    handle_agents_metrics_api as handle_agents_metrics_route,
-    handle_agents_detail_api as handle_agents_detail_route,
-)
-from server.routes.shredding import (
-    handle_shredding_shred_api as handle_shredding_shred_route,
-    handle_shredding_status_api as handle_shredding_status_route,
-    handle_shredding_requirements_api as handle_shredding_requirements_route,
-    handle_shredding_requirement_update_api as handle_shredding_req_update_route,
-    handle_shredding_matrix_api as handle_shredding_matrix_route,
-)
 from server.routes.career import (
     handle_career_positions_list_api as handle_career_positions_list_route,
     handle_career_positions_create_api as handle_career_positions_create_route,
@@ -70,18 +44,6 @@ from server.routes.career import (
     handle_career_list_add_api as handle_career_list_add_route,
     handle_career_list_remove_api as handle_career_list_remove_route,
 )
-from server.routes.mcp import (
-    handle_mcp_servers_api as handle_mcp_servers_route,
-    handle_mcp_server_action_api as handle_mcp_server_action_route,
-    handle_nlp_parse_task_api as handle_nlp_parse_task_route,
-    handle_nlp_capabilities_api as handle_nlp_capabilities_route,
-    handle_mcp_metrics_api as handle_mcp_metrics_route,
-)
-from server.routes.visualizations import (
-    handle_knowledge_graph_api as handle_knowledge_graph_route,
-    handle_performance_dashboard_api as handle_performance_dashboard_route,
-    handle_search_results_api as handle_search_results_route,
-)
 from server.routes.opportunities import (
     handle_opportunities_list_api as handle_opportunities_list_route,
     handle_opportunities_create_api as handle_opportunities_create_route,
@@ -102,6 +64,11 @@ from server.routes.opportunities import (
     handle_pipeline_stats_api as handle_pipeline_stats_route,
 )
 from server.routes.source_tree import handle_source_tree_api as handle_source_tree_route
+from server.routes.jobs import (
+    handle_job_status_api as handle_job_status_route,
+    handle_job_cancel_api as handle_job_cancel_route,
+    handle_job_metrics_api as handle_job_metrics_route,
+)
 from server.routes.color_team import (
     handle_color_team_upload,
     handle_color_team_job_status,
@@ -142,47 +109,67 @@ from server.routes.settings_api import (
     handle_categories_put as handle_categories_put_route,
 )
 
-# Optional feature imports — availability flags set below
-OLLAMA_AGENTS_AVAILABLE = False
-try:
-    from server.routes.ollama_agents import (
-        handle_ollama_agents_api as handle_ollama_agents_route,
-        handle_ollama_agent_detail_api as handle_ollama_agent_detail_route,
-        handle_ollama_agent_invoke_api as handle_ollama_agent_invoke_route,
-        handle_ollama_skills_api as handle_ollama_skills_route,
-        handle_ollama_status_api as handle_ollama_status_route,
-    )
-    OLLAMA_AGENTS_AVAILABLE = True
-except ImportError:
-    pass
 
-RAG_AVAILABLE = False
-try:
-    import rag_api  # noqa: F401
-    RAG_AVAILABLE = True
-except ImportError:
-    pass
+# Heavy subsystems — route modules imported on first request (or by the
+# background warm-up in server.py) so startup doesn't pay for ChromaDB,
+# sentence-transformers, Docling, scikit-learn or the agent runtime.
+handle_chat_route = lazy_handler('server.routes.chat', 'handle_chat_api')
+handle_chat_metrics_route = lazy_handler('server.routes.chat', 'handle_chat_metrics_api')
 
-CAG_AVAILABLE = False
-try:
-    from cag_api import get_cag_manager  # noqa: F401
-    CAG_AVAILABLE = True
-except ImportError:
-    pass
+handle_rag_status_route = lazy_handler('server.routes.rag', 'handle_rag_status_api')
+handle_rag_search_route = lazy_handler('server.routes.rag', 'handle_rag_search_api')
+handle_rag_query_route = lazy_handler('server.routes.rag', 'handle_rag_query_api')
+handle_rag_ingest_route = lazy_handler('server.routes.rag', 'handle_rag_ingest_api')
+handle_rag_documents_route = lazy_handler('server.routes.rag', 'handle_rag_documents_api')
+handle_rag_analytics_route = lazy_handler('server.routes.rag', 'handle_rag_analytics_api')
+handle_rag_upload_route = lazy_handler('server.routes.rag', 'handle_rag_upload_api')
+handle_rag_document_delete_route = lazy_handler('server.routes.rag', 'handle_rag_document_delete_api')
 
-AGENT_SYSTEM_AVAILABLE = False
-try:
-    from agent_system.mcp.server_manager import ZeroCostMCPServerManager  # noqa: F401
-    AGENT_SYSTEM_AVAILABLE = True
-except ImportError:
-    pass
+handle_cag_status_route = lazy_handler('server.routes.cag', 'handle_cag_status_api')
+handle_cag_load_route = lazy_handler('server.routes.cag', 'handle_cag_load_api')
+handle_cag_clear_route = lazy_handler('server.routes.cag', 'handle_cag_clear_api')
+handle_cag_document_delete_route = lazy_handler('server.routes.cag', 'handle_cag_document_delete_api')
+handle_cag_query_route = lazy_handler('server.routes.cag', 'handle_cag_query_api')
 
-SEARCH_AVAILABLE = False
-try:
-    from search_api import handle_search_request  # noqa: F401
-    SEARCH_AVAILABLE = True
-except ImportError:
-    pass
+handle_search_route = lazy_handler('server.routes.search', 'handle_search_api')
+handle_search_folders_route = lazy_handler('server.routes.search', 'handle_search_folders_api')
+handle_search_create_folder_route = lazy_handler('server.routes.search', 'handle_search_create_folder_api')
+handle_search_tags_route = lazy_handler('server.routes.search', 'handle_search_tags_api')
+handle_search_add_object_route = lazy_handler('server.routes.search', 'handle_search_add_object_api')
+
+handle_agents_route = lazy_handler('server.routes.agents', 'handle_agents_api')
+handle_agents_metrics_route = lazy_handler('server.routes.agents', 'handle_agents_metrics_api')
+handle_agents_detail_route = lazy_handler('server.routes.agents', 'handle_agents_detail_api')
+
+handle_shredding_shred_route = lazy_handler('server.routes.shredding', 'handle_shredding_shred_api')
+handle_shredding_status_route = lazy_handler('server.routes.shredding', 'handle_shredding_status_api')
+handle_shredding_requirements_route = lazy_handler('server.routes.shredding', 'handle_shredding_requirements_api')
+handle_shredding_req_update_route = lazy_handler('server.routes.shredding', 'handle_shredding_requirement_update_api')
+handle_shredding_req_bulk_update_route = lazy_handler('server.routes.shredding', 'handle_shredding_requirements_bulk_update_api')
+handle_shredding_matrix_route = lazy_handler('server.routes.shredding', 'handle_shredding_matrix_api')
+
+handle_mcp_servers_route = lazy_handler('server.routes.mcp', 'handle_mcp_servers_api')
+handle_mcp_server_action_route = lazy_handler('server.routes.mcp', 'handle_mcp_server_action_api')
+handle_nlp_parse_task_route = lazy_handler('server.routes.mcp', 'handle_nlp_parse_task_api')
+handle_nlp_capabilities_route = lazy_handler('server.routes.mcp', 'handle_nlp_capabilities_api')
+handle_mcp_metrics_route = lazy_handler('server.routes.mcp', 'handle_mcp_metrics_api')
+
+handle_knowledge_graph_route = lazy_handler('server.routes.visualizations', 'handle_knowledge_graph_api')
+handle_performance_dashboard_route = lazy_handler('server.routes.visualizations', 'handle_performance_dashboard_api')
+handle_search_results_route = lazy_handler('server.routes.visualizations', 'handle_search_results_api')
+
+handle_ollama_agents_route = lazy_handler('server.routes.ollama_agents', 'handle_ollama_agents_api')
+handle_ollama_agent_detail_route = lazy_handler('server.routes.ollama_agents', 'handle_ollama_agent_detail_api')
+handle_ollama_agent_invoke_route = lazy_handler('server.routes.ollama_agents', 'handle_ollama_agent_invoke_api')
+handle_ollama_skills_route = lazy_handler('server.routes.ollama_agents', 'handle_ollama_skills_api')
+handle_ollama_status_route = lazy_handler('server.routes.ollama_agents', 'handle_ollama_status_api')
+
+# Optional feature flags — probed with find_spec so nothing heavy is imported
+OLLAMA_AGENTS_AVAILABLE = module_available('server.routes.ollama_agents')
+RAG_AVAILABLE = module_available('rag_api')
+CAG_AVAILABLE = module_available('cag_api')
+AGENT_SYSTEM_AVAILABLE = module_available('agent_system.mcp.server_manager')
+SEARCH_AVAILABLE = module_available('search_api')
 
 PROMPTS_AVAILABLE = False
 try:
@@ -304,220 +291,241 @@ def _qp(path: str) -> dict:
     return parse_qs(path.split('?', 1)[1])
 
 
-def _last(path: str) -> str:
-    """Extract the last path segment, stripping query string."""
-    return path.split('?')[0].split('/')[-1]
-
-
-def _second_last(path: str) -> str:
-    """Extract the second-to-last path segment, stripping query string."""
-    return path.split('?')[0].split('/')[-2]
-
-
 def build_router() -> Router:
     """Build and return the application router with all registered routes."""
     r = Router()
+    OLLAMA = OLLAMA_AGENTS_AVAILABLE
+
+    # ---- Introspection ------------------------------------------------------
+    r.add('GET', '/api/routes', handle_routes_route)
+    r.add('GET', '/api/metrics', handle_metrics_route)
 
     # ---- GET ----------------------------------------------------------------
-    r.add('GET', lambda p: p == '/api/rag/documents' and RAG_AVAILABLE,       handle_rag_documents_route)
-    r.add('GET', lambda p: p == '/api/rag/analytics' and RAG_AVAILABLE,       handle_rag_analytics_route)
-    r.add('GET', lambda p: p == '/api/search/folders' and SEARCH_AVAILABLE,   handle_search_folders_route)
-    r.add('GET', lambda p: p == '/api/search/tags' and SEARCH_AVAILABLE,      handle_search_tags_route)
-    r.add('GET', lambda p: p == '/api/visualizations/knowledge-graph',        handle_knowledge_graph_route)
-    r.add('GET', lambda p: p == '/api/visualizations/performance',            handle_performance_dashboard_route)
-    r.add('GET', lambda p: p == '/api/visualizations/search-results',         handle_search_results_route)
-    r.add('GET', lambda p: p == '/api/agents' and AGENT_SYSTEM_AVAILABLE,                    handle_agents_route)
-    r.add('GET', lambda p: p == '/api/agents/metrics' and AGENT_SYSTEM_AVAILABLE,            handle_agents_metrics_route)
-    r.add('GET', lambda p: p.startswith('/api/agents/') and AGENT_SYSTEM_AVAILABLE,          handle_agents_detail_route)
-    r.add('GET', lambda p: p == '/api/ollama/status',                         handle_ollama_status_route if OLLAMA_AGENTS_AVAILABLE else handle_models_route)
-    r.add('GET', lambda p: p == '/api/ollama/agents',                         handle_ollama_agents_route if OLLAMA_AGENTS_AVAILABLE else handle_models_route)
-    r.add('GET', lambda p: p == '/api/ollama/skills',                         handle_ollama_skills_route if OLLAMA_AGENTS_AVAILABLE else handle_models_route)
-    r.add('GET', lambda p: p.startswith('/api/ollama/agents/'),               handle_ollama_agent_detail_route if OLLAMA_AGENTS_AVAILABLE else handle_models_route)
-    r.add('GET', lambda p: p == '/api/mcp/servers' and AGENT_SYSTEM_AVAILABLE,               handle_mcp_servers_route)
-    r.add('GET', lambda p: p.startswith('/api/mcp/servers/') and AGENT_SYSTEM_AVAILABLE,     handle_mcp_server_action_route)
-    r.add('GET', lambda p: p == '/api/mcp/metrics' and AGENT_SYSTEM_AVAILABLE,               handle_mcp_metrics_route)
-    r.add('GET', lambda p: p == '/api/nlp/capabilities' and AGENT_SYSTEM_AVAILABLE,          handle_nlp_capabilities_route)
-    r.add('GET', lambda p: p == '/api/prompts' and PROMPTS_AVAILABLE,                        handle_prompts_list_route)
-    r.add('GET', lambda p: p.startswith('/api/prompts/') and PROMPTS_AVAILABLE,              handle_prompts_detail_route)
-    r.add('GET', lambda p: p.startswith('/api/shredding/status/'),            lambda h: handle_shredding_status_route(h, h.path, _qp(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/shredding/requirements/'),      lambda h: handle_shredding_requirements_route(h, h.path, _qp(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/shredding/matrix/'),            lambda h: handle_shredding_matrix_route(h, h.path, _qp(h.path)))
-    r.add('GET', lambda p: p == '/api/todos/users' and TODOS_AVAILABLE,                      handle_users_list_route)
-    r.add('GET', lambda p: TODOS_AVAILABLE and (p == '/api/todos/lists' or p.startswith('/api/todos/lists?')), handle_lists_list_route)
-    r.add('GET', lambda p: p == '/api/todos/shared' and TODOS_AVAILABLE,                     handle_shared_lists_route)
-    r.add('GET', lambda p: p == '/api/todos/today' and TODOS_AVAILABLE,                      handle_todos_today_route)
-    r.add('GET', lambda p: p == '/api/todos/upcoming' and TODOS_AVAILABLE,                   handle_todos_upcoming_route)
-    r.add('GET', lambda p: p == '/api/todos/search' and TODOS_AVAILABLE,                     handle_todos_search_route)
-    r.add('GET', lambda p: p == '/api/todos/tags' and TODOS_AVAILABLE,                       handle_tags_list_route)
-    r.add('GET', lambda p: TODOS_AVAILABLE and (p == '/api/todos' or p.startswith('/api/todos?')), handle_todos_list_route)
-    r.add('GET', lambda p: p.startswith('/api/todos/lists/') and p.endswith('/shares') and TODOS_AVAILABLE, lambda h: handle_lists_shares_route(h, _second_last(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/todos/users/') and TODOS_AVAILABLE,            lambda h: handle_users_detail_route(h, _last(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/todos/lists/') and TODOS_AVAILABLE,            lambda h: handle_lists_detail_route(h, _last(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/todos/tags/') and TODOS_AVAILABLE,             lambda h: handle_tags_detail_route(h, _last(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/todos/') and p.endswith('/history') and TODOS_AVAILABLE, lambda h: handle_todos_history_route(h, _second_last(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/todos/') and TODOS_AVAILABLE,                  lambda h: handle_todos_detail_route(h, _last(h.path)))
-    r.add('GET', lambda p: p == '/api/career/list',                           handle_career_list_get_route)
-    r.add('GET', lambda p: p == '/api/career/positions' or p.startswith('/api/career/positions?'), handle_career_positions_list_route)
-    r.add('GET', lambda p: p == '/api/career/stats',                          handle_career_stats_route)
-    r.add('GET', lambda p: p.startswith('/api/career/assessments/'),          lambda h: handle_career_assessment_get_route(h, _last(h.path)))
-    r.add('GET', lambda p: p == '/api/pipeline/stats',                        handle_pipeline_stats_route)
-    r.add('GET', lambda p: p.startswith('/api/opportunities/export'),         handle_opportunities_export_route)
-    r.add('GET', lambda p: p == '/api/opportunities',                         handle_opportunities_list_route)
-    r.add('GET', lambda p: p.startswith('/api/opportunities/') and '/tasks' in p, lambda h: handle_tasks_list_route(h, h.path.split('?')[0].split('/')[3]))
-    r.add('GET', lambda p: p.startswith('/api/tasks/') and p.endswith('/history'), lambda h: handle_task_history_route(h, _second_last(h.path)))
-    r.add('GET', lambda p: p.startswith('/api/tasks/'),                       lambda h: handle_task_get_route(h, _last(h.path)))
-    r.add('GET', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/contacts'),     handle_contacts_list_route)
-    r.add('GET', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/competitors'),  handle_competitors_list_route)
-    r.add('GET', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/activities'),   handle_activities_list_route)
-    r.add('GET', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/win-strategy'), handle_win_strategy_get_route)
-    r.add('GET', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/ptw'),          handle_ptw_get_route)
-    r.add('GET', lambda p: p.startswith('/api/opportunities/'),               handle_opportunities_detail_route)
-    r.add('GET', lambda p: p == '/api/source-tree',                           handle_source_tree_route)
-    r.add('GET', lambda p: p == '/api/proposals' and PROPOSALS_AVAILABLE,                    handle_proposals_list_route)
-    r.add('GET', lambda p: p.startswith('/api/proposals/') and p.endswith('/schedule') and PROPOSALS_AVAILABLE, handle_proposals_schedule_route)
-    r.add('GET', lambda p: p.startswith('/api/proposals/') and p.endswith('/bid-no-bid') and PROPOSALS_AVAILABLE, handle_proposals_bnb_get_route)
-    r.add('GET', lambda p: p.startswith('/api/proposals/') and PROPOSALS_AVAILABLE,          handle_proposals_detail_route)
-    r.add('GET', lambda p: p == '/api/proposal-items' and TRACKING_AVAILABLE,  handle_proposal_items_list_route)
-    r.add('GET', lambda p: p == '/api/bnb-items' and TRACKING_AVAILABLE,       handle_bnb_items_list_route)
-    r.add('GET', lambda p: p == '/api/hotwash-items' and TRACKING_AVAILABLE,   handle_hotwash_items_list_route)
-    r.add('GET', lambda p: p == '/api/all-tasks' and TRACKING_AVAILABLE,       handle_all_tasks_list_route)
-    r.add('GET', lambda p: p == '/api/settings/tracking-tasks',               handle_tracking_tasks_get_route)
-    r.add('GET', lambda p: p == '/api/settings/categories',                   handle_categories_get_route)
+    r.add('GET', '/api/rag/documents',                    handle_rag_documents_route, enabled=RAG_AVAILABLE)
+    r.add('GET', '/api/rag/analytics',                    handle_rag_analytics_route, enabled=RAG_AVAILABLE)
+    r.add('GET', '/api/search/folders',                   handle_search_folders_route, enabled=SEARCH_AVAILABLE)
+    r.add('GET', '/api/search/tags',                      handle_search_tags_route, enabled=SEARCH_AVAILABLE)
+    r.add('GET', '/api/chat/metrics',                     handle_chat_metrics_route)
+    r.add('GET', '/api/ollama/metrics',                   handle_ollama_metrics_route)
+    r.add('GET', '/api/visualizations/knowledge-graph',   handle_knowledge_graph_route)
+    r.add('GET', '/api/visualizations/performance',       handle_performance_dashboard_route)
+    r.add('GET', '/api/visualizations/search-results',    handle_search_results_route)
+    r.add('GET', '/api/agents',                           handle_agents_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('GET', '/api/agents/metrics',                   handle_agents_metrics_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('GET', '/api/agents/*',                         handle_agents_detail_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('GET', '/api/ollama/status',                    handle_ollama_status_route if OLLAMA else handle_models_route)
+    r.add('GET', '/api/ollama/agents',                    handle_ollama_agents_route if OLLAMA else handle_models_route)
+    r.add('GET', '/api/ollama/skills',                    handle_ollama_skills_route if OLLAMA else handle_models_route)
+    r.add('GET', '/api/ollama/agents/**',                 handle_ollama_agent_detail_route if OLLAMA else handle_models_route)
+    r.add('GET', '/api/mcp/servers',                      handle_mcp_servers_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('GET', '/api/mcp/servers/**',                   handle_mcp_server_action_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('GET', '/api/mcp/metrics',                      handle_mcp_metrics_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('GET', '/api/nlp/capabilities',                 handle_nlp_capabilities_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('GET', '/api/prompts',                          handle_prompts_list_route, enabled=PROMPTS_AVAILABLE)
+    r.add('GET', '/api/prompts/*',                        handle_prompts_detail_route, enabled=PROMPTS_AVAILABLE)
+    r.add('GET', '/api/shredding/status/**',              lambda h: handle_shredding_status_route(h, h.path, _qp(h.path)))
+    r.add('GET', '/api/shredding/requirements/**',        lambda h: handle_shredding_requirements_route(h, h.path, _qp(h.path)))
+    r.add('GET', '/api/shredding/matrix/**',              lambda h: handle_shredding_matrix_route(h, h.path, _qp(h.path)))
+    r.add('GET', '/api/career/list',                      handle_career_list_get_route)
+    r.add('GET', '/api/career/positions',                 handle_career_positions_list_route)
+    r.add('GET', '/api/career/stats',                     handle_career_stats_route)
+    r.add('GET', '/api/career/assessments/{assessment_id}', handle_career_assessment_get_route)
+    r.add('GET', '/api/pipeline/stats',                   handle_pipeline_stats_route)
+    r.add('GET', '/api/opportunities/export',             handle_opportunities_export_route)
+    r.add('GET', '/api/opportunities',                    handle_opportunities_list_route)
+    r.add('GET', '/api/opportunities/{opportunity_id}/tasks', handle_tasks_list_route)
+    r.add('GET', '/api/tasks/{task_id}/history',          handle_task_history_route)
+    r.add('GET', '/api/tasks/{task_id}',                  handle_task_get_route)
+    r.add('GET', '/api/opportunities/*',                  handle_opportunities_detail_route)
+    r.add('GET', '/api/source-tree',                      handle_source_tree_route)
+    r.add('GET', '/api/settings/tracking-tasks',          handle_tracking_tasks_get_route)
+    r.add('GET', '/api/settings/categories',              handle_categories_get_route)
 
     # ---- POST ---------------------------------------------------------------
-    r.add('POST', lambda p: p == '/api/chat',                                 handle_chat_route)
-    r.add('POST', lambda p: p == '/api/models',                               handle_models_route)
-    r.add('POST', lambda p: p == '/api/rag/status' and RAG_AVAILABLE,         handle_rag_status_route)
-    r.add('POST', lambda p: p == '/api/rag/search' and RAG_AVAILABLE,         handle_rag_search_route)
-    r.add('POST', lambda p: p == '/api/rag/query' and RAG_AVAILABLE,          handle_rag_query_route)
-    r.add('POST', lambda p: p == '/api/rag/ingest' and RAG_AVAILABLE,         handle_rag_ingest_route)
-    r.add('POST', lambda p: p == '/api/rag/upload' and RAG_AVAILABLE,         handle_rag_upload_route)
-    r.add('POST', lambda p: p == '/api/rag/documents' and RAG_AVAILABLE,      handle_rag_documents_route)
-    r.add('POST', lambda p: p == '/api/cag/status' and CAG_AVAILABLE,         handle_cag_status_route)
-    r.add('POST', lambda p: p == '/api/cag/load' and CAG_AVAILABLE,           handle_cag_load_route)
-    r.add('POST', lambda p: p == '/api/cag/clear' and CAG_AVAILABLE,          handle_cag_clear_route)
-    r.add('POST', lambda p: p == '/api/cag/query' and CAG_AVAILABLE,          handle_cag_query_route)
-    r.add('POST', lambda p: p == '/api/agents' and AGENT_SYSTEM_AVAILABLE,                   handle_agents_route)
-    r.add('POST', lambda p: p.startswith('/api/agents/') and AGENT_SYSTEM_AVAILABLE,         handle_agents_detail_route)
-    r.add('POST', lambda p: p == '/api/ollama/agents',                        handle_ollama_agents_route if OLLAMA_AGENTS_AVAILABLE else handle_models_route)
-    r.add('POST', lambda p: p.startswith('/api/ollama/agents/') and '/invoke' in p, handle_ollama_agent_invoke_route if OLLAMA_AGENTS_AVAILABLE else handle_models_route)
-    r.add('POST', lambda p: p.startswith('/api/ollama/agents/'),              handle_ollama_agent_detail_route if OLLAMA_AGENTS_AVAILABLE else handle_models_route)
-    r.add('POST', lambda p: p == '/api/mcp/servers' and AGENT_SYSTEM_AVAILABLE,              handle_mcp_servers_route)
-    r.add('POST', lambda p: p.startswith('/api/mcp/servers/') and AGENT_SYSTEM_AVAILABLE,    handle_mcp_server_action_route)
-    r.add('POST', lambda p: p == '/api/nlp/parse-task' and AGENT_SYSTEM_AVAILABLE,           handle_nlp_parse_task_route)
-    r.add('POST', lambda p: p == '/api/search' and SEARCH_AVAILABLE,                         handle_search_route)
-    r.add('POST', lambda p: p == '/api/search/folders' and SEARCH_AVAILABLE,                 handle_search_create_folder_route)
-    r.add('POST', lambda p: p == '/api/search/objects' and SEARCH_AVAILABLE,                 handle_search_add_object_route)
-    r.add('POST', lambda p: p == '/api/career/list',                          handle_career_list_add_route)
-    r.add('POST', lambda p: p == '/api/career/positions',                     handle_career_positions_create_route)
-    r.add('POST', lambda p: p == '/api/career/candidates',                    handle_career_candidates_create_route)
-    r.add('POST', lambda p: p == '/api/career/analyze',                       handle_career_analyze_route)
-    r.add('POST', lambda p: p == '/api/shredding/shred',                      lambda h: handle_shredding_shred_route(h, h.path, _qp(h.path)))
-    r.add('POST', lambda p: p == '/api/prompts' and PROMPTS_AVAILABLE,                       handle_prompts_create_route)
-    r.add('POST', lambda p: p == '/api/prompts/use' and PROMPTS_AVAILABLE,                   handle_prompts_use_route)
-    r.add('POST', lambda p: p == '/api/prompts/search' and PROMPTS_AVAILABLE,                handle_prompts_search_route)
-    r.add('POST', lambda p: p.startswith('/api/prompts/') and PROMPTS_AVAILABLE,             handle_prompts_update_route)
-    r.add('POST', lambda p: p == '/api/todos/users' and TODOS_AVAILABLE,                     handle_users_create_route)
-    r.add('POST', lambda p: p == '/api/todos/lists' and TODOS_AVAILABLE,                     handle_lists_create_route)
-    r.add('POST', lambda p: p == '/api/todos/tags' and TODOS_AVAILABLE,                      handle_tags_create_route)
-    r.add('POST', lambda p: p == '/api/todos/parse' and TODOS_AVAILABLE,                     handle_todos_parse_route)
-    r.add('POST', lambda p: p == '/api/todos/search' and TODOS_AVAILABLE,                    handle_todos_search_route)
-    r.add('POST', lambda p: p == '/api/todos' and TODOS_AVAILABLE,                           handle_todos_create_route)
-    r.add('POST', lambda p: p.startswith('/api/todos/lists/') and p.endswith('/share') and TODOS_AVAILABLE, lambda h: handle_lists_share_route(h, _second_last(h.path)))
-    r.add('POST', lambda p: p.startswith('/api/todos/') and p.endswith('/complete') and TODOS_AVAILABLE, lambda h: handle_todos_complete_route(h, _second_last(h.path)))
-    r.add('POST', lambda p: p.startswith('/api/todos/') and p.endswith('/archive') and TODOS_AVAILABLE, lambda h: handle_todos_archive_route(h, _second_last(h.path)))
-    r.add('POST', lambda p: p.startswith('/api/todos/') and TODOS_AVAILABLE,                 lambda h: handle_todos_update_route(h, _last(h.path)))
-    r.add('POST', lambda p: p == '/api/opportunities/import/parse',           handle_opportunities_import_parse_route)
-    r.add('POST', lambda p: p == '/api/opportunities/import/xls-parse',      handle_opportunities_import_xls_parse_route)
-    r.add('POST', lambda p: p == '/api/opportunities/import/confirm',         handle_opportunities_import_confirm_route)
-    r.add('POST', lambda p: p == '/api/opportunities',                        handle_opportunities_create_route)
-    r.add('POST', lambda p: p.startswith('/api/opportunities/') and '/tasks' in p, lambda h: handle_tasks_create_route(h, h.path.split('?')[0].split('/')[3]))
-    r.add('POST', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/contacts'),    handle_contacts_create_route)
-    r.add('POST', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/competitors'), handle_competitors_create_route)
-    r.add('POST', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/activities'),  handle_activities_create_route)
-    r.add('POST', lambda p: p.startswith('/api/tasks/'),                      lambda h: handle_task_update_route(h, _last(h.path)))
-    r.add('POST', lambda p: p.startswith('/api/opportunities/'),              handle_opportunities_update_route)
-    r.add('POST', lambda p: p == '/api/proposal-items' and TRACKING_AVAILABLE,  handle_proposal_items_create_route)
-    r.add('POST', lambda p: p == '/api/bnb-items' and TRACKING_AVAILABLE,       handle_bnb_items_create_route)
-    r.add('POST', lambda p: p == '/api/hotwash-items' and TRACKING_AVAILABLE,   handle_hotwash_items_create_route)
-    r.add('POST', lambda p: p == '/api/proposals' and PROPOSALS_AVAILABLE,                   handle_proposals_create_route)
-    r.add('POST', lambda p: p.startswith('/api/proposals/') and p.endswith('/advance') and PROPOSALS_AVAILABLE, handle_proposals_advance_route)
-    r.add('POST', lambda p: p.startswith('/api/proposals/') and p.endswith('/folders') and PROPOSALS_AVAILABLE, handle_proposals_folders_route)
-    r.add('POST', lambda p: p.startswith('/api/proposals/') and p.endswith('/bid-no-bid') and PROPOSALS_AVAILABLE, handle_proposals_bnb_post_route)
+    r.add('POST', '/api/chat',                            handle_chat_route)
+    r.add('POST', '/api/models',                          handle_models_route)
+    r.add('POST', '/api/rag/status',                      handle_rag_status_route, enabled=RAG_AVAILABLE)
+    r.add('POST', '/api/rag/search',                      handle_rag_search_route, enabled=RAG_AVAILABLE)
+    r.add('POST', '/api/rag/query',                       handle_rag_query_route, enabled=RAG_AVAILABLE)
+    r.add('POST', '/api/rag/ingest',                      handle_rag_ingest_route, enabled=RAG_AVAILABLE)
+    r.add('POST', '/api/rag/upload',                      handle_rag_upload_route, enabled=RAG_AVAILABLE)
+    r.add('POST', '/api/rag/documents',                   handle_rag_documents_route, enabled=RAG_AVAILABLE)
+    r.add('POST', '/api/cag/status',                      handle_cag_status_route, enabled=CAG_AVAILABLE)
+    r.add('POST', '/api/cag/load',                        handle_cag_load_route, enabled=CAG_AVAILABLE)
+    r.add('POST', '/api/cag/clear',                       handle_cag_clear_route, enabled=CAG_AVAILABLE)
+    r.add('POST', '/api/cag/query',                       handle_cag_query_route, enabled=CAG_AVAILABLE)
+    r.add('POST', '/api/agents',                          handle_agents_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('POST', '/api/agents/*',                        handle_agents_detail_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('POST', '/api/ollama/agents',                   handle_ollama_agents_route if OLLAMA else handle_models_route)
+    r.add('POST', '/api/ollama/agents/*/invoke',          handle_ollama_agent_invoke_route if OLLAMA else handle_models_route)
+    r.add('POST', '/api/ollama/agents/**',                handle_ollama_agent_detail_route if OLLAMA else handle_models_route)
+    r.add('POST', '/api/mcp/servers',                     handle_mcp_servers_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('POST', '/api/mcp/servers/**',                  handle_mcp_server_action_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('POST', '/api/nlp/parse-task',                  handle_nlp_parse_task_route, enabled=AGENT_SYSTEM_AVAILABLE)
+    r.add('POST', '/api/search',                          handle_search_route, enabled=SEARCH_AVAILABLE)
+    r.add('POST', '/api/search/folders',                  handle_search_create_folder_route, enabled=SEARCH_AVAILABLE)
+    r.add('POST', '/api/search/objects',                  handle_search_add_object_route, enabled=SEARCH_AVAILABLE)
+    r.add('POST', '/api/career/list',                     handle_career_list_add_route)
+    r.add('POST', '/api/career/positions',                handle_career_positions_create_route)
+    r.add('POST', '/api/career/candidates',               handle_career_candidates_create_route)
+    r.add('POST', '/api/career/analyze',                  handle_career_analyze_route)
+    r.add('POST', '/api/shredding/shred',                 lambda h: handle_shredding_shred_route(h, h.path, _qp(h.path)))
+    r.add('POST', '/api/prompts',                         handle_prompts_create_route, enabled=PROMPTS_AVAILABLE)
+    r.add('POST', '/api/prompts/use',                     handle_prompts_use_route, enabled=PROMPTS_AVAILABLE)
+    r.add('POST', '/api/prompts/search',                  handle_prompts_search_route, enabled=PROMPTS_AVAILABLE)
+    r.add('POST', '/api/prompts/*',                       handle_prompts_update_route, enabled=PROMPTS_AVAILABLE)
+    r.add('POST', '/api/opportunities/import/parse',      handle_opportunities_import_parse_route)
+    r.add('POST', '/api/opportunities/import/xls-parse',  handle_opportunities_import_xls_parse_route)
+    r.add('POST', '/api/opportunities/import/confirm',    handle_opportunities_import_confirm_route)
+    r.add('POST', '/api/opportunities',                   handle_opportunities_create_route)
+    r.add('POST', '/api/opportunities/{opportunity_id}/tasks', handle_tasks_create_route)
+    r.add('POST', '/api/tasks/{task_id}',                 handle_task_update_route)
+    r.add('POST', '/api/opportunities/*',                 handle_opportunities_update_route)
 
     # ---- DELETE -------------------------------------------------------------
-    r.add('DELETE', lambda p: p.startswith('/api/rag/documents/') and RAG_AVAILABLE,         lambda h: handle_rag_document_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/cag/documents/') and CAG_AVAILABLE,         lambda h: handle_cag_document_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/prompts/') and PROMPTS_AVAILABLE,           lambda h: handle_prompts_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/career/list/'),              lambda h: handle_career_list_remove_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/ollama/agents/') and OLLAMA_AGENTS_AVAILABLE, handle_ollama_agent_detail_route)
-    r.add('DELETE', lambda p: p.startswith('/api/todos/users/') and TODOS_AVAILABLE,         lambda h: handle_users_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/todos/lists/') and '/share' in p and TODOS_AVAILABLE, lambda h: handle_lists_unshare_route(h, _second_last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/todos/lists/') and TODOS_AVAILABLE,         lambda h: handle_lists_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/todos/tags/') and TODOS_AVAILABLE,          lambda h: handle_tags_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/todos/') and TODOS_AVAILABLE,               lambda h: handle_todos_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/tasks/'),                    lambda h: handle_task_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and '/contacts/'    in p, handle_contact_delete_route)
-    r.add('DELETE', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and '/competitors/' in p, handle_competitor_delete_route)
-    r.add('DELETE', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and '/activities/'  in p, handle_activity_delete_route)
-    r.add('DELETE', lambda p: p == '/api/opportunities',                      handle_opportunities_delete_all_route)
-    r.add('DELETE', lambda p: p.startswith('/api/opportunities/'),            lambda h: handle_opportunities_delete_route(h, _last(h.path)))
-    r.add('DELETE', lambda p: p.startswith('/api/proposal-items/') and TRACKING_AVAILABLE, handle_proposal_item_delete_route)
-    r.add('DELETE', lambda p: p.startswith('/api/bnb-items/') and TRACKING_AVAILABLE,      handle_bnb_item_delete_route)
-    r.add('DELETE', lambda p: p.startswith('/api/hotwash-items/') and TRACKING_AVAILABLE,  handle_hotwash_item_delete_route)
-    r.add('DELETE', lambda p: p.startswith('/api/proposals/') and PROPOSALS_AVAILABLE,       handle_proposals_delete_route)
+    r.add('DELETE', '/api/rag/documents/{document_id}',   handle_rag_document_delete_route, enabled=RAG_AVAILABLE)
+    r.add('DELETE', '/api/cag/documents/{document_id}',   handle_cag_document_delete_route, enabled=CAG_AVAILABLE)
+    r.add('DELETE', '/api/prompts/{prompt_id}',           handle_prompts_delete_route, enabled=PROMPTS_AVAILABLE)
+    r.add('DELETE', '/api/career/list/{list_id}',         handle_career_list_remove_route)
+    r.add('DELETE', '/api/tasks/{task_id}',               handle_task_delete_route)
+    r.add('DELETE', '/api/opportunities',                 handle_opportunities_delete_all_route)
+    r.add('DELETE', '/api/opportunities/{opportunity_id}', handle_opportunities_delete_route)
 
     # ---- PUT ----------------------------------------------------------------
-    r.add('PUT', lambda p: p.startswith('/api/shredding/requirements/'),      lambda h: handle_shredding_req_update_route(h, h.path, _qp(h.path)))
-    r.add('PUT', lambda p: p.startswith('/api/prompts/') and PROMPTS_AVAILABLE,              handle_prompts_update_route)
-    r.add('PUT', lambda p: p.startswith('/api/ollama/agents/') and OLLAMA_AGENTS_AVAILABLE,  handle_ollama_agent_detail_route)
-    r.add('PUT', lambda p: p.startswith('/api/todos/users/') and TODOS_AVAILABLE,            lambda h: handle_users_update_route(h, _last(h.path)))
-    r.add('PUT', lambda p: p.startswith('/api/todos/lists/') and TODOS_AVAILABLE,            lambda h: handle_lists_update_route(h, _last(h.path)))
-    r.add('PUT', lambda p: p.startswith('/api/todos/tags/') and TODOS_AVAILABLE,             lambda h: handle_tags_update_route(h, _last(h.path)))
-    r.add('PUT', lambda p: p.startswith('/api/todos/') and TODOS_AVAILABLE,                  lambda h: handle_todos_update_route(h, _last(h.path)))
-    r.add('PUT', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and '/contacts/'    in p, handle_contact_update_route)
-    r.add('PUT', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and '/competitors/' in p, handle_competitor_update_route)
-    r.add('PUT', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/win-strategy'), handle_win_strategy_put_route)
-    r.add('PUT', lambda p: CAPTURE_AVAILABLE and p.startswith('/api/opportunities/') and p.endswith('/ptw'),          handle_ptw_put_route)
-    r.add('PUT', lambda p: p.startswith('/api/opportunities/'),               handle_opportunities_update_route)
-    r.add('PUT', lambda p: p.startswith('/api/proposal-items/') and TRACKING_AVAILABLE, handle_proposal_item_update_route)
-    r.add('PUT', lambda p: p.startswith('/api/bnb-items/') and TRACKING_AVAILABLE,      handle_bnb_item_update_route)
-    r.add('PUT', lambda p: p.startswith('/api/hotwash-items/') and TRACKING_AVAILABLE,  handle_hotwash_item_update_route)
-    r.add('PUT', lambda p: p == '/api/settings/tracking-tasks',               handle_tracking_tasks_put_route)
-    r.add('PUT', lambda p: p == '/api/settings/categories',                   handle_categories_put_route)
-    r.add('PUT', lambda p: p.startswith('/api/proposals/') and PROPOSALS_AVAILABLE,          handle_proposals_update_route)
+    r.add('PUT', '/api/shredding/requirements/bulk',      lambda h: handle_shredding_req_bulk_update_route(h, h.path, _qp(h.path)))
+    r.add('PUT', '/api/shredding/requirements/**',        lambda h: handle_shredding_req_update_route(h, h.path, _qp(h.path)))
+    r.add('PUT', '/api/prompts/*',                        handle_prompts_update_route, enabled=PROMPTS_AVAILABLE)
+    r.add('PUT', '/api/opportunities/*',                  handle_opportunities_update_route)
+    r.add('PUT', '/api/settings/tracking-tasks',          handle_tracking_tasks_put_route)
+    r.add('PUT', '/api/settings/categories',              handle_categories_put_route)
 
     # ---- Proposal Drafts ----------------------------------------------------
-    r.add('GET',    lambda p: p == '/api/proposal-doc-types',                               handle_proposal_doc_types)
-    r.add('GET',    lambda p: p == '/api/proposal-llm-actions',                             handle_proposal_llm_actions)
-    r.add('GET',    lambda p: p == '/api/proposal-docs' or p.startswith('/api/proposal-docs?'), handle_proposal_docs_list)
-    r.add('POST',   lambda p: p == '/api/proposal-docs',                                    handle_proposal_docs_create)
-    r.add('GET',    lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/sections'), handle_proposal_doc_sections)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/sections'), handle_proposal_doc_section_create)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/apply-template'),    handle_proposal_doc_apply_template)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/stage-snapshot'),    handle_proposal_doc_stage_snapshot)
-    r.add('GET',    lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/export'),              handle_proposal_doc_export)
-    r.add('GET',    lambda p: p.startswith('/api/proposal-docs/') and '/sections' not in p and '/apply-template' not in p and '/stage-snapshot' not in p and '/export' not in p and '/color-team' not in p and '/compliance-assessment' not in p, handle_proposal_doc_detail)
-    r.add('PUT',    lambda p: p.startswith('/api/proposal-docs/'),                          handle_proposal_doc_update)
-    r.add('DELETE', lambda p: p.startswith('/api/proposal-docs/'),                          handle_proposal_doc_delete)
-    r.add('GET',    lambda p: p.startswith('/api/proposal-sections/') and p.endswith('/versions'),  handle_proposal_section_versions_list)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-sections/') and p.endswith('/versions'),  handle_proposal_section_versions_create)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-sections/') and '/restore/' in p,         handle_proposal_section_restore)
-    r.add('GET',    lambda p: p.startswith('/api/proposal-sections/') and p.endswith('/comments'),  handle_proposal_section_comments_list)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-sections/') and p.endswith('/comments'),  handle_proposal_section_comments_create)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-sections/') and p.endswith('/llm'),        handle_proposal_section_llm)
-    r.add('GET',    lambda p: p.startswith('/api/proposal-sections/') and '/versions' not in p and '/comments' not in p and '/llm' not in p and '/restore' not in p, handle_proposal_section_detail)
-    r.add('PUT',    lambda p: p.startswith('/api/proposal-sections/'),                      handle_proposal_section_update)
-    r.add('DELETE', lambda p: p.startswith('/api/proposal-sections/'),                      handle_proposal_section_delete)
-    r.add('PUT',    lambda p: p.startswith('/api/proposal-comments/') and '/resolve' not in p, handle_proposal_comment_update)
-    r.add('POST',   lambda p: p.startswith('/api/proposal-comments/') and p.endswith('/resolve'), handle_proposal_comment_resolve)
-    r.add('DELETE', lambda p: p.startswith('/api/proposal-comments/'),                      handle_proposal_comment_delete)
+    r.add('GET',    '/api/proposal-doc-types',                   handle_proposal_doc_types)
+    r.add('GET',    '/api/proposal-llm-actions',                 handle_proposal_llm_actions)
+    r.add('GET',    '/api/proposal-docs',                        handle_proposal_docs_list)
+    r.add('POST',   '/api/proposal-docs',                        handle_proposal_docs_create)
+    r.add('GET',    '/api/proposal-docs/*/sections',             handle_proposal_doc_sections)
+    r.add('POST',   '/api/proposal-docs/*/sections',             handle_proposal_doc_section_create)
+    r.add('POST',   '/api/proposal-docs/*/apply-template',       handle_proposal_doc_apply_template)
+    r.add('POST',   '/api/proposal-docs/*/stage-snapshot',       handle_proposal_doc_stage_snapshot)
+    r.add('GET',    '/api/proposal-docs/*/export',               handle_proposal_doc_export)
+    r.add('GET',    '/api/proposal-docs/*',                      handle_proposal_doc_detail)
+    r.add('PUT',    '/api/proposal-docs/*',                      handle_proposal_doc_update)
+    r.add('DELETE', '/api/proposal-docs/*',                      handle_proposal_doc_delete)
+    r.add('GET',    '/api/proposal-sections/*/versions',         handle_proposal_section_versions_list)
+    r.add('POST',   '/api/proposal-sections/*/versions',         handle_proposal_section_versions_create)
+    r.add('POST',   '/api/proposal-sections/*/restore/*',        handle_proposal_section_restore)
+    r.add('GET',    '/api/proposal-sections/*/comments',         handle_proposal_section_comments_list)
+    r.add('POST',   '/api/proposal-sections/*/comments',         handle_proposal_section_comments_create)
+    r.add('POST',   '/api/proposal-sections/*/llm',              handle_proposal_section_llm)
+    r.add('GET',    '/api/proposal-sections/*',                  handle_proposal_section_detail)
+    r.add('PUT',    '/api/proposal-sections/*',                  handle_proposal_section_update)
+    r.add('DELETE', '/api/proposal-sections/*',                  handle_proposal_section_delete)
+    r.add('PUT',    '/api/proposal-comments/*',                  handle_proposal_comment_update)
+    r.add('POST',   '/api/proposal-comments/*/resolve',          handle_proposal_comment_resolve)
+    r.add('DELETE', '/api/proposal-comments/*',                  handle_proposal_comment_delete)
+
+    # ---- Background Jobs ----------------------------------------------------
+    r.add('GET',  '/api/jobs/metrics',                           handle_job_metrics_route)
+    r.add('GET',  '/api/jobs/{job_id}',                          handle_job_status_route)
+    r.add('POST', '/api/jobs/{job_id}/cancel',                   handle_job_cancel_route)
 
     # ---- Color Team Review --------------------------------------------------
-    r.add('GET',  lambda p: p.startswith('/api/color-team-jobs/'),                                         handle_color_team_job_status)
-    r.add('POST', lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/color-team-upload'),      handle_color_team_upload)
-    r.add('GET',  lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/compliance-assessment'),  handle_compliance_assessment)
-    r.add('GET',  lambda p: p.startswith('/api/proposal-docs/') and p.endswith('/color-team-comments'),    handle_color_team_comments)
-    r.add('GET',  lambda p: p.startswith('/api/proposal-docs/') and '/color-team-export' in p,             handle_color_team_export)
+    r.add('GET',  '/api/color-team-jobs/*',                      handle_color_team_job_status)
+    r.add('POST', '/api/proposal-docs/*/color-team-upload',      handle_color_team_upload)
+    r.add('GET',  '/api/proposal-docs/*/compliance-assessment',  handle_compliance_assessment)
+    r.add('GET',  '/api/proposal-docs/*/color-team-comments',    handle_color_team_comments)
+    r.add('GET',  '/api/proposal-docs/*/color-team-export',      handle_color_team_export)
+
+    # Optional modules below are registered only when their handlers imported;
+    # precedence is by pattern specificity, so grouping does not change matching.
+
+    # ---- Ollama Agents ------------------------------------------------------
+    if OLLAMA:
+        r.add('DELETE', '/api/ollama/agents/**',              handle_ollama_agent_detail_route)
+        r.add('PUT', '/api/ollama/agents/**',                 handle_ollama_agent_detail_route)
+
+    # ---- TODOs --------------------------------------------------------------
+    if TODOS_AVAILABLE:
+        r.add('GET', '/api/todos/users',                      handle_users_list_route)
+        r.add('GET', '/api/todos/lists',                      handle_lists_list_route)
+        r.add('GET', '/api/todos/shared',                     handle_shared_lists_route)
+        r.add('GET', '/api/todos/today',                      handle_todos_today_route)
+        r.add('GET', '/api/todos/upcoming',                   handle_todos_upcoming_route)
+        r.add('GET', '/api/todos/search',                     handle_todos_search_route)
+        r.add('GET', '/api/todos/tags',                       handle_tags_list_route)
+        r.add('GET', '/api/todos',                            handle_todos_list_route)
+        r.add('GET', '/api/todos/lists/{list_id}/shares',     handle_lists_shares_route)
+        r.add('GET', '/api/todos/users/{user_id}',            handle_users_detail_route)
+        r.add('GET', '/api/todos/lists/{list_id}',            handle_lists_detail_route)
+        r.add('GET', '/api/todos/tags/{tag_id}',              handle_tags_detail_route)
+        r.add('GET', '/api/todos/{todo_id}/history',          handle_todos_history_route)
+        r.add('GET', '/api/todos/{todo_id}',                  handle_todos_detail_route)
+        r.add('POST', '/api/todos/users',                     handle_users_create_route)
+        r.add('POST', '/api/todos/lists',                     handle_lists_create_route)
+        r.add('POST', '/api/todos/tags',                      handle_tags_create_route)
+        r.add('POST', '/api/todos/parse',                     handle_todos_parse_route)
+        r.add('POST', '/api/todos/search',                    handle_todos_search_route)
+        r.add('POST', '/api/todos',                           handle_todos_create_route)
+        r.add('POST', '/api/todos/lists/{list_id}/share',     handle_lists_share_route)
+        r.add('POST', '/api/todos/{todo_id}/complete',        handle_todos_complete_route)
+        r.add('POST', '/api/todos/{todo_id}/archive',         handle_todos_archive_route)
+        r.add('POST', '/api/todos/{todo_id}',                 handle_todos_update_route)
+        r.add('DELETE', '/api/todos/users/{user_id}',         handle_users_delete_route)
+        r.add('DELETE', '/api/todos/lists/{list_id}/share',   handle_lists_unshare_route)
+        r.add('DELETE', '/api/todos/lists/{list_id}',         handle_lists_delete_route)
+        r.add('DELETE', '/api/todos/tags/{tag_id}',           handle_tags_delete_route)
+        r.add('DELETE', '/api/todos/{todo_id}',               handle_todos_delete_route)
+        r.add('PUT', '/api/todos/users/{user_id}',            handle_users_update_route)
+        r.add('PUT', '/api/todos/lists/{list_id}',            handle_lists_update_route)
+        r.add('PUT', '/api/todos/tags/{tag_id}',              handle_tags_update_route)
+        r.add('PUT', '/api/todos/{todo_id}',                  handle_todos_update_route)
+
+    # ---- Capture Intelligence -----------------------------------------------
+    if CAPTURE_AVAILABLE:
+        r.add('GET', '/api/opportunities/*/contacts',         handle_contacts_list_route)
+        r.add('GET', '/api/opportunities/*/competitors',      handle_competitors_list_route)
+        r.add('GET', '/api/opportunities/*/activities',       handle_activities_list_route)
+        r.add('GET', '/api/opportunities/*/win-strategy',     handle_win_strategy_get_route)
+        r.add('GET', '/api/opportunities/*/ptw',              handle_ptw_get_route)
+        r.add('POST', '/api/opportunities/*/contacts',        handle_contacts_create_route)
+        r.add('POST', '/api/opportunities/*/competitors',     handle_competitors_create_route)
+        r.add('POST', '/api/opportunities/*/activities',      handle_activities_create_route)
+        r.add('DELETE', '/api/opportunities/*/contacts/*',    handle_contact_delete_route)
+        r.add('DELETE', '/api/opportunities/*/competitors/*', handle_competitor_delete_route)
+        r.add('DELETE', '/api/opportunities/*/activities/*',  handle_activity_delete_route)
+        r.add('PUT', '/api/opportunities/*/contacts/*',       handle_contact_update_route)
+        r.add('PUT', '/api/opportunities/*/competitors/*',    handle_competitor_update_route)
+        r.add('PUT', '/api/opportunities/*/win-strategy',     handle_win_strategy_put_route)
+        r.add('PUT', '/api/opportunities/*/ptw',              handle_ptw_put_route)
+
+    # ---- Proposals ----------------------------------------------------------
+    if PROPOSALS_AVAILABLE:
+        r.add('GET', '/api/proposals',                        handle_proposals_list_route)
+        r.add('GET', '/api/proposals/*/schedule',             handle_proposals_schedule_route)
+        r.add('GET', '/api/proposals/*/bid-no-bid',           handle_proposals_bnb_get_route)
+        r.add('GET', '/api/proposals/*',                      handle_proposals_detail_route)
+        r.add('POST', '/api/proposals',                       handle_proposals_create_route)
+        r.add('POST', '/api/proposals/*/advance',             handle_proposals_advance_route)
+        r.add('POST', '/api/proposals/*/folders',             handle_proposals_folders_route)
+        r.add('POST', '/api/proposals/*/bid-no-bid',          handle_proposals_bnb_post_route)
+        r.add('DELETE', '/api/proposals/*',                   handle_proposals_delete_route)
+        r.add('PUT', '/api/proposals/*',                      handle_proposals_update_route)
+
+    # ---- Tracking Lists -----------------------------------------------------
+    if TRACKING_AVAILABLE:
+        r.add('GET', '/api/proposal-items',                   handle_proposal_items_list_route)
+        r.add('GET', '/api/bnb-items',                        handle_bnb_items_list_route)
+        r.add('GET', '/api/hotwash-items',                    handle_hotwash_items_list_route)
+        r.add('GET', '/api/all-tasks',                        handle_all_tasks_list_route)
+        r.add('POST', '/api/proposal-items',                  handle_proposal_items_create_route)
+        r.add('POST', '/api/bnb-items',                       handle_bnb_items_create_route)
+        r.add('POST', '/api/hotwash-items',                   handle_hotwash_items_create_route)
+        r.add('DELETE', '/api/proposal-items/*',              handle_proposal_item_delete_route)
+        r.add('DELETE', '/api/bnb-items/*',                   handle_bnb_item_delete_route)
+        r.add('DELETE', '/api/hotwash-items/*',               handle_hotwash_item_delete_route)
+        r.add('PUT', '/api/proposal-items/*',                 handle_proposal_item_update_route)
+        r.add('PUT', '/api/bnb-items/*',                      handle_bnb_item_update_route)
+        r.add('PUT', '/api/hotwash-items/*',                  handle_hotwash_item_update_route)
 
     return r
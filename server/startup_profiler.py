@@ -0,0 +1,156 @@
+"""
+server/startup_profiler.py — Import and init timing for `server.py --profile-startup`.
+
+Installs a sys.meta_path hook that times every module import (cumulative
+and self time, like `python -X importtime` but collected in-process) and
+records named startup phases. report() prints the phases followed by the
+slowest modules.
+
+Usage:
+    from server.startup_profiler import StartupProfiler
+
+    profiler = StartupProfiler()
+    profiler.install()
+    with profiler.phase('build router'):
+        router = build_router()
+    profiler.mark('listening')
+    profiler.report()
+"""
+
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """Wraps a module's real loader and times exec_module()."""
+
+    def __init__(self, profiler: 'StartupProfiler', loader, name: str):
+        self._profiler = profiler
+        self._loader = loader
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class StartupProfiler(importlib.abc.MetaPathFinder):
+    """Collects per-module import times and named phase durations."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports: Dict[str, Tuple[float, float]] = {}  # name → (cumulative, self)
+        self.phases: List[Tuple[str, float]] = []
+        self.marks: List[Tuple[str, float]] = []
+        self._local = threading.local()
+        self._installed = False
+
+    # -- import hook --------------------------------------------------------
+
+    def install(self) -> None:
+        """Start timing imports (insert the finder at the front of sys.meta_path)."""
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            sys.meta_path.remove(self)
+            self._installed = False
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimingLoader(self, spec.loader, fullname)
+        return spec
+
+    def _enter(self, name: str) -> None:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str) -> None:
+        stack = self._local.stack
+        _, started, children = stack.pop()
+        elapsed = time.perf_counter() - started
+        self.imports[name] = (elapsed, elapsed - children)
+        if stack:
+            stack[-1][2] += elapsed
+
+    # -- phases -------------------------------------------------------------
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named block of startup work."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, name: str) -> float:
+        """Record a milestone; returns seconds since the profiler was created."""
+        elapsed = time.perf_counter() - self.started
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    # -- reporting ----------------------------------------------------------
+
+    def top_imports(self, limit: int = 25, min_ms: float = 0.0) -> List[Tuple[str, float, float]]:
+        """Slowest top-level-ish imports as (name, cumulative_s, self_s)."""
+        rows = [(n, cum, own) for n, (cum, own) in self.imports.items() if cum * 1000 >= min_ms]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows[:limit]
+
+    def report(self, limit: int = 25, stream=None) -> None:
+        """Print phases, milestones and the slowest module imports."""
+        out = stream or sys.stdout
+        print("\n⏱️  Startup profile", file=out)
+        print("-" * 72, file=out)
+        for name, elapsed in self.phases:
+            print(f"  {elapsed * 1000:9.1f} ms  phase   {name}", file=out)
+        for name, elapsed in self.marks:
+            print(f"  {elapsed * 1000:9.1f} ms  mark    {name} (since start)", file=out)
+        print("-" * 72, file=out)
+        print(f"  {'cumulative':>10}  {'self':>9}  module ({len(self.imports)} imported)", file=out)
+        for name, cum, own in self.top_imports(limit):
+            print(f"  {cum * 1000:8.1f} ms  {own * 1000:6.1f} ms  {name}", file=out)
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def start_profiling() -> StartupProfiler:
+    """Create and install the process-wide startup profiler."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler
@@ -0,0 +1,401 @@
+"""
+Streaming multipart/form-data parser.
+
+Uploads are read from handler.rfile in fixed-size chunks and file parts
+are spooled straight to disk, so a 200 MB PDF costs one chunk of memory
+rather than two or three copies of the whole body (cgi.FieldStorage and
+email.message_from_bytes both buffer everything).
+
+  - Content-Length is required and checked against the size cap before a
+    single body byte is read (MAX_UPLOAD_MB, default 250)
+  - Each file part lands in its own temp directory under its original
+    (sanitised) filename, so ingestion keeps the real document name
+  - Text fields stay in memory, capped at MAX_FIELD_BYTES each
+
+Usage:
+    from server.utils.multipart import UploadError, parse_multipart
+
+    try:
+        form = parse_multipart(handler)
+    except UploadError as e:
+        handler.send_json_response({'error': str(e)}, e.status)
+        return
+    with form:
+        upload = form.files.get('file')
+        result = ingest(upload.path)
+    # temp files are removed when the block exits
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_BYTES = int(float(os.getenv('MAX_UPLOAD_MB', '250')) * 1024 * 1024)
+MAX_FIELD_BYTES = 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9._ -]+')
+_DISPOSITION_PARAM = re.compile(r';\s*([\w*-]+)\s*=\s*("([^"]*)"|[^;]*)')
+
+
+class UploadError(ValueError):
+    """Malformed or rejected upload; `status` is the HTTP status to answer with."""
+
+    status = 400
+
+
+class UploadTooLarge(UploadError):
+    """Upload exceeds the configured size cap."""
+
+    status = 413
+
+
+class LengthRequired(UploadError):
+    """Upload sent without a Content-Length header."""
+
+    status = 411
+
+
+@dataclass
+class UploadedFile:
+    """A file part spooled to disk."""
+
+    name: str
+    filename: str
+    path: str
+    size: int
+    content_type: str = 'application/octet-stream'
+
+
+@dataclass
+class MultipartForm:
+    """Parsed form: text fields plus spooled files. Use as a context manager to clean up."""
+
+    fields: Dict[str, str] = field(default_factory=dict)
+    files: Dict[str, UploadedFile] = field(default_factory=dict)
+
+    def cleanup(self) -> None:
+        """Remove every spooled file (and its temp directory)."""
+        for upload in self.files.values():
+            shutil.rmtree(os.path.dirname(upload.path), ignore_errors=True)
+        self.files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+def safe_filename(filename: str, default: str = 'upload') -> str:
+    """
+    Reduce a client-supplied filename to a safe basename.
+
+    Args:
+        filename: Name from Content-Disposition (may include a path)
+        default: Name used when nothing usable remains
+
+    Returns:
+        str: Basename with path separators and unusual characters removed
+    """
+    name = filename.replace('\\', '/').rsplit('/', 1)[-1]
+    name = _UNSAFE_CHARS.sub('_', name).strip(' .')
+    return name[:200] or default
+
+
+def spool_dir_for(filename: str, spool_dir: Optional[str] = None) -> str:
+    """
+    Create a private temp directory and return the path a file named
+    `filename` should be written to inside it.
+    """
+    directory = tempfile.mkdtemp(prefix='upload_', dir=spool_dir)
+    return os.path.join(directory, safe_filename(filename))
+
+
+def content_length(handler, max_bytes: Optional[int] = None) -> int:
+    """
+    Validate Content-Length against the upload cap without reading the body.
+
+    Args:
+        handler: The HTTP request handler instance
+        max_bytes: Size cap (defaults to MAX_UPLOAD_BYTES)
+
+    Returns:
+        int: Declared body length
+
+    Raises:
+        LengthRequired: Header missing or not a number
+        UploadTooLarge: Declared length exceeds the cap
+    """
+    limit = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    raw = handler.headers.get('Content-Length')
+    try:
+        length = int(raw)
+    except (TypeError, ValueError):
+        raise LengthRequired('Content-Length header is required for uploads')
+    if length < 0:
+        raise LengthRequired('Invalid Content-Length')
+    if length > limit:
+        # The body is never read; make sure the connection is not reused
+        handler.close_connection = True
+        raise UploadTooLarge(
+            f'Upload of {length / 1048576:.1f} MB exceeds the {limit / 1048576:.0f} MB limit'
+        )
+    return length
+
+
+def _boundary(content_type: str) -> bytes:
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.strip().lower() == 'boundary':
+            value = value.strip().strip('"')
+            if value:
+                return value.encode('latin-1')
+    raise UploadError('multipart/form-data boundary missing')
+
+
+def _parse_part_headers(block: bytes) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for line in block.decode('utf-8', errors='replace').split('\r\n'):
+        key, sep, value = line.partition(':')
+        if sep:
+            headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+def _disposition_params(value: str) -> Dict[str, str]:
+    # Quoted values may contain ';' (filename="a;b.pdf")
+    return {m.group(1).lower(): m.group(3) if m.group(3) is not None else m.group(2).strip()
+            for m in _DISPOSITION_PARAM.finditer(value)}
+
+
+class _Reader:
+    """Chunked reader over exactly `remaining` bytes of rfile."""
+
+    def __init__(self, rfile, remaining: int, chunk_size: int):
+        self.rfile = rfile
+        self.remaining = remaining
+        self.chunk_size = chunk_size
+
+    def read(self) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        data = self.rfile.read(min(self.chunk_size, self.remaining))
+        if not data:
+            raise UploadError('Upload ended before Content-Length bytes were received')
+        self.remaining -= len(data)
+        return data
+
+
+def parse_multipart(handler, max_bytes: Optional[int] = None,
+                    spool_dir: Optional[str] = None,
+                    chunk_size: int = CHUNK_SIZE) -> MultipartForm:
+    """
+    Parse a multipart/form-data request body, spooling file parts to disk.
+
+    Args:
+        handler: The HTTP request handler instance
+        max_bytes: Size cap for the whole body (defaults to MAX_UPLOAD_BYTES)
+        spool_dir: Parent directory for spooled files (defaults to the system temp dir)
+        chunk_size: Bytes read from the socket per call
+
+    Returns:
+        MultipartForm: Text fields and UploadedFile entries keyed by form name.
+        Call cleanup() (or use it as a context manager) when done.
+
+    Raises:
+        UploadError: Malformed body (400), missing length (411) or over the cap (413)
+    """
+    boundary = _boundary(handler.headers.get('Content-Type', ''))
+    reader = _Reader(handler.rfile, content_length(handler, max_bytes), chunk_size)
+    form = MultipartForm()
+    try:
+        _parse_body(reader, boundary, form, spool_dir)
+    except BaseException:
+        form.cleanup()
+        raise
+    return form
+
+
+def _parse_body(reader: _Reader, boundary: bytes, form: MultipartForm,
+                spool_dir: Optional[str]) -> None:
+    # The first delimiter may open the body directly (no leading CRLF)
+    buf = b'\r\n'
+    delimiter = b'\r\n--' + boundary
+    keep = len(delimiter) + 4  # enough to recognise delimiter + "--" or CRLF
+
+    def fill(minimum: int) -> bool:
+        nonlocal buf
+        while len(buf) < minimum:
+            data = reader.read()
+            if not data:
+                return False
+            buf += data
+        return True
+
+    # Skip the preamble up to the first delimiter
+    while True:
+        idx = buf.find(delimiter)
+        if idx >= 0:
+            buf = buf[idx + len(delimiter):]
+            break
+        buf = buf[-keep:]
+        data = reader.read()
+        if not data:
+            raise UploadError('Multipart body contains no parts')
+        buf += data
+
+    while True:
+        if not fill(2):
+            raise UploadError('Multipart body truncated')
+        if buf.startswith(b'--'):
+            return  # closing delimiter; ignore the epilogue
+        if not buf.startswith(b'\r\n'):
+            raise UploadError('Malformed multipart delimiter')
+        buf = buf[2:]
+
+        # Part headers
+        while b'\r\n\r\n' not in buf:
+            if len(buf) > MAX_HEADER_BYTES or not fill(len(buf) + 1):
+                raise UploadError('Malformed multipart part headers')
+        head, buf = buf.split(b'\r\n\r\n', 1)
+        headers = _parse_part_headers(head)
+        params = _disposition_params(headers.get('content-disposition', ''))
+        name = params.get('name', '')
+        filename = params.get('filename')
+
+        if filename is not None:
+            sink = _FileSink(name, filename, headers.get('content-type'), spool_dir)
+        else:
+            sink = _FieldSink(name)
+
+        # Part body: stream everything that cannot be the start of a delimiter
+        try:
+            while True:
+                idx = buf.find(delimiter)
+                if idx >= 0:
+                    sink.write(buf[:idx])
+                    buf = buf[idx + len(delimiter):]
+                    break
+                if len(buf) > keep:
+                    sink.write(buf[:-keep])
+                    buf = buf[-keep:]
+                data = reader.read()
+                if not data:
+                    raise UploadError('Multipart body truncated')
+                buf += data
+        except BaseException:
+            sink.abort()
+            raise
+        sink.finish(form)
+
+
+class _FieldSink:
+    def __init__(self, name: str):
+        self.name = name
+        self.parts = []
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > MAX_FIELD_BYTES:
+            raise UploadError(f'Form field "{self.name}" exceeds {MAX_FIELD_BYTES} bytes')
+        self.parts.append(data)
+
+    def abort(self) -> None:
+        self.parts = []
+
+    def finish(self, form: MultipartForm) -> None:
+        if self.name:
+            form.fields[self.name] = b''.join(self.parts).decode('utf-8', errors='replace')
+
+
+class _FileSink:
+    def __init__(self, name: str, filename: str, content_type: Optional[str],
+                 spool_dir: Optional[str]):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type or 'application/octet-stream'
+        self.path = spool_dir_for(filename, spool_dir)
+        self.fh = open(self.path, 'wb')
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        if data:
+            self.fh.write(data)
+            self.size += len(data)
+
+    def abort(self) -> None:
+        self.fh.close()
+        shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+
+    def finish(self, form: MultipartForm) -> None:
+        self.fh.close()
+        # Browsers send an empty part (filename="") for an unselected file input
+        if not self.filename and not self.size:
+            shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+            return
+        previous = form.files.get(self.name)
+        if previous is not None:
+            shutil.rmtree(os.path.dirname(previous.path), ignore_errors=True)
+        form.files[self.name] = UploadedFile(
+            name=self.name,
+            filename=self.filename,
+            path=self.path,
+            size=self.size,
+            content_type=self.content_type,
+        )
+
+
+def spool_base64(encoded: str, filename: str, spool_dir: Optional[str] = None,
+                 max_bytes: Optional[int] = None, chunk_chars: int = 4 * CHUNK_SIZE) -> UploadedFile:
+    """
+    Decode a base64 string to a spooled temp file without building the
+    decoded bytes in memory all at once.
+
+    Args:
+        encoded: Base64 payload (whitespace is not allowed)
+        filename: Original filename (sanitised; keeps the extension)
+        spool_dir: Parent directory for the temp file
+        max_bytes: Size cap for the decoded file (defaults to MAX_UPLOAD_BYTES)
+        chunk_chars: Characters decoded per step (rounded down to a multiple of 4)
+
+    Returns:
+        UploadedFile: The decoded file; remove os.path.dirname(path) when done
+
+    Raises:
+        UploadTooLarge: Decoded size exceeds the cap
+        UploadError: Payload is not valid base64
+    """
+    import base64
+    import binascii
+
+    limit = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    if len(encoded) // 4 * 3 > limit:
+        raise UploadTooLarge(f'Upload "{filename}" exceeds the {limit / 1048576:.0f} MB limit')
+    step = max(4, chunk_chars - chunk_chars % 4)
+    path = spool_dir_for(filename, spool_dir)
+    size = 0
+    try:
+        with open(path, 'wb') as fh:
+            for start in range(0, len(encoded), step):
+                data = base64.b64decode(encoded[start:start + step], validate=True)
+                fh.write(data)
+                size += len(data)
+    except (binascii.Error, ValueError) as e:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+        raise UploadError(f'Invalid base64 content for "{filename}": {e}')
+    except BaseException:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+        raise
+    return UploadedFile(name='', filename=filename, path=path, size=size)
+
+
+def remove_spooled(path: str) -> None:
+    """Remove a file created by parse_multipart/spool_base64 and its temp directory."""
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
@@ -28,6 +28,11 @@ def get_content_type(file_path):
         '.jpeg': 'image/jpeg',
         '.gif': 'image/gif',
         '.ico': 'image/x-icon',
+        '.csv': 'text/csv; charset=utf-8',
+        '.pdf': 'application/pdf',
+        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
     }
 
     # Get file extension
@@ -0,0 +1,59 @@
+"""Server-Sent Events utilities for streaming responses."""
+
+import json
+
+
+class SSEStream:
+    """
+    Write a text/event-stream response frame by frame.
+
+    The handler speaks HTTP/1.0, so the stream has no Content-Length and
+    ends when the connection closes; each frame is flushed as soon as it
+    is written.
+
+    Usage:
+        stream = SSEStream(handler)
+        stream.open()
+        stream.send('token', {'content': 'Hel'})
+        stream.send('done', {'tokens_used': 12})
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.closed = False
+
+    def open(self):
+        """Send the 200 response headers for an event stream."""
+        handler = self.handler
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.send_header('Connection', 'close')
+        handler.send_header('X-Accel-Buffering', 'no')
+        handler.send_header('Access-Control-Allow-Origin', '*')
+        handler.send_header('Access-Control-Allow-Methods', 'GET, HEAD, POST, OPTIONS')
+        handler.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        handler.end_headers()
+        handler.close_connection = True
+
+    def send(self, event, data):
+        """
+        Write one event frame.
+
+        Args:
+            event (str): Event name ('meta', 'token', 'done', 'error').
+            data (dict): JSON-serializable payload.
+
+        Returns:
+            bool: False once the client has disconnected.
+        """
+        if self.closed:
+            return False
+        frame = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+        try:
+            self.handler.wfile.write(frame)
+            self.handler.wfile.flush()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            self.closed = True
+            return False
@@ -0,0 +1,241 @@
+"""
+Persistent cache of LLM requirement classifications.
+
+RFP amendments, recompetes and boilerplate FAR/DFARS clauses repeat the
+same requirement sentences, and each one used to cost an Ollama
+generation every time it was shredded. Classifications are stored in
+SQLite keyed by
+
+    (model, prompt version, sha256(normalized requirement text))
+
+so re-shredding an amended RFP only sends genuinely new text to Ollama.
+Normalization folds Unicode compatibility forms and typographic quotes and
+collapses whitespace (PDF line breaks, double spaces), but keeps case:
+acronyms and "SHALL" matter to the classification and to entity extraction.
+
+The prompt version is a hash of the classification prompts, so editing a
+prompt stops old entries from being served; they are removed with the
+invalidate command. Keyword-fallback results are never cached.
+
+Configuration (env):
+    SHRED_CLASSIFY_CACHE   SQLite file (default <project root>/classification_cache.db,
+                           empty string disables caching)
+
+Usage:
+    python -m shredding.classification_cache stats
+    python -m shredding.classification_cache invalidate           # entries of older prompt versions
+    python -m shredding.classification_cache invalidate --all [--model qwen2.5:3b]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from project_paths import get_project_root
+
+# Rows per "IN (...)" lookup (stays under SQLite's parameter limit)
+_LOOKUP_CHUNK = 500
+
+_WHITESPACE = re.compile(r'\s+')
+_QUOTES = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"',
+                         '–': '-', '—': '-'})
+
+
+def _default_path() -> Optional[str]:
+    configured = os.getenv('SHRED_CLASSIFY_CACHE')
+    if configured is not None:
+        return configured or None
+    return str(get_project_root() / 'classification_cache.db')
+
+
+def normalize_requirement(text: str) -> str:
+    """Requirement text with formatting-only differences removed."""
+    text = unicodedata.normalize('NFKC', text).translate(_QUOTES)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def requirement_key(text: str) -> str:
+    """sha256 hex digest of the normalized requirement text."""
+    return hashlib.sha256(normalize_requirement(text).encode('utf-8')).hexdigest()
+
+
+def prompt_version(*prompts: str) -> str:
+    """Short hash identifying a set of prompt templates."""
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(prompt.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+class ClassificationCache:
+    """
+    Persistent (model, prompt version, text hash) -> classification cache in SQLite.
+
+    Values are the classification dicts as JSON. Safe to share between
+    threads; a single connection is guarded by a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS classifications (
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                classification TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, prompt_version, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, version: str, hashes: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Look up cached classifications.
+
+        Returns:
+            Dict of text hash -> classification dict for the hashes that were cached
+        """
+        found: Dict[str, Dict] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                part = unique[start:start + _LOOKUP_CHUNK]
+                marks = ','.join('?' * len(part))
+                rows = self._conn.execute(
+                    'SELECT text_hash, classification FROM classifications '
+                    f'WHERE model = ? AND prompt_version = ? AND text_hash IN ({marks})',
+                    [model, version, *part],
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def get(self, model: str, version: str, text_hash: str) -> Optional[Dict]:
+        return self.get_many(model, version, [text_hash]).get(text_hash)
+
+    def put_many(self, model: str, version: str, items: Dict[str, Dict]) -> None:
+        """Store classification dicts for the given text hashes."""
+        if not items:
+            return
+        now = time.time()
+        rows = [(model, version, key, json.dumps(value), now) for key, value in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO classifications '
+                '(model, prompt_version, text_hash, classification, created_at) VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+            self._conn.commit()
+
+    def put(self, model: str, version: str, text_hash: str, classification: Dict) -> None:
+        self.put_many(model, version, {text_hash: classification})
+
+    def invalidate(self, keep_version: Optional[str] = None, model: Optional[str] = None) -> int:
+        """
+        Delete entries; returns how many were removed.
+
+        Args:
+            keep_version: Keep this prompt version's entries (None: delete all versions)
+            model: Only this model's entries (None: every model)
+        """
+        clauses, params = [], []
+        if keep_version is not None:
+            clauses.append('prompt_version != ?')
+            params.append(keep_version)
+        if model is not None:
+            clauses.append('model = ?')
+            params.append(model)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            removed = self._conn.execute(f'DELETE FROM classifications{where}', params).rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, object]:
+        """Entry counts per model/prompt version plus lookup hit/miss counters since start-up."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT model, prompt_version, COUNT(*) FROM classifications '
+                'GROUP BY model, prompt_version ORDER BY model, prompt_version'
+            ).fetchall()
+        lookups = self.hits + self.misses
+        return {
+            'entries': sum(count for _, _, count in rows),
+            'versions': [{'model': model, 'prompt_version': version, 'entries': count}
+                         for model, version, count in rows],
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'path': self.db_path,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[ClassificationCache] = None
+_default_lock = threading.Lock()
+
+
+def get_classification_cache() -> Optional[ClassificationCache]:
+    """Process-wide cache at SHRED_CLASSIFY_CACHE (None when disabled)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            path = _default_path()
+            if path is None:
+                return None
+            _default_cache = ClassificationCache(path)
+        return _default_cache
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Requirement classification cache')
+    parser.add_argument('command', choices=['stats', 'invalidate'])
+    parser.add_argument('--db', help='cache file (default: SHRED_CLASSIFY_CACHE)')
+    parser.add_argument('--model', help='only entries of this model')
+    parser.add_argument('--all', action='store_true',
+                        help='invalidate every entry, not only those of older prompt versions')
+    args = parser.parse_args(argv)
+
+    path = args.db or _default_path()
+    if path is None:
+        print('Classification cache is disabled (SHRED_CLASSIFY_CACHE is empty)')
+        return 1
+    cache = ClassificationCache(path)
+    try:
+        if args.command == 'stats':
+            print(json.dumps(cache.stats(), indent=2))
+        else:
+            from shredding.requirement_classifier import PROMPT_VERSION
+            removed = cache.invalidate(keep_version=None if args.all else PROMPT_VERSION, model=args.model)
+            print(f'Removed {removed} cached classifications from {path}')
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Single-pass compliance keyword scanning for requirement extraction.
+
+RequirementExtractor used to run every mandatory, recommended and optional
+keyword regex separately against every sentence (15 searches per sentence
+before it knew the answer). KeywordScanner compiles all keyword patterns
+into one alternation of zero-width lookaheads, one named group per pattern,
+so a single finditer() over the text finds every position where a keyword
+starts; the patterns matching there are then confirmed individually, so
+every pattern that matches anywhere is reported, overlapping matches included ("is required" yields both
+'required' and '(is|are)\\s+required'). The negative and conditional
+pattern lists are each folded into one alternation as well.
+
+classify_many() scans a whole section at once: the sentences are joined
+and scanned together, and each hit is mapped back to its sentence by
+offset. A hit whose match would run past the end of its sentence is
+re-checked against that sentence alone, so results are identical to
+classifying each sentence on its own.
+
+Keyword patterns must not use backreferences or named groups (they are
+renumbered inside the combined pattern), nor ^ / $ anchors (sentences are
+not scanned on their own). Negative patterns are matched per sentence and
+may be anchored.
+
+Usage:
+    scanner = KeywordScanner(mandatory, recommended, optional, negative, conditional)
+    scanner.classify('The contractor shall ...')    # ('mandatory', ['shall'])
+    scanner.classify_many(section_sentences)        # [(type, keywords), ...]
+    scanner.is_negative('Table 3')                  # True
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# Joins a section's sentences for the combined scan (offsets, not this
+# character, decide which sentence a hit belongs to)
+_SEPARATOR = '\x00'
+
+# Shortest text that is worth treating as a requirement sentence
+_MIN_SENTENCE_CHARS = 20
+
+
+def keyword_label(pattern: str) -> str:
+    """Name a keyword pattern is reported under (the pattern without its word boundaries)."""
+    return pattern.strip(r'\b')
+
+
+def _alternatives(pattern: str, start: int = 0) -> Tuple[Optional[List[str]], int]:
+    """
+    Top-level alternatives of pattern[start:] up to the first unmatched ')'
+    (or the end), and that position; (None, -1) if a class is unterminated.
+    """
+    alternatives, depth, begin, i = [], 0, start, start
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 1
+        elif char == '[':
+            i = pattern.find(']', i + 2)
+            if i < 0:
+                return None, -1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            if depth == 0:
+                break
+            depth -= 1
+        elif char == '|' and depth == 0:
+            alternatives.append(pattern[begin:i])
+            begin = i + 1
+        i += 1
+    alternatives.append(pattern[begin:i])
+    return alternatives, i
+
+
+def _leading_letters(pattern: str) -> Optional[Set[str]]:
+    """
+    Letters a match of the pattern can start with (lowercase), or None when
+    that cannot be read off the pattern. Understands leading literals and
+    groups of alternatives, e.g. 'shall' -> {'s'}, '(is|are)\\s' -> {'i', 'a'}.
+    """
+    alternatives, _ = _alternatives(pattern)
+    if alternatives is None:
+        return None
+    if len(alternatives) > 1:
+        letters = set()
+        for alternative in alternatives:
+            first = _leading_letters(alternative)
+            if first is None:
+                return None
+            letters |= first
+        return letters
+
+    if pattern.startswith(r'\b'):
+        pattern = pattern[2:]
+    if pattern[:1].isalpha():
+        return None if pattern[1:2] in ('?', '*', '{') else {pattern[0].lower()}
+    if not pattern.startswith('(') or (pattern.startswith('(?') and not pattern.startswith('(?:')):
+        return None
+
+    group, close = _alternatives(pattern, 3 if pattern.startswith('(?:') else 1)
+    if group is None or close >= len(pattern) or pattern[close + 1:close + 2] in ('?', '*', '{'):
+        return None
+    return _leading_letters('|'.join(group))
+
+
+def _any_of(patterns: Sequence[str]) -> str:
+    return '|'.join(f'(?:{pattern})' for pattern in patterns)
+
+
+class KeywordScanner:
+    """
+    Classify sentences as mandatory / recommended / optional in one scan.
+
+    Precedence matches the per-pattern extractor: any mandatory keyword
+    makes the sentence mandatory (plus 'conditional' when a conditional
+    pattern matches), else any recommended keyword, else any optional one.
+    Keywords are reported in pattern-list order.
+    """
+
+    TYPES = ('mandatory', 'recommended', 'optional')
+
+    def __init__(
+        self,
+        mandatory: Sequence[str],
+        recommended: Sequence[str],
+        optional: Sequence[str],
+        negative: Sequence[str] = (),
+        conditional: Sequence[str] = ()
+    ):
+        self.patterns = [*mandatory, *recommended, *optional]
+        self.labels = [keyword_label(pattern) for pattern in self.patterns]
+        self.kinds = ([0] * len(mandatory) + [1] * len(recommended) + [2] * len(optional))
+
+        leading = [_leading_letters(pattern) for pattern in self.patterns]
+
+        # One lookahead per pattern: zero-width, so every start position is tried
+        # and overlapping keywords are all reported. Patterns that start with a
+        # word boundary share one leading \b, and when their first letters are
+        # known a character-class guard follows it, so the alternatives are only
+        # tried at the starts of words that could be keywords.
+        bounded = [i for i, pattern in enumerate(self.patterns)
+                   if pattern.startswith(r'\b') and len(_alternatives(pattern)[0] or ()) == 1]
+        alternatives = [f'(?=(?P<_k{i}>{pattern}))'
+                        for i, pattern in enumerate(self.patterns) if i not in bounded]
+        if bounded:
+            guard = ''
+            if all(leading[i] for i in bounded):
+                letters = ''.join(sorted(set().union(*(leading[i] for i in bounded))))
+                guard = f'(?=[{re.escape(letters)}])'
+            alternatives.insert(0, r'\b' + guard + '(?:' + '|'.join(
+                f'(?=(?P<_k{i}>{self.patterns[i][2:]}))' for i in bounded) + ')')
+        self._combined = re.compile('|'.join(alternatives), re.IGNORECASE)
+
+        # Patterns worth confirming at a hit, by the hit's first letter (all of
+        # them for any other character)
+        anywhere = [i for i, letters in enumerate(leading) if letters is None]
+        self._by_letter: Dict[str, List[int]] = {}
+        for i, letters in enumerate(leading):
+            for letter in letters or ():
+                self._by_letter.setdefault(letter, list(anywhere)).append(i)
+        self._all = list(range(len(self.patterns)))
+
+        self._compiled = [re.compile(pattern, re.IGNORECASE) for pattern in self.patterns]
+        self._negative = re.compile(_any_of(negative), re.IGNORECASE) if negative else None
+        self._conditional = re.compile(_any_of(conditional), re.IGNORECASE) if conditional else None
+
+    def classify(self, sentence: str) -> Tuple[str, List[str]]:
+        """
+        Classify one sentence.
+
+        Returns:
+            Tuple of (compliance_type, keywords_found); ('unknown', []) without keywords
+        """
+        return self.classify_many([sentence])[0]
+
+    def classify_many(self, sentences: Sequence[str]) -> List[Tuple[str, List[str]]]:
+        """
+        Classify a batch of sentences (typically a whole section) in one scan.
+
+        Returns:
+            One (compliance_type, keywords_found) tuple per sentence, in input order
+        """
+        starts, ends = [], []
+        offset = 0
+        for sentence in sentences:
+            starts.append(offset)
+            offset += len(sentence)
+            ends.append(offset)
+            offset += len(_SEPARATOR)
+
+        found = [set() for _ in sentences]
+        text = _SEPARATOR.join(sentences)
+        for match in self._combined.finditer(text):
+            pos = match.start()
+            index = bisect_right(starts, pos) - 1
+            end = ends[index]
+            first = int(match.lastgroup[2:])
+            hits = found[index]
+            if match.end(match.lastgroup) <= end:
+                hits.add(first)
+            # Other patterns that also match here (the alternation only reports
+            # one), or the same one if its match ran into the next sentence
+            for i in self._by_letter.get(text[pos].lower(), self._all):
+                if i not in hits and self._compiled[i].match(text, pos, end):
+                    hits.add(i)
+
+        return [self._result(sentence, hits) for sentence, hits in zip(sentences, found)]
+
+    def _result(self, sentence: str, hits) -> Tuple[str, List[str]]:
+        if not hits:
+            return ('unknown', [])
+        kind = min(self.kinds[i] for i in hits)
+        keywords = [self.labels[i] for i in sorted(hits) if self.kinds[i] == kind]
+        if kind == 0 and self._conditional and self._conditional.search(sentence):
+            keywords.append('conditional')
+        return (self.TYPES[kind], keywords)
+
+    def is_negative(self, sentence: str) -> bool:
+        """True for fragments that are never requirements (page markers, captions, bare numbers)."""
+        if self._negative and self._negative.match(sentence):
+            return True
+        return len(sentence.strip()) < _MIN_SENTENCE_CHARS
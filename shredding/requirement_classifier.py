@@ -6,19 +6,90 @@ Classifies RFP requirements using local Ollama LLM for:
 - Priority (high, medium, low)
 - Risk level (red, yellow, green)
 - Entity extraction (dates, standards, agencies)
+
+classify_batch() packs several requirements into one JSON-mode prompt
+(a micro-batch) and keeps a few micro-batches in flight at once, so a
+600-requirement RFP costs ~75 generations run two at a time instead of 600
+run one after another. Each requirement's slot in the response is parsed
+on its own; a slot that is missing or malformed is re-classified
+individually, and only a requirement whose own call fails gets the keyword
+fallback. See shredding/README.md for how throughput scales with batch size.
+
+LLM classifications are memoized in a persistent ClassificationCache keyed
+by model, prompt version and normalized requirement text, so boilerplate
+clauses and the unchanged text of an amended RFP are never sent to Ollama
+twice. classify_batch() also classifies repeated text within one RFP only
+once. Keyword fallbacks are not cached.
+
+Configuration (env):
+    SHRED_CLASSIFY_BATCH_SIZE    requirements per prompt (default 8, 1 = one call each)
+    SHRED_CLASSIFY_CONCURRENCY   micro-batches in flight (default 2; the shared
+                                 Ollama client still caps generations at
+                                 OLLAMA_MAX_CONCURRENCY)
+    SHRED_CLASSIFY_CACHE         classification cache file (see classification_cache.py)
 """
 
 import json
 import logging
-import requests
-from typing import Dict, List, Optional
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+from ollama_client import PRIORITY_BATCH, OllamaError, OllamaTimeoutError, get_ollama_client
 from ollama_config import ollama_config
 
+from .classification_cache import ClassificationCache, get_classification_cache, prompt_version, requirement_key
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_SIZE = int(os.getenv('SHRED_CLASSIFY_BATCH_SIZE', '8'))
+DEFAULT_CONCURRENCY = int(os.getenv('SHRED_CLASSIFY_CONCURRENCY', '2'))
+
+# Seconds allowed for a single classification, plus per extra requirement
+# packed into the same prompt
+_CALL_TIMEOUT = 60
+_PER_ITEM_TIMEOUT = 20
+
+_REQUIRED_FIELDS = ('compliance_type', 'category')
+
+# Default for RequirementClassifier(cache=...): the process-wide cache
+_SHARED_CACHE = object()
+
+_DATE_PATTERNS = [
+    re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}'),          # MM/DD/YYYY
+    re.compile(r'\d{4}-\d{2}-\d{2}'),                 # YYYY-MM-DD
+    re.compile(r'[A-Z][a-z]+\s+\d{1,2},\s+\d{4}')      # Month DD, YYYY
+]
+_STANDARD_PATTERN = re.compile(r'\b(NIST|ISO|IEEE|FIPS|MIL-STD|DoD|FAR|DFARS)\s*[\d\-\.]+\b', re.IGNORECASE)
+_ACRONYM_PATTERN = re.compile(r'\b[A-Z]{2,6}\b')
+
+
+def _report_progress(job_id: Optional[str], message: str) -> None:
+    """Record progress on a background job; stop if it was cancelled."""
+    if not job_id:
+        return
+    try:
+        from server.background_jobs import job_store
+    except Exception:
+        return
+    job_store.check_cancelled(job_id)
+    job_store.update_progress(job_id, message)
+
+
+@lru_cache(maxsize=4096)
+def _entities(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+    """Deduplicated (dates, standards, acronyms) of a text; memoized for repeated clauses."""
+    dates = [match for pattern in _DATE_PATTERNS for match in pattern.findall(text)]
+    return (tuple(set(dates)),
+            tuple(set(_STANDARD_PATTERN.findall(text))),
+            tuple(set(_ACRONYM_PATTERN.findall(text))))
+
 
 @dataclass
 class RequirementClassification:
@@ -85,13 +156,37 @@ Respond ONLY with valid JSON matching this exact structure:
   "keywords": ["keyword1", "keyword2", "keyword3"],
   "implicit_requirements": ["implied requirement 1", "implied requirement 2"]
 }}
+"""
+
+    BATCH_CLASSIFICATION_PROMPT = """You are an expert at analyzing government RFP requirements.
+
+Classify each of these {count} requirements from a government solicitation on its own:
+
+{requirements}
+
+For every requirement provide:
+- compliance_type: "mandatory" (shall, must, will, required), "recommended" (should, encouraged) or "optional" (may, can, could)
+- category: "technical", "management", "cost", "deliverable" or "compliance"
+- priority: "high" (critical, scored heavily), "medium" or "low" (minor scoring factor)
+- risk_level: "red" (could eliminate the proposal), "yellow" (could lose points) or "green" (minor impact)
+- keywords: the 3-5 most important keywords
+- implicit_requirements: unstated requirements implied by the statement
+
+Respond ONLY with valid JSON holding exactly one result per requirement, tagged with its id:
+{{
+  "results": [
+    {{"id": "R1", "compliance_type": "mandatory|recommended|optional", "category": "technical|management|cost|deliverable|compliance", "priority": "high|medium|low", "risk_level": "red|yellow|green", "keywords": ["keyword1", "keyword2"], "implicit_requirements": ["implied requirement 1"]}}
+  ]
+}}
 """
 
     def __init__(
         self,
         ollama_url: Optional[str] = None,
         model: str = "qwen2.5:3b",
-        batch_size: int = 1
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cache=_SHARED_CACHE
     ):
         """
         Initialize classifier.
@@ -100,20 +195,32 @@ Respond ONLY with valid JSON matching this exact structure:
             ollama_url: URL of Ollama server
             model: Model to use for classification
             batch_size: Number of requirements to classify in one call
+            concurrency: Micro-batches classified in parallel by classify_batch
+            cache: ClassificationCache to memoize results in (default: the
+                shared SHRED_CLASSIFY_CACHE cache; None disables caching)
         """
         self.ollama_url = ollama_url or ollama_config.base_url
         self.model = model
-        self.batch_size = batch_size
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.client = get_ollama_client()
+        self.last_stats: Dict = {}
+
+        if cache is _SHARED_CACHE:
+            try:
+                cache = get_classification_cache()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Classification cache unavailable, classifying without it: {e}")
+                cache = None
+        self.cache: Optional[ClassificationCache] = cache
 
         # Test connection
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get('models', [])
-                logger.info(f"Connected to Ollama. Available models: {len(models)}")
-            else:
-                logger.warning(f"Ollama connection issue: {response.status_code}")
-        except Exception as e:
+            models = self.client.tags(
+                base_url=self.ollama_url, timeout=5, retries=1, caller='shredding.classifier'
+            ).get('models', [])
+            logger.info(f"Connected to Ollama. Available models: {len(models)}")
+        except OllamaError as e:
             logger.error(f"Failed to connect to Ollama: {e}")
 
     def classify(
@@ -133,6 +240,24 @@ Respond ONLY with valid JSON matching this exact structure:
         Returns:
             RequirementClassification object
         """
+        key = requirement_key(requirement_text)
+        cached = self._cached([key])
+        if key in cached:
+            return cached[key]
+
+        classification = self._classify_llm(requirement_text, section, page)
+        if classification is None:
+            return self._fallback_classification(requirement_text)
+        self._remember({key: classification})
+        return classification
+
+    def _classify_llm(
+        self,
+        requirement_text: str,
+        section: str = "C",
+        page: Optional[int] = None
+    ) -> Optional[RequirementClassification]:
+        """One Ollama classification call; None if it fails."""
         # Build prompt
         prompt = self.CLASSIFICATION_PROMPT.format(
             requirement_text=requirement_text,
@@ -140,88 +265,275 @@ Respond ONLY with valid JSON matching this exact structure:
             page=page or "Unknown"
         )
 
-        # Call Ollama
+        # Call Ollama (batch priority: interactive chat is served first)
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json"
-                },
-                timeout=60
+            result = self.client.generate(
+                self.model,
+                prompt,
+                format="json",
+                caller='shredding.classifier',
+                priority=PRIORITY_BATCH,
+                timeout=60,
+                base_url=self.ollama_url
             )
+            generated_text = result.get('response', '')
 
-            if response.status_code == 200:
-                result = response.json()
-                generated_text = result.get('response', '')
-
-                # Parse JSON response
-                try:
-                    classification_data = json.loads(generated_text)
-
-                    # Create classification object
-                    return RequirementClassification(
-                        compliance_type=classification_data.get('compliance_type', 'unknown'),
-                        category=classification_data.get('category', 'unknown'),
-                        priority=classification_data.get('priority', 'medium'),
-                        risk_level=classification_data.get('risk_level', 'yellow'),
-                        keywords=classification_data.get('keywords', []),
-                        implicit_requirements=classification_data.get('implicit_requirements', []),
-                        extracted_entities=self._extract_entities(requirement_text)
-                    )
+            # Parse JSON response
+            try:
+                classification_data = json.loads(generated_text)
+                return self._from_response(classification_data, requirement_text)
 
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse Ollama response as JSON: {e}")
-                    logger.error(f"Response was: {generated_text[:200]}")
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse Ollama response as JSON: {e}")
+                logger.error(f"Response was: {generated_text[:200]}")
+                return None
 
-                    # Return fallback classification
-                    return self._fallback_classification(requirement_text)
-
-            else:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return self._fallback_classification(requirement_text)
-
-        except requests.exceptions.Timeout:
+        except OllamaTimeoutError:
             logger.error("Ollama request timed out")
-            return self._fallback_classification(requirement_text)
+            return None
+
+        except OllamaError as e:
+            logger.error(f"Ollama API error: {e}")
+            return None
 
         except Exception as e:
             logger.error(f"Error calling Ollama: {e}")
-            return self._fallback_classification(requirement_text)
+            return None
+
+    def _cached(self, keys: List[str]) -> Dict[str, RequirementClassification]:
+        """Cached classifications of the given requirement keys."""
+        if self.cache is None or not keys:
+            return {}
+        try:
+            rows = self.cache.get_many(self.model, PROMPT_VERSION, keys)
+        except sqlite3.Error as e:
+            logger.warning(f"Classification cache lookup failed: {e}")
+            return {}
+        found = {}
+        for key, row in rows.items():
+            try:
+                found[key] = RequirementClassification(**row)
+            except TypeError:
+                continue  # written by an older layout; re-classify
+        return found
+
+    def _remember(self, classifications: Dict[str, RequirementClassification]) -> None:
+        """Store LLM classifications (never keyword fallbacks) in the cache."""
+        if self.cache is None or not classifications:
+            return
+        try:
+            self.cache.put_many(self.model, PROMPT_VERSION,
+                                {key: asdict(value) for key, value in classifications.items()})
+        except sqlite3.Error as e:
+            logger.warning(f"Could not store classifications in cache: {e}")
+
+    def _from_response(self, data: Dict, requirement_text: str) -> RequirementClassification:
+        """Classification from one requirement's parsed JSON fields."""
+        return RequirementClassification(
+            compliance_type=data.get('compliance_type', 'unknown'),
+            category=data.get('category', 'unknown'),
+            priority=data.get('priority', 'medium'),
+            risk_level=data.get('risk_level', 'yellow'),
+            keywords=data.get('keywords', []),
+            implicit_requirements=data.get('implicit_requirements', []),
+            extracted_entities=self._extract_entities(requirement_text)
+        )
 
     def classify_batch(
         self,
         requirements: List[Dict],
-        show_progress: bool = True
+        show_progress: bool = True,
+        job_id: Optional[str] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None
     ) -> List[RequirementClassification]:
         """
         Classify multiple requirements.
 
+        Cached requirements are answered from the classification cache and
+        repeated text is classified once; the rest are packed batch_size to
+        a prompt and up to `concurrency` prompts run at once (Ollama
+        admission still applies). Results come back in input order;
+        statistics of the run are kept in last_stats.
+
         Args:
             requirements: List of requirement dicts with 'text', 'section', 'page'
             show_progress: Show progress logging
+            job_id: Background job to report progress to (and stop on cancel)
+            on_progress: Called as on_progress(done, total) after each micro-batch
 
         Returns:
             List of RequirementClassification objects
         """
-        classifications = []
+        started = time.perf_counter()
         total = len(requirements)
+        results: List[Optional[RequirementClassification]] = [None] * total
+
+        keys = [requirement_key(req.get('text', '')) for req in requirements]
+        cached = self._cached(keys)
+        first_index: Dict[str, int] = {}
+        duplicates: List[Tuple[int, int]] = []
+        for index, key in enumerate(keys):
+            if key in cached:
+                results[index] = self._copy(cached[key])
+            elif key in first_index:
+                duplicates.append((index, first_index[key]))
+            else:
+                first_index[key] = index
+        todo = list(first_index.values())
 
-        for idx, req in enumerate(requirements):
-            if show_progress and (idx % 10 == 0 or idx == total - 1):
-                logger.info(f"Classifying requirements: {idx + 1}/{total}")
+        batches = [todo[start:start + self.batch_size] for start in range(0, len(todo), self.batch_size)]
+        stats = {'requirements': total, 'batch_size': self.batch_size, 'concurrency': self.concurrency,
+                 'cache_hits': total - len(todo) - len(duplicates), 'duplicates': len(duplicates),
+                 'batches': len(batches), 'llm_calls': 0, 'slot_fallbacks': 0, 'keyword_fallbacks': 0}
 
-            classification = self.classify(
-                requirement_text=req.get('text', ''),
-                section=req.get('section', 'C'),
-                page=req.get('page_number')
-            )
+        done = total - len(todo)
+        _report_progress(job_id, f"Classifying requirements: {done}/{total}")
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='shred-classify')
+        try:
+            # Submit lazily so a cancelled job leaves little queued work behind
+            pending = set()
+            queued = iter(batches)
+            for batch in queued:
+                pending.add(executor.submit(self._classify_micro_batch, [requirements[i] for i in batch], batch))
+                if len(pending) >= 2 * self.concurrency:
+                    break
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch, classifications, batch_stats = future.result()
+                    for index, classification in zip(batch, classifications):
+                        results[index] = classification
+                    for key, value in batch_stats.items():
+                        stats[key] += value
+                    done += len(batch)
+
+                    if show_progress:
+                        logger.info(f"Classifying requirements: {done}/{total}")
+                    if on_progress:
+                        on_progress(done, total)
+                    _report_progress(job_id, f"Classifying requirements: {done}/{total}")
+
+                    batch = next(queued, None)
+                    if batch is not None:
+                        pending.add(executor.submit(self._classify_micro_batch,
+                                                    [requirements[i] for i in batch], batch))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        for index, original in duplicates:
+            results[index] = self._copy(results[original])
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 3)
+        stats['requirements_per_second'] = round(total / elapsed, 2) if elapsed else 0.0
+        self.last_stats = stats
+        return results
+
+    def _classify_micro_batch(self, requirements: List[Dict], batch: List[int]):
+        """
+        Classify one micro-batch with a single generation.
 
+        Returns (batch, classifications, stats). A single requirement gets
+        its own call; if the batch call fails outright or a slot cannot be
+        parsed, those requirements are classified individually. Everything
+        the LLM classified is stored in the cache.
+        """
+        stats = {'llm_calls': 0, 'slot_fallbacks': 0, 'keyword_fallbacks': 0}
+        slots: Dict[str, Dict] = {}
+        if len(requirements) == 1:
+            stats['llm_calls'] = 1
+        else:
+            try:
+                stats['llm_calls'] += 1
+                result = self.client.generate(
+                    self.model,
+                    self._build_batch_prompt(requirements),
+                    format="json",
+                    caller='shredding.classifier',
+                    priority=PRIORITY_BATCH,
+                    timeout=_CALL_TIMEOUT + _PER_ITEM_TIMEOUT * (len(requirements) - 1),
+                    base_url=self.ollama_url
+                )
+                slots = self._parse_batch_response(result.get('response', ''), len(requirements))
+            except OllamaTimeoutError:
+                logger.warning(f"Batch of {len(requirements)} requirements timed out; classifying individually")
+            except OllamaError as e:
+                # Ollama itself is failing: individual calls would fail the same way
+                logger.error(f"Ollama API error on batch of {len(requirements)}: {e}")
+                stats['keyword_fallbacks'] = len(requirements)
+                return batch, [self._fallback_classification(req.get('text', '')) for req in requirements], stats
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.warning(f"Could not parse batch classification response: {e}")
+
+        classifications = []
+        learned: Dict[str, RequirementClassification] = {}
+        for position, req in enumerate(requirements, start=1):
+            text = req.get('text', '')
+            slot = slots.get(f"R{position}")
+            if slot is not None:
+                classification = self._from_response(slot, text)
+            else:
+                if len(requirements) > 1:
+                    stats['slot_fallbacks'] += 1
+                    stats['llm_calls'] += 1
+                classification = self._classify_llm(text, req.get('section', 'C'), req.get('page_number'))
+            if classification is None:
+                stats['keyword_fallbacks'] += 1
+                classification = self._fallback_classification(text)
+            else:
+                learned[requirement_key(text)] = classification
             classifications.append(classification)
+        self._remember(learned)
+        return batch, classifications, stats
+
+    @staticmethod
+    def _copy(classification: RequirementClassification) -> RequirementClassification:
+        """Independent copy for another requirement with the same text."""
+        return RequirementClassification(**asdict(classification))
+
+    def _build_batch_prompt(self, requirements: List[Dict]) -> str:
+        """Prompt listing the requirements as R1..Rn with their source."""
+        lines = [
+            f'R{position} (Section {req.get("section", "C")}, Page {req.get("page_number") or "Unknown"}): '
+            f'{json.dumps(req.get("text", ""))}'
+            for position, req in enumerate(requirements, start=1)
+        ]
+        return self.BATCH_CLASSIFICATION_PROMPT.format(count=len(requirements), requirements="\n".join(lines))
 
-        return classifications
+    def _parse_batch_response(self, generated_text: str, count: int) -> Dict[str, Dict]:
+        """
+        Usable per-requirement slots of a batch response, keyed 'R1'..'Rn'.
+
+        Accepts {"results": [...]}, a bare list, or an object keyed by id.
+        Untagged results are matched by position only when their number
+        equals the number of requirements. Slots without the required
+        fields are left out (and re-classified individually).
+        """
+        data = json.loads(generated_text)
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            items = data['results']
+        elif isinstance(data, list):
+            items = data
+        elif isinstance(data, dict):
+            items = [dict(value, id=key) for key, value in data.items() if isinstance(value, dict)]
+        else:
+            raise ValueError(f"unexpected response type {type(data).__name__}")
+
+        slots: Dict[str, Dict] = {}
+        untagged = all(isinstance(item, dict) and 'id' not in item for item in items)
+        for position, item in enumerate(items, start=1):
+            if not isinstance(item, dict) or not all(item.get(field) for field in _REQUIRED_FIELDS):
+                continue
+            if untagged:
+                if len(items) != count:
+                    break
+                key = f"R{position}"
+            else:
+                key = str(item.get('id', '')).strip().upper()
+                if key.isdigit():
+                    key = f"R{key}"
+            slots.setdefault(key, item)
+        return slots
 
     def _fallback_classification(
         self,
@@ -309,37 +621,19 @@ Respond ONLY with valid JSON matching this exact structure:
         - Standards (NIST, ISO, etc.)
         - Acronyms
         """
-        import re
-
-        entities = {
-            'dates': [],
-            'standards': [],
-            'acronyms': []
+        dates, standards, acronyms = _entities(text)
+        return {
+            'dates': list(dates),
+            'standards': list(standards),
+            'acronyms': list(acronyms)
         }
 
-        # Extract dates (simple patterns)
-        date_patterns = [
-            r'\d{1,2}/\d{1,2}/\d{2,4}',  # MM/DD/YYYY
-            r'\d{4}-\d{2}-\d{2}',         # YYYY-MM-DD
-            r'[A-Z][a-z]+\s+\d{1,2},\s+\d{4}'  # Month DD, YYYY
-        ]
-        for pattern in date_patterns:
-            entities['dates'].extend(re.findall(pattern, text))
-
-        # Extract standards
-        standard_pattern = r'\b(NIST|ISO|IEEE|FIPS|MIL-STD|DoD|FAR|DFARS)\s*[\d\-\.]+\b'
-        entities['standards'] = re.findall(standard_pattern, text, re.IGNORECASE)
-
-        # Extract acronyms (all caps words 2-6 chars)
-        acronym_pattern = r'\b[A-Z]{2,6}\b'
-        entities['acronyms'] = re.findall(acronym_pattern, text)
-
-        # Deduplicate
-        for key in entities:
-            entities[key] = list(set(entities[key]))
-
-        return entities
-
     def to_dict(self, classification: RequirementClassification) -> Dict:
         """Convert classification to dictionary."""
         return asdict(classification)
+
+
+# Identifies the prompt templates in cache keys: editing either prompt
+# stops earlier classifications from being served.
+PROMPT_VERSION = prompt_version(RequirementClassifier.CLASSIFICATION_PROMPT,
+                                RequirementClassifier.BATCH_CLASSIFICATION_PROMPT)
@@ -11,6 +11,8 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 import uuid
 
+from .keyword_scanner import KeywordScanner
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -82,27 +84,14 @@ class RequirementExtractor:
 
     def __init__(self):
         """Initialize requirement extractor."""
-        # Compile regex patterns
-        self.mandatory_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in self.MANDATORY_KEYWORDS
-        ]
-        self.recommended_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in self.RECOMMENDED_KEYWORDS
-        ]
-        self.optional_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in self.OPTIONAL_KEYWORDS
-        ]
-        self.negative_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in self.NEGATIVE_PATTERNS
-        ]
-        self.conditional_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in self.CONDITIONAL_PATTERNS
-        ]
+        # All keyword patterns compiled into one scanner (one pass per section)
+        self.scanner = KeywordScanner(
+            self.MANDATORY_KEYWORDS,
+            self.RECOMMENDED_KEYWORDS,
+            self.OPTIONAL_KEYWORDS,
+            negative=self.NEGATIVE_PATTERNS,
+            conditional=self.CONDITIONAL_PATTERNS
+        )
 
     def extract_requirements(
         self,
@@ -158,9 +147,9 @@ class RequirementExtractor:
         requirements = []
         req_counter = 1
 
+        candidates = []
         for para in paragraphs:
             para_text = para['text'].strip()
-            para_number = para['number']
 
             # Skip empty paragraphs or headers
             if not para_text or len(para_text.split()) < 3:
@@ -170,9 +159,12 @@ class RequirementExtractor:
             if para_text.isupper() and len(para_text.split()) < 10:
                 continue
 
-            # Check for compliance keywords
-            compliance_type, keywords = self._classify_sentence(para_text)
+            candidates.append((para_text, para['number']))
+
+        # Check all paragraphs for compliance keywords in one scan
+        classified = self.scanner.classify_many([para_text for para_text, _ in candidates])
 
+        for (para_text, para_number), (compliance_type, keywords) in zip(candidates, classified):
             if compliance_type != 'unknown':
                 # Extract requirement (use UUID for global uniqueness)
                 req = Requirement(
@@ -213,14 +205,13 @@ class RequirementExtractor:
         requirements = []
         req_counter = 1
 
-        for sent_idx, sentence in enumerate(sentences):
-            # Skip if matches negative patterns
-            if self._is_negative(sentence):
-                continue
-
-            # Check for compliance keywords
-            compliance_type, keywords = self._classify_sentence(sentence)
+        # Skip sentences matching negative patterns, then check the rest for
+        # compliance keywords in one scan
+        candidates = [(sent_idx, sentence) for sent_idx, sentence in enumerate(sentences)
+                      if not self._is_negative(sentence)]
+        classified = self.scanner.classify_many([sentence for _, sentence in candidates])
 
+        for (sent_idx, sentence), (compliance_type, keywords) in zip(candidates, classified):
             if compliance_type != 'unknown':
                 # Extract requirement (use UUID for global uniqueness)
                 req = Requirement(
@@ -336,51 +327,11 @@ class RequirementExtractor:
         Returns:
             Tuple of (compliance_type, keywords_found)
         """
-        keywords_found = []
-
-        # Check for mandatory keywords
-        for pattern in self.mandatory_patterns:
-            if pattern.search(sentence):
-                keywords_found.append(pattern.pattern.strip(r'\b'))
-
-        if keywords_found:
-            # Check if it's conditional
-            for cond_pattern in self.conditional_patterns:
-                if cond_pattern.search(sentence):
-                    keywords_found.append('conditional')
-                    break
-
-            return ('mandatory', keywords_found)
-
-        # Check for recommended keywords
-        for pattern in self.recommended_patterns:
-            if pattern.search(sentence):
-                keywords_found.append(pattern.pattern.strip(r'\b'))
-
-        if keywords_found:
-            return ('recommended', keywords_found)
-
-        # Check for optional keywords
-        for pattern in self.optional_patterns:
-            if pattern.search(sentence):
-                keywords_found.append(pattern.pattern.strip(r'\b'))
-
-        if keywords_found:
-            return ('optional', keywords_found)
-
-        return ('unknown', [])
+        return self.scanner.classify(sentence)
 
     def _is_negative(self, sentence: str) -> bool:
-        """Check if sentence matches negative patterns."""
-        for pattern in self.negative_patterns:
-            if pattern.match(sentence):
-                return True
-
-        # Also skip very short sentences
-        if len(sentence.strip()) < 20:
-            return True
-
-        return False
+        """Check if sentence matches negative patterns (or is very short)."""
+        return self.scanner.is_negative(sentence)
 
     def _extract_paragraph_id(self, sentence: str) -> Optional[str]:
         """
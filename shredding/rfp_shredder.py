@@ -8,25 +8,37 @@ Coordinates the complete RFP shredding workflow:
 4. Save to database
 5. Create opportunity and tasks
 6. Generate compliance matrix
+
+Each stage's output is checkpointed under the RFP file's hash (see
+shred_checkpoints.py), so rerunning a failed shred resumes after the last
+completed stage. Per-stage wall times and item counts are returned as
+'pipeline' and recorded in the opportunity's metadata.
 """
 
 import json
 import logging
 import sqlite3
 import csv
-from typing import Dict, List, Optional
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 import uuid
 
 from .section_parser import SectionParser
 from .requirement_extractor import RequirementExtractor, Requirement
-from .requirement_classifier import RequirementClassifier, RequirementClassification
+from .requirement_classifier import PROMPT_VERSION, RequirementClassifier, RequirementClassification
+from .requirement_store import insert_requirements, insert_tasks
+from .shred_checkpoints import ShredCheckpointStore, file_sha256, get_checkpoint_store
 from ollama_config import ollama_config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default for RFPShredder(checkpoints=...): the process-wide store
+_SHARED_STORE = object()
+
 
 class RFPShredder:
     """
@@ -40,7 +52,8 @@ class RFPShredder:
         self,
         db_path: str = "opportunities.db",
         ollama_url: Optional[str] = None,
-        ollama_model: str = "qwen2.5:3b"
+        ollama_model: str = "qwen2.5:3b",
+        checkpoints=_SHARED_STORE
     ):
         """
         Initialize RFP Shredder.
@@ -49,6 +62,8 @@ class RFPShredder:
             db_path: Path to SQLite database
             ollama_url: URL of Ollama server (defaults to ollama_config.base_url)
             ollama_model: Model to use for classification
+            checkpoints: ShredCheckpointStore for resumable runs (default: the
+                shared SHRED_CHECKPOINT_DB store; None disables checkpointing)
         """
         self.db_path = db_path
         self.section_parser = SectionParser()
@@ -58,6 +73,14 @@ class RFPShredder:
             model=ollama_model
         )
 
+        if checkpoints is _SHARED_STORE:
+            try:
+                checkpoints = get_checkpoint_store()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Shred checkpoints unavailable, runs will not be resumable: {e}")
+                checkpoints = None
+        self.checkpoints: Optional[ShredCheckpointStore] = checkpoints
+
         # Verify database exists
         if not Path(db_path).exists():
             logger.warning(f"Database not found: {db_path}")
@@ -74,11 +97,16 @@ class RFPShredder:
         set_aside: Optional[str] = None,
         create_tasks: bool = True,
         auto_assign: bool = False,
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        job_id: Optional[str] = None
     ) -> Dict:
         """
         Complete RFP shredding workflow.
 
+        Each completed stage is checkpointed under the file's hash; calling
+        again with the same file after a failure skips the completed stages
+        (a changed model or rfp_number redoes the stages that depend on it).
+
         Args:
             file_path: Path to RFP PDF
             rfp_number: RFP/solicitation number
@@ -90,6 +118,7 @@ class RFPShredder:
             create_tasks: Create tasks for each requirement
             auto_assign: Auto-assign tasks to team members
             output_dir: Directory for compliance matrix (default: current dir)
+            job_id: Background job to report classification progress to
 
         Returns:
             Dictionary with results:
@@ -103,60 +132,89 @@ class RFPShredder:
                 'tasks_created': int,
                 'matrix_file': str,
                 'sections': {...},
+                'classification': {...},  # micro-batch statistics
+                'pipeline': {...},        # per-stage seconds/items, resumed stages
                 'error': str (if status='error')
             }
         """
         logger.info(f"Starting RFP shredding: {rfp_number}")
 
+        run = {
+            'file_hash': None,
+            'checkpoints': {},
+            'opportunity_id': None,
+            'pipeline': {'status': 'running', 'stages': []}
+        }
+
         try:
+            if self.checkpoints is not None:
+                run['file_hash'] = file_sha256(file_path)
+                run['checkpoints'] = self.checkpoints.load(run['file_hash'])
+                if run['checkpoints']:
+                    logger.info(f"Resuming RFP shredding from checkpoints: {', '.join(run['checkpoints'])}")
+
             # Step 1: Extract sections
             logger.info("Step 1/6: Extracting sections (C, L, M)")
-            sections = self.section_parser.extract_sections(file_path)
-
-            # Validate critical sections
-            validation = self.section_parser.validate_sections(sections)
-            if not validation['is_complete']:
-                logger.warning("Missing critical sections - proceeding with available sections")
+            sections = self._stage(
+                run, 'sections',
+                lambda: self._extract_sections(file_path),
+                encode=lambda value: {
+                    letter: {key: v for key, v in section.items() if key != 'chunks'}
+                    for letter, section in value.items()
+                } if value else None
+            )
 
             # Step 2: Extract requirements from each section
             logger.info("Step 2/6: Extracting requirements")
-            all_requirements = []
-
-            for section_letter in ['C', 'L', 'M']:
-                if section_letter in sections:
-                    section_data = sections[section_letter]
-
-                    requirements = self.req_extractor.extract_requirements(
-                        text=section_data['text'],
-                        section=section_letter,
-                        start_page=section_data.get('start_page')
-                    )
-
-                    all_requirements.extend(requirements)
-
-            # Deduplicate
-            all_requirements = self.req_extractor.deduplicate_requirements(
-                all_requirements
+            all_requirements = self._stage(
+                run, 'requirements',
+                lambda: self._extract_requirements(sections),
+                encode=lambda value: [asdict(req) for req in value],
+                decode=lambda data: [Requirement(**req) for req in data]
             )
 
             logger.info(f"Extracted {len(all_requirements)} unique requirements")
 
             # Step 3: Classify requirements
             logger.info("Step 3/6: Classifying requirements with Ollama")
+            classification_stats: Dict = {}
 
-            # Convert to dict format for batch classification
-            req_dicts = [
-                {
-                    'text': req.text,
-                    'section': req.section,
-                    'page_number': req.page_number
-                }
-                for req in all_requirements
-            ]
-
-            classifications = self.classifier.classify_batch(
-                req_dicts,
-                show_progress=True
+            def classify():
+                # Convert to dict format for batch classification
+                req_dicts = [
+                    {
+                        'text': req.text,
+                        'section': req.section,
+                        'page_number': req.page_number
+                    }
+                    for req in all_requirements
+                ]
+
+                # Micro-batched prompts, several in flight (see RequirementClassifier)
+                classifications = self.classifier.classify_batch(
+                    req_dicts,
+                    show_progress=True,
+                    job_id=job_id
+                )
+                classification_stats.update(self.classifier.last_stats)
+                return classifications
+
+            def decode_classifications(data):
+                if (data['model'] != self.classifier.model or data['prompt_version'] != PROMPT_VERSION
+                        or len(data['classifications']) != len(all_requirements)):
+                    return None
+                classification_stats.update(data['stats'])
+                return [RequirementClassification(**c) for c in data['classifications']]
+
+            classifications = self._stage(
+                run, 'classification', classify,
+                encode=lambda value: {
+                    'model': self.classifier.model,
+                    'prompt_version': PROMPT_VERSION,
+                    'stats': classification_stats,
+                    'classifications': [asdict(c) for c in value]
+                },
+                decode=decode_classifications
             )
 
             # Merge classifications with requirements
@@ -174,41 +232,84 @@ class RFPShredder:
 
             # Step 4: Create opportunity
             logger.info("Step 4/6: Creating opportunity")
-            opportunity_id = self._create_opportunity(
-                rfp_number=rfp_number,
-                opportunity_name=opportunity_name,
-                due_date=due_date,
-                agency=agency,
-                naics_code=naics_code,
-                set_aside=set_aside,
-                file_path=file_path,
-                sections=sections,
-                total_requirements=len(classified_requirements)
+            opportunity_id = self._stage(
+                run, 'opportunity',
+                lambda: self._create_opportunity(
+                    rfp_number=rfp_number,
+                    opportunity_name=opportunity_name,
+                    due_date=due_date,
+                    agency=agency,
+                    naics_code=naics_code,
+                    set_aside=set_aside,
+                    file_path=file_path,
+                    sections=sections,
+                    total_requirements=len(classified_requirements)
+                ),
+                encode=lambda value: {'opportunity_id': value, 'rfp_number': rfp_number},
+                decode=lambda data: data['opportunity_id'] if data['rfp_number'] == rfp_number else None,
+                items=lambda value: 1
             )
+            run['opportunity_id'] = opportunity_id
+
+            def for_this_opportunity(data):
+                return data['result'] if data['opportunity_id'] == opportunity_id else None
+
+            def with_opportunity(value):
+                return {'opportunity_id': opportunity_id, 'result': value}
 
             # Step 5: Save requirements
             logger.info("Step 5/6: Saving requirements to database")
-            self._save_requirements(
-                opportunity_id=opportunity_id,
-                classified_requirements=classified_requirements
+
+            def save():
+                if 'save' in run['checkpoints']:
+                    # An earlier run saved these requirements under another
+                    # opportunity, so their ids are taken: issue fresh ones and
+                    # checkpoint them for the stages that reference them
+                    for req in all_requirements:
+                        req.id = str(uuid.uuid4())
+                    saved = run['checkpoints']['requirements']
+                    self.checkpoints.save(run['file_hash'], 'requirements',
+                                          [asdict(req) for req in all_requirements],
+                                          seconds=saved['seconds'], items=saved['items'])
+                return self._save_requirements(
+                    opportunity_id=opportunity_id,
+                    classified_requirements=classified_requirements
+                )
+
+            self._stage(
+                run, 'save', save,
+                encode=with_opportunity,
+                decode=for_this_opportunity,
+                items=lambda value: value
             )
 
             # Step 6: Create tasks (optional)
             tasks_created = 0
             if create_tasks:
                 logger.info("Step 6/6: Creating tasks")
-                tasks_created = self._create_tasks(
-                    opportunity_id=opportunity_id,
-                    classified_requirements=classified_requirements,
-                    due_date=due_date,
-                    auto_assign=auto_assign
+                tasks_created = self._stage(
+                    run, 'tasks',
+                    lambda: self._create_tasks(
+                        opportunity_id=opportunity_id,
+                        classified_requirements=classified_requirements,
+                        due_date=due_date,
+                        auto_assign=auto_assign
+                    ),
+                    encode=with_opportunity,
+                    decode=for_this_opportunity,
+                    items=lambda value: value
                 )
 
             # Generate compliance matrix
-            matrix_file = self._generate_compliance_matrix(
-                opportunity_id=opportunity_id,
-                rfp_number=rfp_number,
-                output_dir=output_dir
+            matrix_file = self._stage(
+                run, 'matrix',
+                lambda: self._generate_compliance_matrix(
+                    opportunity_id=opportunity_id,
+                    rfp_number=rfp_number,
+                    output_dir=output_dir
+                ),
+                items=lambda value: len(classified_requirements),
+                checkpoint=False
             )
 
             # Calculate statistics
@@ -225,6 +326,10 @@ class RFPShredder:
                 if cr['classification'].compliance_type == 'optional'
             )
 
+            pipeline = self._finish_pipeline(run, 'success')
+            if run['file_hash']:
+                self.checkpoints.delete(run['file_hash'])
+
             logger.info("✅ RFP shredding complete!")
             logger.info(f"  Opportunity ID: {opportunity_id}")
             logger.info(f"  Total requirements: {len(classified_requirements)}")
@@ -233,6 +338,7 @@ class RFPShredder:
             logger.info(f"  Optional: {optional}")
             logger.info(f"  Tasks created: {tasks_created}")
             logger.info(f"  Matrix: {matrix_file}")
+            logger.info(f"  Pipeline: {pipeline['seconds']}s")
 
             return {
                 'status': 'success',
@@ -243,6 +349,8 @@ class RFPShredder:
                 'optional_count': optional,
                 'tasks_created': tasks_created,
                 'matrix_file': matrix_file,
+                'classification': classification_stats,
+                'pipeline': pipeline,
                 'sections': {
                     k: {
                         'title': v['title'],
@@ -255,11 +363,119 @@ class RFPShredder:
 
         except Exception as e:
             logger.error(f"RFP shredding failed: {e}")
+            pipeline = run['pipeline']
+            try:
+                pipeline = self._finish_pipeline(run, 'error', error=str(e))
+            except Exception as record_error:
+                logger.warning(f"Could not record pipeline status: {record_error}")
             return {
                 'status': 'error',
-                'error': str(e)
+                'error': str(e),
+                'opportunity_id': run['opportunity_id'],
+                'pipeline': pipeline
             }
 
+    def _stage(
+        self,
+        run: Dict,
+        name: str,
+        compute: Callable,
+        encode: Callable = lambda value: value,
+        decode: Callable = lambda data: data,
+        items: Callable = len,
+        checkpoint: bool = True
+    ):
+        """
+        Run one pipeline stage, or restore it from its checkpoint.
+
+        The stage's seconds and item count are appended to the run's
+        pipeline. A checkpoint that decode() rejects (returns None for) is
+        ignored and the stage runs again; a stage whose encode() returns
+        None is not checkpointed.
+        """
+        stages = run['pipeline']['stages']
+        run['stage'] = name
+        saved = run['checkpoints'].get(name)
+        if saved is not None:
+            value = decode(saved['data'])
+            if value is not None:
+                logger.info(f"Stage {name}: resumed from checkpoint")
+                stages.append({'stage': name, 'seconds': saved['seconds'], 'items': saved['items'],
+                               'resumed': True})
+                return value
+
+        started = time.perf_counter()
+        value = compute()
+        seconds = round(time.perf_counter() - started, 3)
+        count = items(value)
+        stages.append({'stage': name, 'seconds': seconds, 'items': count, 'resumed': False})
+
+        if checkpoint and run['file_hash']:
+            data = encode(value)
+            if data is not None:
+                self.checkpoints.save(run['file_hash'], name, data, seconds=seconds, items=count)
+        if run['opportunity_id']:
+            self._record_pipeline(run['opportunity_id'], run['pipeline'])
+        return value
+
+    def _finish_pipeline(self, run: Dict, status: str, error: Optional[str] = None) -> Dict:
+        """Close the run's pipeline record (and store it on the opportunity)."""
+        pipeline = run['pipeline']
+        pipeline['status'] = status
+        pipeline['seconds'] = round(sum(s['seconds'] for s in pipeline['stages'] if not s['resumed']), 3)
+        pipeline['resumed_stages'] = [s['stage'] for s in pipeline['stages'] if s['resumed']]
+        if error is not None:
+            pipeline['error'] = error
+            pipeline['failed_stage'] = run.get('stage')
+            pipeline['resumable'] = bool(run['file_hash'])
+        if run['opportunity_id']:
+            self._record_pipeline(run['opportunity_id'], pipeline)
+        return pipeline
+
+    def _extract_sections(self, file_path: str) -> Dict:
+        """Step 1: sections (C, L, M) of the RFP."""
+        sections = self.section_parser.extract_sections(file_path)
+
+        # Validate critical sections
+        validation = self.section_parser.validate_sections(sections)
+        if not validation['is_complete']:
+            logger.warning("Missing critical sections - proceeding with available sections")
+        return sections
+
+    def _extract_requirements(self, sections: Dict) -> List[Requirement]:
+        """Step 2: deduplicated requirements of sections C, L and M."""
+        all_requirements = []
+
+        for section_letter in ['C', 'L', 'M']:
+            if section_letter in sections:
+                section_data = sections[section_letter]
+
+                requirements = self.req_extractor.extract_requirements(
+                    text=section_data['text'],
+                    section=section_letter,
+                    start_page=section_data.get('start_page')
+                )
+
+                all_requirements.extend(requirements)
+
+        # Deduplicate
+        return self.req_extractor.deduplicate_requirements(all_requirements)
+
+    def _record_pipeline(self, opportunity_id: str, pipeline: Dict):
+        """Store the pipeline timings in the opportunity's metadata."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT metadata FROM opportunities WHERE id = ?", (opportunity_id,)).fetchone()
+            if row is None:
+                return
+            metadata = json.loads(row[0]) if row[0] else {}
+            metadata['pipeline'] = pipeline
+            conn.execute("UPDATE opportunities SET metadata = ? WHERE id = ?",
+                         (json.dumps(metadata), opportunity_id))
+            conn.commit()
+        finally:
+            conn.close()
+
     def _create_opportunity(
         self,
         rfp_number: str,
@@ -323,66 +539,24 @@ class RFPShredder:
         self,
         opportunity_id: str,
         classified_requirements: List[Dict]
-    ):
+    ) -> int:
         """
-        Save requirements to database.
+        Save requirements to database (one bulk insert, one transaction).
 
         Args:
             opportunity_id: Parent opportunity ID
             classified_requirements: List of {requirement, classification} dicts
-        """
-        logger.info(f"DEBUG: _save_requirements called with {len(classified_requirements)} requirements for opportunity {opportunity_id[:8]}...")
-
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
 
+        Returns:
+            Number of requirements saved
+        """
         try:
-            logger.info(f"DEBUG: Starting to insert requirements...")
-            for i, cr in enumerate(classified_requirements):
-                req: Requirement = cr['requirement']
-                classification: RequirementClassification = cr['classification']
-
-                logger.info(f"DEBUG: Inserting requirement {i+1}/{len(classified_requirements)}: {req.id}")
-
-                cursor.execute("""
-                    INSERT INTO requirements (
-                        id, opportunity_id, section, page_number,
-                        paragraph_id, source_text, compliance_type,
-                        requirement_category, priority, risk_level,
-                        compliance_status, keywords, extracted_entities,
-                        created_at, updated_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    req.id,
-                    opportunity_id,
-                    req.section,
-                    req.page_number,
-                    req.paragraph_id,
-                    req.text,
-                    classification.compliance_type,
-                    classification.category,
-                    classification.priority,
-                    classification.risk_level,
-                    'not_started',
-                    json.dumps(classification.keywords),
-                    json.dumps(classification.extracted_entities),
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat()
-                ))
-
-                logger.info(f"DEBUG: Successfully inserted requirement {req.id}")
-
-            logger.info(f"DEBUG: All inserts complete, committing...")
-            conn.commit()
-            logger.info(f"Saved {len(classified_requirements)} requirements")
-
+            saved = insert_requirements(self.db_path, opportunity_id, classified_requirements)
         except Exception as e:
             logger.error(f"Failed to save requirements: {e}")
-            conn.rollback()
             raise
-        finally:
-            conn.close()
+        logger.info(f"Saved {saved} requirements")
+        return saved
 
     def _create_tasks(
         self,
@@ -392,7 +566,7 @@ class RFPShredder:
         auto_assign: bool = False
     ) -> int:
         """
-        Create tasks for requirements.
+        Create tasks for requirements (one bulk insert, one transaction).
 
         Args:
             opportunity_id: Parent opportunity ID
@@ -403,87 +577,14 @@ class RFPShredder:
         Returns:
             Number of tasks created
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        tasks_created = 0
-
         try:
-            # Parse due date
-            proposal_due = datetime.fromisoformat(due_date)
-
-            for cr in classified_requirements:
-                req: Requirement = cr['requirement']
-                classification: RequirementClassification = cr['classification']
-
-                # Calculate task due date (7 days before proposal due)
-                task_due = proposal_due - timedelta(days=7)
-
-                # Determine assignee
-                assignee = None
-                assignee_type = None
-
-                if auto_assign:
-                    # Simple auto-assignment logic
-                    if classification.category == 'technical':
-                        assignee = 'agent-technical'
-                        assignee_type = 'agent'
-                    elif classification.category == 'management':
-                        assignee = 'agent-management'
-                        assignee_type = 'agent'
-                    elif classification.category == 'cost':
-                        assignee = 'agent-cost'
-                        assignee_type = 'agent'
-
-                # Create task
-                task_id = str(uuid.uuid4())
-
-                cursor.execute("""
-                    INSERT INTO tasks (
-                        id, opportunity_id, title, description,
-                        status, priority, due_date, assignee,
-                        metadata, created_at, updated_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    task_id,
-                    opportunity_id,
-                    f"{req.id}: {req.text[:80]}...",
-                    req.text,
-                    'pending',
-                    classification.priority,
-                    task_due.isoformat(),
-                    assignee,
-                    json.dumps({
-                        'requirement_id': req.id,
-                        'section': req.section,
-                        'compliance_type': classification.compliance_type,
-                        'category': classification.category,
-                        'assignee_type': assignee_type
-                    }),
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat()
-                ))
-
-                # Update requirement with task_id
-                cursor.execute("""
-                    UPDATE requirements
-                    SET task_id = ?, assignee_id = ?, assignee_type = ?
-                    WHERE id = ?
-                """, (task_id, assignee, assignee_type, req.id))
-
-                tasks_created += 1
-
-            conn.commit()
-            logger.info(f"Created {tasks_created} tasks")
-
+            tasks_created = insert_tasks(
+                self.db_path, opportunity_id, classified_requirements, due_date, auto_assign
+            )
         except Exception as e:
             logger.error(f"Failed to create tasks: {e}")
-            conn.rollback()
             raise
-        finally:
-            conn.close()
-
+        logger.info(f"Created {tasks_created} tasks")
         return tasks_created
 
     def _generate_compliance_matrix(
@@ -633,14 +734,17 @@ class RFPShredder:
 
         conn.close()
 
+        metadata = json.loads(opp[3]) if opp[3] else {}
+
         return {
             'opportunity': {
                 'id': opportunity_id,
                 'title': opp[0],
                 'status': opp[1],
                 'due_date': opp[2],
-                'metadata': json.loads(opp[3]) if opp[3] else {}
+                'metadata': metadata
             },
+            'pipeline': metadata.get('pipeline', {}),
             'requirements': {
                 'total': req_stats[0],
                 'mandatory': req_stats[1],
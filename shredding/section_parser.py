@@ -14,8 +14,11 @@ import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
+# Document processing - import from rag-system directory, by the same module
+# name as RAG and CAG, so all three share one Docling conversion pool and cache
+sys.path.insert(0, str(Path(__file__).parent.parent / "rag-system"))
 
-from rag_system.document_processor import DocumentProcessor
+from document_processor import DocumentProcessor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -59,6 +62,8 @@ class SectionParser:
 
     def __init__(self):
         """Initialize section parser."""
+        # Conversions go through the shared pool's output cache, so an RFP
+        # already ingested into RAG is not converted again for shredding
         self.doc_processor = DocumentProcessor()
         self.compiled_patterns = [
             re.compile(pattern, re.IGNORECASE | re.MULTILINE)
@@ -0,0 +1,142 @@
+"""
+Stage checkpoints for resumable RFP shredding.
+
+RFPShredder.shred_rfp() runs a fixed sequence of stages (sections,
+requirements, classification, opportunity, save, tasks, matrix). After
+each stage completes, its output is stored here under the sha256 of the
+RFP file, so a run that crashes or times out part-way through resumes
+from the last completed stage instead of re-converting the document and
+re-extracting its requirements.
+
+Checkpoints exist only for unfinished runs: they are removed once a run
+completes, so shredding the same file again starts a new opportunity from
+scratch (the conversion and classification caches still make that cheap).
+The requirement IDs stored in a checkpoint are written to the database
+exactly once.
+
+Configuration (env):
+    SHRED_CHECKPOINT_DB   SQLite file (default <project root>/shred_checkpoints.db,
+                          empty string disables checkpointing)
+
+Usage:
+    store = ShredCheckpointStore('./shred_checkpoints.db')
+    key = file_sha256('rfp.pdf')
+    store.save(key, 'sections', {'sections': {...}}, seconds=12.4, items=3)
+    store.load(key)        # {'sections': {'data': {...}, 'seconds': 12.4, 'items': 3}}
+    store.delete(key)      # after the run completes
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from project_paths import get_project_root
+
+_READ_BLOCK = 1024 * 1024
+
+
+def _default_path() -> Optional[str]:
+    configured = os.getenv('SHRED_CHECKPOINT_DB')
+    if configured is not None:
+        return configured or None
+    return str(get_project_root() / 'shred_checkpoints.db')
+
+
+def file_sha256(file_path) -> str:
+    """sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_READ_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ShredCheckpointStore:
+    """
+    Persistent (file hash, stage) -> stage output store in SQLite.
+
+    Stage outputs are stored as JSON together with the stage's wall time and
+    item count. Safe to share between threads; a single connection is
+    guarded by a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        if self.db_path != ':memory:':
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS shred_checkpoints (
+                file_hash TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                data TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                items INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (file_hash, stage)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def load(self, file_hash: str) -> Dict[str, Dict]:
+        """
+        Completed stages of a file.
+
+        Returns:
+            Dict of stage -> {'data': ..., 'seconds': float, 'items': int}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT stage, data, seconds, items FROM shred_checkpoints WHERE file_hash = ?',
+                (file_hash,),
+            ).fetchall()
+        return {stage: {'data': json.loads(data), 'seconds': seconds, 'items': items}
+                for stage, data, seconds, items in rows}
+
+    def save(self, file_hash: str, stage: str, data, seconds: float = 0.0, items: int = 0) -> None:
+        """Record a completed stage's output (replacing an earlier one)."""
+        payload = json.dumps(data)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO shred_checkpoints '
+                '(file_hash, stage, data, seconds, items, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (file_hash, stage, payload, seconds, items, time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, file_hash: str) -> int:
+        """Remove a file's checkpoints; returns how many were removed."""
+        with self._lock:
+            removed = self._conn.execute(
+                'DELETE FROM shred_checkpoints WHERE file_hash = ?', (file_hash,)
+            ).rowcount
+            self._conn.commit()
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[ShredCheckpointStore] = None
+_default_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[ShredCheckpointStore]:
+    """Process-wide store at SHRED_CHECKPOINT_DB (None when disabled)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            path = _default_path()
+            if path is None:
+                return None
+            _default_store = ShredCheckpointStore(path)
+        return _default_store
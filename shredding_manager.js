@@ -8,6 +8,8 @@ class ShreddingManager {
     constructor() {
         this.currentOpportunityId = null;
         this.requirements = [];
+        // IDs ticked in the requirements grid for bulk status changes
+        this.selectedRequirements = new Set();
         this.filters = {
             section: '',
             compliance_type: '',
@@ -391,11 +393,41 @@ Matrix File: ${result.matrix_file}
             return;
         }
 
+        // Drop selections that the current filters no longer show
+        const visibleIds = new Set(this.requirements.map(req => req.id));
+        this.selectedRequirements = new Set(
+            [...this.selectedRequirements].filter(id => visibleIds.has(id))
+        );
+        const allSelected = this.selectedRequirements.size === this.requirements.length;
+
         tableContainer.innerHTML = `
+            <div id="requirements-bulk-bar" class="flex items-center gap-3 mb-3 text-sm">
+                <span id="requirements-selected-count" class="text-gray-500">
+                    ${this.selectedRequirements.size} selected
+                </span>
+                <select id="bulk-status-select"
+                    class="px-2 py-1 border border-gray-300 dark:border-gray-600 rounded-md dark:bg-gray-700 text-xs">
+                    <option value="not_started">Not Started</option>
+                    <option value="fully_compliant">Fully Compliant</option>
+                    <option value="partially_compliant">Partially Compliant</option>
+                    <option value="non_compliant">Non-Compliant</option>
+                </select>
+                <button id="bulk-status-apply"
+                    onclick="shreddingManager.applyBulkStatus()"
+                    class="px-3 py-1 bg-blue-500 text-white rounded-md hover:bg-blue-600 text-xs disabled:opacity-50"
+                    ${this.selectedRequirements.size === 0 ? 'disabled' : ''}>
+                    Set Status
+                </button>
+            </div>
             <div class="overflow-x-auto">
                 <table class="w-full text-sm">
                     <thead class="bg-gray-50 dark:bg-gray-700 sticky top-0">
                         <tr>
+                            <th class="px-4 py-3 text-left">
+                                <input type="checkbox" aria-label="Select all requirements"
+                                    ${allSelected ? 'checked' : ''}
+                                    onchange="shreddingManager.selectAllRequirements(this.checked)">
+                            </th>
                             <th class="px-4 py-3 text-left font-medium">ID</th>
                             <th class="px-4 py-3 text-left font-medium">Section</th>
                             <th class="px-4 py-3 text-left font-medium">Requirement</th>
@@ -441,6 +473,11 @@ Matrix File: ${result.matrix_file}
 
         return `
             <tr class="hover:bg-gray-50 dark:hover:bg-gray-800">
+                <td class="px-4 py-3">
+                    <input type="checkbox" aria-label="Select requirement"
+                        ${this.selectedRequirements.has(req.id) ? 'checked' : ''}
+                        onchange="shreddingManager.toggleRequirementSelection('${req.id}', this.checked)">
+                </td>
                 <td class="px-4 py-3 font-mono text-xs">${req.id}</td>
                 <td class="px-4 py-3">
                     <span class="px-2 py-1 bg-blue-100 text-blue-800 dark:bg-blue-900 dark:text-blue-200 rounded text-xs font-medium">
@@ -510,6 +547,90 @@ Matrix File: ${result.matrix_file}
         }
     }
 
+    /**
+     * Tick or untick one requirement in the grid
+     */
+    toggleRequirementSelection(requirementId, selected) {
+        if (selected) {
+            this.selectedRequirements.add(requirementId);
+        } else {
+            this.selectedRequirements.delete(requirementId);
+        }
+        this.updateBulkBar();
+    }
+
+    /**
+     * Tick or untick every requirement shown in the grid
+     */
+    selectAllRequirements(selected) {
+        this.selectedRequirements = selected ? new Set(this.requirements.map(req => req.id)) : new Set();
+        this.displayRequirements();
+    }
+
+    /**
+     * Refresh the selection count and the bulk action button
+     */
+    updateBulkBar() {
+        const count = document.getElementById('requirements-selected-count');
+        if (count) {
+            count.textContent = `${this.selectedRequirements.size} selected`;
+        }
+        const apply = document.getElementById('bulk-status-apply');
+        if (apply) {
+            apply.disabled = this.selectedRequirements.size === 0;
+        }
+    }
+
+    /**
+     * Apply the bulk bar's status to every selected requirement
+     */
+    async applyBulkStatus() {
+        const select = document.getElementById('bulk-status-select');
+        if (!select || this.selectedRequirements.size === 0) return;
+
+        const requirementIds = [...this.selectedRequirements];
+        if (await this.bulkUpdateRequirementStatus(requirementIds, select.value)) {
+            this.selectedRequirements.clear();
+            await this.loadRequirements(this.currentOpportunityId);
+        }
+    }
+
+    /**
+     * Update the status of several selected requirements in one request
+     *
+     * Returns true when the update succeeded.
+     */
+    async bulkUpdateRequirementStatus(requirementIds, newStatus) {
+        try {
+            const response = await fetch('/api/shredding/requirements/bulk', {
+                method: 'PUT',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    requirement_ids: requirementIds,
+                    compliance_status: newStatus,
+                    opportunity_id: this.currentOpportunityId
+                })
+            });
+
+            if (!response.ok) {
+                throw new Error('Failed to update statuses');
+            }
+
+            // Reload status
+            if (this.currentOpportunityId) {
+                await this.loadStatus(this.currentOpportunityId);
+            }
+            return true;
+
+        } catch (error) {
+            console.error('Failed to update statuses:', error);
+            alert('Failed to update statuses');
+            return false;
+        }
+    }
+
     /**
      * Edit requirement
      */
@@ -1,36 +1,152 @@
 """
 Static asset caching system for the RED project.
 
-Provides in-memory caching for static files (HTML, CSS, JS, images) with
-automatic cache invalidation based on file modification time.
+Provides a byte-budgeted in-memory LRU cache for static files (HTML, CSS,
+JS, images) with invalidation based on file modification time and size.
+
+Compressible assets also keep precompressed variants (gzip always; brotli
+and zstd when the optional `brotli` / `zstandard` packages are installed)
+next to the raw bytes, so each file version is compressed once rather
+than on every request.
 """
 
+import gzip
 import hashlib
 import mimetypes
-from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, Dict, Any
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Any
+
+# Optional encoders — availability flags set below
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# Content-Encoding token → compressor, in server preference order
+# (best ratio first). Levels favour ratio since each variant is built once.
+_ENCODERS: Dict[str, Callable[[bytes], bytes]] = {}
+if BROTLI_AVAILABLE:
+    _ENCODERS['br'] = lambda data: brotli.compress(data, quality=9)
+if ZSTD_AVAILABLE:
+    _ENCODERS['zstd'] = lambda data: zstandard.ZstdCompressor(level=19).compress(data)
+_ENCODERS['gzip'] = lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_LARGE_FILE_BYTES = 2 * 1024 * 1024
+
+# Assets precompressed by warm_static_cache() at startup
+WARM_PATHS = ('index.html', 'styles.css', 'js')
+
+
+def available_encodings() -> List[str]:
+    """Return the Content-Encoding tokens this process can produce, preferred first."""
+    return list(_ENCODERS)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best available encoding for an Accept-Encoding header.
+
+    Honours q-values (q=0 excludes an encoding) and the `*` wildcard.
+    Among acceptable encodings the server preference order wins.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value (may be None).
+
+    Returns:
+        Encoding token ('br', 'zstd', 'gzip') or None for identity.
+
+    Usage:
+        choose_encoding('gzip, deflate, br')  # → 'br' if brotli installed
+    """
+    if not accept_encoding:
+        return None
+
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    wildcard = accepted.get('*')
+    for encoding in _ENCODERS:
+        q = accepted.get(encoding, wildcard if wildcard is not None else 0.0)
+        if q > 0:
+            return encoding
+    return None
 
 
 class StaticCache:
     """
-    In-memory cache for static files with TTL and ETag support.
+    Byte-budgeted in-memory LRU cache for static files with ETag support.
 
     This cache stores file contents in memory to avoid repeated disk reads,
     which can provide 10x faster serving for frequently accessed files.
+
+    - Capacity is a byte budget (raw bytes + compressed variants), not an
+      entry count; the least recently used files are evicted first.
+    - Entries are validated against the file's mtime and size on every
+      lookup, so edits are picked up immediately without a TTL.
+    - Files at or above `large_file_bytes` are never cached; the request
+      handler streams them from disk with sendfile instead (see
+      is_large()), so large PDFs/PPTX in uploads/ or outputs/ do not pin
+      the Python heap.
+
+    All public methods are thread-safe (the server runs a worker pool).
     """
 
-    def __init__(self, ttl_minutes: int = 60):
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, large_file_bytes: int = DEFAULT_LARGE_FILE_BYTES):
         """
         Initialize the static cache.
 
         Args:
-            ttl_minutes: Time-to-live for cache entries in minutes (default: 60)
+            max_bytes: Memory budget for cached content in bytes
+            large_file_bytes: Size at which files bypass the cache
         """
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self.ttl = timedelta(minutes=ttl_minutes)
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.max_bytes = max_bytes
+        self.large_file_bytes = large_file_bytes
+        self.total_bytes = 0
         self.hits = 0
         self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.invalidations = 0
+        self.passthrough_served = 0
+        self.passthrough_bytes = 0
+
+    def is_large(self, size: int) -> bool:
+        """
+        Whether a file of this size should bypass the cache.
+
+        Args:
+            size: File size in bytes
+
+        Returns:
+            True if the file should be streamed from disk instead of cached
+        """
+        return size >= self.large_file_bytes
 
     def get(self, file_path: str) -> Tuple[Optional[bytes], Optional[str]]:
         """
@@ -40,7 +156,7 @@ class StaticCache:
             file_path: Path to the file
 
         Returns:
-            Tuple of (content, etag) or (None, None) if not cached or expired
+            Tuple of (content, etag) or (None, None) if not cached or stale
 
         Usage:
             content, etag = cache.get('/path/to/file.js')
@@ -48,42 +164,103 @@ class StaticCache:
                 # Cache miss - load from disk
                 pass
         """
-        if file_path not in self.cache:
-            self.misses += 1
-            return None, None
-
-        entry = self.cache[file_path]
-
-        # Check if entry has expired
-        if datetime.now() > entry['expires']:
-            del self.cache[file_path]
-            self.misses += 1
-            return None, None
+        with self._lock:
+            entry = self.cache.get(file_path)
+            if entry is None:
+                self.misses += 1
+                return None, None
 
-        # Check if file has been modified (invalidate cache)
+        # Check if file has been modified or removed (invalidate cache)
         try:
-            current_mtime = Path(file_path).stat().st_mtime
-            if current_mtime != entry['mtime']:
-                del self.cache[file_path]
+            st = os.stat(file_path)
+            stale = st.st_mtime_ns != entry['mtime_ns'] or st.st_size != entry['size']
+        except OSError:
+            stale = True
+
+        with self._lock:
+            if stale:
+                if self.cache.get(file_path) is entry:
+                    self._remove(file_path)
+                    self.invalidations += 1
                 self.misses += 1
                 return None, None
-        except OSError:
-            # File doesn't exist anymore
-            del self.cache[file_path]
-            self.misses += 1
+
+            # Cache hit!
+            if file_path in self.cache:
+                self.cache.move_to_end(file_path)
+            self.hits += 1
+            return entry['content'], entry['etag']
+
+    def get_encoded(self, file_path: str, encoding: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Get the precompressed variant of a cached file.
+
+        The variant is built on first request and memoized with the entry,
+        so it is discarded together with the raw bytes when the file changes.
+
+        Args:
+            file_path: Path to a file already stored via set()
+            encoding: Content-Encoding token from choose_encoding()
+
+        Returns:
+            Tuple of (compressed_content, variant_etag), or (None, None) if the
+            file is not cached, the encoding is unsupported, or compression
+            would not make the file smaller (serve identity instead).
+
+        Usage:
+            body, etag = cache.get_encoded('/path/to/file.js', 'gzip')
+        """
+        encoder = _ENCODERS.get(encoding)
+        if encoder is None:
             return None, None
 
-        # Cache hit!
-        self.hits += 1
-        return entry['content'], entry['etag']
+        with self._lock:
+            entry = self.cache.get(file_path)
+            if entry is None:
+                return None, None
+            variants = entry['variants']
+            if encoding in variants:
+                return self._variant_result(entry, encoding)
+            content = entry['content']
+
+        # Compress outside the lock so other workers are not blocked
+        compressed = encoder(content)
+
+        with self._lock:
+            entry = self.cache.get(file_path)
+            if entry is None or entry['content'] is not content:
+                # Replaced while compressing; the new entry will build its own
+                return None, None
+            if encoding not in entry['variants']:
+                if len(compressed) < len(content):
+                    entry['variants'][encoding] = compressed
+                    entry['bytes'] += len(compressed)
+                    self.total_bytes += len(compressed)
+                    self._evict(keep=file_path)
+                else:
+                    entry['variants'][encoding] = None
+            return self._variant_result(entry, encoding)
+
+    @staticmethod
+    def _variant_result(entry: Dict[str, Any], encoding: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Return (bytes, etag) for a built variant; a distinct ETag per encoding."""
+        compressed = entry['variants'][encoding]
+        if compressed is None:
+            return None, None
+        return compressed, f"{entry['etag']}-{encoding}"
 
-    def set(self, file_path: str, content: bytes) -> str:
+    def set(self, file_path: str, content: bytes, precompress: bool = False) -> str:
         """
         Store a file in the cache.
 
+        Content larger than the whole budget is not stored, but its ETag is
+        still returned so the caller can serve it.
+
         Args:
             file_path: Path to the file
             content: File content as bytes
+            precompress: Build every available encoded variant now instead
+                of lazily on first request (used by the startup warm-up)
 
         Returns:
             The computed ETag for the file
@@ -94,23 +271,67 @@ class StaticCache:
         # Compute ETag (MD5 hash of content)
         etag = hashlib.md5(content).hexdigest()
 
-        # Get file modification time for cache invalidation
+        # Record mtime + size for invalidation
         try:
-            mtime = Path(file_path).stat().st_mtime
+            st = os.stat(file_path)
+            mtime_ns, size = st.st_mtime_ns, st.st_size
         except OSError:
-            mtime = 0
-
-        # Store in cache
-        self.cache[file_path] = {
-            'content': content,
-            'etag': etag,
-            'mtime': mtime,
-            'expires': datetime.now() + self.ttl,
-            'cached_at': datetime.now()
-        }
+            mtime_ns, size = 0, len(content)
+
+        if len(content) > self.max_bytes:
+            return etag
+
+        with self._lock:
+            if file_path in self.cache:
+                self._remove(file_path)
+            self.cache[file_path] = {
+                'content': content,
+                'etag': etag,
+                'mtime_ns': mtime_ns,
+                'size': size,
+                'bytes': len(content),
+                'cached_at': datetime.now(),
+                'variants': {},
+            }
+            self.total_bytes += len(content)
+            self._evict(keep=file_path)
+
+        if precompress:
+            for encoding in _ENCODERS:
+                self.get_encoded(file_path, encoding)
 
         return etag
 
+    def record_passthrough(self, size: int) -> None:
+        """
+        Count a large file that was streamed from disk instead of cached.
+
+        Args:
+            size: Bytes sent
+        """
+        with self._lock:
+            self.passthrough_served += 1
+            self.passthrough_bytes += size
+
+    def _remove(self, file_path: str) -> None:
+        """Drop an entry and release its bytes. Caller holds the lock."""
+        entry = self.cache.pop(file_path)
+        self.total_bytes -= entry['bytes']
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Evict least recently used entries until within budget. Caller holds the lock."""
+        while self.total_bytes > self.max_bytes and self.cache:
+            oldest = next(iter(self.cache))
+            if oldest == keep:
+                if len(self.cache) == 1:
+                    break
+                self.cache.move_to_end(oldest)
+                continue
+            freed = self.cache[oldest]['bytes']
+            self._remove(oldest)
+            self.evictions += 1
+            self.evicted_bytes += freed
+
     def invalidate(self, file_path: str) -> bool:
         """
         Remove a specific file from the cache.
@@ -124,10 +345,12 @@ class StaticCache:
         Usage:
             cache.invalidate('/path/to/file.js')
         """
-        if file_path in self.cache:
-            del self.cache[file_path]
-            return True
-        return False
+        with self._lock:
+            if file_path in self.cache:
+                self._remove(file_path)
+                self.invalidations += 1
+                return True
+            return False
 
     def clear(self) -> int:
         """
@@ -140,11 +363,18 @@ class StaticCache:
             count = cache.clear()
             print(f"Cleared {count} cached files")
         """
-        count = len(self.cache)
-        self.cache.clear()
-        self.hits = 0
-        self.misses = 0
-        return count
+        with self._lock:
+            count = len(self.cache)
+            self.cache.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.evicted_bytes = 0
+            self.invalidations = 0
+            self.passthrough_served = 0
+            self.passthrough_bytes = 0
+            return count
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -157,50 +387,50 @@ class StaticCache:
             stats = cache.get_stats()
             print(f"Hit rate: {stats['hit_rate']}%")
         """
-        total_requests = self.hits + self.misses
-        hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
-
-        return {
-            'cached_files': len(self.cache),
-            'hits': self.hits,
-            'misses': self.misses,
-            'total_requests': total_requests,
-            'hit_rate': round(hit_rate, 2),
-            'cache_size_bytes': sum(len(entry['content']) for entry in self.cache.values())
-        }
-
-    def cleanup_expired(self) -> int:
-        """
-        Remove expired entries from the cache.
-
-        Returns:
-            Number of expired entries removed
-
-        Usage:
-            removed = cache.cleanup_expired()
-        """
-        now = datetime.now()
-        expired_keys = [
-            key for key, entry in self.cache.items()
-            if now > entry['expires']
-        ]
-
-        for key in expired_keys:
-            del self.cache[key]
-
-        return len(expired_keys)
+        with self._lock:
+            total_requests = self.hits + self.misses
+            hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
+
+            return {
+                'cached_files': len(self.cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'total_requests': total_requests,
+                'hit_rate': round(hit_rate, 2),
+                'cache_size_bytes': sum(len(entry['content']) for entry in self.cache.values()),
+                'compressed_variants': sum(
+                    1 for entry in self.cache.values() for v in entry['variants'].values() if v is not None
+                ),
+                'compressed_size_bytes': sum(
+                    len(v) for entry in self.cache.values() for v in entry['variants'].values() if v is not None
+                ),
+                'encodings': available_encodings(),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'utilization': round(self.total_bytes / self.max_bytes * 100, 2) if self.max_bytes else 0,
+                'evictions': self.evictions,
+                'evicted_bytes': self.evicted_bytes,
+                'invalidations': self.invalidations,
+                'large_file_bytes': self.large_file_bytes,
+                'passthrough_served': self.passthrough_served,
+                'passthrough_bytes': self.passthrough_bytes,
+            }
 
 
 # Global cache instance
 _cache_instance: Optional[StaticCache] = None
+_instance_lock = threading.Lock()
 
 
-def get_static_cache(ttl_minutes: int = 60) -> StaticCache:
+def get_static_cache(max_bytes: Optional[int] = None, large_file_bytes: Optional[int] = None) -> StaticCache:
     """
     Get the global static cache instance (singleton).
 
+    Defaults come from STATIC_CACHE_MAX_MB (64) and STATIC_CACHE_LARGE_FILE_MB (2).
+
     Args:
-        ttl_minutes: TTL for new cache (only used on first call)
+        max_bytes: Byte budget for a new cache (only used on first call)
+        large_file_bytes: Cache-bypass threshold (only used on first call)
 
     Returns:
         The global StaticCache instance
@@ -211,5 +441,58 @@ def get_static_cache(ttl_minutes: int = 60) -> StaticCache:
     """
     global _cache_instance
     if _cache_instance is None:
-        _cache_instance = StaticCache(ttl_minutes=ttl_minutes)
+        with _instance_lock:
+            if _cache_instance is None:
+                if max_bytes is None:
+                    max_bytes = int(float(os.getenv('STATIC_CACHE_MAX_MB', '64')) * 1024 * 1024)
+                if large_file_bytes is None:
+                    large_file_bytes = int(float(os.getenv('STATIC_CACHE_LARGE_FILE_MB', '2')) * 1024 * 1024)
+                _cache_instance = StaticCache(max_bytes=max_bytes, large_file_bytes=large_file_bytes)
     return _cache_instance
+
+
+def warm_static_cache(root: str, paths: Iterable[str] = WARM_PATHS) -> int:
+    """
+    Load and precompress the main UI assets into the global cache.
+
+    Intended to run once in a background thread at server startup so the
+    first page load already finds compressed variants.
+
+    Args:
+        root: Directory the server serves files from
+        paths: Files or directories (relative to root) to warm; directories
+            are walked recursively for .js/.css/.html/.svg/.json files
+
+    Returns:
+        Number of files cached
+
+    Usage:
+        threading.Thread(target=warm_static_cache, args=(os.getcwd(),), daemon=True).start()
+    """
+    exts = ('.js', '.css', '.html', '.svg', '.json')
+    cache = get_static_cache()
+    warmed = 0
+
+    for rel in paths:
+        start = os.path.join(root, rel)
+        if os.path.isfile(start):
+            files = [start]
+        else:
+            files = [
+                os.path.join(dirpath, name)
+                for dirpath, _, names in os.walk(start)
+                for name in names
+                if name.endswith(exts)
+            ]
+        for full_path in files:
+            try:
+                if cache.is_large(os.path.getsize(full_path)):
+                    continue
+                with open(full_path, 'rb') as f:
+                    content = f.read()
+            except OSError:
+                continue
+            cache.set(full_path, content, precompress=True)
+            warmed += 1
+
+    return warmed
@@ -0,0 +1,15 @@
+"""Shared fixtures for the proposal tests."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from ollama_client import OllamaError
+
+
+@pytest.fixture
+def unavailable_ollama():
+    """Ollama client whose generate() fails as if the server were down."""
+    client = MagicMock()
+    client.generate.side_effect = OllamaError("Connection error: connection refused")
+    return client
@@ -12,7 +12,6 @@ import csv
 from unittest.mock import MagicMock, patch
 
 import pytest
-import requests
 
 from proposal.document_generator import (
     Requirement,
@@ -204,14 +203,13 @@ class TestMapRequirementsToSections:
 # ---------------------------------------------------------------------------
 
 class TestGenerateSectionProse:
-    def test_returns_placeholder_when_ollama_down(self):
+    def test_returns_placeholder_when_ollama_down(self, unavailable_ollama):
         section = SectionContent(
             volume="technical_volume",
             heading="2.0 Technical Approach",
             requirements=[Requirement(id="R1", category="tech", text="Test req")],
         )
-        with patch("requests.post") as mock_post:
-            mock_post.side_effect = requests.ConnectionError("Connection refused")
+        with patch("proposal.document_generator.get_ollama_client", return_value=unavailable_ollama):
             prose = generate_section_prose(section)
         assert "DRAFT REQUIRED" in prose
         assert "R1" in prose
@@ -222,15 +220,14 @@ class TestGenerateSectionProse:
             heading="2.0 Technical Approach",
             requirements=[Requirement(id="R1", category="tech", text="Test req")],
         )
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "Generated proposal text here."}
-        mock_resp.raise_for_status.return_value = None
+        client = MagicMock()
+        client.generate.return_value = {"response": "Generated proposal text here."}
 
-        with patch("requests.post", return_value=mock_resp):
+        with patch("proposal.document_generator.get_ollama_client", return_value=client):
             prose = generate_section_prose(section)
         assert prose == "Generated proposal text here."
 
-    def test_placeholder_includes_req_ids(self):
+    def test_placeholder_includes_req_ids(self, unavailable_ollama):
         section = SectionContent(
             volume="technical_volume",
             heading="Test",
@@ -239,7 +236,7 @@ class TestGenerateSectionProse:
                 Requirement(id="R2", category="tech", text="Second"),
             ],
         )
-        with patch("requests.post", side_effect=requests.ConnectionError("down")):
+        with patch("proposal.document_generator.get_ollama_client", return_value=unavailable_ollama):
             prose = generate_section_prose(section)
         assert "R1" in prose
         assert "R2" in prose
@@ -277,11 +274,10 @@ class TestDraftProposal:
     def test_drafts_technical_volume(self, sample_requirements, mock_docx_template, tmp_path, monkeypatch):
         monkeypatch.setenv("OUTPUTS_DIR", str(tmp_path / "outputs"))
 
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "Professional proposal text."}
-        mock_resp.raise_for_status.return_value = None
+        client = MagicMock()
+        client.generate.return_value = {"response": "Professional proposal text."}
 
-        with patch("requests.post", return_value=mock_resp):
+        with patch("proposal.document_generator.get_ollama_client", return_value=client):
             result = draft_proposal(
                 requirements=sample_requirements,
                 proposal_title="Test Proposal",
@@ -297,12 +293,12 @@ class TestDraftProposal:
         assert result.requirements_addressed == len(sample_requirements)
         assert not result.errors
 
-    def test_missing_template_recorded_as_error(self, sample_requirements, tmp_path, monkeypatch):
+    def test_missing_template_recorded_as_error(self, sample_requirements, tmp_path, monkeypatch, unavailable_ollama):
         monkeypatch.setenv("TEMPLATES_DIR", str(tmp_path / "empty_templates"))
         monkeypatch.setenv("OUTPUTS_DIR", str(tmp_path / "outputs"))
         (tmp_path / "empty_templates").mkdir()
 
-        with patch("requests.post", side_effect=requests.ConnectionError("Ollama down")):
+        with patch("proposal.document_generator.get_ollama_client", return_value=unavailable_ollama):
             result = draft_proposal(
                 requirements=sample_requirements,
                 proposal_title="Test",
@@ -327,11 +323,10 @@ class TestDraftProposal:
         self, sample_requirements, mock_docx_template, tmp_path, monkeypatch
     ):
         monkeypatch.setenv("OUTPUTS_DIR", str(tmp_path / "outputs"))
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "Text."}
-        mock_resp.raise_for_status.return_value = None
+        client = MagicMock()
+        client.generate.return_value = {"response": "Text."}
 
-        with patch("requests.post", return_value=mock_resp):
+        with patch("proposal.document_generator.get_ollama_client", return_value=client):
             result = draft_proposal(
                 requirements=sample_requirements,
                 proposal_title="Test",
@@ -11,7 +11,6 @@ from datetime import date, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
-import requests
 
 from proposal.hotwash import (
     IMPACT_LEVELS,
@@ -235,21 +234,20 @@ class TestBuildHotwashFromDict:
 
 class TestGenerateImprovementInsights:
     def test_returns_ollama_response(self, complete_record):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "1. Improve schedule\n2. Better subs"}
-        mock_resp.raise_for_status.return_value = None
-        with patch("requests.post", return_value=mock_resp):
+        client = MagicMock()
+        client.generate.return_value = {"response": "1. Improve schedule\n2. Better subs"}
+        with patch("proposal.hotwash.get_ollama_client", return_value=client):
             result = generate_improvement_insights(complete_record)
         assert "Improve schedule" in result
 
-    def test_fallback_when_ollama_down_with_critical(self, complete_record):
-        with patch("requests.post", side_effect=requests.ConnectionError("down")):
+    def test_fallback_when_ollama_down_with_critical(self, complete_record, unavailable_ollama):
+        with patch("proposal.hotwash.get_ollama_client", return_value=unavailable_ollama):
             result = generate_improvement_insights(complete_record)
         assert "Critical" in result or "SIEM" in result
 
-    def test_fallback_when_no_lessons(self):
+    def test_fallback_when_no_lessons(self, unavailable_ollama):
         record = HotwashRecord("FA001", "Test", outcome="WIN")
-        with patch("requests.post", side_effect=requests.ConnectionError("down")):
+        with patch("proposal.hotwash.get_ollama_client", return_value=unavailable_ollama):
             result = generate_improvement_insights(record)
         assert result is not None
         assert len(result) > 0
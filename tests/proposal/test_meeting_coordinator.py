@@ -12,7 +12,6 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
-import requests
 
 from proposal.meeting_coordinator import (
     AGENDA_TEMPLATES,
@@ -306,22 +305,20 @@ class TestExportMeetingSummary:
 
 class TestSummarizeNotes:
     def test_returns_ollama_response(self):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "• Key point 1\n• Action: Alice by Friday"}
-        mock_resp.raise_for_status.return_value = None
-        with patch("requests.post", return_value=mock_resp):
+        client = MagicMock()
+        client.generate.return_value = {"response": "• Key point 1\n• Action: Alice by Friday"}
+        with patch("proposal.meeting_coordinator.get_ollama_client", return_value=client):
             result = summarize_notes("Long raw notes here...", "kickoff")
         assert "Key point 1" in result
 
-    def test_returns_raw_when_ollama_down(self):
-        with patch("requests.post", side_effect=requests.ConnectionError("down")):
+    def test_returns_raw_when_ollama_down(self, unavailable_ollama):
+        with patch("proposal.meeting_coordinator.get_ollama_client", return_value=unavailable_ollama):
             result = summarize_notes("My raw notes", "pink_team")
         assert result == "My raw notes"
 
     def test_empty_notes_handled(self):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {"response": "No significant notes."}
-        mock_resp.raise_for_status.return_value = None
-        with patch("requests.post", return_value=mock_resp):
+        client = MagicMock()
+        client.generate.return_value = {"response": "No significant notes."}
+        with patch("proposal.meeting_coordinator.get_ollama_client", return_value=client):
             result = summarize_notes("")
         assert result is not None
@@ -0,0 +1,211 @@
+"""
+Tests for server/background_jobs.py — the bounded, persistent job executor.
+
+Each test uses its own _JobStore on a temporary SQLite file.
+
+Covers:
+  - submit/get round trip, submit_with_id + update_progress
+  - Worker count bounds concurrency per queue
+  - Priority ordering within a queue
+  - Cancellation of pending and running jobs
+  - Status survives a restart; unfinished jobs reported as interrupted
+  - TTL cleanup of finished jobs
+  - Queue metrics
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from server.background_jobs import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    QUEUE_CPU,
+    QUEUE_LLM,
+    _JobStore,
+)
+
+
+def _wait(store, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job and job['status'] not in ('pending', 'running'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish: {store.get(job_id)}")
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    stores = []
+
+    def factory(**kwargs):
+        kwargs.setdefault('workers', {'llm': 1, 'io': 2, 'cpu': 1})
+        store = _JobStore(db_path=str(tmp_path / 'jobs.db'), **kwargs)
+        stores.append(store)
+        return store
+
+    yield factory
+    for store in stores:
+        store.shutdown(wait=False)
+
+
+class TestExecution:
+    def test_submit_and_get(self, make_store):
+        store = make_store()
+        job_id = store.submit(lambda a, b=0: a + b, 2, b=3)
+        job = _wait(store, job_id)
+        assert job['status'] == 'done'
+        assert job['result'] == 5
+        assert job['progress'] == 'Complete'
+        assert job['queue'] == 'io'
+
+    def test_error_recorded(self, make_store):
+        store = make_store()
+
+        def boom():
+            raise RuntimeError('bad input')
+
+        job = _wait(store, store.submit(boom))
+        assert job['status'] == 'error'
+        assert job['error'] == 'bad input'
+
+    def test_submit_with_id_reports_progress(self, make_store):
+        store = make_store()
+        seen = threading.Event()
+        release = threading.Event()
+
+        def work(job_id, n):
+            store.update_progress(job_id, f"step 1/{n}")
+            seen.set()
+            release.wait(5)
+            return job_id
+
+        job_id = store.submit_with_id(work, 2)
+        assert seen.wait(5)
+        assert store.get(job_id)['progress'] == 'step 1/2'
+        release.set()
+        assert _wait(store, job_id)['result'] == job_id
+
+    def test_unknown_queue_rejected(self, make_store):
+        with pytest.raises(ValueError):
+            make_store().enqueue(print, queue='gpu')
+
+
+class TestScheduling:
+    def test_workers_bound_concurrency(self, make_store):
+        store = make_store(workers={'llm': 2, 'io': 1, 'cpu': 1})
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def work():
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.05)
+            with lock:
+                state['active'] -= 1
+
+        ids = [store.enqueue(work, queue=QUEUE_LLM) for _ in range(6)]
+        for job_id in ids:
+            _wait(store, job_id)
+        assert state['peak'] == 2
+        assert len([t for t in threading.enumerate() if t.name.startswith('bg-llm-')]) >= 2
+
+    def test_priority_order(self, make_store):
+        store = make_store()
+        gate = threading.Event()
+        order = []
+        blocker = store.enqueue(gate.wait, (5,), queue=QUEUE_CPU)
+        ids = [
+            store.enqueue(order.append, ('low',), queue=QUEUE_CPU, priority=PRIORITY_LOW),
+            store.enqueue(order.append, ('normal',), queue=QUEUE_CPU),
+            store.enqueue(order.append, ('high',), queue=QUEUE_CPU, priority=PRIORITY_HIGH),
+        ]
+        gate.set()
+        for job_id in [blocker] + ids:
+            _wait(store, job_id)
+        assert order == ['high', 'normal', 'low']
+
+
+class TestCancellation:
+    def test_cancel_pending(self, make_store):
+        store = make_store()
+        gate = threading.Event()
+        ran = []
+        blocker = store.enqueue(gate.wait, (5,), queue=QUEUE_LLM)
+        queued = store.enqueue(ran.append, (1,), queue=QUEUE_LLM)
+
+        assert store.cancel(queued) is True
+        assert store.get(queued)['status'] == 'cancelled'
+        gate.set()
+        _wait(store, blocker)
+        time.sleep(0.05)
+        assert ran == []
+        assert store.cancel(queued) is False
+
+    def test_cancel_running_cooperative(self, make_store):
+        store = make_store()
+        started = threading.Event()
+
+        def work(job_id):
+            started.set()
+            while True:
+                store.check_cancelled(job_id)
+                time.sleep(0.01)
+
+        job_id = store.submit_with_id(work)
+        assert started.wait(5)
+        assert store.cancel(job_id) is True
+        job = _wait(store, job_id)
+        assert job['status'] == 'cancelled'
+        assert store.get_metrics()['queues']['io']['cancelled'] == 1
+
+
+class TestPersistence:
+    def test_status_survives_restart(self, make_store):
+        first = make_store()
+        done_id = first.submit(lambda: {'ingested': 3})
+        _wait(first, done_id)
+
+        gate = threading.Event()
+        running_id = first.submit(gate.wait, 5)
+        while first.get(running_id)['status'] != 'running':
+            time.sleep(0.01)
+
+        second = make_store()
+        done = second.get(done_id)
+        assert done['status'] == 'done'
+        assert done['result'] == {'ingested': 3}
+
+        interrupted = second.get(running_id)
+        assert interrupted['status'] == 'error'
+        assert 'restart' in interrupted['error']
+        gate.set()
+
+    def test_ttl_cleanup(self, make_store):
+        store = make_store(ttl_seconds=3600)
+        job_id = store.submit(lambda: 1)
+        _wait(store, job_id)
+        assert store.cleanup() == 0
+        assert store.cleanup(max_age=-1) == 1
+        assert store.get(job_id) is None
+
+    def test_unknown_job(self, make_store):
+        assert make_store().get('missing') is None
+
+
+class TestMetrics:
+    def test_queue_metrics(self, make_store):
+        store = make_store()
+        for i in range(3):
+            _wait(store, store.enqueue(time.sleep, (0.01,), queue=QUEUE_CPU))
+        cpu = store.get_metrics()['queues']['cpu']
+        assert cpu['submitted'] == cpu['completed'] == 3
+        assert cpu['depth'] == cpu['running'] == 0
+        assert cpu['run_mean_ms'] >= 10
+        assert cpu['wait_p95_ms'] >= 0
@@ -0,0 +1,204 @@
+"""
+Tests for streaming chat — OllamaConfig.stream_request and /api/chat SSE.
+
+A stub Ollama server emits NDJSON frames with a delay between tokens, so the
+tests can check that tokens reach the client before generation finishes.
+
+Covers:
+  - stream_request yields frames and stops at done=True
+  - Connection failure raises OllamaStreamError
+  - /api/chat with stream=true: meta → token… → done (token counts, TTFT)
+  - Ollama unreachable still answers 503 JSON
+  - Streamed latencies feed get_chat_latency_stats()
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import server.request_handler as handler_mod
+import server.routes.chat as chat
+from ollama_config import OllamaStreamError, ollama_config
+from server.http_server import BoundedThreadPoolHTTPServer
+from server.request_handler import CustomHTTPRequestHandler
+from server.router import Router
+
+TOKENS = ['Hel', 'lo', ', ', 'world']
+TOKEN_DELAY = 0.15
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, body))
+        chat_api = self.path == '/api/chat'
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def chunk(obj):
+            data = (json.dumps(obj) + '\n').encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        for tok in TOKENS:
+            frame = {'model': body['model'], 'done': False}
+            if chat_api:
+                frame['message'] = {'role': 'assistant', 'content': tok}
+            else:
+                frame['response'] = tok
+            chunk(frame)
+            time.sleep(TOKEN_DELAY)
+        chunk({'model': body['model'], 'done': True, 'response': '',
+               'created_at': '2026-01-01T00:00:00Z',
+               'prompt_eval_count': 7, 'eval_count': len(TOKENS)})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        return
+
+
+@pytest.fixture
+def stub_ollama(monkeypatch):
+    server = HTTPServer(('127.0.0.1', 0), _StubOllama)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(ollama_config, 'generate_endpoint', base + '/api/generate')
+    monkeypatch.setattr(ollama_config, 'chat_endpoint', base + '/api/chat')
+    monkeypatch.setattr(ollama_config, 'max_retries', 1)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dead_ollama(monkeypatch):
+    monkeypatch.setattr(ollama_config, 'generate_endpoint', 'http://127.0.0.1:9/api/generate')
+    monkeypatch.setattr(ollama_config, 'max_retries', 1)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    router = Router()
+    router.add('POST', '/api/chat', chat.handle_chat_api)
+    monkeypatch.setattr(handler_mod, '_router', router)
+    httpd = BoundedThreadPoolHTTPServer(('127.0.0.1', 0), CustomHTTPRequestHandler, max_workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _read_events(resp):
+    """Parse SSE frames, recording when each arrived."""
+    events = []
+    started = time.monotonic()
+    buffer = b''
+    while True:
+        chunk = resp.read1(4096) if hasattr(resp, 'read1') else resp.read(1)
+        if not chunk:
+            break
+        buffer += chunk
+        while b'\n\n' in buffer:
+            frame, buffer = buffer.split(b'\n\n', 1)
+            lines = frame.decode().split('\n')
+            event = lines[0][len('event: '):]
+            data = json.loads(lines[1][len('data: '):])
+            events.append((event, data, time.monotonic() - started))
+    return events
+
+
+def _post_chat(port, body):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.request('POST', '/api/chat', body=json.dumps(body),
+                 headers={'Content-Type': 'application/json'})
+    return conn, conn.getresponse()
+
+
+class TestStreamRequest:
+    def test_yields_frames_until_done(self, stub_ollama):
+        frames = list(ollama_config.generate_stream('m', 'hi'))
+        assert [f['response'] for f in frames[:-1]] == TOKENS
+        assert frames[-1]['done'] is True
+        assert frames[-1]['eval_count'] == len(TOKENS)
+        path, body = stub_ollama.requests[0]
+        assert path == '/api/generate'
+        assert body['stream'] is True
+
+    def test_chat_endpoint(self, stub_ollama):
+        frames = list(ollama_config.chat_stream('m', [{'role': 'user', 'content': 'hi'}]))
+        assert ''.join(f['message']['content'] for f in frames[:-1]) == ''.join(TOKENS)
+
+    def test_connection_failure_raises(self, dead_ollama):
+        with pytest.raises(OllamaStreamError):
+            next(ollama_config.generate_stream('m', 'hi'))
+
+
+class TestChatSSE:
+    def test_tokens_arrive_before_completion(self, stub_ollama, app):
+        conn, resp = _post_chat(app, {'message': 'hi', 'model': 'm', 'stream': True})
+        assert resp.status == 200
+        assert resp.getheader('Content-Type').startswith('text/event-stream')
+        events = _read_events(resp)
+        conn.close()
+
+        names = [e[0] for e in events]
+        assert names[0] == 'meta'
+        assert names[-1] == 'done'
+        assert ''.join(d['content'] for n, d, _ in events if n == 'token') == ''.join(TOKENS)
+
+        first_token_at = next(t for n, _, t in events if n == 'token')
+        done_at = events[-1][2]
+        assert done_at - first_token_at >= TOKEN_DELAY * (len(TOKENS) - 1) * 0.8
+
+        done = events[-1][1]
+        assert done['prompt_tokens'] == 7
+        assert done['completion_tokens'] == len(TOKENS)
+        assert done['tokens_used'] == 7 + len(TOKENS)
+        assert 0 < done['ttft_ms'] < done['elapsed_ms']
+        assert done['timestamp'] == '2026-01-01T00:00:00Z'
+
+    def test_accept_header_selects_stream(self, stub_ollama, app):
+        conn = http.client.HTTPConnection('127.0.0.1', app, timeout=10)
+        conn.request('POST', '/api/chat', body=json.dumps({'message': 'hi', 'model': 'm'}),
+                     headers={'Content-Type': 'application/json', 'Accept': 'text/event-stream'})
+        resp = conn.getresponse()
+        assert resp.getheader('Content-Type').startswith('text/event-stream')
+        assert _read_events(resp)[-1][0] == 'done'
+        conn.close()
+
+    def test_non_streaming_unchanged(self, stub_ollama, app, monkeypatch):
+        monkeypatch.setattr(ollama_config, 'generate_response', lambda model, prompt, **kw: {
+            'success': True, 'attempt': 1,
+            'data': {'response': 'full', 'prompt_eval_count': 1, 'eval_count': 2}})
+        conn, resp = _post_chat(app, {'message': 'hi', 'model': 'm'})
+        data = json.loads(resp.read())
+        conn.close()
+        assert data['response'] == 'full'
+        assert data['tokens_used'] == 3
+
+    def test_ollama_down_returns_503_json(self, dead_ollama, app):
+        conn, resp = _post_chat(app, {'message': 'hi', 'model': 'm', 'stream': True})
+        assert resp.status == 503
+        assert 'Ollama request failed' in json.loads(resp.read())['error']
+        conn.close()
+
+    def test_latency_stats_recorded(self, stub_ollama, app, monkeypatch):
+        monkeypatch.setattr(chat, '_latency_samples', chat.deque(maxlen=chat._LATENCY_WINDOW))
+        conn, resp = _post_chat(app, {'message': 'hi', 'model': 'm', 'stream': True})
+        _read_events(resp)
+        conn.close()
+        stats = chat.get_chat_latency_stats()
+        assert stats['count'] == 1
+        assert 0 < stats['ttft_p50_ms'] < stats['total_p50_ms']
@@ -0,0 +1,182 @@
+"""
+Tests for server/http_server.py — bounded worker-pool HTTP server.
+
+Covers:
+  - Requests flow through CustomHTTPRequestHandler → Router.dispatch
+  - Load test: p99 latency of a cheap route stays flat while slow
+    (LLM-like) requests occupy workers
+  - Queue overflow is answered with 503 instead of blocking
+  - Each worker thread keeps its own db_pool connection
+  - SERVER_MODE selection in create_server()
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from http.server import HTTPServer
+
+import pytest
+
+import server.request_handler as handler_mod
+from server.db_pool import get_db
+from server.http_server import BoundedThreadPoolHTTPServer, create_server
+from server.request_handler import CustomHTTPRequestHandler
+from server.router import Router
+
+SLOW_SECONDS = 1.0
+
+
+def _build_test_router(release: threading.Event, db_path: str) -> Router:
+    r = Router()
+
+    def slow(h):
+        # Stand-in for a 30–120 s Ollama call
+        release.wait(SLOW_SECONDS)
+        h.send_json_response({'ok': 'slow'})
+
+    def conn_id(h):
+        with get_db(db_path) as conn:
+            h.send_json_response({'conn': id(conn), 'thread': threading.get_ident()})
+
+    r.add('GET', lambda p: p == '/api/health', lambda h: h.send_json_response({'ok': True}))
+    r.add('GET', lambda p: p == '/api/slow', slow)
+    r.add('GET', lambda p: p == '/api/conn', conn_id)
+    return r
+
+
+@pytest.fixture
+def release():
+    ev = threading.Event()
+    yield ev
+    ev.set()
+
+
+@pytest.fixture
+def make_server(monkeypatch, tmp_path, release):
+    servers = []
+
+    def _make(max_workers=8, queue_depth=32):
+        monkeypatch.setattr(handler_mod, '_router', _build_test_router(release, str(tmp_path / 'pool.db')))
+        httpd = BoundedThreadPoolHTTPServer(('127.0.0.1', 0), CustomHTTPRequestHandler,
+                                            max_workers=max_workers, queue_depth=queue_depth)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return httpd
+
+    yield _make
+    release.set()
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _get(port: int, path: str, timeout: float = 10.0):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        conn.request('GET', path)
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+    finally:
+        conn.close()
+
+
+def _p99(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def test_dispatches_through_router(make_server):
+    httpd = make_server()
+    status, body = _get(httpd.server_address[1], '/api/health')
+    assert status == 200
+    assert b'"ok": true' in body
+
+
+def test_cheap_route_p99_flat_while_slow_requests_in_flight(make_server):
+    """Load test: health checks are not blocked behind in-flight LLM calls."""
+    httpd = make_server(max_workers=8)
+    port = httpd.server_address[1]
+
+    def timed_health():
+        t0 = time.perf_counter()
+        status, _ = _get(port, '/api/health')
+        assert status == 200
+        return time.perf_counter() - t0
+
+    baseline = [timed_health() for _ in range(50)]
+
+    slow_threads = [threading.Thread(target=_get, args=(port, '/api/slow')) for _ in range(4)]
+    for t in slow_threads:
+        t.start()
+    time.sleep(0.1)  # let the slow requests occupy workers
+
+    loaded = [timed_health() for _ in range(50)]
+    for t in slow_threads:
+        t.join()
+
+    # With the single-threaded HTTPServer every health check would wait
+    # for the slow calls (≥ SLOW_SECONDS); here p99 must stay near baseline.
+    assert _p99(loaded) < SLOW_SECONDS / 4
+    assert _p99(loaded) < max(_p99(baseline) * 20, 0.05)
+
+
+def test_queue_overflow_returns_503(make_server, release):
+    httpd = make_server(max_workers=1, queue_depth=1)
+    port = httpd.server_address[1]
+
+    occupying = threading.Thread(target=_get, args=(port, '/api/slow'))
+    occupying.start()
+    time.sleep(0.2)                       # worker busy
+    queued = threading.Thread(target=_get, args=(port, '/api/slow'))
+    queued.start()
+    time.sleep(0.2)                       # queue slot taken
+
+    status, body = _get(port, '/api/health')
+    assert status == 503
+    assert b'busy' in body
+    assert httpd.get_stats()['rejected'] == 1
+
+    release.set()
+    occupying.join()
+    queued.join()
+
+
+def test_each_worker_reuses_its_own_db_connection(make_server):
+    httpd = make_server(max_workers=2)
+    port = httpd.server_address[1]
+
+    seen = {}
+    for _ in range(20):
+        _, body = _get(port, '/api/conn')
+        data = json.loads(body)
+        seen.setdefault(data['thread'], set()).add(data['conn'])
+
+    assert 1 <= len(seen) <= 2
+    assert all(len(conns) == 1 for conns in seen.values())
+
+
+def test_create_server_modes(monkeypatch):
+    monkeypatch.setenv('SERVER_MODE', 'single')
+    httpd = create_server(('127.0.0.1', 0), CustomHTTPRequestHandler)
+    try:
+        assert type(httpd) is HTTPServer
+    finally:
+        httpd.server_close()
+
+    monkeypatch.setenv('SERVER_MODE', 'threaded')
+    monkeypatch.setenv('SERVER_MAX_WORKERS', '3')
+    monkeypatch.setenv('SERVER_QUEUE_DEPTH', '5')
+    httpd = create_server(('127.0.0.1', 0), CustomHTTPRequestHandler)
+    try:
+        stats = httpd.get_stats()
+        assert stats['max_workers'] == 3
+        assert stats['queue_depth'] == 5
+    finally:
+        httpd.server_close()
+
+    monkeypatch.setenv('SERVER_MODE', 'bogus')
+    with pytest.raises(ValueError):
+        create_server(('127.0.0.1', 0), CustomHTTPRequestHandler)
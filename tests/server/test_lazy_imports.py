@@ -0,0 +1,135 @@
+"""
+Tests for server/lazy_imports.py and server/startup_profiler.py.
+
+Covers:
+  - lazy_handler imports its module only on first call, then dispatches
+  - Router.describe() lists lazy actions under the real handler name
+  - A handler whose module fails to import answers 503
+  - warm_lazy_handlers imports pending modules ahead of use
+  - build_router() does not import the heavy subsystems
+  - StartupProfiler records phases and per-module import times
+"""
+
+from __future__ import annotations
+
+import io
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from server import lazy_imports
+from server.lazy_imports import lazy_handler, module_available, pending_modules, warm_lazy_handlers
+from server.router import Router
+from server.startup_profiler import StartupProfiler
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+class _Handler:
+    def __init__(self):
+        self.responses = []
+
+    def send_json_response(self, data, status=200):
+        self.responses.append((status, data))
+
+
+@pytest.fixture
+def fake_module(tmp_path, monkeypatch):
+    """A throwaway route module on sys.path; returns its name."""
+    name = 'lazy_route_fixture'
+    (tmp_path / f'{name}.py').write_text(textwrap.dedent('''
+        def handle_echo_api(handler, item_id):
+            handler.send_json_response({'item_id': item_id})
+    '''))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(lazy_imports, '_registry', {})
+    sys.modules.pop(name, None)
+    yield name
+    sys.modules.pop(name, None)
+
+
+class TestLazyHandler:
+    def test_imports_on_first_call(self, fake_module):
+        action = lazy_handler(fake_module, 'handle_echo_api')
+        assert fake_module not in sys.modules
+        assert pending_modules() == [fake_module]
+
+        handler = _Handler()
+        action(handler, '42')
+        assert fake_module in sys.modules
+        assert handler.responses == [(200, {'item_id': '42'})]
+        assert pending_modules() == []
+
+    def test_dispatch_and_describe(self, fake_module):
+        router = Router()
+        router.add('GET', '/api/items/{item_id}', lazy_handler(fake_module, 'handle_echo_api'))
+        assert router.describe()[0]['action'] == f'{fake_module}.handle_echo_api'
+
+        handler = _Handler()
+        assert router.dispatch('GET', '/api/items/7', handler)
+        assert handler.responses == [(200, {'item_id': '7'})]
+
+    def test_missing_module_returns_503(self, monkeypatch):
+        monkeypatch.setattr(lazy_imports, '_registry', {})
+        action = lazy_handler('no_such_route_module', 'handle_x')
+        handler = _Handler()
+        action(handler)
+        status, body = handler.responses[0]
+        assert status == 503
+        assert 'no_such_route_module not available' in body['message']
+
+    def test_warm_imports_pending(self, fake_module):
+        lazy_handler(fake_module, 'handle_echo_api')
+        timings = warm_lazy_handlers()
+        assert list(timings) == [fake_module]
+        assert fake_module in sys.modules
+
+    def test_module_available_does_not_import(self, fake_module):
+        assert module_available(fake_module)
+        assert fake_module not in sys.modules
+        assert not module_available(fake_module, 'no_such_module_anywhere')
+
+
+def test_build_router_defers_heavy_subsystems():
+    script = textwrap.dedent('''
+        import sys
+        from server.routes_builder import build_router
+        router = build_router()
+        heavy = ('server.routes.chat', 'server.routes.visualizations', 'server.routes.shredding',
+                 'rag_api', 'search_api', 'knowledge_graph_builder',
+                 'agent_system.ollama_agent_runtime', 'sklearn')
+        print(','.join(m for m in heavy if m in sys.modules))
+        actions = {r['pattern']: r['action'] for r in router.describe()}
+        print(actions['/api/chat'])
+    ''')
+    out = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True,
+                         text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    loaded, chat_action = out.stdout.strip().splitlines()[-2:]
+    assert loaded == ''
+    assert chat_action == 'server.routes.chat.handle_chat_api'
+
+
+class TestStartupProfiler:
+    def test_phases_and_imports(self, fake_module):
+        profiler = StartupProfiler()
+        profiler.install()
+        try:
+            with profiler.phase('load fixture'):
+                __import__(fake_module)
+        finally:
+            profiler.uninstall()
+        profiler.mark('done')
+
+        assert profiler.phases[0][0] == 'load fixture'
+        cumulative, own = profiler.imports[fake_module]
+        assert 0 < own <= cumulative
+        assert profiler.top_imports(1)[0][0] == fake_module
+
+        buf = io.StringIO()
+        profiler.report(stream=buf)
+        assert 'load fixture' in buf.getvalue()
+        assert fake_module in buf.getvalue()
@@ -0,0 +1,210 @@
+"""
+Tests for the request-timing middleware and GET /api/metrics.
+
+Covers:
+  - Per-route counts, status codes and bytes out through a live server
+  - DB (get_db) and Ollama time attributed to the route that spent it
+  - Unmatched paths recorded as 404 under "<unmatched>"
+  - Work outside a request recorded under "<background>"
+  - Histogram quantile estimation
+  - Prometheus text output
+  - Middleware overhead stays small
+"""
+
+from __future__ import annotations
+
+import http.client
+import threading
+import time
+
+import pytest
+
+import server.request_handler as handler_mod
+from server.db_pool import get_db
+from server.http_server import BoundedThreadPoolHTTPServer
+from server.middleware.prometheus import PrometheusWriter, write_request_metrics
+from server.middleware.timing import (
+    BACKGROUND_ROUTE,
+    UNMATCHED_ROUTE,
+    RequestMetrics,
+    TimingMiddleware,
+    _RouteStats,
+    record_db_time,
+    record_ollama_time,
+)
+from server.request_handler import CustomHTTPRequestHandler
+from server.router import Router
+from server.routes.metrics import handle_metrics_api
+
+
+@pytest.fixture
+def metrics():
+    return RequestMetrics()
+
+
+@pytest.fixture
+def app(monkeypatch, metrics, tmp_path):
+    db_path = str(tmp_path / 'metrics.db')
+
+    def items(handler, item_id):
+        with get_db(db_path) as conn:
+            conn.execute('SELECT 1').fetchone()
+        record_ollama_time(0.25)
+        handler.send_json_response({'item_id': item_id})
+
+    def missing(handler):
+        handler.send_json_response({'error': 'nope'}, 404)
+
+    router = Router()
+    router.add('GET', '/api/items/{item_id}', items)
+    router.add('GET', '/api/missing', missing)
+    router.add('GET', '/api/metrics', handle_metrics_api)
+    monkeypatch.setattr(handler_mod, '_router', TimingMiddleware(router, metrics))
+    monkeypatch.setattr('server.routes.metrics.request_metrics', metrics)
+
+    httpd = BoundedThreadPoolHTTPServer(('127.0.0.1', 0), CustomHTTPRequestHandler, max_workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.request('GET', path)
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp, body
+
+
+def _row(metrics, route, count=None, timeout=2.0):
+    """Snapshot row for route; waits for `count` requests (recorded after the response is sent)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        row = next((r for r in metrics.snapshot() if r['route'] == route), None)
+        if row is not None and (count is None or row['count'] >= count):
+            return row
+        if time.monotonic() > deadline:
+            raise AssertionError(f"no metrics for {route}: {metrics.snapshot()}")
+        time.sleep(0.005)
+
+
+class TestMiddleware:
+    def test_counts_status_and_bytes(self, app, metrics):
+        for i in range(3):
+            _, body = _get(app, f'/api/items/{i}')
+        _get(app, '/api/missing')
+
+        items = _row(metrics, '/api/items/{item_id}', count=3)
+        assert items['count'] == 3
+        assert items['statuses'] == {200: 3}
+        assert items['bytes_out'] > 3 * len(body)  # body plus status line and headers
+        assert _row(metrics, '/api/missing', count=1)['statuses'] == {404: 1}
+
+    def test_db_and_ollama_time_attributed(self, app, metrics):
+        _get(app, '/api/items/1')
+        items = _row(metrics, '/api/items/{item_id}', count=1)
+        assert items['db_calls'] == 1
+        assert items['db_seconds'] > 0
+        assert items['ollama_calls'] == 1
+        assert items['ollama_seconds'] == pytest.approx(0.25)
+
+    def test_unmatched_recorded(self, app, metrics):
+        resp, _ = _get(app, '/api/does-not-exist')
+        assert resp.status == 404
+        assert _row(metrics, UNMATCHED_ROUTE, count=1)['statuses'] == {404: 1}
+
+    def test_exception_recorded_as_500(self, metrics):
+        def boom(handler):
+            raise RuntimeError('x')
+
+        router = Router()
+        router.add('GET', '/api/boom', boom)
+        handler = type('H', (), {'wfile': None})()
+        with pytest.raises(RuntimeError):
+            TimingMiddleware(router, metrics).dispatch('GET', '/api/boom', handler)
+        assert _row(metrics, '/api/boom')['statuses'] == {500: 1}
+
+    def test_background_time(self):
+        from server.middleware import timing
+
+        before = {r['route']: r for r in timing.request_metrics.snapshot()}
+        record_db_time(0.5)
+        after = _row(timing.request_metrics, BACKGROUND_ROUTE)
+        prev = before.get(BACKGROUND_ROUTE, {'db_calls': 0})
+        assert after['db_calls'] == prev['db_calls'] + 1
+        assert after['count'] == 0
+
+    def test_overhead_is_small(self, metrics):
+        def noop(handler, item_id):
+            return None
+
+        class _H:
+            wfile = None
+
+        router = Router()
+        router.add('GET', '/api/items/{item_id}', noop)
+        wrapped = TimingMiddleware(router, metrics)
+        handler = _H()
+        n = 20000
+
+        start = time.perf_counter()
+        for _ in range(n):
+            router.dispatch('GET', '/api/items/5', handler)
+        bare = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(n):
+            wrapped.dispatch('GET', '/api/items/5', handler)
+        timed = time.perf_counter() - start
+        assert (timed - bare) / n < 50e-6
+
+
+class TestQuantiles:
+    def test_interpolated_from_buckets(self, metrics):
+        for _ in range(90):
+            metrics.observe('GET', '/api/x', 200, 0.004)
+        for _ in range(10):
+            metrics.observe('GET', '/api/x', 200, 0.8)
+        row = _row(metrics, '/api/x')
+        assert 0.0025 <= row['p50'] <= 0.005
+        assert 0.5 <= row['p95'] <= 1.0
+        assert 0.5 <= row['p99'] <= 1.0
+
+    def test_empty(self):
+        assert _RouteStats().quantile(0.5) == 0.0
+
+
+class TestPrometheus:
+    def test_text_format(self, metrics):
+        metrics.observe('POST', '/api/chat', 200, 0.3, bytes_out=120)
+        out = PrometheusWriter()
+        write_request_metrics(out, metrics)
+        text = out.render()
+        assert '# TYPE robobrain_http_request_duration_seconds histogram' in text
+        assert ('robobrain_http_requests_total{method="POST",route="/api/chat",status="200"} 1'
+                in text)
+        assert ('robobrain_http_request_duration_seconds_bucket'
+                '{method="POST",route="/api/chat",le="+Inf"} 1') in text
+        assert 'robobrain_http_response_bytes_total{method="POST",route="/api/chat"} 120' in text
+
+        # Every sample belongs to the most recently declared family
+        family = None
+        for line in text.splitlines():
+            if line.startswith('# TYPE'):
+                family = line.split()[2]
+            elif not line.startswith('#'):
+                assert line.startswith(family)
+
+    def test_endpoint(self, app, metrics):
+        _get(app, '/api/items/1')
+        _row(metrics, '/api/items/{item_id}', count=1)
+        resp, body = _get(app, '/api/metrics')
+        text = body.decode()
+        assert resp.status == 200
+        assert resp.getheader('Content-Type').startswith('text/plain; version=0.0.4')
+        assert 'route="/api/items/{item_id}"' in text
+        assert 'robobrain_db_seconds_total' in text
+        assert 'robobrain_ollama_in_flight' in text
+        assert 'robobrain_jobs_depth{queue="llm"}' in text
+        assert 'robobrain_http_pool_max_workers 2' in text
@@ -0,0 +1,199 @@
+"""
+Tests for server/router.py — compiled segment-trie router.
+
+Covers:
+  - Literal, {name}, * and ** pattern matching
+  - Precedence by specificity regardless of registration order
+  - Captured params passed positionally and exposed as handler.path_params
+  - Query strings ignored for matching
+  - enabled= gate and describe() introspection
+  - Legacy predicate routes still dispatch after the trie misses
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from server.router import Router
+
+
+class _Handler:
+    def __init__(self, path):
+        self.path = path
+        self.calls = []
+
+    def handle_health_api(self):
+        self.calls.append(('health',))
+
+
+def _recorder(name):
+    def action(handler, *args):
+        handler.calls.append((name,) + args)
+    action.__name__ = name
+    return action
+
+
+def _dispatch(router, method, path):
+    handler = _Handler(path)
+    matched = router.dispatch(method, path, handler)
+    return matched, handler
+
+
+class TestPatterns:
+    def test_literal_and_method_name_action(self):
+        r = Router()
+        r.add('GET', '/api/health', 'handle_health_api')
+        matched, h = _dispatch(r, 'GET', '/api/health')
+        assert matched
+        assert h.calls == [('health',)]
+        assert h.path_params == {}
+
+    def test_method_is_case_insensitive_and_separate(self):
+        r = Router()
+        r.add('get', '/api/health', 'handle_health_api')
+        assert _dispatch(r, 'GET', '/api/health')[0]
+        assert not _dispatch(r, 'POST', '/api/health')[0]
+
+    def test_named_capture_passed_positionally(self):
+        r = Router()
+        r.add('GET', '/api/opportunities/{opp_id}/tasks', _recorder('tasks'))
+        matched, h = _dispatch(r, 'GET', '/api/opportunities/42/tasks')
+        assert matched
+        assert h.calls == [('tasks', '42')]
+        assert h.path_params == {'opp_id': '42'}
+
+    def test_multiple_captures(self):
+        r = Router()
+        r.add('POST', '/api/proposal-sections/{section_id}/restore/{version_id}', _recorder('restore'))
+        _, h = _dispatch(r, 'POST', '/api/proposal-sections/s1/restore/v9')
+        assert h.calls == [('restore', 's1', 'v9')]
+        assert h.path_params == {'section_id': 's1', 'version_id': 'v9'}
+
+    def test_star_matches_but_is_not_passed(self):
+        r = Router()
+        r.add('GET', '/api/opportunities/*/ptw', _recorder('ptw'))
+        matched, h = _dispatch(r, 'GET', '/api/opportunities/7/ptw')
+        assert matched
+        assert h.calls == [('ptw',)]
+
+    def test_wildcards_require_non_empty_segment(self):
+        r = Router()
+        r.add('GET', '/api/tasks/{task_id}', _recorder('task'))
+        assert not _dispatch(r, 'GET', '/api/tasks/')[0]
+
+    def test_double_star_matches_remaining_segments(self):
+        r = Router()
+        r.add('GET', '/api/mcp/servers/**', _recorder('mcp'))
+        assert _dispatch(r, 'GET', '/api/mcp/servers/s1')[0]
+        assert _dispatch(r, 'GET', '/api/mcp/servers/s1/start')[0]
+        assert not _dispatch(r, 'GET', '/api/mcp/servers')[0]
+
+    def test_double_star_must_be_last(self):
+        with pytest.raises(ValueError):
+            Router().add('GET', '/api/**/x', 'handle_health_api')
+
+    def test_extra_segments_do_not_match(self):
+        r = Router()
+        r.add('DELETE', '/api/todos/{todo_id}', _recorder('delete'))
+        assert not _dispatch(r, 'DELETE', '/api/todos/1/complete')[0]
+
+    def test_query_string_ignored(self):
+        r = Router()
+        r.add('GET', '/api/todos/lists', _recorder('lists'))
+        r.add('GET', '/api/todos/lists/{list_id}', _recorder('list'))
+        _, h = _dispatch(r, 'GET', '/api/todos/lists?user_id=3')
+        assert h.calls == [('lists',)]
+        _, h = _dispatch(r, 'GET', '/api/todos/lists/5?x=/y')
+        assert h.calls == [('list', '5')]
+
+
+class TestPrecedence:
+    def test_literal_beats_capture_in_either_order(self):
+        for order in (0, 1):
+            r = Router()
+            routes = [
+                ('/api/todos/{todo_id}', _recorder('detail')),
+                ('/api/todos/today', _recorder('today')),
+            ]
+            if order:
+                routes.reverse()
+            for pattern, action in routes:
+                r.add('GET', pattern, action)
+            _, h = _dispatch(r, 'GET', '/api/todos/today')
+            assert h.calls == [('today',)]
+            _, h = _dispatch(r, 'GET', '/api/todos/99')
+            assert h.calls == [('detail', '99')]
+
+    def test_backtracks_from_literal_branch(self):
+        r = Router()
+        r.add('GET', '/api/todos/lists', _recorder('lists'))
+        r.add('GET', '/api/todos/{todo_id}/history', _recorder('history'))
+        _, h = _dispatch(r, 'GET', '/api/todos/lists/history')
+        assert h.calls == [('history', 'lists')]
+        assert h.path_params == {'todo_id': 'lists'}
+
+    def test_single_wildcard_beats_double_star(self):
+        r = Router()
+        r.add('GET', '/api/shredding/**', _recorder('rest'))
+        r.add('GET', '/api/shredding/{opp_id}', _recorder('one'))
+        _, h = _dispatch(r, 'GET', '/api/shredding/o1')
+        assert h.calls == [('one', 'o1')]
+        _, h = _dispatch(r, 'GET', '/api/shredding/status/o1')
+        assert h.calls == [('rest',)]
+
+    def test_first_registration_wins_for_same_pattern(self):
+        r = Router()
+        r.add('GET', '/api/x/{a}', _recorder('first'))
+        r.add('GET', '/api/x/{b}', _recorder('second'))
+        _, h = _dispatch(r, 'GET', '/api/x/1')
+        assert h.calls == [('first', '1')]
+
+
+class TestGatingAndIntrospection:
+    def test_disabled_route_not_dispatched_but_described(self):
+        r = Router()
+        r.add('GET', '/api/rag/status', _recorder('rag'), enabled=False)
+        assert not _dispatch(r, 'GET', '/api/rag/status')[0]
+        [entry] = r.describe()
+        assert entry['enabled'] is False
+        assert entry['pattern'] == '/api/rag/status'
+
+    def test_describe_lists_registration_order_and_params(self):
+        r = Router()
+        r.add('GET', '/api/health', 'handle_health_api')
+        r.add('DELETE', '/api/tasks/{task_id}', _recorder('task_delete'))
+        table = r.describe()
+        assert [e['method'] for e in table] == ['GET', 'DELETE']
+        assert table[0]['action'] == 'handle_health_api'
+        assert table[1]['params'] == ['task_id']
+        assert table[1]['action'].endswith('task_delete')
+
+    def test_describe_returns_copies(self):
+        r = Router()
+        r.add('GET', '/api/health', 'handle_health_api')
+        r.describe()[0]['enabled'] = False
+        assert r.describe()[0]['enabled'] is True
+
+
+class TestLegacyPredicates:
+    def test_predicate_route_used_after_trie_miss(self):
+        r = Router()
+        r.add('GET', '/api/a', _recorder('trie'))
+        r.add('GET', lambda p: p.startswith('/api/legacy'), _recorder('legacy'))
+        _, h = _dispatch(r, 'GET', '/api/legacy/anything?q=1')
+        assert h.calls == [('legacy',)]
+        assert h.path_params == {}
+        assert r.describe()[1]['pattern'] == '<predicate>'
+
+    def test_trie_takes_priority_over_predicate(self):
+        r = Router()
+        r.add('GET', lambda p: True, _recorder('legacy'))
+        r.add('GET', '/api/a', _recorder('trie'))
+        _, h = _dispatch(r, 'GET', '/api/a')
+        assert h.calls == [('trie',)]
+
+    def test_no_match(self):
+        r = Router()
+        r.add('GET', '/api/a', _recorder('a'))
+        assert r.match('GET', '/api/b') is None
+        assert not _dispatch(r, 'PUT', '/api/a')[0]
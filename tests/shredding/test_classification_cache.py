@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Unit tests for classification_cache.py
+
+Tests the persistent requirement classification cache including:
+- Text normalization and keys
+- Get/put, hit-rate statistics and invalidation by prompt version
+- RequirementClassifier answering repeated and amended text from the cache
+"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shredding.classification_cache import ClassificationCache, main, normalize_requirement, requirement_key
+from shredding.requirement_classifier import PROMPT_VERSION, RequirementClassifier
+
+_RESPONSE = {
+    "compliance_type": "mandatory",
+    "category": "compliance",
+    "priority": "high",
+    "risk_level": "red",
+    "keywords": ["FAR 52.204-21", "safeguarding"],
+    "implicit_requirements": [],
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ClassificationCache(tmp_path / "cache.db")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def classifier(cache):
+    client = MagicMock()
+    client.tags.return_value = {"models": []}
+    with patch("shredding.requirement_classifier.get_ollama_client", return_value=client):
+        classifier = RequirementClassifier(ollama_url="http://localhost:11434", cache=cache,
+                                           batch_size=4, concurrency=2)
+    client.generate.side_effect = lambda model, prompt, **kwargs: _answer(prompt)
+    return classifier
+
+
+def _answer(prompt):
+    """One tagged result per requirement of a batch prompt, or a single result."""
+    count = prompt.count(" (Section ")
+    if '"results"' not in prompt:
+        return {"response": json.dumps(_RESPONSE)}
+    return {"response": json.dumps({"results": [{**_RESPONSE, "id": f"R{i}"} for i in range(1, count + 1)]})}
+
+
+def _requirements(texts):
+    return [{"text": text, "section": "I", "page_number": 1} for text in texts]
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+def test_normalization_ignores_formatting_only():
+    assert normalize_requirement("The  Contractor\nshall  “comply”. ") == 'The Contractor shall "comply".'
+    assert requirement_key("shall comply") == requirement_key("shall comply")
+    assert requirement_key("SHALL comply") != requirement_key("shall comply")
+
+
+def test_get_put_and_hit_rate(cache):
+    key = requirement_key("The contractor shall comply.")
+    assert cache.get("m", "v1", key) is None
+    cache.put("m", "v1", key, {"category": "compliance"})
+    assert cache.get("m", "v1", key) == {"category": "compliance"}
+    assert cache.get("other-model", "v1", key) is None
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 0.3333)
+
+
+def test_invalidate_keeps_current_prompt_version(cache):
+    cache.put_many("m", "old", {"a": {}, "b": {}})
+    cache.put_many("m", "new", {"a": {}})
+    cache.put_many("n", "old", {"a": {}})
+    assert cache.invalidate(keep_version="new", model="m") == 2
+    assert [v["prompt_version"] for v in cache.stats()["versions"]] == ["new", "old"]
+    assert cache.invalidate() == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_cli_invalidates_stale_versions(tmp_path, capsys):
+    path = tmp_path / "cache.db"
+    cache = ClassificationCache(path)
+    cache.put("m", "stale", "a", {})
+    cache.put("m", PROMPT_VERSION, "a", {})
+    cache.close()
+
+    assert main(["invalidate", "--db", str(path)]) == 0
+    assert "Removed 1" in capsys.readouterr().out
+    assert main(["stats", "--db", str(path)]) == 0
+    assert json.loads(capsys.readouterr().out)["entries"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Classifier integration
+# ---------------------------------------------------------------------------
+
+def test_classify_is_served_from_cache(classifier):
+    first = classifier.classify("Contractor shall comply with FAR 52.204-21.")
+    second = classifier.classify("Contractor  shall comply with\nFAR 52.204-21.")
+    assert classifier.client.generate.call_count == 1
+    assert second == first
+    assert second.extracted_entities["standards"] == ["FAR"]
+
+
+def test_fallbacks_are_not_cached(classifier, cache):
+    from ollama_client import OllamaError
+    classifier.client.generate.side_effect = OllamaError("down")
+    classifier.classify("The contractor shall deliver reports.")
+    assert cache.stats()["entries"] == 0
+
+
+def test_amended_rfp_only_classifies_new_text(classifier):
+    original = [f"The contractor shall provide service {i}." for i in range(8)]
+    classifier.classify_batch(_requirements(original), show_progress=False)
+    assert classifier.last_stats["llm_calls"] == 2
+
+    amended = original[:6] + ["The contractor shall provide service 42.", original[0]]
+    prompts = []
+    classifier.client.generate.side_effect = lambda model, prompt, **kwargs: prompts.append(prompt) or _answer(prompt)
+    results = classifier.classify_batch(_requirements(amended), show_progress=False)
+
+    assert len(results) == 8 and all(r.compliance_type == "mandatory" for r in results)
+    assert len(prompts) == 1 and "service 42." in prompts[0]
+    assert classifier.last_stats["cache_hits"] == 7
+    assert classifier.last_stats["llm_calls"] == 1
+
+
+def test_repeated_text_in_one_rfp_is_classified_once(classifier):
+    texts = ["Offeror shall be registered in SAM."] * 5
+    results = classifier.classify_batch(_requirements(texts), show_progress=False)
+    assert classifier.client.generate.call_count == 1
+    assert classifier.last_stats["duplicates"] == 4
+    assert len({id(r) for r in results}) == 5  # independent copies
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for keyword_scanner.py
+
+Tests single-pass compliance keyword classification:
+- Same results as searching each keyword pattern separately
+- Overlapping keywords are all reported, in pattern order
+- Batch classification never lets a match span two sentences
+- Negative patterns and leading-letter analysis
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shredding.keyword_scanner import KeywordScanner, _leading_letters
+from shredding.requirement_extractor import RequirementExtractor
+
+JADC2_TEXT = Path(__file__).parent.parent.parent / 'data' / 'JADC2' / 'FA8612-21-S-C001.txt'
+
+SENTENCES = [
+    "The contractor shall provide secure authentication services.",
+    "Section L compliance is required for all offerors.",
+    "Offerors should describe their approach; alternatives may be proposed.",
+    "At the offeror's discretion, a demonstration could be included.",
+    "If the system fails, the contractor shall restore service within 4 hours.",
+    "This paragraph contains background information only.",
+    "WILL the Government MUST ALWAYS be notified?",
+    "",
+]
+
+
+def _per_pattern(sentence):
+    """Reference classification: every pattern searched on its own."""
+    for compliance_type, patterns in (('mandatory', RequirementExtractor.MANDATORY_KEYWORDS),
+                                      ('recommended', RequirementExtractor.RECOMMENDED_KEYWORDS),
+                                      ('optional', RequirementExtractor.OPTIONAL_KEYWORDS)):
+        found = [p.strip(r'\b') for p in patterns if re.search(p, sentence, re.IGNORECASE)]
+        if found:
+            if compliance_type == 'mandatory' and any(
+                    re.search(p, sentence, re.IGNORECASE) for p in RequirementExtractor.CONDITIONAL_PATTERNS):
+                found.append('conditional')
+            return (compliance_type, found)
+    return ('unknown', [])
+
+
+@pytest.fixture(scope='module')
+def scanner():
+    return RequirementExtractor().scanner
+
+
+def test_matches_per_pattern_classification(scanner):
+    assert scanner.classify_many(SENTENCES) == [_per_pattern(s) for s in SENTENCES]
+    assert [scanner.classify(s) for s in SENTENCES] == [_per_pattern(s) for s in SENTENCES]
+
+
+def test_matches_per_pattern_on_real_rfp(scanner):
+    sentences = RequirementExtractor()._split_sentences(JADC2_TEXT.read_text(encoding='utf-8'))
+    assert len(sentences) > 100
+    assert scanner.classify_many(sentences) == [_per_pattern(s) for s in sentences]
+
+
+def test_overlapping_keywords_reported_in_pattern_order(scanner):
+    assert scanner.classify("Attendance is required and the vendor must attend.") == (
+        'mandatory', ['must', 'required', r'(is|are)\s+required'])
+    assert scanner.classify("When notified, the contractor will respond.") == (
+        'mandatory', ['will', 'conditional'])
+
+
+def test_batch_matches_stay_within_sentences():
+    scanner = KeywordScanner([r'\bsubmit\s+reports\b', r'\bshall\W*'], [], [r'\bmay\b'])
+    sentences = ["Vendors submit", "reports monthly.", "The vendor shall", "may"]
+    assert scanner.classify_many(sentences) == [
+        ('unknown', []), ('unknown', []), ('mandatory', [r'shall\W*']), ('optional', ['may'])]
+
+
+def test_same_start_and_unbounded_patterns():
+    scanner = KeywordScanner([r'\bshall\b', r'\bshall\s+not\b', r'[0-9]+\s+days'], [], [])
+    assert scanner.classify("Payment shall not exceed 30 days.") == (
+        'mandatory', ['shall', r'shall\s+not', r'[0-9]+\s+days'])
+
+
+def test_negative_patterns(scanner):
+    assert scanner.is_negative("Table 3 lists the deliverables and their due dates.")
+    assert scanner.is_negative("Page 12 of 40, Statement of Work")
+    assert scanner.is_negative("Too short.")
+    assert not scanner.is_negative("The contractor shall provide a table of deliverables.")
+
+
+@pytest.mark.parametrize('pattern, letters', [
+    (r'\bshall\b', {'s'}),
+    (r'\b(is|are)\s+required\b', {'i', 'a'}),
+    (r'shall|must', {'s', 'm'}),
+    (r'\b(a[)|]b|c)d', {'a', 'c'}),
+    (r'\bs?hall', None),
+    (r'\b(?:is|are)?\s*required', None),
+    (r'\b\w+', None),
+])
+def test_leading_letters(pattern, letters):
+    assert _leading_letters(pattern) == letters
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
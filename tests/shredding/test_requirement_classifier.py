@@ -10,6 +10,7 @@ Tests Ollama-based requirement classification including:
 """
 
 import json
+import re
 import pytest
 import sys
 from pathlib import Path
@@ -25,12 +26,9 @@ from shredding.requirement_classifier import RequirementClassifier, RequirementC
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _mock_ollama_response(payload: dict) -> MagicMock:
-    """Return a mock requests.post response with given JSON payload."""
-    resp = MagicMock()
-    resp.status_code = 200
-    resp.json.return_value = {"response": json.dumps(payload)}
-    return resp
+def _mock_ollama_response(payload: dict) -> dict:
+    """Return an Ollama generate result whose response text is the given JSON payload."""
+    return {"response": json.dumps(payload)}
 
 
 _MANDATORY_RESPONSE = {
@@ -68,10 +66,10 @@ _OPTIONAL_RESPONSE = {
 @pytest.fixture
 def classifier():
     """Create RequirementClassifier with mocked init connection check."""
-    with patch("shredding.requirement_classifier.requests.get") as mock_get:
-        mock_get.return_value = MagicMock(status_code=200,
-                                          json=lambda: {"models": []})
-        return RequirementClassifier(ollama_url="http://localhost:11434")
+    client = MagicMock()
+    client.tags.return_value = {"models": []}
+    with patch("shredding.requirement_classifier.get_ollama_client", return_value=client):
+        return RequirementClassifier(ollama_url="http://localhost:11434", cache=None)
 
 
 # ---------------------------------------------------------------------------
@@ -85,15 +83,15 @@ class TestRequirementClassifier:
 
     def test_classify_returns_dataclass(self, classifier):
         """classify() returns a RequirementClassification dataclass."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The contractor shall provide support.")
         assert isinstance(result, RequirementClassification)
 
     def test_classify_has_all_fields(self, classifier):
         """All expected fields are present on the returned dataclass."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The system shall use AES-256.")
         assert hasattr(result, "compliance_type")
         assert hasattr(result, "category")
@@ -105,66 +103,66 @@ class TestRequirementClassifier:
 
     def test_mandatory_compliance_type(self, classifier):
         """Ollama response with mandatory is surfaced correctly."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The contractor must comply with regulations.")
         assert result.compliance_type == "mandatory"
 
     def test_recommended_compliance_type(self, classifier):
         """Ollama response with recommended is surfaced correctly."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_RECOMMENDED_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_RECOMMENDED_RESPONSE)):
             result = classifier.classify("Contractors should have ISO 27001 certification.")
         assert result.compliance_type == "recommended"
 
     def test_optional_compliance_type(self, classifier):
         """Ollama response with optional is surfaced correctly."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_OPTIONAL_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_OPTIONAL_RESPONSE)):
             result = classifier.classify("Offerors may provide additional references.")
         assert result.compliance_type == "optional"
 
     def test_category_technical(self, classifier):
         """Category field is populated from Ollama response."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The system shall use AES-256.")
         assert result.category == "technical"
 
     def test_priority_high(self, classifier):
         """Priority field is populated from Ollama response."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The system shall maintain 99.99% uptime.")
         assert result.priority == "high"
 
     def test_keywords_list(self, classifier):
         """Keywords are returned as a list."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The system shall use AES-256 encryption.")
         assert isinstance(result.keywords, list)
         assert "security" in result.keywords
 
     def test_keywords_joinable(self, classifier):
         """Keywords list is joinable for downstream processing."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The system shall implement NIST 800-53 controls.")
         keyword_str = " ".join(result.keywords).lower()
         assert len(keyword_str) > 0
 
     def test_entity_extraction_returns_dict(self, classifier):
         """extracted_entities is always a dict."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The contractor shall comply with NIST 800-171.")
         assert isinstance(result.extracted_entities, dict)
 
     def test_entity_extraction_has_standard_keys(self, classifier):
         """extracted_entities contains expected sub-keys."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             result = classifier.classify("The system must comply with NIST 800-53.")
         assert "standards" in result.extracted_entities or "acronyms" in result.extracted_entities
 
@@ -172,36 +170,36 @@ class TestRequirementClassifier:
 
     def test_fallback_mandatory_on_shall(self, classifier):
         """Fallback classifies 'shall' as mandatory without Ollama."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   side_effect=Exception("Connection refused")):
+        with patch.object(classifier.client, "generate",
+                          side_effect=Exception("Connection refused")):
             result = classifier.classify("The contractor shall provide services.")
         assert result.compliance_type == "mandatory"
 
     def test_fallback_mandatory_on_must(self, classifier):
         """Fallback classifies 'must' as mandatory without Ollama."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   side_effect=Exception("Connection refused")):
+        with patch.object(classifier.client, "generate",
+                          side_effect=Exception("Connection refused")):
             result = classifier.classify("The system must comply with federal regulations.")
         assert result.compliance_type == "mandatory"
 
     def test_fallback_recommended_on_should(self, classifier):
         """Fallback classifies 'should' as recommended without Ollama."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   side_effect=Exception("Connection refused")):
+        with patch.object(classifier.client, "generate",
+                          side_effect=Exception("Connection refused")):
             result = classifier.classify("Contractors should have prior experience.")
         assert result.compliance_type == "recommended"
 
     def test_fallback_optional_on_may(self, classifier):
         """Fallback classifies 'may' as optional without Ollama."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   side_effect=Exception("Connection refused")):
+        with patch.object(classifier.client, "generate",
+                          side_effect=Exception("Connection refused")):
             result = classifier.classify("Offerors may provide additional references.")
         assert result.compliance_type == "optional"
 
     def test_fallback_returns_dataclass(self, classifier):
         """Fallback still returns RequirementClassification dataclass."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   side_effect=Exception("down")):
+        with patch.object(classifier.client, "generate",
+                          side_effect=Exception("down")):
             result = classifier.classify("The contractor shall provide support.")
         assert isinstance(result, RequirementClassification)
 
@@ -214,8 +212,8 @@ class TestRequirementClassifier:
             {"text": "The system should integrate with infrastructure.", "section": "C"},
             {"text": "Additional services may be requested.", "section": "C"},
         ]
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             results = classifier.classify_batch(requirements, show_progress=False)
         assert len(results) == 3
 
@@ -224,16 +222,16 @@ class TestRequirementClassifier:
         requirements = [
             {"text": "The contractor shall comply.", "section": "C"},
         ]
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             results = classifier.classify_batch(requirements, show_progress=False)
         assert all(isinstance(r, RequirementClassification) for r in results)
 
     def test_batch_has_compliance_type(self, classifier):
         """All batch results have compliance_type attribute."""
         requirements = [{"text": "The system shall support 10,000 users.", "section": "C"}]
-        with patch("shredding.requirement_classifier.requests.post",
-                   return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
+        with patch.object(classifier.client, "generate",
+                          return_value=_mock_ollama_response(_MANDATORY_RESPONSE)):
             results = classifier.classify_batch(requirements, show_progress=False)
         assert all(hasattr(r, "compliance_type") for r in results)
 
@@ -241,22 +239,113 @@ class TestRequirementClassifier:
 
     def test_empty_text_does_not_crash(self, classifier):
         """Empty text returns a RequirementClassification without crashing."""
-        with patch("shredding.requirement_classifier.requests.post",
-                   side_effect=Exception("down")):
+        with patch.object(classifier.client, "generate",
+                          side_effect=Exception("down")):
             result = classifier.classify("")
         assert result is not None
         assert hasattr(result, "compliance_type")
 
     def test_bad_json_from_ollama_falls_back(self, classifier):
         """If Ollama returns invalid JSON, fallback classification is used."""
-        bad_resp = MagicMock()
-        bad_resp.status_code = 200
-        bad_resp.json.return_value = {"response": "NOT JSON AT ALL"}
-        with patch("shredding.requirement_classifier.requests.post", return_value=bad_resp):
+        bad_resp = {"response": "NOT JSON AT ALL"}
+        with patch.object(classifier.client, "generate", return_value=bad_resp):
             result = classifier.classify("The contractor shall provide services.")
         assert isinstance(result, RequirementClassification)
         assert result.compliance_type == "mandatory"  # fallback via keyword
 
 
+
+# ---------------------------------------------------------------------------
+# TestMicroBatching
+# ---------------------------------------------------------------------------
+
+def _batch_generate(broken=()):
+    """Fake generate(): answers a batch prompt with one tagged slot per requirement."""
+    calls = []
+
+    def generate(model, prompt, **kwargs):
+        calls.append(prompt)
+        if '"results"' not in prompt:
+            return _mock_ollama_response(_OPTIONAL_RESPONSE)  # individual fallback call
+        ids = re.findall(r"^(R\d+) \(Section", prompt, re.MULTILINE)
+        texts = re.findall(r'^R\d+ \(Section [^)]*\): (".*")$', prompt, re.MULTILINE)
+        results = []
+        for slot_id, text in zip(ids, texts):
+            if json.loads(text) in broken:
+                results.append({"id": slot_id, "priority": "high"})  # missing required fields
+            else:
+                results.append({**_MANDATORY_RESPONSE, "id": slot_id, "keywords": [json.loads(text)]})
+        return {"response": json.dumps({"results": list(reversed(results))})}
+
+    return generate, calls
+
+
+def _requirements(n):
+    return [{"text": f"The contractor shall deliver item {i}.", "section": "C", "page_number": i}
+            for i in range(n)]
+
+
+class TestMicroBatching:
+    """classify_batch packs requirements into prompts and keeps them in order."""
+
+    @pytest.fixture
+    def batched(self, classifier):
+        classifier.batch_size = 4
+        classifier.concurrency = 3
+        return classifier
+
+    def test_one_call_per_micro_batch(self, batched):
+        generate, calls = _batch_generate()
+        with patch.object(batched.client, "generate", side_effect=generate):
+            results = batched.classify_batch(_requirements(10), show_progress=False)
+        assert len(calls) == 3
+        # Slots come back shuffled but are matched by id
+        assert [r.keywords for r in results] == [[f"The contractor shall deliver item {i}."] for i in range(10)]
+        assert batched.last_stats["batches"] == 3
+        assert batched.last_stats["llm_calls"] == 3
+        assert batched.last_stats["slot_fallbacks"] == 0
+
+    def test_unparseable_slot_falls_back_individually(self, batched):
+        broken = {"The contractor shall deliver item 2."}
+        generate, calls = _batch_generate(broken=broken)
+        with patch.object(batched.client, "generate", side_effect=generate):
+            results = batched.classify_batch(_requirements(4), show_progress=False)
+        assert len(calls) == 2
+        assert results[2].compliance_type == "optional"  # from its own call
+        assert all(r.compliance_type == "mandatory" for i, r in enumerate(results) if i != 2)
+        assert batched.last_stats["slot_fallbacks"] == 1
+
+    def test_unparseable_response_classifies_each_requirement(self, batched):
+        responses = iter([{"response": "NOT JSON"}] + [_mock_ollama_response(_RECOMMENDED_RESPONSE)] * 3)
+        with patch.object(batched.client, "generate", side_effect=lambda *a, **k: next(responses)):
+            results = batched.classify_batch(_requirements(3), show_progress=False)
+        assert [r.compliance_type for r in results] == ["recommended"] * 3
+
+    def test_ollama_error_uses_keyword_fallback_without_retrying(self, batched):
+        from ollama_client import OllamaError
+        with patch.object(batched.client, "generate", side_effect=OllamaError("down")) as generate:
+            results = batched.classify_batch(_requirements(4), show_progress=False)
+        assert generate.call_count == 1
+        assert all(r.compliance_type == "mandatory" for r in results)
+        assert batched.last_stats["keyword_fallbacks"] == 4
+
+    def test_untagged_results_match_by_position(self, batched):
+        payload = {"results": [_RECOMMENDED_RESPONSE, _OPTIONAL_RESPONSE]}
+        with patch.object(batched.client, "generate", return_value={"response": json.dumps(payload)}):
+            results = batched.classify_batch(_requirements(2), show_progress=False)
+        assert [r.compliance_type for r in results] == ["recommended", "optional"]
+
+    def test_progress_is_reported_to_job(self, batched):
+        generate, _ = _batch_generate()
+        seen = []
+        with patch.object(batched.client, "generate", side_effect=generate), \
+                patch("shredding.requirement_classifier._report_progress",
+                      side_effect=lambda job_id, message: seen.append((job_id, message))):
+            batched.classify_batch(_requirements(9), show_progress=False, job_id="job-1")
+        assert seen[0] == ("job-1", "Classifying requirements: 0/9")
+        assert seen[-1] == ("job-1", "Classifying requirements: 9/9")
+        assert len(seen) == 4
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit tests for requirement_store.py
+
+Tests bulk persistence of shredded requirements:
+- Requirement and task rows are built in input order with one timestamp
+- Bulk inserts write every row and link tasks back to requirements
+- A failing insert leaves nothing behind
+- Bulk compliance status updates, scoped to an opportunity
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shredding.requirement_classifier import RequirementClassification
+from shredding.requirement_extractor import Requirement
+from shredding.requirement_store import (
+    insert_requirements, insert_tasks, requirement_rows, task_rows, update_compliance_status
+)
+from tests.shredding.test_shred_checkpoints import _create_schema
+
+
+def _classified(n, category='technical'):
+    return [
+        {
+            'requirement': Requirement(id=f'req-{i}', section='C', text=f'The contractor shall do thing {i}.',
+                                       page_number=i, paragraph_id=f'C.{i}'),
+            'classification': RequirementClassification(
+                compliance_type='mandatory', category=category, priority='high', risk_level='red',
+                keywords=['thing'], implicit_requirements=[], extracted_entities={'acronyms': []}
+            )
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'opportunities.db')
+    _create_schema(path)
+    return path
+
+
+def _query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_requirement_rows_in_input_order():
+    rows = requirement_rows('opp-1', _classified(3), timestamp='2026-10-01T00:00:00')
+    assert [row[0] for row in rows] == ['req-0', 'req-1', 'req-2']
+    assert rows[1][1:11] == ('opp-1', 'C', 1, 'C.1', 'The contractor shall do thing 1.',
+                             'mandatory', 'technical', 'high', 'red', 'not_started')
+    assert rows[1][11:] == ('["thing"]', '{"acronyms": []}', '2026-10-01T00:00:00', '2026-10-01T00:00:00')
+
+
+def test_task_rows_due_a_week_early_and_auto_assigned():
+    classified = _classified(2) + _classified(1, category='deliverable')
+    tasks, links = task_rows('opp-1', classified, '2026-12-08', auto_assign=True)
+    assert [task[6] for task in tasks] == ['2026-12-01T00:00:00'] * 3
+    assert [task[7] for task in tasks] == ['agent-technical', 'agent-technical', None]
+    assert [link[0] for link in links] == [task[0] for task in tasks]
+    assert links[2][1:] == (None, None, 'req-0')
+
+
+def test_bulk_insert_and_link_tasks(db_path):
+    classified = _classified(2000)
+    assert insert_requirements(db_path, 'opp-1', classified) == 2000
+    assert insert_tasks(db_path, 'opp-1', classified, '2026-12-08') == 2000
+
+    assert _query(db_path, 'SELECT COUNT(*) FROM requirements WHERE opportunity_id = ?', ('opp-1',)) == [(2000,)]
+    assert _query(db_path, 'SELECT COUNT(*) FROM tasks') == [(2000,)]
+    unlinked = _query(db_path, 'SELECT COUNT(*) FROM requirements r LEFT JOIN tasks t ON t.id = r.task_id '
+                               'WHERE t.id IS NULL')
+    assert unlinked == [(0,)]
+
+
+def test_failed_insert_is_rolled_back(db_path):
+    classified = _classified(5)
+    classified.append(classified[0])  # duplicate primary key
+    with pytest.raises(sqlite3.IntegrityError):
+        insert_requirements(db_path, 'opp-1', classified)
+    assert _query(db_path, 'SELECT COUNT(*) FROM requirements') == [(0,)]
+
+
+def test_bulk_status_update(db_path):
+    insert_requirements(db_path, 'opp-1', _classified(1200))
+    ids = [f'req-{i}' for i in range(0, 1200, 2)]
+
+    assert update_compliance_status(db_path, ids + ids[:3] + ['missing'], 'fully_compliant') == 600
+    assert _query(db_path, "SELECT COUNT(*) FROM requirements WHERE compliance_status = 'fully_compliant'") == [(600,)]
+
+    assert update_compliance_status(db_path, ids, 'non_compliant', opportunity_id='opp-2') == 0
+    with pytest.raises(ValueError):
+        update_compliance_status(db_path, ids, 'done')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Unit tests for shred_checkpoints.py and resumable RFPShredder.shred_rfp
+
+Tests:
+- Checkpoint store save/load/delete keyed by file hash
+- A failed shred resumes from the last completed stage
+- A changed rfp_number after requirements were saved gets fresh requirement ids
+- Per-stage timings are returned and exposed by get_opportunity_status
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shredding.rfp_shredder import RFPShredder
+from shredding.shred_checkpoints import ShredCheckpointStore, file_sha256
+
+_SECTIONS = {
+    'C': {
+        'title': 'Statement of Work',
+        'start_page': 3,
+        'end_page': 9,
+        'chunks': [object()],  # not JSON-serializable; never checkpointed
+        'text': ("The contractor shall provide help desk support during business hours. "
+                 "The contractor shall deliver monthly status reports to the COR. "
+                 "Offerors should describe their transition approach in detail.")
+    }
+}
+
+_RESPONSE = {
+    "compliance_type": "mandatory",
+    "category": "technical",
+    "priority": "high",
+    "risk_level": "yellow",
+    "keywords": ["support"],
+    "implicit_requirements": [],
+}
+
+
+def _create_schema(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE opportunities (
+            id TEXT PRIMARY KEY, title TEXT, description TEXT, status TEXT, due_date TEXT,
+            agency TEXT, naics_code TEXT, set_aside TEXT, metadata TEXT
+        );
+        CREATE TABLE requirements (
+            id TEXT PRIMARY KEY, opportunity_id TEXT, task_id TEXT, section TEXT, page_number INTEGER,
+            paragraph_id TEXT, source_text TEXT, compliance_type TEXT, requirement_category TEXT,
+            priority TEXT, risk_level TEXT, compliance_status TEXT, proposal_section TEXT,
+            proposal_page INTEGER, assignee_id TEXT, assignee_type TEXT, assignee_name TEXT,
+            keywords TEXT, extracted_entities TEXT, notes TEXT, due_date TEXT,
+            created_at TEXT, updated_at TEXT
+        );
+        CREATE TABLE tasks (
+            id TEXT PRIMARY KEY, opportunity_id TEXT, title TEXT, description TEXT, status TEXT,
+            priority TEXT, due_date TEXT, assignee TEXT, metadata TEXT, created_at TEXT, updated_at TEXT
+        );
+    """)
+    conn.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ShredCheckpointStore(tmp_path / "checkpoints.db")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def shredder(tmp_path, store):
+    db_path = tmp_path / "opportunities.db"
+    _create_schema(db_path)
+    client = MagicMock()
+    client.tags.return_value = {"models": []}
+    client.generate.return_value = {"response": json.dumps(_RESPONSE)}
+    with patch("shredding.rfp_shredder.SectionParser") as parser, \
+            patch("shredding.requirement_classifier.get_ollama_client", return_value=client), \
+            patch("shredding.requirement_classifier.get_classification_cache", return_value=None):
+        parser.return_value.extract_sections.side_effect = lambda path: dict(_SECTIONS)
+        parser.return_value.validate_sections.return_value = {'is_complete': False}
+        shredder = RFPShredder(db_path=str(db_path), checkpoints=store)
+    shredder.classifier.batch_size = 1
+    return shredder
+
+
+@pytest.fixture
+def rfp(tmp_path):
+    path = tmp_path / "rfp.pdf"
+    path.write_bytes(b"%PDF-1.4 fake rfp")
+    return path
+
+
+def _shred(shredder, rfp, tmp_path, **kwargs):
+    return shredder.shred_rfp(str(rfp), rfp_number="RFP-001", opportunity_name="Help Desk",
+                              due_date="2026-12-01", output_dir=str(tmp_path / "matrix"), **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+def test_store_round_trip(store, rfp):
+    key = file_sha256(rfp)
+    store.save(key, "sections", {"C": {"text": "..."}}, seconds=1.5, items=1)
+    assert store.load(key) == {"sections": {"data": {"C": {"text": "..."}}, "seconds": 1.5, "items": 1}}
+    assert store.load("other") == {}
+    assert store.delete(key) == 1
+    assert store.load(key) == {}
+
+
+# ---------------------------------------------------------------------------
+# Resumable shredding
+# ---------------------------------------------------------------------------
+
+def test_successful_run_reports_stages_and_clears_checkpoints(shredder, store, rfp, tmp_path):
+    result = _shred(shredder, rfp, tmp_path)
+    assert result["status"] == "success"
+    assert result["total_requirements"] == 3
+
+    stages = result["pipeline"]["stages"]
+    assert [s["stage"] for s in stages] == [
+        "sections", "requirements", "classification", "opportunity", "save", "tasks", "matrix"]
+    assert [s["items"] for s in stages[:3]] == [1, 3, 3]
+    assert not any(s["resumed"] for s in stages)
+    assert store.load(file_sha256(rfp)) == {}
+
+    status = shredder.get_opportunity_status(result["opportunity_id"])
+    assert status["pipeline"]["status"] == "success"
+    assert [s["stage"] for s in status["pipeline"]["stages"]] == [s["stage"] for s in stages]
+
+
+def test_failed_run_resumes_after_last_completed_stage(shredder, store, rfp, tmp_path):
+    with patch.object(shredder, "_create_tasks", side_effect=RuntimeError("database is locked")):
+        failed = _shred(shredder, rfp, tmp_path)
+    assert failed["status"] == "error"
+    assert failed["pipeline"]["failed_stage"] == "tasks"
+    assert failed["pipeline"]["resumable"] is True
+    assert set(store.load(file_sha256(rfp))) == {"sections", "requirements", "classification", "opportunity", "save"}
+    calls = shredder.classifier.client.generate.call_count
+
+    result = _shred(shredder, rfp, tmp_path)
+    assert result["status"] == "success"
+    assert result["opportunity_id"] == failed["opportunity_id"]
+    assert result["tasks_created"] == 3
+    assert result["pipeline"]["resumed_stages"] == ["sections", "requirements", "classification", "opportunity", "save"]
+    assert shredder.section_parser.extract_sections.call_count == 1
+    assert shredder.classifier.client.generate.call_count == calls
+
+    conn = sqlite3.connect(shredder.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM requirements").fetchone()[0] == 3
+    assert conn.execute("SELECT COUNT(*) FROM opportunities").fetchone()[0] == 1
+    conn.close()
+
+    status = shredder.get_opportunity_status(result["opportunity_id"])
+    assert status["pipeline"]["status"] == "success"
+    assert status["tasks"]["total"] == 3
+
+
+def test_changed_rfp_number_does_not_reuse_opportunity(shredder, store, rfp, tmp_path):
+    with patch.object(shredder, "_save_requirements", side_effect=RuntimeError("disk full")):
+        failed = _shred(shredder, rfp, tmp_path)
+    result = shredder.shred_rfp(str(rfp), rfp_number="RFP-001A", opportunity_name="Help Desk",
+                                due_date="2026-12-01", output_dir=str(tmp_path / "matrix"))
+    assert result["status"] == "success"
+    assert result["opportunity_id"] != failed["opportunity_id"]
+    assert result["pipeline"]["resumed_stages"] == ["sections", "requirements", "classification"]
+
+
+def test_changed_rfp_number_after_save_issues_fresh_requirement_ids(shredder, store, rfp, tmp_path):
+    with patch.object(shredder, "_create_tasks", side_effect=RuntimeError("database is locked")):
+        failed = _shred(shredder, rfp, tmp_path)
+    assert failed["pipeline"]["failed_stage"] == "tasks"
+
+    with patch.object(shredder, "_create_tasks", side_effect=RuntimeError("database is locked")):
+        retried = shredder.shred_rfp(str(rfp), rfp_number="RFP-001A", opportunity_name="Help Desk",
+                                     due_date="2026-12-01", output_dir=str(tmp_path / "matrix"))
+    assert retried["pipeline"]["failed_stage"] == "tasks"
+
+    result = shredder.shred_rfp(str(rfp), rfp_number="RFP-001A", opportunity_name="Help Desk",
+                                due_date="2026-12-01", output_dir=str(tmp_path / "matrix"))
+    assert result["status"] == "success"
+    assert result["opportunity_id"] == retried["opportunity_id"] != failed["opportunity_id"]
+    assert result["tasks_created"] == 3
+
+    conn = sqlite3.connect(shredder.db_path)
+    counts = dict(conn.execute(
+        "SELECT opportunity_id, COUNT(*) FROM requirements GROUP BY opportunity_id").fetchall())
+    linked = conn.execute(
+        "SELECT COUNT(*) FROM requirements WHERE opportunity_id = ? AND task_id IS NOT NULL",
+        (result["opportunity_id"],)).fetchone()[0]
+    conn.close()
+    assert counts == {failed["opportunity_id"]: 3, result["opportunity_id"]: 3}
+    assert linked == 3
+
+
+def test_changed_model_reclassifies(shredder, store, rfp, tmp_path):
+    with patch.object(shredder, "_create_opportunity", side_effect=RuntimeError("no such table")):
+        _shred(shredder, rfp, tmp_path)
+    shredder.classifier.model = "llama3.1:8b"
+    result = _shred(shredder, rfp, tmp_path)
+    assert result["pipeline"]["resumed_stages"] == ["sections", "requirements"]
+
+
+def test_checkpointing_can_be_disabled(shredder, rfp, tmp_path):
+    shredder.checkpoints = None
+    with patch.object(shredder, "_create_tasks", side_effect=RuntimeError("boom")):
+        failed = _shred(shredder, rfp, tmp_path)
+    assert failed["pipeline"]["resumable"] is False
+    assert _shred(shredder, rfp, tmp_path)["pipeline"]["resumed_stages"] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,245 @@
+"""Unit tests for rag-system/document_catalog.py — chunk-level diffing for incremental ingestion.
+
+Covers:
+  - Content-addressed chunk IDs (stable per doc_key, distinct for repeated text)
+  - Sync plans: add only new/changed chunks, keep unchanged, delete vanished
+  - force=True re-adds everything
+  - Catalog versions bump only when content changes; removal
+  - Stable document IDs, listing and totals without a collection scan
+  - Reconciling a catalog whose collection lost its chunks (restart)
+"""
+
+import os
+import sys
+
+import pytest
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from document_catalog import (
+    DocumentCatalog, chunk_hash, chunk_ids_for, document_id_for, existing_chunk_ids, plan_document_sync
+)
+
+
+class _Collection:
+    """In-memory stand-in for the Chroma collection calls used by the catalog."""
+
+    def __init__(self):
+        self.chunks = {}
+
+    def upsert(self, ids, documents):
+        self.chunks.update(zip(ids, documents))
+
+    def count(self):
+        return len(self.chunks)
+
+    def get(self, ids, include):
+        return {'ids': [chunk_id for chunk_id in ids if chunk_id in self.chunks]}
+
+
+def _ingest(catalog, collection, workspace, doc_key, texts):
+    """The sync_document flow: diff against the catalog, write new chunks, record."""
+    entry = catalog.get(workspace, doc_key)
+    plan = plan_document_sync(doc_key, texts, entry['chunk_ids'] if entry else None)
+    if entry is not None and entry['content_hash'] == plan.content_hash and plan.unchanged:
+        return 0
+    collection.upsert([plan.chunk_ids[i] for i in plan.to_add], [texts[i] for i in plan.to_add])
+    catalog.record(workspace, doc_key, plan.content_hash, plan.chunk_ids)
+    return len(plan.to_add)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    cat = DocumentCatalog(tmp_path / 'catalog.db')
+    yield cat
+    cat.close()
+
+
+# ---------------------------------------------------------------------------
+# Chunk IDs
+# ---------------------------------------------------------------------------
+
+def test_chunk_ids_are_stable_for_same_key_and_text():
+    hashes = [chunk_hash('alpha'), chunk_hash('beta')]
+    assert chunk_ids_for('uploads/rfp.pdf', hashes) == chunk_ids_for('uploads/rfp.pdf', hashes)
+
+
+def test_chunk_ids_differ_between_documents():
+    hashes = [chunk_hash('alpha')]
+    assert chunk_ids_for('uploads/a.pdf', hashes) != chunk_ids_for('uploads/b.pdf', hashes)
+
+
+def test_repeated_text_gets_distinct_ids():
+    ids = chunk_ids_for('doc.txt', [chunk_hash('x'), chunk_hash('x'), chunk_hash('x')])
+    assert len(set(ids)) == 3
+    assert ids[1] == ids[0] + '_1'
+
+
+# ---------------------------------------------------------------------------
+# Sync plans
+# ---------------------------------------------------------------------------
+
+def test_first_ingest_adds_every_chunk():
+    plan = plan_document_sync('doc.txt', ['a', 'b', 'c'])
+    assert plan.to_add == [0, 1, 2]
+    assert plan.to_keep == []
+    assert plan.to_delete == []
+    assert not plan.unchanged
+
+
+def test_reingest_identical_document_is_unchanged():
+    first = plan_document_sync('doc.txt', ['a', 'b', 'c'])
+    again = plan_document_sync('doc.txt', ['a', 'b', 'c'], first.chunk_ids)
+    assert again.unchanged
+    assert again.to_keep == [0, 1, 2]
+    assert again.content_hash == first.content_hash
+
+
+def test_edit_adds_changed_and_deletes_stale_chunks():
+    first = plan_document_sync('doc.txt', ['a', 'b', 'c', 'd'])
+    edited = plan_document_sync('doc.txt', ['a', 'B', 'c'], first.chunk_ids)
+    assert edited.to_add == [1]
+    assert edited.to_keep == [0, 2]
+    assert sorted(edited.to_delete) == sorted([first.chunk_ids[1], first.chunk_ids[3]])
+
+
+def test_force_re_adds_everything():
+    first = plan_document_sync('doc.txt', ['a', 'b'])
+    forced = plan_document_sync('doc.txt', ['a', 'b'], first.chunk_ids, force=True)
+    assert forced.to_add == [0, 1]
+    assert forced.to_delete == []
+
+
+# ---------------------------------------------------------------------------
+# Catalog
+# ---------------------------------------------------------------------------
+
+def test_record_versions_only_bump_on_content_change(catalog):
+    v1 = plan_document_sync('doc.txt', ['a'])
+    v2 = plan_document_sync('doc.txt', ['a', 'b'])
+    assert catalog.record('ws', 'doc.txt', v1.content_hash, v1.chunk_ids) == 1
+    assert catalog.record('ws', 'doc.txt', v1.content_hash, v1.chunk_ids) == 1
+    assert catalog.record('ws', 'doc.txt', v2.content_hash, v2.chunk_ids, 'txt') == 2
+
+    entry = catalog.get('ws', 'doc.txt')
+    assert entry['version'] == 2
+    assert entry['chunk_ids'] == v2.chunk_ids
+    assert entry['file_type'] == 'txt'
+
+
+def test_workspaces_are_isolated(catalog):
+    plan = plan_document_sync('doc.txt', ['a'])
+    catalog.record('one', 'doc.txt', plan.content_hash, plan.chunk_ids)
+    assert catalog.get('two', 'doc.txt') is None
+
+
+def test_remove_returns_entry_and_forgets_document(catalog):
+    plan = plan_document_sync('doc.txt', ['a'])
+    catalog.record('ws', 'doc.txt', plan.content_hash, plan.chunk_ids)
+    removed = catalog.remove('ws', 'doc.txt')
+    assert removed['chunk_ids'] == plan.chunk_ids
+    assert catalog.get('ws', 'doc.txt') is None
+    assert catalog.remove('ws', 'doc.txt') is None
+
+
+def test_catalog_persists_across_instances(tmp_path):
+    plan = plan_document_sync('doc.txt', ['a'])
+    first = DocumentCatalog(tmp_path / 'catalog.db')
+    first.record('ws', 'doc.txt', plan.content_hash, plan.chunk_ids)
+    first.close()
+    second = DocumentCatalog(tmp_path / 'catalog.db')
+    assert second.get('ws', 'doc.txt')['version'] == 1
+    second.close()
+
+
+def test_document_ids_are_stable_and_url_safe(catalog):
+    doc_id = document_id_for('uploads/My RFP (final).pdf')
+    assert doc_id == document_id_for('uploads/My RFP (final).pdf')
+    assert doc_id.startswith('doc_') and doc_id.replace('_', '').isalnum()
+
+    plan = plan_document_sync('uploads/My RFP (final).pdf', ['a', 'b'])
+    catalog.record('ws', 'uploads/My RFP (final).pdf', plan.content_hash, plan.chunk_ids, 'pdf', 2048)
+    entry = catalog.get_by_id('ws', doc_id)
+    assert entry['doc_key'] == 'uploads/My RFP (final).pdf'
+    assert entry['chunk_count'] == 2
+    assert entry['size_bytes'] == 2048
+
+
+def test_list_and_stats_per_workspace(catalog):
+    for key, texts, size in [('a.txt', ['1', '2'], 10), ('b.txt', ['3'], 5)]:
+        plan = plan_document_sync(key, texts)
+        catalog.record('ws', key, plan.content_hash, plan.chunk_ids, 'text', size, ingested_at=len(texts))
+    plan = plan_document_sync('c.txt', ['4'])
+    catalog.record('other', 'c.txt', plan.content_hash, plan.chunk_ids, 'text', 7)
+
+    listed = catalog.list('ws')
+    assert [doc['doc_key'] for doc in listed] == ['b.txt', 'a.txt']  # oldest ingestion first
+    assert 'chunk_ids' not in listed[0]
+    assert catalog.stats('ws') == {'documents': 2, 'chunks': 3, 'size_bytes': 15}
+    assert catalog.stats() == {'documents': 3, 'chunks': 4, 'size_bytes': 22}
+
+
+def test_update_keeps_ingestion_date_and_size(catalog):
+    v1 = plan_document_sync('doc.txt', ['a'])
+    v2 = plan_document_sync('doc.txt', ['b'])
+    catalog.record('ws', 'doc.txt', v1.content_hash, v1.chunk_ids, size_bytes=10, ingested_at=100.0)
+    catalog.record('ws', 'doc.txt', v2.content_hash, v2.chunk_ids)
+    entry = catalog.get('ws', 'doc.txt')
+    assert entry['ingested_at'] == 100.0
+    assert entry['updated_at'] > 100.0
+    assert entry['size_bytes'] == 10
+
+
+def test_backfill_marker(catalog):
+    assert not catalog.is_backfilled('ws')
+    catalog.mark_backfilled('ws')
+    assert catalog.is_backfilled('ws')
+    assert not catalog.is_backfilled('other')
+
+
+# ---------------------------------------------------------------------------
+# Reconciliation with the collection
+# ---------------------------------------------------------------------------
+
+def test_existing_chunk_ids_looks_up_in_windows(monkeypatch):
+    import document_catalog
+    monkeypatch.setattr(document_catalog, '_ID_WINDOW', 2)
+    collection = _Collection()
+    collection.upsert(['a', 'c', 'e'], ['', '', ''])
+    assert existing_chunk_ids(collection, ['a', 'b', 'c', 'd', 'e']) == {'a', 'c', 'e'}
+
+
+def test_restart_with_empty_collection_reingests_every_chunk(tmp_path):
+    texts = ['Section C scope.', 'Section L instructions.', 'Section M evaluation.']
+    collection = _Collection()
+    first = DocumentCatalog(tmp_path / 'catalog.db')
+    assert _ingest(first, collection, 'ws', 'uploads/rfp.pdf', texts) == 3
+    assert _ingest(first, collection, 'ws', 'uploads/rfp.pdf', texts) == 0
+    first.mark_backfilled('ws')
+    first.close()
+
+    # Restart: the catalog is on disk, but the collection came back empty
+    restarted = DocumentCatalog(tmp_path / 'catalog.db')
+    empty = _Collection()
+    assert restarted.workspaces() == ['ws']
+    assert restarted.reconcile('ws', empty) is True
+    assert restarted.get('ws', 'uploads/rfp.pdf') is None
+    assert not restarted.is_backfilled('ws')
+
+    assert _ingest(restarted, empty, 'ws', 'uploads/rfp.pdf', texts) == 3
+    assert empty.count() == 3
+    assert restarted.reconcile('ws', empty) is False
+    restarted.close()
+
+
+def test_reconcile_detects_missing_ids_and_ignores_extra_chunks(catalog):
+    collection = _Collection()
+    _ingest(catalog, collection, 'ws', 'a.txt', ['alpha', 'beta'])
+    collection.upsert(['added-outside-the-catalog'], ['gamma'])
+    assert catalog.reconcile('ws', collection) is False
+
+    del collection.chunks[catalog.get('ws', 'a.txt')['chunk_ids'][0]]
+    collection.upsert(['another-extra'], ['delta'])  # same count, different IDs
+    assert catalog.reconcile('ws', collection) is True
+    assert catalog.chunk_ids('ws') == []
@@ -0,0 +1,178 @@
+"""Unit tests for rag-system/document_conversion.py — pooled Docling conversion with page streaming.
+
+Covers:
+  - Page range planning for PDFs of known and unknown length
+  - Conversion cache persistence and keys
+  - Service: batches arrive in page order, repeats are served from the cache,
+    prefetch converts several files, slow conversions raise ConversionTimeout
+  - Streaming chunker boundaries match chunking the whole text at once
+
+The service runs a stub converter on a real (spawned) process pool; the stub
+must be a module-level function so workers can unpickle it.
+"""
+
+import os
+import random
+import sys
+import time
+
+import pytest
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from document_conversion import (
+    WHOLE_DOCUMENT, ConversionCache, ConversionTimeout, DocumentConversionService, page_ranges
+)
+
+
+def fake_convert(file_path, page_range):
+    """Stub Docling worker: echoes the page range, sleeps if the file says so."""
+    with open(file_path) as f:
+        content = f.read()
+    if content.startswith('slow'):
+        time.sleep(30)
+    if page_range == WHOLE_DOCUMENT:
+        return f'{content} [all]'
+    return f'{content} [{page_range[0]}-{page_range[1]}]'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ConversionCache(tmp_path / 'conversion_cache.db')
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def service(cache):
+    svc = DocumentConversionService(
+        workers=2, timeout=30, page_batch=2, cache=cache,
+        convert_fn=fake_convert, count_pages=lambda path: 5
+    )
+    yield svc
+    svc.shutdown()
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Page ranges
+# ---------------------------------------------------------------------------
+
+def test_page_ranges_cover_document():
+    assert page_ranges(5, 2) == [(1, 2), (3, 4), (5, 5)]
+    assert page_ranges(4, 8) == [(1, 4)]
+
+
+def test_unknown_page_count_converts_whole_document():
+    assert page_ranges(None, 8) == [WHOLE_DOCUMENT]
+    assert page_ranges(10, 0) == [WHOLE_DOCUMENT]
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+def test_cache_round_trip_and_counters(cache):
+    assert cache.get('key', (1, 2)) is None
+    cache.put('key', (1, 2), '# Pages 1-2')
+    assert cache.get('key', (1, 2)) == '# Pages 1-2'
+    assert cache.get('key', (3, 4)) is None
+    assert cache.get_stats() == {'hits': 1, 'misses': 2}
+
+
+def test_cache_persists_across_instances(tmp_path):
+    first = ConversionCache(tmp_path / 'conversion_cache.db')
+    first.put('key', WHOLE_DOCUMENT, 'text')
+    first.close()
+    second = ConversionCache(tmp_path / 'conversion_cache.db')
+    assert second.get('key', WHOLE_DOCUMENT) == 'text'
+    second.close()
+
+
+def test_cache_file_created_on_first_put(tmp_path):
+    path = tmp_path / 'data' / 'conversion_cache.db'
+    cache = ConversionCache(path)
+    assert cache.get('key', WHOLE_DOCUMENT) is None
+    assert not path.exists()
+    cache.put('key', WHOLE_DOCUMENT, 'text')
+    assert path.exists()
+    cache.close()
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+def test_pdf_batches_stream_in_page_order(service, tmp_path):
+    pdf = _write(tmp_path, 'rfp.pdf', 'rfp')
+    batches = list(service.iter_batches(pdf))
+    assert [(b.first_page, b.last_page) for b in batches] == [(1, 2), (3, 4), (5, 5)]
+    assert batches[0].text == 'rfp [1-2]'
+    assert not any(b.cached for b in batches)
+
+
+def test_repeat_conversion_is_served_from_cache(service, tmp_path):
+    pdf = _write(tmp_path, 'rfp.pdf', 'rfp')
+    first = service.convert_text(pdf)
+    again = list(service.iter_batches(pdf))
+    assert '\n\n'.join(b.text for b in again) == first
+    assert all(b.cached for b in again)
+
+    # Same bytes under another name share the cache entry
+    copy = _write(tmp_path, 'copy.pdf', 'rfp')
+    assert all(b.cached for b in service.iter_batches(copy))
+
+
+def test_non_pdf_and_unpaginated_convert_whole_document(service, tmp_path):
+    docx = _write(tmp_path, 'sow.docx', 'sow')
+    assert service.convert_text(docx) == 'sow [all]'
+    pdf = _write(tmp_path, 'rfp.pdf', 'rfp')
+    assert service.convert_text(pdf, paginate=False) == 'rfp [all]'
+
+
+def test_prefetch_fills_cache(service, tmp_path):
+    files = [_write(tmp_path, f'doc{i}.pdf', f'doc{i}') for i in range(3)]
+    assert service.prefetch(files) == {str(f): None for f in files}
+    for f in files:
+        assert all(b.cached for b in service.iter_batches(f))
+
+
+def test_slow_conversion_times_out(cache, tmp_path):
+    svc = DocumentConversionService(
+        workers=1, timeout=3, page_batch=2, cache=cache,
+        convert_fn=fake_convert, count_pages=lambda path: 2
+    )
+    try:
+        slow = _write(tmp_path, 'slow.pdf', 'slow')
+        with pytest.raises(ConversionTimeout):
+            list(svc.iter_batches(slow))
+        # The pool is replaced and keeps serving other files
+        fast = _write(tmp_path, 'fast.pdf', 'fast')
+        assert svc.convert_text(fast) == 'fast [1-2]'
+    finally:
+        svc.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Streaming chunker
+# ---------------------------------------------------------------------------
+
+def test_streamed_chunks_match_whole_text_chunking(service):
+    pytest.importorskip('pandas')
+    from document_processor import DocumentProcessor
+
+    processor = DocumentProcessor(chunk_size=120, chunk_overlap=20, conversion=service)
+    rng = random.Random(7)
+    words = ['shall', 'provide', 'support.', 'CLIN', '0001', 'the', 'contractor', 'report!', 'why?']
+    for _ in range(25):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(20, 200)))
+        cuts = sorted(rng.sample(range(1, len(text)), 3))
+        pieces = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        streamed = [c for c in processor._iter_chunks(pieces, flush_each_piece=True) if c is not None]
+        assert streamed == list(processor._iter_chunks([text]))
@@ -0,0 +1,208 @@
+"""Unit tests for rag-system/embedding_pipeline.py — batched embedding with a content-hash cache.
+
+Covers:
+  - Cache keyed by (model, sha256(text)); persisted across instances
+  - Re-ingesting after a small edit only embeds the changed chunks
+  - Duplicate chunks within one run are embedded once
+  - Batching, parallel workers and in-order windowed writes
+  - Backpressure: embedding stays within max_in_flight batches of the writer
+  - Throughput report (chunks/s, cache hit rate) and cumulative stats
+  - The cache is pruned to max_cache_entries after a run adds vectors
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from embedding_pipeline import EmbeddingCache, EmbeddingPipeline, content_hash
+
+
+class _Encoder:
+    """Deterministic stub model: one 8-dim vector per text, records every call."""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return np.array([self.vector(t) for t in texts])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    @staticmethod
+    def vector(text):
+        rng = np.random.default_rng(int(content_hash(text)[:8], 16))
+        return rng.random(8, dtype=np.float32)
+
+    @property
+    def encoded(self):
+        return sum(len(c) for c in self.calls)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = EmbeddingCache(tmp_path / 'cache.db')
+    yield c
+    c.close()
+
+
+def _pages(n, prefix='page'):
+    return [f'{prefix} {i} of the request for proposal' for i in range(n)]
+
+
+class _Sink:
+    def __init__(self, total, dim=8):
+        self.vectors = np.zeros((total, dim), dtype=np.float32)
+        self.starts = []
+
+    def __call__(self, start, vectors):
+        self.starts.append(start)
+        self.vectors[start:start + len(vectors)] = vectors
+
+
+class TestCache:
+    def test_roundtrip_and_persistence(self, tmp_path):
+        path = tmp_path / 'cache.db'
+        first = EmbeddingCache(path)
+        vec = np.arange(4, dtype=np.float32)
+        first.put_many('m', {'abc': vec})
+        first.close()
+
+        second = EmbeddingCache(path)
+        assert np.array_equal(second.get_many('m', ['abc', 'zzz'])['abc'], vec)
+        assert second.get_many('other-model', ['abc']) == {}
+        assert second.stats()['entries'] == 1
+        second.close()
+
+    def test_prune_drops_oldest(self, cache):
+        for i in range(5):
+            cache.put_many('m', {f'h{i}': np.zeros(2)})
+        assert cache.prune(3) == 2
+        assert set(cache.get_many('m', [f'h{i}' for i in range(5)])) == {'h2', 'h3', 'h4'}
+
+    def test_many_keys_lookup(self, cache):
+        items = {f'h{i}': np.full(2, i, dtype=np.float32) for i in range(1200)}
+        cache.put_many('m', items)
+        assert len(cache.get_many('m', list(items))) == 1200
+
+
+class TestPipeline:
+    def test_vectors_written_in_order(self, cache):
+        encoder = _Encoder()
+        texts = _pages(50)
+        sink = _Sink(len(texts))
+        report = EmbeddingPipeline(encoder, 'm', cache, batch_size=8, workers=3).run(texts, sink)
+
+        assert sink.starts == list(range(0, 50, 8))
+        for text, vec in zip(texts, sink.vectors):
+            assert np.allclose(vec, _Encoder.vector(text))
+        assert report.chunks == 50
+        assert report.embedded == 50
+        assert report.batches == 7
+        assert all(len(c) <= 8 for c in encoder.calls)
+
+    def test_reingest_after_amendment_embeds_only_changes(self, cache):
+        encoder = _Encoder()
+        pipeline = EmbeddingPipeline(encoder, 'm', cache, batch_size=16, workers=2)
+        original = _pages(400)
+        pipeline.run(original, _Sink(400))
+        assert encoder.encoded == 400
+
+        amended = list(original)
+        amended[123] = 'page 123 as amended by amendment 0001'
+        encoder.calls.clear()
+        sink = _Sink(400)
+        report = pipeline.run(amended, sink)
+
+        assert encoder.calls == [[amended[123]]]
+        assert report.cache_hits == 399
+        assert report.cache_hit_rate == pytest.approx(399 / 400)
+        assert np.allclose(sink.vectors[123], _Encoder.vector(amended[123]))
+
+    def test_cache_is_per_model(self, cache):
+        encoder = _Encoder()
+        EmbeddingPipeline(encoder, 'model-a', cache).run(_pages(5))
+        EmbeddingPipeline(encoder, 'model-b', cache).run(_pages(5))
+        assert encoder.encoded == 10
+
+    def test_cache_capped_after_run(self, cache):
+        pipeline = EmbeddingPipeline(_Encoder(), 'm', cache, batch_size=4, max_cache_entries=10)
+        pipeline.run(_pages(6))
+        assert cache.stats()['entries'] == 6
+        pipeline.run(_pages(12)[6:])
+        assert cache.stats()['entries'] == 10
+        assert pipeline.get_stats()['max_cache_entries'] == 10
+
+    def test_duplicates_embedded_once(self, cache):
+        encoder = _Encoder()
+        texts = ['boilerplate'] * 10 + ['unique']
+        sink = _Sink(len(texts))
+        report = EmbeddingPipeline(encoder, 'm', cache, batch_size=4).run(texts, sink)
+        assert encoder.encoded == 2
+        assert report.duplicates == 9
+        assert np.allclose(sink.vectors[9], _Encoder.vector('boilerplate'))
+
+    def test_without_cache(self):
+        encoder = _Encoder()
+        pipeline = EmbeddingPipeline(encoder, 'm', None, batch_size=4)
+        pipeline.run(_pages(6))
+        pipeline.run(_pages(6))
+        assert encoder.encoded == 12
+
+    def test_parallel_workers(self, cache):
+        encoder = _Encoder(delay=0.05)
+        EmbeddingPipeline(encoder, 'm', cache, batch_size=4, workers=4).run(_pages(32))
+        assert encoder.max_active > 1
+
+    def test_backpressure_bounds_lookahead(self, cache):
+        encoder = _Encoder()
+        pipeline = EmbeddingPipeline(encoder, 'm', cache, batch_size=2, workers=2, max_in_flight=2)
+        seen_at_write = []
+
+        def slow_write(start, vectors):
+            time.sleep(0.01)
+            seen_at_write.append((start // 2, len(encoder.calls)))
+
+        pipeline.run(_pages(40), slow_write)
+        # When window i is written, at most i + 1 + max_in_flight batches were started
+        for window, started in seen_at_write:
+            assert started <= window + 1 + 2
+
+    def test_encoder_error_propagates(self, cache):
+        def broken(texts):
+            raise RuntimeError('model crashed')
+
+        with pytest.raises(RuntimeError):
+            EmbeddingPipeline(broken, 'm', cache).run(_pages(3))
+        assert cache.stats()['entries'] == 0
+
+    def test_report_and_stats(self, cache):
+        pipeline = EmbeddingPipeline(_Encoder(), 'm', cache, batch_size=4)
+        pipeline.run(_pages(8))
+        report = pipeline.run(_pages(8))
+        data = report.to_dict()
+        assert data['cache_hit_rate'] == 1.0
+        assert data['chunks_per_second'] > 0
+        stats = pipeline.get_stats()
+        assert stats['totals']['chunks'] == 16
+        assert stats['totals']['embedded'] == 8
+        assert stats['last_run']['cache_hits'] == 8
+        assert stats['cache']['entries'] == 8
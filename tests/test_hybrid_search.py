@@ -0,0 +1,180 @@
+"""Unit tests for rag-system/hybrid_search.py — BM25 index and reciprocal-rank fusion.
+
+Covers:
+  - MATCH query building (clause numbers stay one phrase, FTS syntax is quoted)
+  - Lexical index: per-workspace search, upsert replaces text, delete, persistence
+  - Reconciling an index whose collection lost its chunks (restart)
+  - Weighted RRF: agreement between retrievers wins, ranks are reported
+  - Retrieval trace serialization (fusion weights, timings)
+"""
+
+import os
+import sys
+
+import pytest
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from hybrid_search import LexicalIndex, RetrievalTrace, build_match_query, reciprocal_rank_fusion
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = LexicalIndex(tmp_path / 'lexical_index.db')
+    yield idx
+    idx.close()
+
+
+CHUNKS = {
+    'far': 'The contractor shall comply with FAR 52.212-4 Contract Terms and Conditions.',
+    'clin': 'CLIN 0001 covers systems engineering support for the PMO.',
+    'general': 'This section describes general proposal management and staffing.',
+}
+
+
+class _Collection:
+    """In-memory stand-in for the Chroma collection calls used by reconcile()."""
+
+    def __init__(self, ids=()):
+        self.ids = set(ids)
+
+    def count(self):
+        return len(self.ids)
+
+    def get(self, ids, include):
+        return {'ids': [chunk_id for chunk_id in ids if chunk_id in self.ids]}
+
+
+def _load(index, workspace='default'):
+    index.upsert(workspace, list(CHUNKS), list(CHUNKS.values()))
+
+
+# ---------------------------------------------------------------------------
+# Query building
+# ---------------------------------------------------------------------------
+
+def test_match_query_keeps_clause_numbers_whole():
+    match = build_match_query('Which clause is FAR 52.212-4?')
+    assert '"52.212-4"' in match
+    assert '"FAR"' in match
+
+
+def test_match_query_quotes_fts_syntax():
+    match = build_match_query('NEAR(a b) OR "quoted" AND x*')
+    assert match.count('"NEAR"') == 1
+    # Every term is wrapped in quotes, so operators are plain terms
+    assert all(term.startswith('"') and term.endswith('"') for term in match.split(' OR '))
+
+
+def test_match_query_without_terms_is_none():
+    assert build_match_query('?? !! --') is None
+
+
+# ---------------------------------------------------------------------------
+# Lexical index
+# ---------------------------------------------------------------------------
+
+def test_search_finds_exact_clause_number(index):
+    _load(index)
+    hits = index.search('default', 'requirements of 52.212-4')
+    assert hits[0][0] == 'far'
+
+
+def test_search_finds_clin_and_acronyms(index):
+    _load(index)
+    assert index.search('default', 'CLIN 0001')[0][0] == 'clin'
+    assert index.search('default', 'PMO')[0][0] == 'clin'
+
+
+def test_search_is_scoped_to_workspace(index):
+    _load(index, 'one')
+    assert index.search('two', '52.212-4') == []
+    assert index.count('one') == 3
+    assert index.count('two') == 0
+
+
+def test_upsert_replaces_text(index):
+    _load(index)
+    index.upsert('default', ['clin'], ['Replaced text about travel'])
+    assert index.search('default', 'CLIN') == []
+    assert index.search('default', 'travel')[0][0] == 'clin'
+    assert index.count('default') == 3
+
+
+def test_delete_removes_chunks(index):
+    _load(index)
+    index.delete('default', ['far', 'unknown'])
+    assert index.search('default', '52.212-4') == []
+    assert index.count('default') == 2
+
+
+def test_index_persists_across_instances(tmp_path):
+    first = LexicalIndex(tmp_path / 'lexical_index.db')
+    _load(first)
+    first.mark_indexed('default')
+    first.close()
+    second = LexicalIndex(tmp_path / 'lexical_index.db')
+    assert second.is_indexed('default')
+    assert second.search('default', '52.212-4')[0][0] == 'far'
+    second.close()
+
+
+def test_reconcile_clears_index_of_emptied_collection(tmp_path):
+    first = LexicalIndex(tmp_path / 'lexical_index.db')
+    _load(first)
+    first.mark_indexed('default')
+    assert first.reconcile('default', _Collection(CHUNKS)) is False
+    first.close()
+
+    # Restart: the index is on disk, but the collection came back empty
+    index = LexicalIndex(tmp_path / 'lexical_index.db')
+    assert index.workspaces() == ['default']
+    assert index.reconcile('default', _Collection()) is True
+    assert index.count('default') == 0
+    assert index.search('default', 'FAR 52.212-4') == []
+    assert not index.is_indexed('default')
+    index.close()
+
+
+def test_reconcile_detects_other_ids_and_skips_unindexed(index):
+    _load(index, 'ws')
+    assert index.reconcile('ws', _Collection(['x'])) is False  # not built yet: built on first search
+    index.mark_indexed('ws')
+    assert index.reconcile('ws', _Collection(['far', 'clin', 'other'])) is True
+    _load(index, 'ws')
+    index.mark_indexed('ws')
+    assert index.reconcile('ws', _Collection(CHUNKS)) is False
+
+
+# ---------------------------------------------------------------------------
+# Fusion
+# ---------------------------------------------------------------------------
+
+def test_rrf_prefers_agreement():
+    fused = reciprocal_rank_fusion({'vector': ['a', 'b', 'c'], 'lexical': ['b', 'd']})
+    assert [item for item, _, _ in fused][:1] == ['b']
+    ranks = {item: r for item, _, r in fused}
+    assert ranks['b'] == {'vector': 2, 'lexical': 1}
+    assert ranks['d'] == {'lexical': 2}
+
+
+def test_rrf_weights_shift_ranking():
+    rankings = {'vector': ['a'], 'lexical': ['b']}
+    assert reciprocal_rank_fusion(rankings, {'vector': 1.0, 'lexical': 2.0})[0][0] == 'b'
+    assert reciprocal_rank_fusion(rankings, {'vector': 2.0, 'lexical': 1.0})[0][0] == 'a'
+
+
+def test_rrf_score_formula_and_duplicates():
+    fused = reciprocal_rank_fusion({'vector': ['a', 'a']}, k=10)
+    assert fused == [('a', pytest.approx(1 / 11), {'vector': 1})]
+
+
+def test_trace_to_dict():
+    trace = RetrievalTrace(mode='hybrid', k=60, weights={'vector': 1.0, 'lexical': 0.5})
+    trace.candidates['lexical'] = 4
+    trace.timings_ms['fusion'] = 0.12345
+    data = trace.to_dict()
+    assert data['fusion'] == {'method': 'rrf', 'k': 60, 'weights': {'vector': 1.0, 'lexical': 0.5}}
+    assert data['candidates'] == {'lexical': 4}
+    assert data['timings_ms'] == {'fusion': 0.12}
@@ -0,0 +1,150 @@
+"""Unit tests for knowledge_graph_builder.py — incremental, cached knowledge graphs.
+
+Covers:
+  - Concepts, clusters and sources from chunks; one edge per entity pair
+  - Whole-word concept matching through the inverted index
+  - Adding and removing chunks matches building from scratch
+  - KnowledgeGraphCache: hits per workspace version, fetches only new chunks
+"""
+
+import pytest
+
+pytest.importorskip('sklearn')
+np = pytest.importorskip('numpy')
+
+from knowledge_graph_builder import KnowledgeGraphCache, VectorKnowledgeGraphBuilder
+
+
+def _chunk(i, text, source='rfp.pdf', dims=8):
+    rng = np.random.default_rng(i)
+    return {'id': f'c{i}', 'text': text, 'embedding': rng.random(dims).tolist(),
+            'source': source, 'file_type': 'pdf'}
+
+
+TEXTS = [
+    'The Project Management Office oversees CLIN delivery.',
+    'Project Management Office staff report to the PMO.',
+    'Cyber Security controls follow NIST guidance for the PMO.',
+    'NIST Cyber Security baselines apply to every CLIN.',
+    'Travel is reimbursed at cost.',
+    'We maintain the servers and the network.',
+]
+
+
+def _chunks():
+    return [_chunk(i, text, 'rfp.pdf' if i < 3 else 'sow.pdf') for i, text in enumerate(TEXTS)]
+
+
+def _entities(graph, entity_type):
+    return [e for e in graph['entities'] if e['type'] == entity_type]
+
+
+def _mentions(graph):
+    names = {e['id']: e['name'] for e in graph['entities']}
+    return {(names[r['source']], names[r['target']]): r['metadata']['chunk_count']
+            for r in graph['relationships'] if r['relationship'] == 'MENTIONED_IN'}
+
+
+def test_graph_has_concepts_clusters_and_sources():
+    graph = VectorKnowledgeGraphBuilder().build_knowledge_graph_from_vectors({'chunks': _chunks()})
+    concepts = {e['name'] for e in _entities(graph, 'CONCEPT')}
+    assert {'PMO', 'NIST', 'CLIN', 'Cyber Security'} <= concepts
+    assert len(_entities(graph, 'CONTENT_CLUSTER')) == 2
+    assert {e['name'] for e in _entities(graph, 'DOCUMENT_SOURCE')} == {'rfp.pdf', 'sow.pdf'}
+    assert graph['metadata']['chunk_count'] == 6
+
+
+def test_one_mention_edge_per_concept_and_source():
+    graph = VectorKnowledgeGraphBuilder().build_knowledge_graph_from_vectors({'chunks': _chunks()})
+    mentions = _mentions(graph)
+    assert mentions[('PMO', 'rfp.pdf')] == 2
+    assert mentions[('CLIN', 'rfp.pdf')] == 1
+    assert mentions[('CLIN', 'sow.pdf')] == 1
+    pairs = [(r['source'], r['target']) for r in graph['relationships']]
+    assert len(pairs) == len(set(pairs))
+
+
+def test_concepts_match_whole_words_only():
+    builder = VectorKnowledgeGraphBuilder()
+    builder.add_chunks(_chunks())
+    # "maintain" does not mention a concept named "AI"
+    assert builder._chunks_mentioning('AI') == set()
+    assert builder._chunks_mentioning('Project Management Office') == {'c0', 'c1'}
+    assert builder._chunks_mentioning('cyber security') == {'c2', 'c3'}
+
+
+def test_incremental_updates_match_fresh_build():
+    chunks = _chunks()
+    incremental = VectorKnowledgeGraphBuilder()
+    incremental.add_chunks(chunks[:4])
+    incremental.build_graph()  # remember mention sets for the current concepts
+    incremental.add_chunks(chunks[4:] + [_chunk(9, 'A second PMO review of NIST items.', 'sow.pdf')])
+    incremental.remove_chunks(['c0'])
+
+    fresh = VectorKnowledgeGraphBuilder()
+    fresh.add_chunks(chunks[1:] + [_chunk(9, 'A second PMO review of NIST items.', 'sow.pdf')])
+
+    assert _mentions(incremental.build_graph()) == _mentions(fresh.build_graph())
+
+
+def test_too_few_embeddings_means_no_clusters():
+    builder = VectorKnowledgeGraphBuilder()
+    builder.add_chunks(_chunks()[:2])
+    builder.remove_chunks(['c1'])
+    assert _entities(builder.build_graph(), 'CONTENT_CLUSTER') == []
+
+
+def test_empty_workspace():
+    graph = VectorKnowledgeGraphBuilder().build_knowledge_graph_from_vectors({'chunks': []})
+    assert graph['entities'] == [] and graph['relationships'] == []
+
+
+class _Store:
+    def __init__(self, chunks):
+        self.chunks = {c['id']: c for c in chunks}
+        self.fetched = []
+        self.listings = 0
+
+    def list_chunks(self, workspace):
+        self.listings += 1
+        return {cid: {'source': c['source'], 'file_type': c['file_type']} for cid, c in self.chunks.items()}
+
+    def fetch(self, workspace, ids):
+        self.fetched.append(sorted(ids))
+        return [self.chunks[cid] for cid in ids]
+
+
+def test_cache_hits_until_version_changes():
+    store = _Store(_chunks())
+    cache = KnowledgeGraphCache()
+    first = cache.get('ws', 0, store.list_chunks, store.fetch)
+    again = cache.get('ws', 0, store.list_chunks, store.fetch)
+    assert first['metadata']['cache'] == 'miss'
+    assert again['metadata']['cache'] == 'hit'
+    assert store.listings == 1
+    assert again['entities'] == first['entities']
+
+
+def test_cache_fetches_only_new_chunks():
+    store = _Store(_chunks())
+    cache = KnowledgeGraphCache()
+    cache.get('ws', 0, store.list_chunks, store.fetch)
+
+    store.chunks['c7'] = _chunk(7, 'Another PMO tasking under CLIN 0002.', 'sow.pdf')
+    del store.chunks['c4']
+    graph = cache.get('ws', 1, store.list_chunks, store.fetch)
+
+    assert store.fetched[-1] == ['c7']
+    assert graph['metadata']['chunks_recomputed'] == 1
+    assert graph['metadata']['chunk_count'] == 6
+    assert _mentions(graph)[('PMO', 'sow.pdf')] == 1
+
+
+def test_cache_workspaces_are_independent():
+    cache = KnowledgeGraphCache()
+    one = _Store(_chunks())
+    two = _Store(_chunks()[:3])
+    assert cache.get('one', 0, one.list_chunks, one.fetch)['metadata']['chunk_count'] == 6
+    assert cache.get('two', 0, two.list_chunks, two.fetch)['metadata']['chunk_count'] == 3
+    cache.invalidate('one')
+    assert cache.get('one', 0, one.list_chunks, one.fetch)['metadata']['cache'] == 'miss'
@@ -0,0 +1,219 @@
+"""
+Tests for ollama_client.OllamaClient — the shared pooled Ollama client.
+
+A stub Ollama server (HTTP/1.1, keep-alive) records every request and the
+peer port it arrived on, and can be told to hold generations open or to
+fail with a given status.
+
+Covers:
+  - generate/chat/embed/tags payloads and parsed results
+  - Concurrency limit is never exceeded
+  - Waiting callers are admitted by priority, not arrival order
+  - 5xx and connection errors retried; 4xx fails immediately
+  - Per-caller metrics (calls, errors, retries, tokens)
+  - Keep-alive: sequential calls reuse one connection
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ollama_client import (
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    OllamaClient,
+    OllamaError,
+    OllamaTimeoutError,
+)
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, status, obj):
+        data = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.log.append(('GET', self.path, None, self.client_address[1]))
+        self._reply(200, {'models': [{'name': 'm'}]})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        srv = self.server
+        with srv.lock:
+            srv.log.append(('POST', self.path, body, self.client_address[1]))
+            srv.active += 1
+            srv.peak = max(srv.peak, srv.active)
+            status = srv.failures.pop(0) if srv.failures else 200
+        try:
+            time.sleep(srv.hold)
+            if status != 200:
+                self._reply(status, {'error': 'boom'})
+            elif self.path == '/api/embeddings':
+                self._reply(200, {'embedding': [0.1, 0.2]})
+            elif self.path == '/api/chat':
+                self._reply(200, {'message': {'role': 'assistant', 'content': 'hi'},
+                                  'done': True, 'prompt_eval_count': 3, 'eval_count': 2})
+            else:
+                self._reply(200, {'response': body.get('prompt', ''), 'done': True,
+                                  'prompt_eval_count': 3, 'eval_count': 2})
+        finally:
+            with srv.lock:
+                srv.active -= 1
+
+    def log_message(self, *args):
+        return
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubOllama)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.log = []
+    server.failures = []
+    server.active = 0
+    server.peak = 0
+    server.hold = 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(stub, **kwargs):
+    kwargs.setdefault('max_retries', 3)
+    kwargs.setdefault('retry_delay', 0.01)
+    return OllamaClient(base_url=stub.url, **kwargs)
+
+
+class TestEndpoints:
+    def test_generate(self, stub):
+        result = _client(stub).generate('m', 'hello', system='sys', options={'temperature': 0.1},
+                                        format='json')
+        assert result['response'] == 'hello'
+        method, path, body, _ = stub.log[0]
+        assert (method, path) == ('POST', '/api/generate')
+        assert body == {'model': 'm', 'prompt': 'hello', 'stream': False, 'system': 'sys',
+                        'options': {'temperature': 0.1}, 'format': 'json'}
+
+    def test_chat_embed_tags(self, stub):
+        client = _client(stub)
+        assert client.chat('m', [{'role': 'user', 'content': 'x'}])['message']['content'] == 'hi'
+        assert client.embed('m', 'text') == [0.1, 0.2]
+        assert client.tags()['models'][0]['name'] == 'm'
+        assert client.is_available()
+
+    def test_unreachable_is_unavailable(self):
+        client = OllamaClient(base_url='http://127.0.0.1:9', retry_delay=0.01)
+        assert client.is_available(timeout=0.5) is False
+        with pytest.raises(OllamaError) as exc:
+            client.generate('m', 'x', retries=2)
+        assert exc.value.attempt == 2
+
+
+class TestConcurrency:
+    def test_limit_is_respected(self, stub):
+        stub.hold = 0.1
+        client = _client(stub, max_concurrency=2)
+        threads = [threading.Thread(target=client.generate, args=('m', str(i))) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(stub.log) == 6
+        assert stub.peak == 2
+
+    def test_waiters_admitted_by_priority(self, stub):
+        stub.hold = 0.2
+        client = _client(stub, max_concurrency=1)
+        blocker = threading.Thread(target=client.generate, args=('m', 'first'))
+        blocker.start()
+        while client.get_metrics()['in_flight'] == 0:
+            time.sleep(0.005)
+
+        threads = []
+        for prompt, priority in (('batch-1', PRIORITY_BATCH), ('batch-2', PRIORITY_BATCH),
+                                 ('chat', PRIORITY_INTERACTIVE)):
+            t = threading.Thread(target=client.generate, args=('m', prompt),
+                                 kwargs={'priority': priority})
+            t.start()
+            threads.append(t)
+            time.sleep(0.02)
+        assert client.get_metrics()['waiting'] == 3
+
+        blocker.join()
+        for t in threads:
+            t.join()
+        order = [body['prompt'] for _, _, body, _ in stub.log]
+        assert order == ['first', 'chat', 'batch-1', 'batch-2']
+
+    def test_tags_bypass_limit(self, stub):
+        stub.hold = 0.3
+        client = _client(stub, max_concurrency=1)
+        t = threading.Thread(target=client.generate, args=('m', 'slow'))
+        t.start()
+        while client.get_metrics()['in_flight'] == 0:
+            time.sleep(0.005)
+        started = time.monotonic()
+        client.tags()
+        assert time.monotonic() - started < 0.2
+        t.join()
+
+
+class TestRetries:
+    def test_5xx_is_retried(self, stub):
+        stub.failures = [500, 503]
+        client = _client(stub)
+        assert client.generate('m', 'ok', caller='batch')['response'] == 'ok'
+        assert len(stub.log) == 3
+        assert client.get_metrics()['callers']['batch']['retries'] == 2
+
+    def test_4xx_fails_immediately(self, stub):
+        stub.failures = [404]
+        client = _client(stub)
+        with pytest.raises(OllamaError) as exc:
+            client.generate('missing', 'x')
+        assert exc.value.status_code == 404
+        assert len(stub.log) == 1
+
+    def test_read_timeout(self, stub):
+        stub.hold = 0.5
+        client = _client(stub)
+        with pytest.raises(OllamaTimeoutError):
+            client.generate('m', 'x', timeout=0.1, retries=1)
+
+
+class TestMetricsAndPooling:
+    def test_per_caller_metrics(self, stub):
+        client = _client(stub)
+        client.generate('m', 'a', caller='chat')
+        client.generate('m', 'b', caller='chat')
+        stub.failures = [400]
+        with pytest.raises(OllamaError):
+            client.generate('m', 'c', caller='shredding')
+
+        callers = client.get_metrics()['callers']
+        assert callers['chat']['calls'] == 2
+        assert callers['chat']['errors'] == 0
+        assert callers['chat']['prompt_tokens'] == 6
+        assert callers['chat']['completion_tokens'] == 4
+        assert callers['chat']['latency_p50_ms'] > 0
+        assert callers['shredding'] == dict(callers['shredding'], calls=1, errors=1)
+
+    def test_connections_are_reused(self, stub):
+        client = _client(stub)
+        for i in range(5):
+            client.generate('m', str(i))
+        assert len({port for *_, port in stub.log}) == 1
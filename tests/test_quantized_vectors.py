@@ -0,0 +1,164 @@
+"""Unit tests for rag-system/quantized_vectors.py — compact embedding storage.
+
+Covers:
+  - float16 / int8 round trips stay close to the original vectors
+  - Store upsert, replace, delete (row moves) and persistence across instances
+  - retain() drops vectors whose chunks the collection no longer has
+  - Coarse search matches exact float32 search; rescoring restores exact order
+  - Footprint: int8 is 4x smaller than float32
+"""
+
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from quantized_vectors import QuantizedVectorStore, dequantize, quantize, rescore, squared_l2, storage_mode
+
+
+def _vectors(n, dim=32, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+# ---------------------------------------------------------------------------
+# Quantization
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize('mode,tolerance', [('float16', 1e-3), ('int8', 1e-2)])
+def test_round_trip_is_close(mode, tolerance):
+    vectors = _vectors(50)
+    codes, scales = quantize(vectors, mode)
+    assert codes.dtype == (np.float16 if mode == 'float16' else np.int8)
+    assert np.abs(dequantize(codes, scales) - vectors).max() < tolerance
+
+
+def test_zero_vector_quantizes_to_zero():
+    codes, scales = quantize(np.zeros((1, 4), dtype=np.float32), 'int8')
+    assert not codes.any() and scales[0] == 1.0
+
+
+def test_unknown_mode_is_rejected():
+    assert storage_mode(None) == 'float32'
+    with pytest.raises(ValueError):
+        storage_mode('int4')
+    with pytest.raises(ValueError):
+        QuantizedVectorStore('unused.npz', 'float32')
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+def test_upsert_replace_and_delete(tmp_path):
+    store = QuantizedVectorStore(tmp_path / 'ws.npz', 'int8')
+    vectors = _vectors(3)
+    store.upsert(['a', 'b', 'c'], vectors)
+    store.upsert(['b'], vectors[:1])
+    assert len(store) == 3
+    assert np.allclose(store.get(['b'])['b'], vectors[0], atol=1e-2)
+
+    assert store.delete(['a', 'missing']) == 1
+    # 'c' moved into the freed row and is still addressable
+    got = store.get(['a', 'c'])
+    assert list(got) == ['c']
+    assert np.allclose(got['c'], vectors[2], atol=1e-2)
+
+
+def test_store_persists_across_instances(tmp_path):
+    path = tmp_path / 'vectors' / 'ws.npz'
+    store = QuantizedVectorStore(path, 'float16')
+    vectors = _vectors(5)
+    ids = [f'doc::{i}' for i in range(5)]
+    store.upsert(ids, vectors)
+    store.flush()
+
+    reloaded = QuantizedVectorStore(path, 'float16')
+    assert len(reloaded) == 5
+    assert np.allclose(reloaded.get(ids)['doc::3'], vectors[3], atol=1e-3)
+    # Growing a loaded store keeps its rows
+    reloaded.upsert(['doc::5'], _vectors(1, seed=9))
+    assert len(reloaded.get(ids + ['doc::5'])) == 6
+
+    with pytest.raises(ValueError):
+        QuantizedVectorStore(path, 'int8')
+
+
+def test_empty_store(tmp_path):
+    store = QuantizedVectorStore(tmp_path / 'ws.npz', 'int8')
+    ids, distances = store.search(_vectors(1)[0], 5)
+    assert ids == [] and len(distances) == 0
+    store.upsert(['a'], _vectors(1))
+    store.delete(['a'])
+    store.flush()
+    assert len(QuantizedVectorStore(tmp_path / 'ws.npz', 'int8')) == 0
+
+
+def test_retain_drops_vectors_missing_from_collection(tmp_path):
+    path = tmp_path / 'vectors' / 'ws.npz'
+    store = QuantizedVectorStore(path, 'int8')
+    vectors = _vectors(4)
+    store.upsert(['a', 'b', 'c', 'd'], vectors)
+    store.flush()
+
+    # Restart: only 'b' and 'd' are still in the collection
+    reloaded = QuantizedVectorStore(path, 'int8')
+    assert reloaded.retain(['b', 'd', 'not-vectorized']) == 2
+    assert sorted(reloaded.ids()) == ['b', 'd']
+    assert np.allclose(reloaded.get(['d'])['d'], vectors[3], atol=1e-2)
+    assert set(reloaded.search(vectors[0], 4)[0]) == {'b', 'd'}
+    reloaded.flush()
+
+    assert reloaded.retain([]) == 2
+    reloaded.flush()
+    assert len(QuantizedVectorStore(path, 'int8')) == 0
+
+
+# ---------------------------------------------------------------------------
+# Search and rescoring
+# ---------------------------------------------------------------------------
+
+def test_coarse_search_recalls_exact_neighbours(tmp_path):
+    vectors = _vectors(2000, dim=64)
+    ids = [f'c{i}' for i in range(len(vectors))]
+    store = QuantizedVectorStore(tmp_path / 'ws.npz', 'int8')
+    store.upsert(ids, vectors)
+
+    query = _vectors(1, dim=64, seed=42)[0]
+    exact_order = np.argsort(squared_l2(query, vectors))[:10]
+    coarse_ids, distances = store.search(query, 40)
+    assert list(distances) == sorted(distances)
+    assert {f'c{i}' for i in exact_order} <= set(coarse_ids)
+
+    exact = {chunk_id: vectors[int(chunk_id[1:])] for chunk_id in coarse_ids}
+    ranked = rescore(query, coarse_ids, distances, exact)[:10]
+    assert [chunk_id for chunk_id, _ in ranked] == [f'c{i}' for i in exact_order]
+    assert ranked[0][1] == pytest.approx(float(squared_l2(query, vectors[exact_order[:1]])[0]), abs=1e-5)
+
+
+def test_rescore_keeps_coarse_distance_without_exact_vector():
+    query = np.zeros(2, dtype=np.float32)
+    ranked = rescore(query, ['a', 'b'], [0.5, 0.1], {'a': np.zeros(2, dtype=np.float32)})
+    assert ranked == [('a', 0.0), ('b', pytest.approx(0.1))]
+
+
+def test_int8_footprint(tmp_path):
+    store = QuantizedVectorStore(tmp_path / 'ws.npz', 'int8')
+    store.upsert([f'c{i}' for i in range(100)], _vectors(100, dim=384))
+    stats = store.stats()
+    assert stats['vectors'] == 100 and stats['dimensions'] == 384
+    assert stats['float32_bytes'] / stats['bytes'] > 3.9
+    assert stats['rescore_bytes'] == 0 and stats['total_bytes'] == stats['bytes']
+
+
+def test_stats_count_exact_vectors_kept_for_rescoring(tmp_path):
+    store = QuantizedVectorStore(tmp_path / 'ws.npz', 'int8')
+    store.upsert([f'c{i}' for i in range(100)], _vectors(100, dim=384))
+    stats = store.stats(rescore_vectors=100)
+    assert stats['rescore_bytes'] == stats['float32_bytes']
+    assert stats['total_bytes'] == stats['bytes'] + stats['float32_bytes']
@@ -0,0 +1,106 @@
+"""Unit tests for rag-system/query_cache.py — query-embedding and result caches.
+
+Covers:
+  - LRU eviction order, hit/miss counters and disabled (size 0) caches
+  - Result keys change with workspace version, n_results and mode
+  - Whitespace-insensitive query normalization
+  - Per-workspace version bumps
+"""
+
+import os
+import sys
+import threading
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from query_cache import LRUCache, WorkspaceVersions, normalize_query, result_key
+
+
+# ---------------------------------------------------------------------------
+# LRU
+# ---------------------------------------------------------------------------
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1      # 'a' is now most recent
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_lru_counts_hits_and_misses():
+    cache = LRUCache(4)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('a')
+    cache.get('missing')
+    stats = cache.get_stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == round(2 / 3, 4)
+    assert stats['entries'] == 1
+    assert stats['max_entries'] == 4
+
+
+def test_lru_size_zero_disables_caching():
+    cache = LRUCache(0)
+    cache.put('a', 1)
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_lru_is_thread_safe():
+    cache = LRUCache(50)
+
+    def worker(offset):
+        for i in range(500):
+            cache.put((offset, i), i)
+            cache.get((offset, i - 1))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(cache) == 50
+    assert cache.hits + cache.misses == 8 * 500
+
+
+# ---------------------------------------------------------------------------
+# Keys and versions
+# ---------------------------------------------------------------------------
+
+def test_normalize_query_collapses_whitespace():
+    assert normalize_query('  what is\tCLIN   0001?\n') == 'what is CLIN 0001?'
+
+
+def test_result_key_tracks_every_component():
+    base = result_key('default', 'FAR 52.212-4', 5, 'hybrid', 1)
+    assert base == result_key('default', ' FAR  52.212-4 ', 5, 'hybrid', 1)
+    assert base != result_key('default', 'FAR 52.212-4', 5, 'hybrid', 2)
+    assert base != result_key('default', 'FAR 52.212-4', 3, 'hybrid', 1)
+    assert base != result_key('default', 'FAR 52.212-4', 5, 'vector', 1)
+    assert base != result_key('other', 'FAR 52.212-4', 5, 'hybrid', 1)
+
+
+def test_version_bump_invalidates_cached_result():
+    versions = WorkspaceVersions()
+    results = LRUCache(8)
+    results.put(result_key('default', 'q', 5, 'hybrid', versions.get('default')), 'stale')
+
+    versions.bump('default')
+    assert results.get(result_key('default', 'q', 5, 'hybrid', versions.get('default'))) is None
+
+
+def test_workspace_versions_are_independent():
+    versions = WorkspaceVersions()
+    assert versions.get('a') == 0
+    assert versions.bump('a') == 1
+    assert versions.bump('a') == 2
+    assert versions.get('b') == 0
+    assert versions.snapshot() == {'a': 2}
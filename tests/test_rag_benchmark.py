@@ -0,0 +1,80 @@
+"""Unit tests for rag-system/rag_benchmark.py — the offline RAG benchmark.
+
+Covers:
+  - Stub embedder is deterministic and ranks shared words closer
+  - Synthetic corpus is seeded and labels every question with a unique answer
+  - A benchmark run reports throughput, latency, recall@k and memory
+  - Regression comparison flags recall drops and latency growth
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from rag_benchmark import StubEmbedder, compare, load_corpus, run_benchmark, synthetic_corpus
+
+
+def test_stub_embedder_is_deterministic():
+    texts = ['secure the payroll database', 'secure the payroll database for DHS', 'travel is reimbursed']
+    first = StubEmbedder(dim=64).encode(texts)
+    assert np.array_equal(first, StubEmbedder(dim=64).encode(texts))
+    assert first.dtype == np.float32
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert first[0] @ first[1] > first[0] @ first[2]
+
+
+def test_synthetic_corpus_is_seeded():
+    corpus = synthetic_corpus(documents=3, facts_per_document=4, seed=1)
+    assert corpus == synthetic_corpus(documents=3, facts_per_document=4, seed=1)
+    assert len(corpus['documents']) == 3 and len(corpus['questions']) == 12
+    answers = [q['answer'] for q in corpus['questions']]
+    assert len(set(answers)) == len(answers)
+    text = ' '.join(doc['text'] for doc in corpus['documents'])
+    assert all(text.count(answer) == 1 for answer in answers)
+    assert not any(q['answer'] in q['question'] for q in corpus['questions'])
+
+
+def test_load_corpus(tmp_path):
+    path = tmp_path / 'corpus.json'
+    path.write_text(json.dumps({'documents': [{'id': 'a', 'text': 'CLIN 0001 covers help desk.'}],
+                                'questions': [{'question': 'help desk?', 'answer': 'CLIN 0001'}]}))
+    assert load_corpus(path)['source'] == str(path)
+    path.write_text(json.dumps({'documents': []}))
+    with pytest.raises(ValueError):
+        load_corpus(path)
+
+
+@pytest.mark.parametrize('mode,storage', [('hybrid', 'float32'), ('vector', 'int8')])
+def test_run_reports_metrics(tmp_path, mode, storage):
+    corpus = synthetic_corpus(documents=4, facts_per_document=5)
+    results = run_benchmark(corpus, chunk_size=300, chunk_overlap=30, mode=mode, storage=storage,
+                            work_dir=tmp_path / f'{mode}-{storage}')
+    assert results['config']['storage'] == storage
+    assert results['ingest']['chunks'] > 4
+    assert results['ingest']['chunks_per_second'] > 0
+    assert results['query']['count'] == 20
+    assert 0 < results['query']['p50_ms'] <= results['query']['p95_ms']
+    assert set(results['recall']) == {'@1', '@5', '@10'}
+    assert 0 < results['recall']['@1'] <= results['recall']['@5'] <= results['recall']['@10'] <= 1
+    assert results['memory']['vector_bytes'] > 0
+    json.dumps(results)  # serializable as-is
+
+
+def test_compare_flags_regressions():
+    base = {'recall': {'@1': 0.5, '@5': 0.9}, 'mrr': 0.6, 'config': {'mode': 'hybrid'},
+            'ingest': {'chunks_per_second': 1000.0}, 'query': {'p50_ms': 1.0, 'p95_ms': 2.0}}
+    same = compare(base, base)
+    assert same['regressions'] == [] and same['configs_match']
+
+    worse = {**base, 'recall': {'@1': 0.45, '@5': 0.9}, 'query': {'p50_ms': 1.1, 'p95_ms': 3.0}}
+    result = compare(base, worse)
+    assert result['regressions'] == ['recall@1', 'p95_ms']
+    assert result['deltas']['recall@1']['delta'] == -0.05
@@ -0,0 +1,121 @@
+"""Unit tests for spreadsheet chunking in rag-system/document_processor.py.
+
+Covers:
+  - Row texts skip nulls and are grouped into row windows
+  - Windows widen so a sheet never exceeds max_row_chunks row chunks
+  - Reading in small blocks produces the same chunks as reading at once
+  - Column statistics accumulated across blocks (counts, range, mean, uniques)
+  - Header-only CSVs
+"""
+
+import os
+import sys
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+# rag-system modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rag-system'))
+
+from document_processor import DocumentProcessor, SheetProfile
+
+
+@pytest.fixture
+def processor():
+    # Spreadsheets never touch the Docling conversion service
+    proc = DocumentProcessor(conversion=object())
+    proc.row_window = 2
+    proc.max_row_chunks = 100
+    proc.read_chunksize = 1000
+    return proc
+
+
+@pytest.fixture
+def staff_csv(tmp_path):
+    path = tmp_path / 'staff.csv'
+    pd.DataFrame({
+        'Name': ['Alice', 'Bob', None, 'Dana', 'Eve'],
+        'Age': [25, 30, 35, None, 45],
+        'Department': ['Engineering', 'Marketing', 'Engineering', 'Sales', 'Sales'],
+    }).to_csv(path, index=False)
+    return path
+
+
+def _by_type(result, chunk_type):
+    return [c for c in result['chunks'] if c['metadata']['chunk_type'] == chunk_type]
+
+
+def test_rows_are_grouped_into_windows(processor, staff_csv):
+    result = processor.process_document(str(staff_csv))
+    assert result['status'] == 'success'
+    rows = _by_type(result, 'data_rows')
+    assert [(c['metadata']['row_start'], c['metadata']['row_end']) for c in rows] == [(1, 2), (3, 4), (5, 5)]
+    assert rows[0]['text'].startswith('Rows 1-2 from staff.csv:')
+    assert 'Row 1:\nName: Alice\nAge: 25.0\nDepartment: Engineering' in rows[0]['text']
+    # Null cells are left out
+    assert 'Row 3:\nAge: 35.0\nDepartment: Engineering' in rows[1]['text']
+
+
+def test_summary_and_column_chunks_come_first(processor, staff_csv):
+    result = processor.process_document(str(staff_csv))
+    types = [c['metadata']['chunk_type'] for c in result['chunks']]
+    assert types[:4] == ['table_summary'] + ['column_summary'] * 3
+    assert [c['metadata']['chunk_index'] for c in result['chunks']] == list(range(len(types)))
+    assert result['table_info']['rows'] == 5
+
+
+def test_windows_widen_to_bound_chunk_count(processor, tmp_path):
+    path = tmp_path / 'big.csv'
+    pd.DataFrame({'id': range(1000), 'value': ['x'] * 1000}).to_csv(path, index=False)
+    processor.max_row_chunks = 10
+    result = processor.process_document(str(path))
+    rows = _by_type(result, 'data_rows')
+    assert len(rows) == 10
+    assert result['table_info']['rows_per_chunk'] == 100
+    assert rows[-1]['metadata']['row_end'] == 1000
+
+
+def test_block_reads_match_single_read(processor, tmp_path):
+    path = tmp_path / 'sheet.csv'
+    pd.DataFrame({
+        'id': range(57),
+        'region': ['East', 'West', None] * 19,
+        'amount': [i * 1.5 for i in range(57)],
+    }).to_csv(path, index=False)
+    whole = processor.process_document(str(path))
+    processor.read_chunksize = 5
+    blocks = processor.process_document(str(path))
+    assert [c['text'] for c in blocks['chunks']] == [c['text'] for c in whole['chunks']]
+    # Streaming yields a batch per block, summaries last
+    batches = list(processor.iter_document_chunk_batches(str(path)))
+    assert len(batches) > 2
+    assert batches[-1]['chunks'][0]['metadata']['chunk_type'] == 'table_summary'
+
+
+def test_column_statistics_across_blocks():
+    profile = SheetProfile(unique_cap=3)
+    profile.update(pd.DataFrame({'n': [1, 2], 's': ['a', 'b']}))
+    profile.update(pd.DataFrame({'n': [None, 10.5], 's': ['c', 'd']}))
+    assert profile.rows == 4
+    assert profile.counts == {'n': 3, 's': 4}
+    assert (profile.mins['n'], profile.maxs['n'], profile.sums['n']) == (1, 10.5, 13.5)
+    assert str(profile.dtypes['n']) == 'float64'
+    assert profile.unique_count('s') == '3+'
+    assert profile.unique_count('n') == '3'
+
+
+def test_column_chunk_reports_mean(processor, staff_csv):
+    result = processor.process_document(str(staff_csv))
+    age = next(c for c in _by_type(result, 'column_summary') if c['metadata']['column_name'] == 'Age')
+    assert 'Total Values: 4 (excluding nulls)' in age['text']
+    assert 'Mean: 33.75' in age['text']
+
+
+def test_header_only_csv(processor, tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_text('Name,Age\n')
+    result = processor.process_document(str(path))
+    assert result['status'] == 'success'
+    assert result['table_info'] == {'rows': 0, 'columns': 2, 'column_names': ['Name', 'Age'], 'rows_per_chunk': 2}
+    assert _by_type(result, 'data_rows') == []
@@ -0,0 +1,256 @@
+"""Unit tests for static_cache.py — in-memory static asset cache.
+
+Covers:
+  - Accept-Encoding negotiation (q-values, wildcard, identity fallback)
+  - Precompressed variants built once and memoized per file version
+  - Distinct ETag per encoding
+  - Startup warm-up over the UI asset paths
+  - Byte-budgeted LRU eviction and mtime/size invalidation
+  - End-to-end serving through CustomHTTPRequestHandler (Vary, 304,
+    sendfile for large files)
+"""
+
+import gzip
+import http.client
+import os
+import sys
+import threading
+
+import pytest
+
+# Point to repo root so static_cache is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import static_cache
+from static_cache import StaticCache, choose_encoding, warm_static_cache
+
+
+JS = b"function hello() { return 'world'; }\n" * 200
+
+
+@pytest.fixture
+def asset(tmp_path):
+    path = tmp_path / "app.js"
+    path.write_bytes(JS)
+    return str(path)
+
+
+# ---------------------------------------------------------------------------
+# Negotiation
+# ---------------------------------------------------------------------------
+
+class TestChooseEncoding:
+    def test_none_and_empty(self):
+        assert choose_encoding(None) is None
+        assert choose_encoding('') is None
+
+    def test_gzip(self):
+        assert choose_encoding('gzip, deflate') == 'gzip'
+
+    def test_q_zero_excludes(self):
+        assert choose_encoding('gzip;q=0, deflate') is None
+
+    def test_wildcard(self):
+        assert choose_encoding('*') == static_cache.available_encodings()[0]
+
+    def test_identity_only(self):
+        assert choose_encoding('identity') is None
+
+
+# ---------------------------------------------------------------------------
+# Variants
+# ---------------------------------------------------------------------------
+
+class TestVariants:
+    def test_gzip_variant_round_trips(self, asset):
+        cache = StaticCache()
+        etag = cache.set(asset, JS)
+        body, variant_etag = cache.get_encoded(asset, 'gzip')
+        assert gzip.decompress(body) == JS
+        assert variant_etag == f"{etag}-gzip"
+        assert variant_etag != etag
+
+    def test_variant_built_once(self, asset, monkeypatch):
+        calls = []
+        real = static_cache._ENCODERS['gzip']
+        monkeypatch.setitem(static_cache._ENCODERS, 'gzip', lambda b: calls.append(1) or real(b))
+        cache = StaticCache()
+        cache.set(asset, JS)
+        for _ in range(5):
+            cache.get_encoded(asset, 'gzip')
+        assert len(calls) == 1
+
+    def test_precompress_on_set(self, asset):
+        cache = StaticCache()
+        cache.set(asset, JS, precompress=True)
+        stats = cache.get_stats()
+        assert stats['compressed_variants'] == len(static_cache.available_encodings())
+        assert 0 < stats['compressed_size_bytes'] < len(JS)
+
+    def test_incompressible_falls_back_to_identity(self, tmp_path):
+        path = str(tmp_path / "tiny.js")
+        cache = StaticCache()
+        cache.set(path, b"x")
+        assert cache.get_encoded(path, 'gzip') == (None, None)
+
+    def test_unknown_encoding_or_uncached(self, asset):
+        cache = StaticCache()
+        assert cache.get_encoded(asset, 'gzip') == (None, None)
+        cache.set(asset, JS)
+        assert cache.get_encoded(asset, 'compress') == (None, None)
+
+    def test_variant_dropped_with_entry(self, asset):
+        cache = StaticCache()
+        cache.set(asset, JS, precompress=True)
+        cache.invalidate(asset)
+        assert cache.get_encoded(asset, 'gzip') == (None, None)
+
+
+def test_warm_static_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(static_cache, '_cache_instance', StaticCache())
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'a.js').write_bytes(JS)
+    (tmp_path / 'js' / 'logo.png').write_bytes(b'\x89PNG')
+    (tmp_path / 'index.html').write_bytes(b"<html>" * 500)
+
+    assert warm_static_cache(str(tmp_path)) == 2
+    cache = static_cache.get_static_cache()
+    assert cache.get_stats()['compressed_variants'] >= 2
+
+
+# ---------------------------------------------------------------------------
+# LRU budget and invalidation
+# ---------------------------------------------------------------------------
+
+class TestBudget:
+    def _files(self, tmp_path, n, size):
+        paths = []
+        for i in range(n):
+            p = tmp_path / f"f{i}.bin"
+            p.write_bytes(bytes([i]) * size)
+            paths.append(str(p))
+        return paths
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        a, b, c = self._files(tmp_path, 3, 400)
+        cache = StaticCache(max_bytes=1000)
+        cache.set(a, b'\x00' * 400)
+        cache.set(b, b'\x01' * 400)
+        cache.get(a)                       # a is now most recently used
+        cache.set(c, b'\x02' * 400)        # must evict b
+        assert cache.get(b) == (None, None)
+        assert cache.get(a)[0] is not None
+        stats = cache.get_stats()
+        assert stats['evictions'] == 1
+        assert stats['evicted_bytes'] == 400
+        assert stats['total_bytes'] <= stats['max_bytes']
+
+    def test_variants_count_toward_budget(self, asset):
+        cache = StaticCache()
+        cache.set(asset, JS, precompress=True)
+        stats = cache.get_stats()
+        assert stats['total_bytes'] == len(JS) + stats['compressed_size_bytes']
+
+    def test_oversized_content_not_stored(self, asset):
+        cache = StaticCache(max_bytes=10)
+        etag = cache.set(asset, JS)
+        assert etag
+        assert cache.get_stats()['cached_files'] == 0
+
+    def test_invalidated_on_size_change(self, asset):
+        cache = StaticCache()
+        cache.set(asset, JS)
+        st = os.stat(asset)
+        with open(asset, 'ab') as f:
+            f.write(b'// more')
+        os.utime(asset, ns=(st.st_atime_ns, st.st_mtime_ns))  # same mtime
+        assert cache.get(asset) == (None, None)
+        assert cache.get_stats()['invalidations'] == 1
+
+    def test_invalidated_on_mtime_change(self, asset):
+        cache = StaticCache()
+        cache.set(asset, JS)
+        st = os.stat(asset)
+        os.utime(asset, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert cache.get(asset) == (None, None)
+
+    def test_is_large(self):
+        cache = StaticCache(large_file_bytes=100)
+        assert cache.is_large(100)
+        assert not cache.is_large(99)
+
+
+# ---------------------------------------------------------------------------
+# End-to-end through the request handler
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    from server.http_server import BoundedThreadPoolHTTPServer
+    from server.request_handler import CustomHTTPRequestHandler
+
+    (tmp_path / 'app.js').write_bytes(JS)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(static_cache, '_cache_instance', StaticCache(large_file_bytes=64 * 1024))
+    httpd = BoundedThreadPoolHTTPServer(('127.0.0.1', 0), CustomHTTPRequestHandler, max_workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(port, headers, path='/app.js'):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        conn.request('GET', path, headers=headers)
+        resp = conn.getresponse()
+        return resp.status, dict(resp.getheaders()), resp.read()
+    finally:
+        conn.close()
+
+
+def test_serves_precompressed_gzip(served):
+    status, headers, body = _get(served, {'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert headers['ETag'].endswith('-gzip')
+    assert gzip.decompress(body) == JS
+
+
+def test_identity_still_varies(served):
+    status, headers, body = _get(served, {})
+    assert status == 200
+    assert 'Content-Encoding' not in headers
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert body == JS
+
+
+def test_not_modified_per_encoding(served):
+    _, gz_headers, _ = _get(served, {'Accept-Encoding': 'gzip'})
+    _, id_headers, _ = _get(served, {})
+
+    status, _, _ = _get(served, {'Accept-Encoding': 'gzip', 'If-None-Match': gz_headers['ETag']})
+    assert status == 304
+
+    # An identity ETag must not validate the gzip representation
+    status, _, _ = _get(served, {'Accept-Encoding': 'gzip', 'If-None-Match': id_headers['ETag']})
+    assert status == 200
+
+
+def test_large_file_streamed_uncached(served, tmp_path):
+    payload = os.urandom(256 * 1024)
+    (tmp_path / 'deck.pdf').write_bytes(payload)
+
+    status, headers, body = _get(served, {'Accept-Encoding': 'gzip'}, path='/deck.pdf')
+    assert status == 200
+    assert body == payload
+    assert headers['Content-Type'] == 'application/pdf'
+    assert 'Content-Encoding' not in headers
+
+    stats = static_cache.get_static_cache().get_stats()
+    assert stats['passthrough_served'] == 1
+    assert stats['cached_files'] == 0
+
+    status, _, _ = _get(served, {'If-None-Match': headers['ETag']}, path='/deck.pdf')
+    assert status == 304